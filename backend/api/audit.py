@@ -14,8 +14,8 @@ from schemas.audit_schemas import (
 )
 from models.audit import SecurityEvent, AuditAction
 from schemas.audit_schemas import SecurityLogCreate
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from services.rate_limit_service import rate_limiter
+from services.export_artifact_service import export_artifacts
 import structlog
 
 logger = structlog.get_logger()
@@ -23,14 +23,11 @@ logger = structlog.get_logger()
 # Create router
 router = APIRouter(prefix="/companies/{company_id}/audit", tags=["audit"])
 
-# Rate limiter
-limiter = Limiter(key_func=get_remote_address)
-
 # Auth service
 auth_service = AuthService()
 
 @router.get("/logs", response_model=AuditLogList)
-@limiter.limit("30/minute")
+@rate_limiter.limit("30/minute")
 async def get_audit_logs(
     request: Request,
     company_id: str,
@@ -66,7 +63,7 @@ async def get_audit_logs(
                 company_id=company_id,
                 event_type=SecurityEvent.PERMISSION_DENIED,
                 success=False,
-                ip_address=get_remote_address(request),
+                ip_address=rate_limiter.client_ip(request),
                 user_agent=request.headers.get("user-agent"),
                 endpoint="/audit/logs",
                 request_method="GET",
@@ -110,7 +107,7 @@ async def get_audit_logs(
             company_id=company_id,
             event_type=SecurityEvent.SENSITIVE_DATA_ACCESS,
             success=True,
-            ip_address=get_remote_address(request),
+            ip_address=rate_limiter.client_ip(request),
             user_agent=request.headers.get("user-agent"),
             endpoint="/audit/logs",
             request_method="GET",
@@ -129,7 +126,7 @@ async def get_audit_logs(
         )
 
 @router.get("/logs/{audit_id}", response_model=AuditLogResponse)
-@limiter.limit("60/minute")
+@rate_limiter.limit("60/minute")
 async def get_audit_log(
     request: Request,
     company_id: str,
@@ -178,7 +175,7 @@ async def get_audit_log(
         )
 
 @router.get("/logs/transaction/{transaction_id}", response_model=List[AuditLogResponse])
-@limiter.limit("30/minute")
+@rate_limiter.limit("30/minute")
 async def get_transaction_audit_logs(
     request: Request,
     company_id: str,
@@ -221,7 +218,7 @@ async def get_transaction_audit_logs(
         )
 
 @router.get("/logs/user/{user_id}", response_model=List[AuditLogResponse])
-@limiter.limit("30/minute")
+@rate_limiter.limit("30/minute")
 async def get_user_audit_logs(
     request: Request,
     company_id: str,
@@ -263,8 +260,45 @@ async def get_user_audit_logs(
             detail="Failed to retrieve user audit logs"
         )
 
+async def _require_audit_export(
+    request: Request,
+    company_id: str,
+    db: AsyncSession,
+    current_user: User
+) -> SecurityService:
+    """Check company access and the audit export permission, logging denials"""
+    
+    # Check if user has access to this company
+    if not await auth_service.check_company_access(current_user.user_id, company_id, db):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this company"
+        )
+    
+    # Check audit export permission
+    security_service = SecurityService(db)
+    if not await security_service.check_user_permissions(current_user.user_id, company_id, "audit", "export"):
+        # Log security event
+        await security_service.create_security_log(SecurityLogCreate(
+            user_id=current_user.user_id,
+            company_id=company_id,
+            event_type=SecurityEvent.PERMISSION_DENIED,
+            success=False,
+            ip_address=rate_limiter.client_ip(request),
+            user_agent=request.headers.get("user-agent"),
+            endpoint=request.url.path,
+            request_method=request.method,
+            details={"resource": "audit", "action": "export"}
+        ))
+        
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions to export audit reports"
+        )
+    return security_service
+
 @router.post("/reports", response_model=AuditReportResponse)
-@limiter.limit("10/minute")
+@rate_limiter.limit("10/minute")
 async def generate_audit_report(
     request: Request,
     company_id: str,
@@ -276,37 +310,11 @@ async def generate_audit_report(
     Generate audit report in various formats
     """
     try:
-        # Check if user has access to this company
-        if not await auth_service.check_company_access(current_user.user_id, company_id, db):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to this company"
-            )
-        
-        # Check audit export permission
-        security_service = SecurityService(db)
-        if not await security_service.check_user_permissions(current_user.user_id, company_id, "audit", "export"):
-            # Log security event
-            await security_service.create_security_log(SecurityLogCreate(
-                user_id=current_user.user_id,
-                company_id=company_id,
-                event_type=SecurityEvent.PERMISSION_DENIED,
-                success=False,
-                ip_address=get_remote_address(request),
-                user_agent=request.headers.get("user-agent"),
-                endpoint="/audit/reports",
-                request_method="POST",
-                details={"resource": "audit", "action": "export"}
-            ))
-            
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Insufficient permissions to export audit reports"
-            )
+        security_service = await _require_audit_export(request, company_id, db, current_user)
         
         # Generate report
         audit_service = AuditService(db)
-        report = await audit_service.generate_audit_report(company_id, report_request)
+        report = await audit_service.generate_audit_report(company_id, report_request, current_user.user_id)
         
         # Log data export
         await security_service.create_security_log(SecurityLogCreate(
@@ -314,7 +322,7 @@ async def generate_audit_report(
             company_id=company_id,
             event_type=SecurityEvent.DATA_EXPORT,
             success=True,
-            ip_address=get_remote_address(request),
+            ip_address=rate_limiter.client_ip(request),
             user_agent=request.headers.get("user-agent"),
             endpoint="/audit/reports",
             request_method="POST",
@@ -337,8 +345,30 @@ async def generate_audit_report(
             detail="Failed to generate audit report"
         )
 
+@router.get("/reports/download/{filename}")
+async def download_audit_report(
+    request: Request,
+    company_id: str,
+    filename: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download an exported audit report
+    """
+    await _require_audit_export(request, company_id, db, current_user)
+    
+    artifact = export_artifacts.get(company_id, filename.split(".", 1)[0])
+    if artifact is None or artifact.kind != "audit":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    
+    return export_artifacts.file_response(request, artifact)
+
 @router.get("/summary")
-@limiter.limit("20/minute")
+@rate_limiter.limit("20/minute")
 async def get_audit_summary(
     request: Request,
     company_id: str,
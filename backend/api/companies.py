@@ -350,8 +350,7 @@ async def update_company_user(
         # Check admin access
         await company_service._check_company_admin_access(db, company_id, str(user.user_id))
         
-        # For now, just return success message
-        # In production, you'd update the user's membership
+        await company_service.update_company_user(db, company_id, user_id, update_data)
         
         return MessageResponse(message="User updated successfully")
         
@@ -376,8 +375,7 @@ async def remove_company_user(
         # Check admin access
         await company_service._check_company_admin_access(db, company_id, str(user.user_id))
         
-        # For now, just return success message
-        # In production, you'd deactivate the user's membership
+        await company_service.remove_company_user(db, company_id, user_id)
         
         return MessageResponse(message="User removed successfully")
         
@@ -4,12 +4,17 @@ from database.connection import get_db
 from models.user import User
 from services.security import get_current_user
 from services.inventory_service import InventoryService
+from services.inventory_costing_service import inventory_costing
+from services.inventory_checkpoint_service import inventory_checkpoints
+from services.inventory_ledger_service import inventory_ledger
 from schemas.inventory_schemas import (
-    InventorySearchFilters, PaginatedResponse, MessageResponse,
+    InventorySearchFilters, MessageResponse,
     InventorySummary, ItemInventorySummary, TransactionSearchFilters,
-    InventoryTransactionResponse, InventoryValuationCreate, InventoryValuationResponse
+    InventoryTransactionResponse, InventoryValuationCreate, InventoryValuationResponse,
+    InventoryCostLayerResponse, InventoryLedgerPage
 )
 from typing import List, Optional, Dict, Any
+from datetime import date
 import structlog
 
 logger = structlog.get_logger()
@@ -44,6 +49,94 @@ async def get_inventory_overview(
             detail="Failed to get inventory overview"
         )
 
+@router.get("/summary/snapshot", response_model=Dict[str, Any])
+async def get_inventory_snapshot(
+    company_id: str,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get company inventory summary statistics from the snapshot kept current by stock movements"""
+    try:
+        # Verify user has access to company
+        if not await InventoryService.verify_company_access(db, str(user.user_id), company_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this company"
+            )
+        
+        return await InventoryService.get_inventory_snapshot(db, company_id)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to get inventory snapshot", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get inventory snapshot"
+        )
+
+@router.get("/valuation/as-of", response_model=Dict[str, Any])
+async def get_inventory_as_of(
+    company_id: str,
+    as_of_date: date = Query(...),
+    location_id: Optional[str] = Query(None),
+    item_id: Optional[str] = Query(None),
+    include_inactive_items: bool = Query(False),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get inventory quantity and value as of a date from the movement ledger"""
+    try:
+        # Verify user has access to company
+        if not await InventoryService.verify_company_access(db, str(user.user_id), company_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this company"
+            )
+        
+        return await inventory_checkpoints.get_balances_as_of(
+            db, company_id, as_of_date, location_id, item_id, include_inactive_items
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to get inventory as of date", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get inventory as of date"
+        )
+
+@router.get("/low-stock", response_model=List[Dict[str, Any]])
+async def get_low_stock_items(
+    company_id: str,
+    location_id: Optional[str] = Query(None),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get items with low stock levels"""
+    try:
+        # Verify user has access to company
+        if not await InventoryService.verify_company_access(db, str(user.user_id), company_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this company"
+            )
+        
+        low_stock_items = await InventoryService.get_low_stock_items(
+            db, company_id, location_id
+        )
+        return low_stock_items
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to get low stock items", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get low stock items"
+        )
+
 @router.get("/{item_id}", response_model=Dict[str, Any])
 async def get_item_inventory(
     company_id: str,
@@ -72,7 +165,36 @@ async def get_item_inventory(
             detail="Failed to get item inventory"
         )
 
-@router.get("/{item_id}/transactions", response_model=PaginatedResponse)
+@router.get("/{item_id}/cost-layers", response_model=List[InventoryCostLayerResponse])
+async def get_item_cost_layers(
+    company_id: str,
+    item_id: str,
+    location_id: Optional[str] = Query(None),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the open cost layers of an item, oldest first"""
+    try:
+        # Verify user has access to company
+        if not await InventoryService.verify_company_access(db, str(user.user_id), company_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this company"
+            )
+        
+        layers = await inventory_costing.get_open_layers(db, company_id, item_id, location_id)
+        return [InventoryCostLayerResponse.from_orm(layer) for layer in layers]
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to get item cost layers", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get item cost layers"
+        )
+
+@router.get("/{item_id}/transactions", response_model=InventoryLedgerPage)
 async def get_item_transactions(
     company_id: str,
     item_id: str,
@@ -80,9 +202,8 @@ async def get_item_transactions(
     transaction_type: Optional[str] = Query(None),
     date_from: Optional[str] = Query(None),
     date_to: Optional[str] = Query(None),
-    sort_by: Optional[str] = Query("transaction_date"),
-    sort_order: str = Query("desc"),
-    page: int = Query(1, ge=1),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     page_size: int = Query(20, ge=1, le=100),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -101,24 +222,24 @@ async def get_item_transactions(
             transaction_type=transaction_type,
             date_from=date_from,
             date_to=date_to,
-            sort_by=sort_by,
-            sort_order=sort_order,
-            page=page,
-            page_size=page_size
+            sort_order=sort_order
         )
         
-        transactions, total = await InventoryService.get_item_transactions(
-            db, company_id, item_id, filters
+        page = await InventoryService.get_item_transactions(
+            db, company_id, item_id, filters, cursor, page_size
         )
         
-        return PaginatedResponse(
-            items=[InventoryTransactionResponse.from_orm(t) for t in transactions],
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=(total + page_size - 1) // page_size
+        return InventoryLedgerPage(
+            items=[InventoryTransactionResponse.from_orm(t) for t in page["items"]],
+            has_more=page["has_more"],
+            next_cursor=page["next_cursor"]
         )
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -128,14 +249,15 @@ async def get_item_transactions(
             detail="Failed to get item transactions"
         )
 
-@router.get("/low-stock", response_model=List[Dict[str, Any]])
-async def get_low_stock_items(
+@router.post("/{item_id}/transactions/rebalance", response_model=Dict[str, Any])
+async def rebalance_item_transactions(
     company_id: str,
+    item_id: str,
     location_id: Optional[str] = Query(None),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get items with low stock levels"""
+    """Recompute the running balances of an item's transactions"""
     try:
         # Verify user has access to company
         if not await InventoryService.verify_company_access(db, str(user.user_id), company_id):
@@ -144,18 +266,22 @@ async def get_low_stock_items(
                 detail="Access denied to this company"
             )
         
-        low_stock_items = await InventoryService.get_low_stock_items(
-            db, company_id, location_id
-        )
-        return low_stock_items
+        updated = await inventory_ledger.rebalance(db, company_id, item_id, location_id)
+        await db.commit()
+        
+        return {
+            "item_id": item_id,
+            "location_id": location_id,
+            "transactions_updated": updated
+        }
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error("Failed to get low stock items", error=str(e))
+        logger.error("Failed to rebalance item transactions", error=str(e))
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to get low stock items"
+            detail="Failed to rebalance item transactions"
         )
 
 @router.post("/valuation", response_model=InventoryValuationResponse, status_code=status.HTTP_201_CREATED)
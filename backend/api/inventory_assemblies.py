@@ -6,9 +6,11 @@ from services.security import get_current_user
 from services.inventory_service import InventoryAssemblyService
 from schemas.inventory_schemas import (
     InventoryAssemblyCreate, InventoryAssemblyUpdate, InventoryAssemblyResponse,
-    AssemblyBuildRequest, AssemblyBuildResponse, PaginatedResponse, MessageResponse
+    AssemblyBuildRequest, AssemblyBuildResponse, AssemblyBatchBuildRequest,
+    PaginatedResponse, MessageResponse
 )
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
+from decimal import Decimal
 import structlog
 
 logger = structlog.get_logger()
@@ -32,10 +34,15 @@ async def create_assembly(
             )
         
         assembly = await InventoryAssemblyService.create_assembly(
-            db, assembly_data
+            db, company_id, assembly_data
         )
         return InventoryAssemblyResponse.from_orm(assembly)
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -77,6 +84,76 @@ async def get_assemblies(
             detail="Failed to get inventory assemblies"
         )
 
+@router.get("/items/{assembly_item_id}/requirements", response_model=List[Dict[str, Any]])
+async def get_assembly_requirements(
+    company_id: str,
+    assembly_item_id: str,
+    quantity: Decimal = Query(Decimal('1'), gt=0),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the leaf components needed to build an assembly through every level of its bill of materials"""
+    try:
+        # Verify user has access to company
+        if not await InventoryAssemblyService.verify_company_access(db, str(user.user_id), company_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this company"
+            )
+        
+        return await InventoryAssemblyService.get_assembly_requirements(
+            db, company_id, assembly_item_id, quantity
+        )
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to get assembly requirements", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get assembly requirements"
+        )
+
+@router.post("/build", response_model=List[AssemblyBuildResponse], status_code=status.HTTP_201_CREATED)
+async def build_assemblies(
+    company_id: str,
+    batch_request: AssemblyBatchBuildRequest,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Build several assemblies in one request; all builds succeed or none do"""
+    try:
+        # Verify user has access to company
+        if not await InventoryAssemblyService.verify_company_access(db, str(user.user_id), company_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this company"
+            )
+        
+        build_results = await InventoryAssemblyService.build_assemblies(
+            db, company_id, batch_request.builds, str(user.user_id)
+        )
+        return [AssemblyBuildResponse(**build_result) for build_result in build_results]
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to build assemblies", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to build assemblies"
+        )
+
 @router.put("/{assembly_id}", response_model=InventoryAssemblyResponse)
 async def update_assembly(
     company_id: str,
@@ -106,6 +183,11 @@ async def update_assembly(
         
         return InventoryAssemblyResponse.from_orm(updated_assembly)
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except HTTPException:
         raise
     except Exception as e:
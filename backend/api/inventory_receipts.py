@@ -36,6 +36,11 @@ async def create_receipt(
         )
         return InventoryReceiptResponse.from_orm(receipt)
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except HTTPException:
         raise
     except Exception as e:
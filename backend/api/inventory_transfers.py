@@ -0,0 +1,262 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.connection import get_db
+from models.user import User
+from services.security import get_current_user
+from services.inventory_service import InventoryTransferService
+from schemas.inventory_schemas import (
+    InventoryTransferCreate, InventoryTransferReceive, InventoryTransferResponse,
+    TransferSearchFilters, StockRebalanceRequest, StockRebalanceResponse, PaginatedResponse
+)
+from typing import Optional
+import structlog
+
+logger = structlog.get_logger()
+
+router = APIRouter(prefix="/companies/{company_id}/inventory-transfers", tags=["Inventory Transfers"])
+
+@router.post("/", response_model=InventoryTransferResponse, status_code=status.HTTP_201_CREATED)
+async def create_transfer(
+    company_id: str,
+    transfer_data: InventoryTransferCreate,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Transfer stock between locations, directly or through transit"""
+    try:
+        # Verify user has access to company
+        if not await InventoryTransferService.verify_company_access(db, str(user.user_id), company_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this company"
+            )
+        
+        transfer = await InventoryTransferService.create_transfer(
+            db, company_id, transfer_data, str(user.user_id)
+        )
+        return InventoryTransferResponse.from_orm(transfer)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to create inventory transfer", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create inventory transfer"
+        )
+
+@router.post("/rebalance", response_model=StockRebalanceResponse)
+async def rebalance_stock(
+    company_id: str,
+    request: StockRebalanceRequest,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Move surplus stock to locations below their reorder point for many items at once"""
+    try:
+        # Verify user has access to company
+        if not await InventoryTransferService.verify_company_access(db, str(user.user_id), company_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this company"
+            )
+        
+        result = await InventoryTransferService.rebalance_stock(
+            db, company_id, request, str(user.user_id)
+        )
+        return StockRebalanceResponse(
+            moves=result["moves"],
+            transfers=[InventoryTransferResponse.from_orm(transfer) for transfer in result["transfers"]]
+        )
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to rebalance stock", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to rebalance stock"
+        )
+
+@router.get("/", response_model=PaginatedResponse)
+async def get_transfers(
+    company_id: str,
+    location_id: Optional[str] = Query(None),
+    transfer_status: Optional[str] = Query(None, alias="status"),
+    date_from: Optional[str] = Query(None),
+    date_to: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get stock transfers with pagination and filtering"""
+    try:
+        # Verify user has access to company
+        if not await InventoryTransferService.verify_company_access(db, str(user.user_id), company_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this company"
+            )
+        
+        filters = TransferSearchFilters(
+            location_id=location_id,
+            status=transfer_status,
+            date_from=date_from,
+            date_to=date_to,
+            page=page,
+            page_size=page_size
+        )
+        
+        transfers, total = await InventoryTransferService.get_transfers(
+            db, company_id, filters
+        )
+        
+        return PaginatedResponse(
+            items=[InventoryTransferResponse.from_orm(transfer) for transfer in transfers],
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=(total + page_size - 1) // page_size
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to get inventory transfers", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get inventory transfers"
+        )
+
+@router.get("/{transfer_id}", response_model=InventoryTransferResponse)
+async def get_transfer(
+    company_id: str,
+    transfer_id: str,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get transfer by ID"""
+    try:
+        # Verify user has access to company
+        if not await InventoryTransferService.verify_company_access(db, str(user.user_id), company_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this company"
+            )
+        
+        transfer = await InventoryTransferService.get_transfer_by_id(
+            db, company_id, transfer_id
+        )
+        
+        if not transfer:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Transfer not found"
+            )
+        
+        return InventoryTransferResponse.from_orm(transfer)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to get transfer", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get transfer"
+        )
+
+@router.post("/{transfer_id}/receive", response_model=InventoryTransferResponse)
+async def receive_transfer(
+    company_id: str,
+    transfer_id: str,
+    receive_data: InventoryTransferReceive,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Receive an in-transit transfer at its destination"""
+    try:
+        # Verify user has access to company
+        if not await InventoryTransferService.verify_company_access(db, str(user.user_id), company_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this company"
+            )
+        
+        transfer = await InventoryTransferService.receive_transfer(
+            db, company_id, transfer_id, receive_data, str(user.user_id)
+        )
+        
+        if not transfer:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Transfer not found"
+            )
+        
+        return InventoryTransferResponse.from_orm(transfer)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to receive transfer", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to receive transfer"
+        )
+
+@router.post("/{transfer_id}/cancel", response_model=InventoryTransferResponse)
+async def cancel_transfer(
+    company_id: str,
+    transfer_id: str,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Cancel an in-transit transfer, returning its stock to the source location"""
+    try:
+        # Verify user has access to company
+        if not await InventoryTransferService.verify_company_access(db, str(user.user_id), company_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this company"
+            )
+        
+        transfer = await InventoryTransferService.cancel_transfer(
+            db, company_id, transfer_id, str(user.user_id)
+        )
+        
+        if not transfer:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Transfer not found"
+            )
+        
+        return InventoryTransferResponse.from_orm(transfer)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to cancel transfer", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to cancel transfer"
+        )
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from database.connection import get_db
 from models.user import User
 from services.security import get_current_user
 from services.transaction_service import TransactionService
+from services.pdf_render_service import pdf_render_service
+from services.export_artifact_service import export_artifacts
 from schemas.transaction_schemas import (
     InvoiceCreate, InvoiceUpdate, InvoiceResponse,
     TransactionSearchFilters, MessageResponse, PaginatedResponse
@@ -300,6 +302,7 @@ async def send_invoice_email(
 async def get_invoice_pdf(
     company_id: str,
     invoice_id: str,
+    request: Request,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -319,12 +322,10 @@ async def get_invoice_pdf(
                 detail="Invoice not found"
             )
         
-        # TODO: Implement PDF generation
-        return {
-            "message": "PDF generation not implemented yet",
-            "invoice_id": invoice_id,
-            "download_url": f"/api/companies/{company_id}/invoices/{invoice_id}/pdf"
-        }
+        company = await TransactionService.get_company(db, company_id)
+        artifact = await pdf_render_service.render_invoice(db, company, invoice)
+        
+        return export_artifacts.file_response(request, artifact)
         
     except HTTPException:
         raise
@@ -333,4 +334,41 @@ async def get_invoice_pdf(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to generate invoice PDF"
-        )
\ No newline at end of file
+        )
+
+@router.get("/archive/{year}/{month}")
+async def get_invoice_pdf_archive(
+    company_id: str,
+    request: Request,
+    year: int = Path(..., ge=1, le=9999),
+    month: int = Path(..., ge=1, le=12),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Generate and download a zip archive of a month's invoice PDFs"""
+    try:
+        # Verify user has access to company
+        if not await TransactionService.verify_company_access(db, str(user.user_id), company_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this company"
+            )
+        
+        company = await TransactionService.get_company(db, company_id)
+        archive = await pdf_render_service.render_month_archive(db, company, year, month)
+        if archive is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No invoices found for this month"
+            )
+        
+        return export_artifacts.file_response(request, archive)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to generate invoice archive", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to generate invoice archive"
+        )
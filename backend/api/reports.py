@@ -1,19 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc, and_, case
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 
-from database.connection import get_db
+from database.connection import get_db, AsyncSessionLocal
 from services.auth_service import auth_service
 from services.security import get_current_user
 from services.report_service import ReportService, MemorizedReportService, ReportGroupService
-from services.financial_report_service import FinancialReportService
+from services.financial_report_service import FinancialReportService, GENERAL_LEDGER_COLUMNS
 from services.report_export_service import ReportExportService
+from services.export_worker_pool import export_workers
+from services.export_artifact_service import export_artifacts
+from services.report_telemetry_service import report_telemetry
+from services.report_registry import report_registry
+from services.budget_service import budget_service
+from services.access_control_service import access_control
 from models.reports import ReportDefinition, MemorizedReport, MemorizedReportGroup, ReportExecution
-from models.user import User
+from models.user import User, UserRole
 from models.transactions import Transaction, TransactionLine, TransactionType, TransactionStatus
 from models.list_management import Account, AccountType
 from schemas.report_schemas import (
@@ -36,7 +42,10 @@ from schemas.report_schemas import (
     
     # Standard Financial Report schemas
     ProfitLossRequest, BalanceSheetRequest, CashFlowRequest,
-    TrialBalanceRequest, AgingReportRequest,
+    TrialBalanceRequest, AgingReportRequest, GeneralLedgerRequest,
+    
+    # Budget schemas
+    BudgetCreate, BudgetUpdate, BudgetResponse,
     
     # Utility schemas
     MessageResponse, PaginatedResponse
@@ -109,7 +118,7 @@ async def get_report(
 ):
     """Get specific report definition"""
     
-    report = await ReportService.get_report_definition_by_id(db, report_id)
+    report = await ReportService.resolve_report_definition(db, report_id)
     if not report:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -174,6 +183,56 @@ async def get_report_data(
     
     return report_data
 
+@router.put("/reports/definition/{report_id}", response_model=ReportDefinitionResponse)
+async def update_report(
+    company_id: str,
+    report_id: str,
+    report_data: ReportDefinitionUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """Update a custom report definition"""
+    
+    report = await ReportService.resolve_report_definition(db, report_id)
+    if not report:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+    if report.is_system_report:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="System reports cannot be modified; customize a copy instead"
+        )
+    if report.created_by != str(current_user.user_id):
+        # Only the author may change the SQL; company admins may edit the rest
+        # of reports written by members of their company
+        if "sql_template" in report_data.dict(exclude_unset=True):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only the report's creator can change its SQL template"
+            )
+        permissions = await access_control.get_permissions(db, str(current_user.user_id), company_id)
+        creator_is_member = bool(report.created_by) and (
+            await access_control.get_permissions(db, report.created_by, company_id)
+        ).has_membership
+        if permissions.role != UserRole.ADMIN.value or not creator_is_member:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only the report's creator or a company admin can modify this report"
+            )
+    
+    updated_report = await ReportService.update_report_definition(db, report_id, report_data)
+    return ReportDefinitionResponse.from_orm(updated_report)
+
+@router.get("/reports/registry")
+async def get_report_registry(
+    company_id: str,
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """List the registered system reports with their parameters and caching policy"""
+    return {"reports": report_registry.list()}
+
 # Report Customization Endpoints
 @router.post("/reports/definition/{report_id}/customize", response_model=ReportDefinitionResponse)
 async def customize_report(
@@ -202,7 +261,7 @@ async def update_report_filters(
 ):
     """Update report filters"""
     
-    report = await ReportService.get_report_definition_by_id(db, report_id)
+    report = await ReportService.resolve_report_definition(db, report_id)
     if not report:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -222,7 +281,7 @@ async def get_report_columns(
 ):
     """Get report column definitions"""
     
-    report = await ReportService.get_report_definition_by_id(db, report_id)
+    report = await ReportService.resolve_report_definition(db, report_id)
     if not report:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -368,157 +427,342 @@ async def delete_report_group(
     # This would need proper implementation
     return {"message": "Report group deleted successfully"}
 
-# Report Export Endpoints
-@router.post("/reports/definition/{report_id}/export/pdf", response_model=ReportExportResponse)
-async def export_report_to_pdf(
+# Budget Endpoints
+@router.get("/budgets", response_model=List[BudgetResponse])
+async def get_budgets(
     company_id: str,
-    report_id: str,
-    export_request: ReportExportRequest,
-    background_tasks: BackgroundTasks,
+    fiscal_year: Optional[int] = Query(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_with_company_access)
 ):
-    """Export report to PDF"""
+    """Get budgets"""
     
-    # Get report data
-    report_data = await ReportService.get_report_data(
-        db, company_id, report_id, export_request.parameters
-    )
+    budgets = await budget_service.list_budgets(db, company_id, fiscal_year)
+    return [budget_service.to_response(budget) for budget in budgets]
+
+@router.post("/budgets", response_model=BudgetResponse)
+async def create_budget(
+    company_id: str,
+    budget_data: BudgetCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """Create a budget"""
     
-    # Get company and report info
+    try:
+        budget = await budget_service.create_budget(db, company_id, current_user.user_id, budget_data)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return budget_service.to_response(budget)
+
+@router.get("/budgets/{budget_id}", response_model=BudgetResponse)
+async def get_budget(
+    company_id: str,
+    budget_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """Get a budget with its amounts"""
+    
+    budget = await budget_service.get_budget(db, company_id, budget_id)
+    if not budget:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Budget not found"
+        )
+    
+    return budget_service.to_response(budget)
+
+@router.put("/budgets/{budget_id}", response_model=BudgetResponse)
+async def update_budget(
+    company_id: str,
+    budget_id: str,
+    budget_data: BudgetUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """Update a budget"""
+    
+    try:
+        budget = await budget_service.update_budget(db, company_id, budget_id, budget_data)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not budget:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Budget not found"
+        )
+    
+    return budget_service.to_response(budget)
+
+@router.delete("/budgets/{budget_id}")
+async def delete_budget(
+    company_id: str,
+    budget_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """Delete a budget"""
+    
+    deleted = await budget_service.delete_budget(db, company_id, budget_id)
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Budget not found"
+        )
+    
+    return {"message": "Budget deleted successfully"}
+
+# Report Export Endpoints
+async def _export_report_artifact(
+    db: AsyncSession,
+    company_id: str,
+    report_id: str,
+    export_request: ReportExportRequest
+) -> ReportExportResponse:
+    """Return the stored export of a report, rendering it only when its inputs changed"""
+    
+    report_def = await ReportService.resolve_report_definition(db, report_id)
+    if not report_def:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report definition not found"
+        )
     company = await ReportService.get_company(db, company_id)
-    report_def = await ReportService.get_report_definition_by_id(db, report_id)
     
-    # Export to PDF
     export_service = ReportExportService()
-    export_result = await export_service.export_report(
-        report_data.dict(),
-        export_request,
-        company.company_name,
-        report_def.report_name if report_def else "Report"
-    )
+    extension = export_service.FILE_EXTENSIONS.get(export_request.format)
+    if extension is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format: {export_request.format}"
+        )
+    data_version = await ReportService.data_version(db, company_id, report_def)
+    
+    async def counted(row_chunks):
+        async for chunk in row_chunks:
+            run.rows += len(chunk)
+            yield chunk
+    
+    async def render(filepath):
+        if export_request.format in export_service.COLUMNAR_FORMATS:
+            # Columnar files are written batch by batch straight from the query cursor
+            columns, row_chunks = await ReportService.open_report_stream(
+                db, company_id, report_def, export_request.parameters,
+                [f.dict() for f in export_request.filters]
+            )
+            await export_service.export_columnar(
+                columns, counted(row_chunks), filepath, export_request.format,
+                company.company_name, report_def.report_name
+            )
+            return
+        report_data = await ReportService.get_report_data(
+            db, company_id, report_id, export_request.parameters, report_def=report_def
+        )
+        await export_service.export_report(
+            report_data.dict(),
+            export_request,
+            company.company_name,
+            report_def.report_name,
+            company_id=company_id,
+            filepath=filepath
+        )
+    
+    async with report_telemetry.track(db, company_id, report_def, f"export_{extension}") as run:
+        artifact, reused = await export_artifacts.get_or_create(
+            company_id,
+            f"report:{report_id}",
+            {
+                "request": export_request.dict(),
+                "definition_updated_at": report_def.updated_at,
+                "company_name": company.company_name
+            },
+            data_version,
+            extension,
+            f"{export_service._sanitize_filename(report_def.report_name)}.{extension}",
+            render
+        )
+        run.cache_hit = reused
+        run.bytes = artifact.file_size
     
     return ReportExportResponse(
-        file_url=f"/api/companies/{company_id}/reports/download/{export_result['filename']}",
-        file_name=export_result['filename'],
-        file_size=export_result['file_size'],
-        format=export_result['format'],
-        expires_at=datetime.now().replace(hour=23, minute=59, second=59)  # End of day
+        file_url=f"/api/companies/{company_id}/reports/download/{artifact.storage_name}",
+        file_name=artifact.filename,
+        file_size=artifact.file_size,
+        format=export_request.format,
+        expires_at=export_artifacts.expires_at(artifact)
     )
 
+@router.post("/reports/definition/{report_id}/export/pdf", response_model=ReportExportResponse)
+async def export_report_to_pdf(
+    company_id: str,
+    report_id: str,
+    export_request: ReportExportRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """Export report to PDF"""
+    
+    return await _export_report_artifact(db, company_id, report_id, export_request)
+
 @router.post("/reports/definition/{report_id}/export/excel", response_model=ReportExportResponse)
 async def export_report_to_excel(
     company_id: str,
     report_id: str,
     export_request: ReportExportRequest,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_with_company_access)
 ):
     """Export report to Excel"""
     
-    # Similar implementation as PDF export
     export_request.format = "excel"
-    
-    # Get report data
-    report_data = await ReportService.get_report_data(
-        db, company_id, report_id, export_request.parameters
-    )
-    
-    # Get company and report info
-    company = await ReportService.get_company(db, company_id)
-    report_def = await ReportService.get_report_definition_by_id(db, report_id)
-    
-    # Export to Excel
-    export_service = ReportExportService()
-    export_result = await export_service.export_report(
-        report_data.dict(),
-        export_request,
-        company.company_name,
-        report_def.report_name if report_def else "Report"
-    )
-    
-    return ReportExportResponse(
-        file_url=f"/api/companies/{company_id}/reports/download/{export_result['filename']}",
-        file_name=export_result['filename'],
-        file_size=export_result['file_size'],
-        format=export_result['format'],
-        expires_at=datetime.now().replace(hour=23, minute=59, second=59)
-    )
+    return await _export_report_artifact(db, company_id, report_id, export_request)
 
 @router.post("/reports/definition/{report_id}/export/csv", response_model=ReportExportResponse)
 async def export_report_to_csv(
     company_id: str,
     report_id: str,
     export_request: ReportExportRequest,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_with_company_access)
 ):
     """Export report to CSV"""
     
-    # Similar implementation as PDF export
     export_request.format = "csv"
+    return await _export_report_artifact(db, company_id, report_id, export_request)
+
+@router.post("/reports/definition/{report_id}/export/parquet", response_model=ReportExportResponse)
+async def export_report_to_parquet(
+    company_id: str,
+    report_id: str,
+    export_request: ReportExportRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """Export report to Parquet"""
     
-    # Get report data
-    report_data = await ReportService.get_report_data(
-        db, company_id, report_id, export_request.parameters
-    )
+    export_request.format = "parquet"
+    return await _export_report_artifact(db, company_id, report_id, export_request)
+
+@router.post("/reports/definition/{report_id}/export/arrow", response_model=ReportExportResponse)
+async def export_report_to_arrow(
+    company_id: str,
+    report_id: str,
+    export_request: ReportExportRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """Export report to an Arrow IPC stream file"""
     
-    # Get company and report info
+    export_request.format = "arrow"
+    return await _export_report_artifact(db, company_id, report_id, export_request)
+
+@router.post("/reports/definition/{report_id}/export/csv/stream")
+async def stream_report_to_csv(
+    company_id: str,
+    report_id: str,
+    export_request: ReportExportRequest,
+    compress: bool = Query(False, description="Gzip-encode the response body"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """Stream report rows as CSV without building the full report in memory"""
+    
+    report_def = await ReportService.resolve_report_definition(db, report_id)
+    if not report_def:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report definition not found"
+        )
     company = await ReportService.get_company(db, company_id)
-    report_def = await ReportService.get_report_definition_by_id(db, report_id)
     
-    # Export to CSV
     export_service = ReportExportService()
-    export_result = await export_service.export_report(
-        report_data.dict(),
-        export_request,
-        company.company_name,
-        report_def.report_name if report_def else "Report"
-    )
-    
-    return ReportExportResponse(
-        file_url=f"/api/companies/{company_id}/reports/download/{export_result['filename']}",
-        file_name=export_result['filename'],
-        file_size=export_result['file_size'],
-        format=export_result['format'],
-        expires_at=datetime.now().replace(hour=23, minute=59, second=59)
-    )
+    filename = f"{export_service._sanitize_filename(report_def.report_name)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    parameters = export_request.parameters
+    filters = [f.dict() for f in export_request.filters]
+    
+    async def csv_body():
+        # The request session is closed once the endpoint returns, so the
+        # stream reads through its own session for as long as it runs
+        async with AsyncSessionLocal() as stream_db:
+            try:
+                async with report_telemetry.track(stream_db, company_id, report_def, "stream_csv") as run:
+                    run.bytes = 0
+                    columns, row_chunks = await ReportService.open_report_stream(
+                        stream_db, company_id, report_def, parameters, filters
+                    )
+                    
+                    async def counted_chunks():
+                        async for chunk in row_chunks:
+                            run.rows += len(chunk)
+                            yield chunk
+                    
+                    async for data in export_service.stream_csv(
+                        columns,
+                        counted_chunks(),
+                        company.company_name,
+                        report_def.report_name,
+                        report_def.column_definitions,
+                        compress=compress
+                    ):
+                        run.bytes += len(data)
+                        yield data
+            except Exception as e:
+                logger.error("CSV report stream failed", report_id=report_id, error=str(e))
+                raise
+    
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    
+    return StreamingResponse(csv_body(), media_type="text/csv", headers=headers)
+
+@router.get("/reports/telemetry")
+async def get_report_telemetry(
+    company_id: str,
+    report_id: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """Get latency, size, cache and query statistics of recent report executions"""
+    return {
+        "slow_threshold_ms": report_telemetry.slow_ms,
+        "reports": report_telemetry.summary(company_id, report_id)
+    }
+
+@router.get("/reports/exports/progress")
+async def get_export_progress(
+    company_id: str,
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """Get progress of the company's queued and running exports"""
+    return {"exports": export_workers.get_progress(company_id)}
 
 # File Download Endpoint
 @router.get("/reports/download/{filename}")
 async def download_report_file(
     company_id: str,
     filename: str,
+    request: Request,
     current_user: User = Depends(get_current_user_with_company_access)
 ):
     """Download exported report file"""
     
-    file_path = f"/app/backend/exports/{filename}"
-    
-    # Check if file exists
-    import os
-    if not os.path.exists(file_path):
+    # Audit and invoice exports are served by routes that check their own permissions
+    artifact = export_artifacts.get(company_id, filename.split(".", 1)[0])
+    if artifact is None or artifact.kind != "report":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="File not found"
         )
     
-    # Determine media type based on file extension
-    media_type = "application/octet-stream"
-    if filename.endswith('.pdf'):
-        media_type = "application/pdf"
-    elif filename.endswith('.xlsx'):
-        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    elif filename.endswith('.csv'):
-        media_type = "text/csv"
-    
-    return FileResponse(
-        path=file_path,
-        filename=filename,
-        media_type=media_type
-    )
+    return export_artifacts.file_response(request, artifact)
 
 # Standard Financial Reports Endpoints
 @router.get("/reports/profit-loss")
@@ -627,6 +871,99 @@ async def get_trial_balance_report(
     
     return report_data
 
+@router.get("/reports/general-ledger")
+async def get_general_ledger_report(
+    company_id: str,
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    account_ids: Optional[List[str]] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    page_size: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """Generate a page of the General Ledger detail report"""
+    
+    request = GeneralLedgerRequest(
+        start_date=start_date,
+        end_date=end_date,
+        account_ids=account_ids
+    )
+    
+    try:
+        report_data = await FinancialReportService.generate_general_ledger_page(
+            db, company_id, request, cursor, page_size
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return report_data
+
+@router.get("/reports/general-ledger/export/csv")
+async def stream_general_ledger_csv(
+    company_id: str,
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    account_ids: Optional[List[str]] = Query(None),
+    compress: bool = Query(False, description="Gzip-encode the response body"),
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """Stream the full General Ledger detail report as CSV"""
+    
+    request = GeneralLedgerRequest(
+        start_date=start_date,
+        end_date=end_date,
+        account_ids=account_ids
+    )
+    export_service = ReportExportService()
+    filename = f"General_Ledger_{start_date.isoformat()}_{end_date.isoformat()}.csv"
+    
+    async def csv_body():
+        async with AsyncSessionLocal() as stream_db:
+            try:
+                company = await ReportService.get_company(stream_db, company_id)
+                async for data in export_service.stream_csv(
+                    GENERAL_LEDGER_COLUMNS,
+                    FinancialReportService.stream_general_ledger(stream_db, company_id, request),
+                    company.company_name,
+                    "General Ledger",
+                    compress=compress
+                ):
+                    yield data
+            except Exception as e:
+                logger.error("General ledger stream failed", company_id=company_id, error=str(e))
+                raise
+    
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    
+    return StreamingResponse(csv_body(), media_type="text/csv", headers=headers)
+
+@router.get("/reports/budget-vs-actual")
+async def get_budget_vs_actual_report(
+    company_id: str,
+    budget_id: str = Query(...),
+    include_unbudgeted: bool = Query(False, description="Also show income and expense accounts without a budget"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_with_company_access)
+):
+    """Generate Budget vs. Actual report"""
+    
+    report_data = await budget_service.generate_budget_vs_actual(
+        db, company_id, budget_id, include_unbudgeted
+    )
+    if report_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Budget not found"
+        )
+    
+    return report_data
+
 @router.get("/reports/ar-aging")
 async def get_ar_aging_report(
     company_id: str,
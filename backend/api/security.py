@@ -15,8 +15,7 @@ from schemas.audit_schemas import (
 )
 from models.audit import SecurityEvent
 from schemas.audit_schemas import SecurityLogCreate
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from services.rate_limit_service import rate_limiter
 import structlog
 
 logger = structlog.get_logger()
@@ -24,15 +23,12 @@ logger = structlog.get_logger()
 # Create router
 router = APIRouter(prefix="/companies/{company_id}/security", tags=["security"])
 
-# Rate limiter
-limiter = Limiter(key_func=get_remote_address)
-
 # Auth service
 auth_service = AuthService()
 
 # Security Logs Endpoints
 @router.get("/logs", response_model=SecurityLogList)
-@limiter.limit("30/minute")
+@rate_limiter.limit("30/minute")
 async def get_security_logs(
     request: Request,
     company_id: str,
@@ -69,7 +65,7 @@ async def get_security_logs(
                 company_id=company_id,
                 event_type=SecurityEvent.PERMISSION_DENIED,
                 success=False,
-                ip_address=get_remote_address(request),
+                ip_address=rate_limiter.client_ip(request),
                 user_agent=request.headers.get("user-agent"),
                 endpoint="/security/logs",
                 request_method="GET",
@@ -102,7 +98,7 @@ async def get_security_logs(
             company_id=company_id,
             event_type=SecurityEvent.SENSITIVE_DATA_ACCESS,
             success=True,
-            ip_address=get_remote_address(request),
+            ip_address=rate_limiter.client_ip(request),
             user_agent=request.headers.get("user-agent"),
             endpoint="/security/logs",
             request_method="GET",
@@ -121,7 +117,7 @@ async def get_security_logs(
         )
 
 @router.get("/summary")
-@limiter.limit("20/minute")
+@rate_limiter.limit("20/minute")
 async def get_security_summary(
     request: Request,
     company_id: str,
@@ -164,7 +160,7 @@ async def get_security_summary(
 
 # Role Management Endpoints
 @router.get("/roles", response_model=RoleList)
-@limiter.limit("30/minute")
+@rate_limiter.limit("30/minute")
 async def get_roles(
     request: Request,
     company_id: str,
@@ -207,7 +203,7 @@ async def get_roles(
         )
 
 @router.post("/roles", response_model=RoleResponse)
-@limiter.limit("10/minute")
+@rate_limiter.limit("10/minute")
 async def create_role(
     request: Request,
     company_id: str,
@@ -235,7 +231,7 @@ async def create_role(
                 company_id=company_id,
                 event_type=SecurityEvent.PERMISSION_DENIED,
                 success=False,
-                ip_address=get_remote_address(request),
+                ip_address=rate_limiter.client_ip(request),
                 user_agent=request.headers.get("user-agent"),
                 endpoint="/security/roles",
                 request_method="POST",
@@ -259,7 +255,7 @@ async def create_role(
             company_id=company_id,
             event_type=SecurityEvent.SENSITIVE_DATA_ACCESS,
             success=True,
-            ip_address=get_remote_address(request),
+            ip_address=rate_limiter.client_ip(request),
             user_agent=request.headers.get("user-agent"),
             endpoint="/security/roles",
             request_method="POST",
@@ -278,7 +274,7 @@ async def create_role(
         )
 
 @router.get("/roles/{role_id}", response_model=RoleResponse)
-@limiter.limit("60/minute")
+@rate_limiter.limit("60/minute")
 async def get_role(
     request: Request,
     company_id: str,
@@ -322,7 +318,7 @@ async def get_role(
         )
 
 @router.put("/roles/{role_id}", response_model=RoleResponse)
-@limiter.limit("10/minute")
+@rate_limiter.limit("10/minute")
 async def update_role(
     request: Request,
     company_id: str,
@@ -368,7 +364,7 @@ async def update_role(
 
 # User Permission Endpoints
 @router.get("/users/{user_id}/permissions", response_model=UserPermissionList)
-@limiter.limit("30/minute")
+@rate_limiter.limit("30/minute")
 async def get_user_permissions(
     request: Request,
     company_id: str,
@@ -411,7 +407,7 @@ async def get_user_permissions(
         )
 
 @router.put("/users/{user_id}/permissions", response_model=List[UserPermissionResponse])
-@limiter.limit("10/minute")
+@rate_limiter.limit("10/minute")
 async def update_user_permissions(
     request: Request,
     company_id: str,
@@ -440,7 +436,7 @@ async def update_user_permissions(
                 company_id=company_id,
                 event_type=SecurityEvent.PERMISSION_DENIED,
                 success=False,
-                ip_address=get_remote_address(request),
+                ip_address=rate_limiter.client_ip(request),
                 user_agent=request.headers.get("user-agent"),
                 endpoint=f"/security/users/{user_id}/permissions",
                 request_method="PUT",
@@ -467,7 +463,7 @@ async def update_user_permissions(
 
 # Security Settings Endpoints
 @router.get("/settings", response_model=SecuritySettingsResponse)
-@limiter.limit("30/minute")
+@rate_limiter.limit("30/minute")
 async def get_security_settings(
     request: Request,
     company_id: str,
@@ -507,7 +503,7 @@ async def get_security_settings(
         )
 
 @router.put("/settings", response_model=SecuritySettingsResponse)
-@limiter.limit("10/minute")
+@rate_limiter.limit("10/minute")
 async def update_security_settings(
     request: Request,
     company_id: str,
@@ -535,7 +531,7 @@ async def update_security_settings(
                 company_id=company_id,
                 event_type=SecurityEvent.PERMISSION_DENIED,
                 success=False,
-                ip_address=get_remote_address(request),
+                ip_address=rate_limiter.client_ip(request),
                 user_agent=request.headers.get("user-agent"),
                 endpoint="/security/settings",
                 request_method="PUT",
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from dotenv import load_dotenv
 import structlog
 from typing import AsyncGenerator
+import time
 
 load_dotenv()
 
@@ -64,6 +65,34 @@ class MockRedis:
     async def sadd(self, key: str, value: str):
         pass
     
+    async def xadd(self, key: str, fields: dict):
+        stream = self._data.setdefault(key, [])
+        now_ms = int(time.time() * 1000)
+        last_ms, last_seq = stream[-1][0] if stream else (0, -1)
+        entry_id = (last_ms, last_seq + 1) if now_ms <= last_ms else (now_ms, 0)
+        stream.append((entry_id, dict(fields)))
+        return f"{entry_id[0]}-{entry_id[1]}"
+
+    async def xrange(self, key: str, min: str = "-", max: str = "+"):
+        def parse(value: str, default):
+            if value in ("-", "+"):
+                return default
+            ms, _, seq = value.lstrip("(").partition("-")
+            return (int(ms), int(seq or 0))
+        low, high = parse(min, (0, 0)), parse(max, (float("inf"), 0))
+        exclusive = min.startswith("(")
+        return [
+            (f"{entry_id[0]}-{entry_id[1]}", fields) for entry_id, fields in self._data.get(key, [])
+            if (entry_id > low if exclusive else entry_id >= low) and entry_id <= high
+        ]
+
+    async def xtrim(self, key: str, minid: str):
+        ms, _, seq = minid.partition("-")
+        stream = self._data.get(key, [])
+        kept = [entry for entry in stream if entry[0] >= (int(ms), int(seq or 0))]
+        self._data[key] = kept
+        return len(stream) - len(kept)
+
     async def pipeline(self):
         return MockRedisPipeline(self)
     
@@ -13,6 +13,7 @@ from models.user import User, UserSession, CompanyMembership, Company, CompanySe
 from models.list_management import Account, Customer, Vendor, Item, Employee
 from models.transactions import Transaction, TransactionLine, JournalEntry, Payment, PaymentApplication, RecurringTransaction
 from models.reports import ReportDefinition, MemorizedReport, MemorizedReportGroup, ReportCache, ReportExecution, ReportTemplate
+from models.budget import Budget, BudgetLine
 import structlog
 import uuid
 
@@ -90,6 +91,7 @@ async def create_demo_data():
             system_reports = [
                 {
                     "report_name": "Profit & Loss",
+                    "report_key": "profit_loss",
                     "report_category": ReportCategory.COMPANY_FINANCIAL,
                     "description": "Shows company income, expenses, and net profit over a period",
                     "is_system_report": True,
@@ -125,6 +127,7 @@ async def create_demo_data():
                 },
                 {
                     "report_name": "Balance Sheet",
+                    "report_key": "balance_sheet",
                     "report_category": ReportCategory.COMPANY_FINANCIAL,
                     "description": "Shows company assets, liabilities, and equity at a point in time",
                     "is_system_report": True,
@@ -144,6 +147,7 @@ async def create_demo_data():
                 },
                 {
                     "report_name": "Cash Flow Statement",
+                    "report_key": "cash_flow",
                     "report_category": ReportCategory.COMPANY_FINANCIAL,
                     "description": "Shows cash inflows and outflows by activity type",
                     "is_system_report": True,
@@ -178,6 +182,7 @@ async def create_demo_data():
                 },
                 {
                     "report_name": "Trial Balance",
+                    "report_key": "trial_balance",
                     "report_category": ReportCategory.COMPANY_FINANCIAL,
                     "description": "Shows all account balances to verify debits equal credits",
                     "is_system_report": True,
@@ -204,6 +209,7 @@ async def create_demo_data():
                 },
                 {
                     "report_name": "A/R Aging Summary",
+                    "report_key": "ar_aging",
                     "report_category": ReportCategory.CUSTOMERS_RECEIVABLES,
                     "description": "Shows outstanding customer invoices by age",
                     "is_system_report": True,
@@ -233,6 +239,7 @@ async def create_demo_data():
                 },
                 {
                     "report_name": "A/P Aging Summary", 
+                    "report_key": "ap_aging",
                     "report_category": ReportCategory.VENDORS_PAYABLES,
                     "description": "Shows outstanding vendor bills by age",
                     "is_system_report": True,
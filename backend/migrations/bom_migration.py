@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Bill of Materials Migration Script
+Adds the index used to load assembly components level by level
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+from sqlalchemy import text
+from database.connection import engine
+
+async def create_bom_indexes():
+    """Create the assembly item index"""
+    
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_inventory_assemblies_assembly_item "
+            "ON inventory_assemblies(assembly_item_id, is_active);"
+        ))
+    
+    print("✅ Bill of materials indexes created successfully!")
+
+async def main():
+    """Main migration function"""
+    print("🚀 Starting Bill of Materials Migration...")
+    
+    try:
+        await create_bom_indexes()
+        print("\n✅ Bill of Materials Migration completed successfully!")
+    
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
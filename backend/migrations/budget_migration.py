@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Budget Migration Script
+Creates the budget and budget line tables for budget vs. actual reporting
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+from database.connection import engine, Base
+from models.user import User, Company
+from models.list_management import Account
+from models.budget import Budget, BudgetLine
+
+async def create_budget_tables():
+    """Create budget tables"""
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            lambda sync_conn: Base.metadata.create_all(
+                sync_conn, tables=[Budget.__table__, BudgetLine.__table__]
+            )
+        )
+    
+    print("✅ Budget tables created successfully!")
+
+async def main():
+    """Main migration function"""
+    print("🚀 Starting Budget Migration...")
+    
+    try:
+        await create_budget_tables()
+        print("\n✅ Budget Migration completed successfully!")
+    
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
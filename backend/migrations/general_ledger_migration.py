@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+General Ledger Migration Script
+Adds the journal entry index the General Ledger detail report pages through
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+from sqlalchemy import text
+from database.connection import engine
+
+async def create_general_ledger_indexes():
+    """Create indexes for per-account, posting-date ordered ledger reads"""
+    
+    async with engine.begin() as conn:
+        # Keyset order of the report lines and the opening balance aggregate
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_journal_entries_account_posting "
+            "ON journal_entries(account_id, posting_date, entry_id);"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_journal_entries_transaction "
+            "ON journal_entries(transaction_id);"
+        ))
+    
+    print("✅ General ledger indexes created successfully!")
+
+async def main():
+    """Main migration function"""
+    print("🚀 Starting General Ledger Migration...")
+    
+    try:
+        await create_general_ledger_indexes()
+        print("\n✅ General Ledger Migration completed successfully!")
+    
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Inventory Checkpoint Migration Script
+Creates the month-end inventory checkpoint table and builds checkpoints from existing movements
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+from sqlalchemy import text
+from database.connection import engine, Base, AsyncSessionLocal
+from models.user import Company
+from models.inventory import InventoryCheckpoint
+from services.inventory_checkpoint_service import inventory_checkpoints
+
+async def create_inventory_checkpoint_table():
+    """Create the checkpoint table and the movement date index"""
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[InventoryCheckpoint.__table__])
+        )
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_inventory_transactions_company_date "
+            "ON inventory_transactions(company_id, transaction_date);"
+        ))
+    
+    print("✅ Inventory checkpoint table created successfully!")
+
+async def build_checkpoints():
+    """Build month-end checkpoints for every company's existing movements"""
+    
+    async with AsyncSessionLocal() as db:
+        built = await inventory_checkpoints.run_once(db)
+    
+    print(f"✅ Built {sum(built.values())} monthly checkpoints for {len(built)} companies!")
+
+async def main():
+    """Main migration function"""
+    print("🚀 Starting Inventory Checkpoint Migration...")
+    
+    try:
+        await create_inventory_checkpoint_table()
+        await build_checkpoints()
+        print("\n✅ Inventory Checkpoint Migration completed successfully!")
+    
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Inventory Cost Layer Migration Script
+Creates the cost layer table and opens a layer for stock already on hand
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+import uuid
+from datetime import date, datetime
+from sqlalchemy import text
+from database.connection import engine, Base
+from models.inventory import InventoryCostLayer
+
+async def create_cost_layer_table():
+    """Create the inventory cost layer table and its indexes"""
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[InventoryCostLayer.__table__])
+        )
+    
+    print("✅ Inventory cost layer table created successfully!")
+
+async def seed_opening_layers():
+    """Open one layer at average cost for each item-location with stock and no layers"""
+    
+    async with engine.begin() as conn:
+        result = await conn.execute(text("""
+            SELECT il.item_id, il.location_id, i.company_id, il.quantity_on_hand,
+                   COALESCE(il.average_cost, 0) AS average_cost, il.last_count_date
+            FROM item_locations il
+            JOIN items i ON i.item_id = il.item_id
+            WHERE il.quantity_on_hand > 0
+            AND NOT EXISTS (
+                SELECT 1 FROM inventory_cost_layers cl
+                WHERE cl.item_id = il.item_id
+                AND (cl.location_id = il.location_id OR (cl.location_id IS NULL AND il.location_id IS NULL))
+            )
+        """))
+        item_locations = result.fetchall()
+        
+        now = datetime.utcnow()
+        for item_id, location_id, company_id, quantity, average_cost, last_count_date in item_locations:
+            await conn.execute(
+                InventoryCostLayer.__table__.insert().values(
+                    layer_id=str(uuid.uuid4()),
+                    company_id=company_id,
+                    item_id=item_id,
+                    location_id=location_id,
+                    received_date=last_count_date or date.today(),
+                    received_at=now,
+                    original_quantity=quantity,
+                    remaining_quantity=quantity,
+                    unit_cost=average_cost
+                )
+            )
+    
+    print(f"✅ Opening cost layers created for {len(item_locations)} item locations!")
+
+async def main():
+    """Main migration function"""
+    print("🚀 Starting Inventory Cost Layer Migration...")
+    
+    try:
+        await create_cost_layer_table()
+        await seed_opening_layers()
+        print("\n✅ Inventory Cost Layer Migration completed successfully!")
+    
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
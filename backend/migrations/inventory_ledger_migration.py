@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Inventory Ledger Migration Script
+Creates the movement ledger index and records opening balances for stock
+that was never recorded as movements
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+from datetime import date, timedelta
+from decimal import Decimal
+from sqlalchemy import text, select, func, and_
+from database.connection import engine, AsyncSessionLocal
+from models.list_management import Item
+from models.inventory import ItemLocation, InventoryTransaction, InventoryTransactionType
+from services.inventory_ledger_service import inventory_ledger, new_ledger_id
+from services.inventory_checkpoint_service import inventory_checkpoints
+
+async def create_inventory_ledger_index():
+    """Create the per item-location ledger index on inventory transactions"""
+    
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_inventory_transactions_ledger_order "
+            "ON inventory_transactions(company_id, item_id, location_id, transaction_date, created_at, inventory_transaction_id);"
+        ))
+        # Superseded by the index above, which orders same-day movements by created_at
+        await conn.execute(text("DROP INDEX IF EXISTS idx_inventory_transactions_ledger;"))
+    
+    print("✅ Inventory ledger index created successfully!")
+
+async def seed_opening_balances():
+    """Record one opening movement per item-location whose on-hand is not the sum of its movements"""
+    
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(
+                ItemLocation.item_id,
+                ItemLocation.location_id,
+                Item.company_id,
+                ItemLocation.quantity_on_hand,
+                func.coalesce(ItemLocation.total_value, 0).label("total_value"),
+                ItemLocation.last_count_date,
+                func.coalesce(func.sum(InventoryTransaction.quantity_change), 0).label("moved_quantity"),
+                func.coalesce(func.sum(InventoryTransaction.total_cost), 0).label("moved_value"),
+                func.min(InventoryTransaction.transaction_date).label("first_movement_date")
+            ).join(
+                Item, ItemLocation.item_id == Item.item_id
+            ).outerjoin(
+                InventoryTransaction,
+                and_(
+                    InventoryTransaction.company_id == Item.company_id,
+                    InventoryTransaction.item_id == ItemLocation.item_id,
+                    InventoryTransaction.location_id == ItemLocation.location_id
+                )
+            ).group_by(
+                ItemLocation.item_id, ItemLocation.location_id, Item.company_id,
+                ItemLocation.quantity_on_hand, ItemLocation.total_value, ItemLocation.last_count_date
+            )
+        )
+        
+        opened = []
+        earliest = {}
+        for row in result.all():
+            quantity = Decimal(str(row.quantity_on_hand or 0)) - Decimal(str(row.moved_quantity))
+            value = (Decimal(str(row.total_value)) - Decimal(str(row.moved_value))).quantize(Decimal('0.01'))
+            if not quantity and not value:
+                continue
+            
+            # Dated before the first movement so the running sums start from it
+            if row.first_movement_date:
+                opening_date = row.first_movement_date - timedelta(days=1)
+            else:
+                opening_date = row.last_count_date or date.today()
+            db.add(InventoryTransaction(
+                inventory_transaction_id=new_ledger_id(),
+                company_id=row.company_id,
+                item_id=row.item_id,
+                location_id=row.location_id,
+                transaction_type=InventoryTransactionType.ADJUSTMENT,
+                transaction_date=opening_date,
+                quantity_change=quantity,
+                unit_cost=(value / quantity).quantize(Decimal('0.01')) if quantity else Decimal('0'),
+                total_cost=value,
+                balance_quantity=quantity,
+                balance_value=value,
+                reference_type="opening_balance",
+                memo="Opening balance"
+            ))
+            opened.append((row.company_id, row.item_id, row.location_id))
+            earliest[row.company_id] = min(earliest.get(row.company_id, opening_date), opening_date)
+        await db.flush()
+        
+        # Later movements' balances now start from the opening balance, and
+        # checkpoints built without it are stale
+        for company_id, item_id, location_id in opened:
+            await inventory_ledger.rebalance(db, company_id, item_id, location_id)
+        for company_id, opening_date in earliest.items():
+            await inventory_checkpoints.invalidate(db, company_id, opening_date)
+        await db.commit()
+    
+    print(f"✅ Opening balances recorded for {len(opened)} item locations!")
+
+async def main():
+    """Main migration function"""
+    print("🚀 Starting Inventory Ledger Migration...")
+    
+    try:
+        await create_inventory_ledger_index()
+        await seed_opening_balances()
+        print("\n✅ Inventory Ledger Migration completed successfully!")
+    
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
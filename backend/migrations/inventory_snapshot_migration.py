@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Inventory Snapshot Migration Script
+Creates the per-company inventory summary snapshot table
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+from sqlalchemy import text
+from database.connection import engine, Base
+from models.user import Company
+from models.inventory import InventorySnapshot
+
+async def create_inventory_snapshot_table():
+    """Create the inventory snapshot table and the summary grouping indexes"""
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[InventorySnapshot.__table__])
+        )
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_items_company_active ON items(company_id, is_active);"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_item_locations_location ON item_locations(location_id);"
+        ))
+    
+    print("✅ Inventory snapshot table created successfully!")
+
+async def main():
+    """Main migration function"""
+    print("🚀 Starting Inventory Snapshot Migration...")
+    
+    try:
+        await create_inventory_snapshot_table()
+        print("\n✅ Inventory Snapshot Migration completed successfully!")
+    
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Inventory Transfer Migration Script
+Creates the stock transfer tables
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+from database.connection import engine, Base
+from models.inventory import InventoryTransfer, InventoryTransferLine
+
+async def create_inventory_transfer_tables():
+    """Create the transfer and transfer line tables"""
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            lambda sync_conn: Base.metadata.create_all(
+                sync_conn, tables=[InventoryTransfer.__table__, InventoryTransferLine.__table__]
+            )
+        )
+    
+    print("✅ Inventory transfer tables created successfully!")
+
+async def main():
+    """Main migration function"""
+    print("🚀 Starting Inventory Transfer Migration...")
+    
+    try:
+        await create_inventory_transfer_tables()
+        print("\n✅ Inventory Transfer Migration completed successfully!")
+    
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Low Stock Migration Script
+Creates the maintained low-stock set and fills it from current stock levels
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+from sqlalchemy import select
+from database.connection import engine, Base, AsyncSessionLocal
+from models.inventory import InventoryLowStock
+from models.user import Company
+from services.low_stock_alert_service import low_stock_alerts
+
+async def create_low_stock_table():
+    """Create the low-stock set table"""
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[InventoryLowStock.__table__])
+        )
+    
+    print("✅ Low-stock table created successfully!")
+
+async def backfill_low_stock():
+    """Add the item-locations already at or below their reorder point, without alerting them"""
+    
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Company.company_id))
+        added = 0
+        for company_id in result.scalars().all():
+            counts = await low_stock_alerts.refresh(db, company_id)
+            added += counts["added"]
+        await db.commit()
+    
+    print(f"✅ Backfilled {added} low-stock item-locations!")
+
+async def main():
+    """Main migration function"""
+    print("🚀 Starting Low Stock Migration...")
+    
+    try:
+        await create_low_stock_table()
+        await backfill_low_stock()
+        print("\n✅ Low Stock Migration completed successfully!")
+    
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
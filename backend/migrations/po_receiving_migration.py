@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Purchase Order Receiving Migration Script
+Adds the index used to load the lines of purchase orders being received
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+from sqlalchemy import text
+from database.connection import engine
+
+async def create_receiving_indexes():
+    """Create the purchase order line index"""
+    
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_purchase_order_lines_order "
+            "ON purchase_order_lines(purchase_order_id, line_number);"
+        ))
+    
+    print("✅ Purchase order receiving indexes created successfully!")
+
+async def main():
+    """Main migration function"""
+    print("🚀 Starting Purchase Order Receiving Migration...")
+    
+    try:
+        await create_receiving_indexes()
+        print("\n✅ Purchase Order Receiving Migration completed successfully!")
+    
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
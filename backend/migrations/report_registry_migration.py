@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Report Registry Migration Script
+Adds report_key to report definitions and backfills it for system reports
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+from sqlalchemy import text, inspect
+from database.connection import engine
+from services.report_service import ReportService  # registers the system reports
+from services.report_registry import report_registry
+
+async def add_report_key_column():
+    """Add the report_key column and its unique index"""
+    
+    async with engine.begin() as conn:
+        columns = await conn.run_sync(
+            lambda sync_conn: [column["name"] for column in inspect(sync_conn).get_columns("report_definitions")]
+        )
+        if "report_key" not in columns:
+            await conn.execute(text("ALTER TABLE report_definitions ADD COLUMN report_key VARCHAR(100);"))
+        await conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_report_definitions_report_key ON report_definitions(report_key);"
+        ))
+    
+    print("✅ report_key column created successfully!")
+
+async def backfill_report_keys():
+    """Set report_key on system report definitions by their registered names"""
+    
+    async with engine.begin() as conn:
+        result = await conn.execute(text(
+            "SELECT report_id, report_name FROM report_definitions "
+            "WHERE is_system_report = :is_system AND report_key IS NULL"
+        ), {"is_system": True})
+        system_reports = result.fetchall()
+        
+        existing = await conn.execute(text(
+            "SELECT report_key FROM report_definitions WHERE report_key IS NOT NULL"
+        ))
+        taken = {row[0] for row in existing.fetchall()}
+        assigned = set()
+        for report_id, report_name in system_reports:
+            report_key = report_registry.key_for_name(report_name)
+            if report_key is None or report_key in taken or report_key in assigned:
+                print(f"⚠️  No unique report key for system report '{report_name}' ({report_id})")
+                continue
+            await conn.execute(
+                text("UPDATE report_definitions SET report_key = :report_key WHERE report_id = :report_id"),
+                {"report_key": report_key, "report_id": report_id}
+            )
+            assigned.add(report_key)
+    
+    print(f"✅ Report keys assigned to {len(assigned)} system reports!")
+
+async def main():
+    """Main migration function"""
+    print("🚀 Starting Report Registry Migration...")
+    
+    try:
+        await add_report_key_column()
+        await backfill_report_keys()
+        print("\n✅ Report Registry Migration completed successfully!")
+    
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
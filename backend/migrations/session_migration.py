@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+User Session Maintenance Migration Script
+Adds the indexes used by per-user session lookups and expired session pruning
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+from sqlalchemy import text
+from database.connection import engine
+
+async def create_session_indexes():
+    """Create user session indexes"""
+    
+    indexes = [
+        "CREATE INDEX IF NOT EXISTS idx_user_sessions_user_active ON user_sessions(user_id, is_active, expires_at);",
+        "CREATE INDEX IF NOT EXISTS idx_user_sessions_expires_at ON user_sessions(expires_at);"
+    ]
+    
+    async with engine.begin() as conn:
+        for index_sql in indexes:
+            await conn.execute(text(index_sql))
+    
+    print("✅ User session indexes created successfully!")
+
+async def main():
+    """Main migration function"""
+    print("🚀 Starting User Session Maintenance Migration...")
+    
+    try:
+        await create_session_indexes()
+        print("\n✅ User Session Maintenance Migration completed successfully!")
+        
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
@@ -0,0 +1,57 @@
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, Text, ForeignKey, Numeric, Date
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from database.connection import Base
+import uuid
+from sqlalchemy import String as SQLString
+import sqlalchemy as sa
+
+# Budget header: a named plan over consecutive monthly periods
+class Budget(Base):
+    __tablename__ = "budgets"
+    
+    budget_id = Column(SQLString(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    company_id = Column(SQLString(36), ForeignKey("companies.company_id"), nullable=False, index=True)
+    
+    # Budget information
+    budget_name = Column(String(255), nullable=False)
+    fiscal_year = Column(Integer, nullable=False)
+    start_date = Column(Date, nullable=False)  # First day of the first period
+    period_count = Column(Integer, default=12)
+    description = Column(Text)
+    is_active = Column(Boolean, default=True)
+    
+    # Metadata
+    created_by = Column(SQLString(36), ForeignKey("users.user_id"), nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, onupdate=func.now())
+    
+    # Relationships
+    company = relationship("Company", foreign_keys=[company_id])
+    created_by_user = relationship("User", foreign_keys=[created_by])
+    lines = relationship("BudgetLine", back_populates="budget", cascade="all, delete-orphan")
+    
+    def __repr__(self):
+        return f"<Budget {self.budget_name}>"
+
+# Budgeted amount of one account for one period
+class BudgetLine(Base):
+    __tablename__ = "budget_lines"
+    
+    line_id = Column(SQLString(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    budget_id = Column(SQLString(36), ForeignKey("budgets.budget_id", ondelete="CASCADE"), nullable=False)
+    account_id = Column(SQLString(36), ForeignKey("accounts.account_id"), nullable=False)
+    period_start = Column(Date, nullable=False)
+    # In the account's natural sign: credits for revenue, debits for expenses
+    amount = Column(Numeric(15, 2), nullable=False, default=0)
+    
+    # Relationships
+    budget = relationship("Budget", back_populates="lines")
+    account = relationship("Account")
+    
+    __table_args__ = (
+        sa.UniqueConstraint('budget_id', 'account_id', 'period_start', name='unique_budget_account_period'),
+    )
+    
+    def __repr__(self):
+        return f"<BudgetLine {self.account_id} {self.period_start}>"
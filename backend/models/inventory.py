@@ -34,6 +34,11 @@ class ReceiptStatus(str, Enum):
     COMPLETE = "complete"
     CANCELLED = "cancelled"
 
+class TransferStatus(str, Enum):
+    IN_TRANSIT = "in_transit"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
 class InventoryTransactionType(str, Enum):
     PURCHASE = "purchase"
     SALE = "sale"
@@ -176,6 +181,11 @@ class PurchaseOrderLine(Base):
     customer = relationship("Customer", foreign_keys=[customer_id])
     receipt_lines = relationship("ReceiptLine", back_populates="po_line")
     
+    # Receiving loads every line of the purchase orders it touches
+    __table_args__ = (
+        sa.Index('idx_purchase_order_lines_order', 'purchase_order_id', 'line_number'),
+    )
+    
     def __repr__(self):
         return f"<PurchaseOrderLine {self.po_line_id}>"
 
@@ -283,8 +293,9 @@ class InventoryTransaction(Base):
     # Notes
     memo = Column(Text)
     
-    # Audit fields
-    created_at = Column(DateTime, server_default=func.now())
+    # Audit fields; created_at is set when the movement is flushed, after its
+    # item-locations are locked, and orders same-day movements in the ledger
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     created_by = Column(SQLString(36), ForeignKey("users.user_id"))
     
     # Relationships
@@ -293,6 +304,14 @@ class InventoryTransaction(Base):
     location = relationship("InventoryLocation", foreign_keys=[location_id])
     created_by_user = relationship("User", foreign_keys=[created_by])
     
+    # Date-range scans of a company's movements for as-of balances, and the
+    # per item-location ledger order used for paging and running balances
+    __table_args__ = (
+        sa.Index('idx_inventory_transactions_company_date', 'company_id', 'transaction_date'),
+        sa.Index('idx_inventory_transactions_ledger_order', 'company_id', 'item_id', 'location_id',
+                 'transaction_date', 'created_at', 'inventory_transaction_id'),
+    )
+    
     def __repr__(self):
         return f"<InventoryTransaction {self.inventory_transaction_id}>"
 
@@ -399,6 +418,11 @@ class InventoryAssembly(Base):
     assembly_item = relationship("Item", foreign_keys=[assembly_item_id])
     component_item = relationship("Item", foreign_keys=[component_item_id])
     
+    # Bill of materials explosion loads the lines of many assemblies per query
+    __table_args__ = (
+        sa.Index('idx_inventory_assemblies_assembly_item', 'assembly_item_id', 'is_active'),
+    )
+    
     def __repr__(self):
         return f"<InventoryAssembly {self.assembly_id}>"
 
@@ -432,4 +456,169 @@ class InventoryValuation(Base):
     created_by_user = relationship("User", foreign_keys=[created_by])
     
     def __repr__(self):
-        return f"<InventoryValuation {self.valuation_id}>"
\ No newline at end of file
+        return f"<InventoryValuation {self.valuation_id}>"
+
+class InventoryCostLayer(Base):
+    __tablename__ = "inventory_cost_layers"
+    
+    layer_id = Column(SQLString(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    company_id = Column(SQLString(36), ForeignKey("companies.company_id"), nullable=False)
+    item_id = Column(SQLString(36), ForeignKey("items.item_id"), nullable=False)
+    location_id = Column(SQLString(36), ForeignKey("inventory_locations.location_id"))
+    source_transaction_id = Column(SQLString(36), ForeignKey("inventory_transactions.inventory_transaction_id"))
+    
+    # Layer position: depletion walks layers in (received_date, received_at) order
+    received_date = Column(Date, nullable=False)
+    received_at = Column(DateTime, nullable=False)
+    
+    # Quantities and cost
+    original_quantity = Column(Numeric(15, 4), nullable=False)
+    remaining_quantity = Column(Numeric(15, 4), nullable=False)
+    unit_cost = Column(Numeric(15, 2), nullable=False)
+    
+    # Lot tracking
+    lot_number = Column(String(100))
+    
+    # Audit fields
+    created_at = Column(DateTime, server_default=func.now())
+    
+    # Relationships
+    item = relationship("Item", foreign_keys=[item_id])
+    location = relationship("InventoryLocation", foreign_keys=[location_id])
+    
+    # Open layers of an item-location in depletion order; depleted layers
+    # drop out of the index so consumption never scans them
+    __table_args__ = (
+        sa.Index(
+            'idx_cost_layers_open', 'item_id', 'location_id', 'received_date', 'received_at', 'layer_id',
+            sqlite_where=sa.text('remaining_quantity > 0'),
+            postgresql_where=sa.text('remaining_quantity > 0')
+        ),
+        sa.Index('idx_cost_layers_company', 'company_id', 'item_id'),
+    )
+    
+    def __repr__(self):
+        return f"<InventoryCostLayer {self.layer_id}>"
+
+class InventorySnapshot(Base):
+    __tablename__ = "inventory_snapshots"
+    
+    company_id = Column(SQLString(36), ForeignKey("companies.company_id"), primary_key=True)
+    
+    # Company-wide inventory summary as returned by the summary endpoint
+    summary = Column(JSON, nullable=False, default=lambda: {})
+    
+    # Set by stock movements; the next read recomputes the summary
+    is_stale = Column(Boolean, nullable=False, default=True)
+    refreshed_at = Column(DateTime)
+    
+    def __repr__(self):
+        return f"<InventorySnapshot {self.company_id}>"
+
+class InventoryCheckpoint(Base):
+    __tablename__ = "inventory_checkpoints"
+    
+    # Integer key so checkpoints can be written with a single INSERT ... SELECT
+    checkpoint_id = Column(Integer, primary_key=True, autoincrement=True)
+    company_id = Column(SQLString(36), ForeignKey("companies.company_id"), nullable=False)
+    item_id = Column(SQLString(36), ForeignKey("items.item_id"), nullable=False)
+    location_id = Column(SQLString(36), ForeignKey("inventory_locations.location_id"))
+    
+    # Balance of the item-location after every movement dated on or before checkpoint_date
+    checkpoint_date = Column(Date, nullable=False)
+    quantity = Column(Numeric(15, 4), nullable=False)
+    value = Column(Numeric(15, 2), nullable=False)
+    
+    created_at = Column(DateTime, server_default=func.now())
+    
+    __table_args__ = (
+        sa.UniqueConstraint('company_id', 'checkpoint_date', 'item_id', 'location_id', name='unique_inventory_checkpoint'),
+    )
+    
+    def __repr__(self):
+        return f"<InventoryCheckpoint {self.item_id} {self.checkpoint_date}>"
+
+class InventoryTransfer(Base):
+    __tablename__ = "inventory_transfers"
+    
+    transfer_id = Column(SQLString(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    company_id = Column(SQLString(36), ForeignKey("companies.company_id"), nullable=False)
+    transfer_number = Column(String(50), nullable=False)
+    from_location_id = Column(SQLString(36), ForeignKey("inventory_locations.location_id"), nullable=False)
+    to_location_id = Column(SQLString(36), ForeignKey("inventory_locations.location_id"), nullable=False)
+    
+    # Stock shipped but not yet received sits in the company's in-transit location
+    transit_location_id = Column(SQLString(36), ForeignKey("inventory_locations.location_id"))
+    transfer_date = Column(Date, nullable=False)
+    received_date = Column(Date)
+    status = Column(SQLEnum(TransferStatus), nullable=False, default=TransferStatus.COMPLETED)
+    
+    # Cost of the stock taken from the source location
+    total_value = Column(Numeric(15, 2), nullable=False, default=0)
+    memo = Column(Text)
+    
+    # Audit fields
+    created_by = Column(SQLString(36), ForeignKey("users.user_id"), nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+    received_by = Column(SQLString(36), ForeignKey("users.user_id"))
+    updated_at = Column(DateTime, onupdate=func.now())
+    
+    # Relationships
+    company = relationship("Company", foreign_keys=[company_id])
+    from_location = relationship("InventoryLocation", foreign_keys=[from_location_id])
+    to_location = relationship("InventoryLocation", foreign_keys=[to_location_id])
+    created_by_user = relationship("User", foreign_keys=[created_by])
+    transfer_lines = relationship("InventoryTransferLine", back_populates="transfer", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        sa.Index('idx_inventory_transfers_company_status', 'company_id', 'status', 'transfer_date'),
+    )
+    
+    def __repr__(self):
+        return f"<InventoryTransfer {self.transfer_number}>"
+
+class InventoryTransferLine(Base):
+    __tablename__ = "inventory_transfer_lines"
+    
+    transfer_line_id = Column(SQLString(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    transfer_id = Column(SQLString(36), ForeignKey("inventory_transfers.transfer_id", ondelete="CASCADE"), nullable=False)
+    item_id = Column(SQLString(36), ForeignKey("items.item_id"), nullable=False)
+    
+    # Quantity and the cost it left the source location at
+    quantity = Column(Numeric(15, 4), nullable=False)
+    unit_cost = Column(Numeric(15, 2), nullable=False)
+    total_cost = Column(Numeric(15, 2), nullable=False)
+    lot_number = Column(String(100))
+    
+    created_at = Column(DateTime, server_default=func.now())
+    
+    # Relationships
+    transfer = relationship("InventoryTransfer", back_populates="transfer_lines")
+    item = relationship("Item", foreign_keys=[item_id])
+    
+    def __repr__(self):
+        return f"<InventoryTransferLine {self.transfer_line_id}>"
+
+class InventoryLowStock(Base):
+    __tablename__ = "inventory_low_stock"
+    
+    # One row per item-location at or below its reorder point, kept by stock movements
+    item_location_id = Column(SQLString(36), ForeignKey("item_locations.item_location_id", ondelete="CASCADE"), primary_key=True)
+    company_id = Column(SQLString(36), ForeignKey("companies.company_id"), nullable=False)
+    item_id = Column(SQLString(36), ForeignKey("items.item_id"), nullable=False)
+    location_id = Column(SQLString(36), ForeignKey("inventory_locations.location_id"), nullable=False)
+    
+    # When the item-location crossed its reorder point, and when users were alerted
+    below_since = Column(DateTime, nullable=False, server_default=func.now())
+    alerted_at = Column(DateTime)
+    
+    # Relationships
+    item_location = relationship("ItemLocation", foreign_keys=[item_location_id])
+    
+    __table_args__ = (
+        sa.Index('idx_inventory_low_stock_company_location', 'company_id', 'location_id'),
+        sa.Index('idx_inventory_low_stock_pending', 'alerted_at'),
+    )
+    
+    def __repr__(self):
+        return f"<InventoryLowStock {self.item_location_id}>"
@@ -19,6 +19,8 @@ class ReportFormat(str, Enum):
     EXCEL = "excel"
     CSV = "csv"
     HTML = "html"
+    PARQUET = "parquet"
+    ARROW = "arrow"
 
 class ReportStatus(str, Enum):
     PENDING = "pending"
@@ -44,6 +46,8 @@ class ReportDefinition(Base):
     report_name = Column(String(255), nullable=False)
     report_category = Column(SQLEnum(ReportCategory), nullable=False)
     report_type = Column(SQLEnum(ReportType), default=ReportType.STANDARD)
+    # Stable key of the registered generator that runs a system report
+    report_key = Column(String(100), unique=True, index=True)
     
     # Query and template information
     sql_template = Column(Text)
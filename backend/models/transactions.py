@@ -199,6 +199,12 @@ class JournalEntry(Base):
     transaction = relationship("Transaction", back_populates="journal_entries")
     account = relationship("Account", foreign_keys=[account_id])
     
+    # General ledger lines of one account in posting order, and the lines of a transaction
+    __table_args__ = (
+        sa.Index('ix_journal_entries_account_posting', 'account_id', 'posting_date', 'entry_id'),
+        sa.Index('ix_journal_entries_transaction', 'transaction_id'),
+    )
+    
     def __repr__(self):
         return f"<JournalEntry {self.description}>"
 
@@ -92,6 +92,12 @@ class UserSession(Base):
     # Relationships
     user = relationship("User", back_populates="sessions")
     
+    # Indexes for per-user active session lookups and expiry pruning
+    __table_args__ = (
+        sa.Index('idx_user_sessions_user_active', 'user_id', 'is_active', 'expires_at'),
+        sa.Index('idx_user_sessions_expires_at', 'expires_at'),
+    )
+    
     def __repr__(self):
         return f"<UserSession {self.session_id}>"
 
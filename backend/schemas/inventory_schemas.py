@@ -31,6 +31,11 @@ class ReceiptStatus(str, Enum):
     COMPLETE = "complete"
     CANCELLED = "cancelled"
 
+class TransferStatus(str, Enum):
+    IN_TRANSIT = "in_transit"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
 class InventoryTransactionType(str, Enum):
     PURCHASE = "purchase"
     SALE = "sale"
@@ -429,6 +434,9 @@ class AssemblyBuildRequest(BaseRequest):
     build_date: date = Field(..., description="Build date")
     memo: Optional[str] = None
 
+class AssemblyBatchBuildRequest(BaseRequest):
+    builds: List[AssemblyBuildRequest] = Field(..., min_length=1, max_length=500, description="Assemblies to build")
+
 class AssemblyBuildResponse(BaseResponse):
     build_id: str
     assembly_item_id: str
@@ -439,6 +447,65 @@ class AssemblyBuildResponse(BaseResponse):
     memo: Optional[str]
     transactions: List[InventoryTransactionResponse] = []
 
+# Inventory Transfer schemas
+class InventoryTransferLineCreate(BaseRequest):
+    item_id: str = Field(..., description="Item being transferred")
+    quantity: Decimal = Field(..., gt=0, description="Quantity to transfer")
+    lot_number: Optional[str] = None
+
+class InventoryTransferCreate(BaseRequest):
+    from_location_id: str = Field(..., description="Location the stock leaves")
+    to_location_id: str = Field(..., description="Location the stock goes to")
+    transfer_date: date = Field(..., description="Date the stock leaves the source location")
+    in_transit: bool = Field(default=False, description="Hold the stock in transit until the transfer is received")
+    memo: Optional[str] = None
+    lines: List[InventoryTransferLineCreate] = Field(..., min_length=1, description="Transfer line items")
+
+class InventoryTransferReceive(BaseRequest):
+    received_date: date = Field(..., description="Date the stock arrived")
+
+class InventoryTransferLineResponse(BaseResponse):
+    transfer_line_id: str
+    transfer_id: str
+    item_id: str
+    quantity: Decimal
+    unit_cost: Decimal
+    total_cost: Decimal
+    lot_number: Optional[str]
+
+class InventoryTransferResponse(BaseResponse):
+    transfer_id: str
+    company_id: str
+    transfer_number: str
+    from_location_id: str
+    to_location_id: str
+    transit_location_id: Optional[str]
+    transfer_date: date
+    received_date: Optional[date]
+    status: TransferStatus
+    total_value: Decimal
+    memo: Optional[str]
+    created_by: str
+    created_at: Optional[datetime]
+    transfer_lines: List[InventoryTransferLineResponse] = []
+
+class StockRebalanceRequest(BaseRequest):
+    item_ids: Optional[List[str]] = Field(None, max_length=5000, description="Items to rebalance; all stocked items if omitted")
+    location_ids: Optional[List[str]] = Field(None, description="Locations taking part; all active locations if omitted")
+    transfer_date: date = Field(..., description="Date of the resulting transfers")
+    in_transit: bool = False
+    dry_run: bool = Field(default=False, description="Only return the planned moves")
+
+class StockRebalanceMove(BaseModel):
+    item_id: str
+    from_location_id: str
+    to_location_id: str
+    quantity: Decimal
+
+class StockRebalanceResponse(BaseModel):
+    moves: List[StockRebalanceMove]
+    transfers: List[InventoryTransferResponse] = []
+
 # Inventory Valuation schemas
 class InventoryValuationCreate(BaseRequest):
     valuation_date: date = Field(..., description="Valuation date")
@@ -461,6 +528,18 @@ class InventoryValuationResponse(BaseResponse):
     created_by: str
     created_at: datetime
 
+# Inventory Cost Layer schemas
+class InventoryCostLayerResponse(BaseResponse):
+    layer_id: str
+    item_id: str
+    location_id: Optional[str]
+    source_transaction_id: Optional[str]
+    received_date: date
+    original_quantity: Decimal
+    remaining_quantity: Decimal
+    unit_cost: Decimal
+    lot_number: Optional[str]
+
 # Search and filter schemas
 class InventorySearchFilters(BaseModel):
     search: Optional[str] = None
@@ -495,6 +574,14 @@ class ReceiptSearchFilters(BaseModel):
     page: int = Field(default=1, ge=1)
     page_size: int = Field(default=20, ge=1, le=100)
 
+class TransferSearchFilters(BaseModel):
+    location_id: Optional[str] = None
+    status: Optional[TransferStatus] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    page: int = Field(default=1, ge=1)
+    page_size: int = Field(default=20, ge=1, le=100)
+
 class AdjustmentSearchFilters(BaseModel):
     search: Optional[str] = None
     item_id: Optional[str] = None
@@ -513,10 +600,12 @@ class TransactionSearchFilters(BaseModel):
     transaction_type: Optional[InventoryTransactionType] = None
     date_from: Optional[date] = None
     date_to: Optional[date] = None
-    sort_by: Optional[str] = Field(default="transaction_date")
     sort_order: Optional[str] = Field(default="desc")
-    page: int = Field(default=1, ge=1)
-    page_size: int = Field(default=20, ge=1, le=100)
+
+class InventoryLedgerPage(BaseModel):
+    items: List[InventoryTransactionResponse]
+    has_more: bool
+    next_cursor: Optional[str] = None
 
 # Common response schemas
 class PaginatedResponse(BaseModel):
@@ -559,6 +648,9 @@ class ReorderItem(BaseModel):
     reorder_quantity: Decimal
     preferred_vendor_id: Optional[str]
     suggested_order_quantity: Decimal
+    average_daily_usage: Optional[Decimal] = None
+    safety_stock: Optional[Decimal] = None
+    unit_cost: Optional[Decimal] = None
 
 class ReorderReport(BaseModel):
     report_date: date
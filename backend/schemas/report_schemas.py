@@ -3,9 +3,11 @@ from typing import Optional, List, Dict, Any, Union
 from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
+import re
 
 # Import enums from models
 from models.reports import ReportType, ReportFormat, ReportStatus, ReportCategory
+from database.connection import Base
 
 # Base schemas for common structures
 class ReportParameterSchema(BaseModel):
@@ -33,6 +35,80 @@ class ReportFilterSchema(BaseModel):
     value: Union[str, int, float, date, List[Any]]
     label: Optional[str] = None
 
+# Tables custom report SQL may read, each scoped to the company running the
+# report: by its own company_id column (None), or through the parent row it
+# belongs to as (foreign key column, parent table, parent key).
+CUSTOM_REPORT_TABLES = {
+    "accounts": None,
+    "customers": None,
+    "vendors": None,
+    "items": None,
+    "transactions": None,
+    "transaction_lines": ("transaction_id", "transactions", "transaction_id"),
+    "journal_entries": ("transaction_id", "transactions", "transaction_id"),
+    "payments": None,
+    "payment_applications": ("payment_id", "payments", "payment_id"),
+    "recurring_transactions": None,
+    "budgets": None,
+    "budget_lines": ("budget_id", "budgets", "budget_id"),
+    "inventory_locations": None,
+    "item_locations": ("item_id", "items", "item_id"),
+    "inventory_transactions": None,
+    "inventory_adjustments": None,
+    "inventory_cost_layers": None,
+    "inventory_valuations": None,
+    "purchase_orders": None,
+    "purchase_order_lines": ("purchase_order_id", "purchase_orders", "purchase_order_id"),
+    "inventory_receipts": None,
+    "receipt_lines": ("receipt_id", "inventory_receipts", "receipt_id"),
+    "inventory_transfers": None,
+    "inventory_transfer_lines": ("transfer_id", "inventory_transfers", "transfer_id"),
+}
+
+# Schemas, catalogs and functions that reach past the scoped tables
+FORBIDDEN_SQL_IDENTIFIER = re.compile(
+    r'(?i)^(main|temp|public|information_schema|sqlite_\w*|pg_\w*|pragma_\w*|'
+    r'(query|table|schema|database|cursor)_to_xml\w*|dblink\w*|lo_\w+|'
+    r'current_setting|set_config|load_extension|readfile|writefile|fts3_tokenizer)$'
+)
+SQL_IDENTIFIER_PATTERN = re.compile(r'"((?:[^"]|"")*)"|`([^`]*)`|\[([^\]]*)\]|([A-Za-z_][\w$]*)')
+# :company_id may only be compared against, never selected as a value
+COMPANY_ID_COMPARISON = re.compile(r'(?i)(=|<>|!=)\s*:company_id\b|(?<![:\w]):company_id\s*(=|<>|!=)')
+
+
+def sql_template_tables(sql_template: str) -> List[str]:
+    """The custom report tables a template references"""
+    identifiers = {
+        next(group for group in match.groups() if group is not None).lower()
+        for match in SQL_IDENTIFIER_PATTERN.finditer(sql_template)
+    }
+    return sorted(identifiers & set(CUSTOM_REPORT_TABLES))
+
+
+def validate_sql_template(sql_template: Optional[str]) -> Optional[str]:
+    """Reject custom report SQL that is not a single SELECT over the custom report tables.
+
+    Every identifier is checked, including those in string literals, since
+    some databases can run SQL held in a string.
+    """
+    if sql_template is None:
+        return sql_template
+    statement = sql_template.strip().rstrip(';')
+    if ';' in statement or not re.match(r'(?is)^\s*(select|with)\b', statement):
+        raise ValueError("sql_template must be a single SELECT statement")
+
+    known_tables = set(Base.metadata.tables)
+    for match in SQL_IDENTIFIER_PATTERN.finditer(statement):
+        identifier = next(group for group in match.groups() if group is not None)
+        name = identifier.lower()
+        if FORBIDDEN_SQL_IDENTIFIER.match(name) or (name in known_tables and name not in CUSTOM_REPORT_TABLES):
+            raise ValueError(f"sql_template may not reference {identifier}")
+
+    company_id_uses = len(re.findall(r'(?<![:\w]):company_id\b', statement))
+    if company_id_uses != len(COMPANY_ID_COMPARISON.findall(statement)):
+        raise ValueError("sql_template may only compare against :company_id")
+    return sql_template
+
 # Report Definition Schemas
 class ReportDefinitionBase(BaseModel):
     report_name: str
@@ -65,7 +141,9 @@ class ReportDefinitionBase(BaseModel):
         return v
 
 class ReportDefinitionCreate(ReportDefinitionBase):
-    pass
+    @validator('sql_template')
+    def check_sql_template(cls, v):
+        return validate_sql_template(v)
 
 class ReportDefinitionUpdate(BaseModel):
     report_name: Optional[str] = None
@@ -77,8 +155,13 @@ class ReportDefinitionUpdate(BaseModel):
     access_permissions: Optional[Dict[str, Any]] = None
     description: Optional[str] = None
 
+    @validator('sql_template')
+    def check_sql_template(cls, v):
+        return validate_sql_template(v)
+
 class ReportDefinitionResponse(ReportDefinitionBase):
     report_id: str
+    report_key: Optional[str] = None
     is_system_report: bool
     created_by: Optional[str] = None
     created_at: datetime
@@ -282,6 +365,11 @@ class TrialBalanceRequest(BaseModel):
     include_zero_balances: bool = False
     show_cents: bool = True
 
+class GeneralLedgerRequest(BaseModel):
+    start_date: date
+    end_date: date
+    account_ids: Optional[List[str]] = None  # All accounts when not set
+
 class AgingReportRequest(BaseModel):
     as_of_date: date
     aging_periods: List[int] = [30, 60, 90, 120]  # Days for aging buckets
@@ -289,6 +377,48 @@ class AgingReportRequest(BaseModel):
     customer_id: Optional[str] = None  # For AR aging
     vendor_id: Optional[str] = None    # For AP aging
 
+# Budget Schemas
+class BudgetAccountAmounts(BaseModel):
+    account_id: str
+    amounts: List[Decimal]  # One amount per period, in the account's natural sign
+
+class BudgetCreate(BaseModel):
+    budget_name: str = Field(..., min_length=1, max_length=255)
+    fiscal_year: int
+    start_date: date  # First day of the first period
+    period_count: int = Field(12, ge=1, le=36)
+    description: Optional[str] = None
+    accounts: List[BudgetAccountAmounts] = []
+
+    @validator('start_date')
+    def validate_start_date(cls, v):
+        if v.day != 1:
+            raise ValueError('Budget periods must start on the first day of a month')
+        return v
+
+class BudgetUpdate(BaseModel):
+    budget_name: Optional[str] = Field(None, min_length=1, max_length=255)
+    description: Optional[str] = None
+    is_active: Optional[bool] = None
+    accounts: Optional[List[BudgetAccountAmounts]] = None  # Replaces the amounts of the listed accounts
+
+class BudgetResponse(BaseModel):
+    budget_id: str
+    company_id: str
+    budget_name: str
+    fiscal_year: int
+    start_date: date
+    period_count: int
+    description: Optional[str] = None
+    is_active: bool
+    created_by: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    accounts: List[BudgetAccountAmounts] = []
+
+    class Config:
+        from_attributes = True
+
 # Report Template Schemas
 class ReportTemplateResponse(BaseModel):
     template_id: str
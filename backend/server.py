@@ -5,20 +5,27 @@ from pathlib import Path
 backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
-from fastapi import FastAPI, APIRouter, Request, HTTPException, status
+from fastapi import FastAPI, APIRouter, Request, HTTPException, status, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.security import HTTPBearer
-from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
+from fastapi.responses import JSONResponse, Response
 from dotenv import load_dotenv
 import os
 import structlog
 from contextlib import asynccontextmanager
-from database.connection import close_db_connections
+from database.connection import close_db_connections, engine
+from services.rate_limit_service import rate_limiter
+from services.security import require_metrics_token
+from services.security_event_service import security_event_detector
+from services.session_maintenance_service import session_maintenance
+from services.export_worker_pool import export_workers
+from services.export_artifact_service import export_artifacts
+from services.inventory_checkpoint_service import inventory_checkpoints
+from services.inventory_ledger_service import inventory_ledger
+from services.low_stock_alert_service import low_stock_alerts
+from services.report_telemetry_service import report_telemetry
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from api.auth import router as auth_router
 from api.companies import router as companies_router
 from api.accounts import router as accounts_router
@@ -42,6 +49,7 @@ from api.inventory_receipts import router as inventory_receipts_router
 from api.inventory_locations import router as inventory_locations_router
 from api.inventory_assemblies import router as inventory_assemblies_router
 from api.inventory_reorder import router as inventory_reorder_router
+from api.inventory_transfers import router as inventory_transfers_router
 from api.notifications import router as notifications_router
 from api.email_management import router as email_management_router
 from api.webhooks import router as webhooks_router
@@ -76,16 +84,28 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
-# Rate limiter
-limiter = Limiter(key_func=get_remote_address)
-
 # Lifespan context manager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan"""
     logger.info("Starting QuickBooks Clone API")
+    await rate_limiter.start()
+    security_event_detector.start()
+    session_maintenance.start()
+    export_artifacts.start()
+    inventory_checkpoints.start()
+    inventory_ledger.start()
+    low_stock_alerts.start()
+    report_telemetry.install(engine)
     yield
     logger.info("Shutting down QuickBooks Clone API")
+    await session_maintenance.stop()
+    await export_artifacts.stop()
+    await inventory_checkpoints.stop()
+    await inventory_ledger.stop()
+    await low_stock_alerts.stop()
+    await security_event_detector.stop()
+    export_workers.shutdown()
     await close_db_connections()
 
 # Create FastAPI app
@@ -99,11 +119,6 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Add rate limiting middleware
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
-
 # Security middleware
 app.add_middleware(
     TrustedHostMiddleware,
@@ -124,7 +139,7 @@ api_router = APIRouter(prefix="/api")
 
 # Basic health check endpoint
 @api_router.get("/health")
-@limiter.limit("30/minute")
+@rate_limiter.limit("30/minute")
 async def health_check(request: Request):
     """Health check endpoint"""
     return {
@@ -133,9 +148,15 @@ async def health_check(request: Request):
         "version": "1.0.0"
     }
 
+# Metrics endpoint, for scrapers holding METRICS_TOKEN
+@api_router.get("/metrics", dependencies=[Depends(require_metrics_token)], include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 # Root endpoint
 @api_router.get("/")
-@limiter.limit("30/minute")
+@rate_limiter.limit("30/minute")
 async def root(request: Request):
     """Root API endpoint"""
     return {
@@ -182,6 +203,7 @@ api_router.include_router(inventory_receipts_router)
 api_router.include_router(inventory_locations_router)
 api_router.include_router(inventory_assemblies_router)
 api_router.include_router(inventory_reorder_router)
+api_router.include_router(inventory_transfers_router)
 
 # Include notification & communication routes
 api_router.include_router(notifications_router)
@@ -214,7 +236,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             "error": exc.detail,
             "status_code": exc.status_code,
             "path": request.url.path
-        }
+        },
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(Exception)
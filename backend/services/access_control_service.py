@@ -0,0 +1,271 @@
+from typing import Optional, Dict, Any, List, Set, Tuple
+from datetime import datetime, timezone
+from collections import OrderedDict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, or_
+from models.audit import UserPermission
+from models.user import User, CompanyMembership, UserRole
+from database.connection import get_redis
+import json
+import os
+import threading
+import time
+import structlog
+
+logger = structlog.get_logger()
+
+# Default permissions granted by a company membership role
+DEFAULT_ROLE_PERMISSIONS: Dict[UserRole, Dict[str, List[str]]] = {
+    UserRole.ADMIN: {
+        "users": ["read", "write", "delete"],
+        "companies": ["read", "write", "delete"],
+        "transactions": ["read", "write", "delete"],
+        "reports": ["read", "write", "export"],
+        "settings": ["read", "write"],
+        "audit": ["read", "export"],
+        "security": ["read", "write", "delete"],
+        "permissions": ["read", "write", "delete"],
+        "roles": ["read", "write", "delete"]
+    },
+    UserRole.MANAGER: {
+        "users": ["read", "write"],
+        "companies": ["read", "write"],
+        "transactions": ["read", "write"],
+        "reports": ["read", "write", "export"],
+        "settings": ["read"],
+        "audit": ["read"],
+        "security": ["read"],
+        "permissions": ["read"],
+        "roles": ["read"]
+    },
+    UserRole.ACCOUNTANT: {
+        "transactions": ["read", "write"],
+        "reports": ["read", "write", "export"],
+        "customers": ["read", "write"],
+        "vendors": ["read", "write"],
+        "items": ["read", "write"]
+    },
+    UserRole.EMPLOYEE: {
+        "transactions": ["read"],
+        "reports": ["read"],
+        "customers": ["read"],
+        "vendors": ["read"],
+        "items": ["read"]
+    },
+    UserRole.VIEWER: {
+        "transactions": ["read"],
+        "reports": ["read"],
+        "customers": ["read"],
+        "vendors": ["read"],
+        "items": ["read"]
+    }
+}
+
+
+class CompiledPermissions:
+    """Resolved access for one user in one company"""
+
+    __slots__ = ("has_membership", "role", "role_permissions", "direct_permissions", "expires_at")
+
+    def __init__(
+        self,
+        has_membership: bool,
+        role: Optional[str],
+        direct_permissions: Dict[str, Set[str]],
+        expires_at: Optional[float] = None
+    ):
+        self.has_membership = has_membership
+        self.role = role
+        self.role_permissions: Dict[str, Set[str]] = {}
+        if has_membership and role:
+            defaults = DEFAULT_ROLE_PERMISSIONS.get(UserRole(role), {})
+            self.role_permissions = {resource: set(actions) for resource, actions in defaults.items()}
+        self.direct_permissions = direct_permissions
+        # Earliest expiry of any direct permission, as a unix timestamp
+        self.expires_at = expires_at
+
+    def allows(self, resource: str, action: str) -> bool:
+        """Check a resource/action pair against direct and role permissions"""
+        if action in self.direct_permissions.get(resource, ()):
+            return True
+        return action in self.role_permissions.get(resource, ())
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "has_membership": self.has_membership,
+            "role": self.role,
+            "direct_permissions": {resource: sorted(actions) for resource, actions in self.direct_permissions.items()},
+            "expires_at": self.expires_at
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "CompiledPermissions":
+        data = json.loads(raw)
+        return cls(
+            has_membership=data["has_membership"],
+            role=data["role"],
+            direct_permissions={resource: set(actions) for resource, actions in data["direct_permissions"].items()},
+            expires_at=data.get("expires_at")
+        )
+
+
+class AccessControlResolver:
+    """Resolves and caches company access and permissions per (user, company).
+
+    Compiled permission sets are kept in a bounded in-process LRU and mirrored
+    in the cache backend. Each user has a version counter in the cache backend;
+    invalidation bumps it, which retires both the shared entry and every
+    worker's local copy on their next lookup.
+    """
+
+    def __init__(self):
+        self.max_entries = int(os.getenv("ACCESS_CACHE_MAX_ENTRIES", "10000"))
+        self.ttl_seconds = int(os.getenv("ACCESS_CACHE_TTL_SECONDS", "300"))
+        self._local: "OrderedDict[Tuple[str, str], Tuple[CompiledPermissions, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _version_key(user_id: str) -> str:
+        return f"acl:version:{user_id}"
+
+    @staticmethod
+    def _entry_key(user_id: str, company_id: str, version: str) -> str:
+        return f"acl:perms:{user_id}:{company_id}:{version}"
+
+    def _local_get(self, key: Tuple[str, str], version: str) -> Optional[CompiledPermissions]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            compiled, cached_version, valid_until = entry
+            if cached_version != version or time.time() >= valid_until:
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return compiled
+
+    def _local_put(self, key: Tuple[str, str], compiled: CompiledPermissions, version: str, valid_until: float) -> None:
+        with self._lock:
+            self._local[key] = (compiled, version, valid_until)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def _valid_until(self, compiled: CompiledPermissions) -> float:
+        valid_until = time.time() + self.ttl_seconds
+        if compiled.expires_at is not None:
+            valid_until = min(valid_until, compiled.expires_at)
+        return valid_until
+
+    async def _load(self, db: AsyncSession, user_id: str, company_id: str) -> CompiledPermissions:
+        """Load membership, role and direct permissions in a single query"""
+        now = datetime.now(timezone.utc)
+        result = await db.execute(
+            select(
+                CompanyMembership.role,
+                CompanyMembership.membership_id,
+                UserPermission.resource,
+                UserPermission.actions,
+                UserPermission.expires_at
+            )
+            .select_from(User)
+            .outerjoin(
+                CompanyMembership,
+                and_(
+                    CompanyMembership.user_id == User.user_id,
+                    CompanyMembership.company_id == company_id,
+                    CompanyMembership.is_active == True
+                )
+            )
+            .outerjoin(
+                UserPermission,
+                and_(
+                    UserPermission.user_id == User.user_id,
+                    UserPermission.company_id == company_id,
+                    UserPermission.is_active == True,
+                    or_(
+                        UserPermission.expires_at.is_(None),
+                        UserPermission.expires_at > now
+                    )
+                )
+            )
+            .where(User.user_id == user_id)
+        )
+
+        has_membership = False
+        role = None
+        direct_permissions: Dict[str, Set[str]] = {}
+        expires_at = None
+
+        for row in result.all():
+            if row.membership_id is not None:
+                has_membership = True
+                role = row.role.value if isinstance(row.role, UserRole) else row.role
+            if row.resource is not None:
+                direct_permissions.setdefault(row.resource, set()).update(row.actions or [])
+                if row.expires_at is not None:
+                    permission_expiry = row.expires_at
+                    if permission_expiry.tzinfo is None:
+                        permission_expiry = permission_expiry.replace(tzinfo=timezone.utc)
+                    timestamp = permission_expiry.timestamp()
+                    expires_at = timestamp if expires_at is None else min(expires_at, timestamp)
+
+        return CompiledPermissions(has_membership, role, direct_permissions, expires_at)
+
+    async def get_permissions(self, db: AsyncSession, user_id: str, company_id: str) -> CompiledPermissions:
+        """Get the compiled permission set, serving from cache where possible"""
+        user_id = str(user_id)
+        company_id = str(company_id)
+        key = (user_id, company_id)
+
+        redis = await get_redis()
+        version = await redis.get(self._version_key(user_id)) or "0"
+        version = version.decode() if isinstance(version, bytes) else str(version)
+
+        compiled = self._local_get(key, version)
+        if compiled is not None:
+            return compiled
+
+        entry_key = self._entry_key(user_id, company_id, version)
+        shared = await redis.get(entry_key)
+        if shared:
+            compiled = CompiledPermissions.from_json(shared)
+            valid_until = self._valid_until(compiled)
+            if time.time() < valid_until:
+                self._local_put(key, compiled, version, valid_until)
+                return compiled
+
+        compiled = await self._load(db, user_id, company_id)
+        valid_until = self._valid_until(compiled)
+        ttl = max(int(valid_until - time.time()), 1)
+        await redis.setex(entry_key, ttl, compiled.to_json())
+        self._local_put(key, compiled, version, valid_until)
+
+        logger.debug("Access permissions compiled", user_id=user_id, company_id=company_id,
+                     has_membership=compiled.has_membership, role=compiled.role)
+        return compiled
+
+    async def has_company_access(self, db: AsyncSession, user_id: str, company_id: str) -> bool:
+        """Check whether the user is an active member of the company"""
+        compiled = await self.get_permissions(db, user_id, company_id)
+        return compiled.has_membership
+
+    async def has_permission(self, db: AsyncSession, user_id: str, company_id: str,
+                             resource: str, action: str) -> bool:
+        """Check whether the user may perform an action on a resource"""
+        compiled = await self.get_permissions(db, user_id, company_id)
+        return compiled.allows(resource, action)
+
+    async def invalidate(self, user_id: str) -> None:
+        """Invalidate every cached permission set for a user across all workers"""
+        user_id = str(user_id)
+        redis = await get_redis()
+        await redis.incr(self._version_key(user_id))
+        with self._lock:
+            for key in [key for key in self._local if key[0] == user_id]:
+                del self._local[key]
+        logger.debug("Access permissions invalidated", user_id=user_id)
+
+
+# Global access control resolver instance
+access_control = AccessControlResolver()
@@ -8,8 +8,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, and_
 from models.user import User, UserSession, CompanyMembership
 from database.connection import get_redis
+from services.access_control_service import access_control
+from services.session_revocation_service import session_revocations
+from services.session_maintenance_service import session_maintenance
+from collections import OrderedDict
+import hashlib
 import secrets
 import structlog
+import time
 from fastapi import HTTPException, status
 import uuid
 from pydantic import BaseModel, EmailStr
@@ -25,6 +31,9 @@ class AuthService:
         self.bcrypt_rounds = int(os.getenv("BCRYPT_ROUNDS", "12"))
         self.max_login_attempts = int(os.getenv("MAX_LOGIN_ATTEMPTS", "5"))
         self.lockout_duration = int(os.getenv("ACCOUNT_LOCKOUT_DURATION", "30"))
+        # Decoded access token claims keyed by token hash, evicted LRU or on expiry
+        self.claims_cache_size = int(os.getenv("JWT_CLAIMS_CACHE_SIZE", "10000"))
+        self._claims_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         
     def hash_password(self, password: str) -> str:
         """Hash password using bcrypt"""
@@ -51,7 +60,15 @@ class AuthService:
         return secrets.token_urlsafe(32)
     
     def decode_access_token(self, token: str) -> Dict[str, Any]:
-        """Decode and validate JWT access token"""
+        """Decode and validate JWT access token, serving repeat tokens from cache"""
+        cache_key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        payload = self._claims_cache.get(cache_key)
+        if payload is not None:
+            if payload["exp"] > time.time():
+                self._claims_cache.move_to_end(cache_key)
+                return payload
+            del self._claims_cache[cache_key]
+        
         try:
             payload = jwt.decode(token, self.jwt_secret, algorithms=[self.jwt_algorithm])
             if payload.get("type") != "access":
@@ -59,7 +76,6 @@ class AuthService:
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid token type"
                 )
-            return payload
         except jwt.ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -70,6 +86,11 @@ class AuthService:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
             )
+        
+        self._claims_cache[cache_key] = payload
+        if len(self._claims_cache) > self.claims_cache_size:
+            self._claims_cache.popitem(last=False)
+        return payload
     
     async def validate_password_strength(self, password: str) -> tuple[bool, str]:
         """Validate password strength and return detailed error if invalid"""
@@ -213,6 +234,9 @@ class AuthService:
         await db.commit()
         await db.refresh(session)
         
+        # Keep the number of concurrent sessions bounded
+        await session_maintenance.enforce_user_session_limit(db, user.user_id)
+        
         # Generate access token
         access_token = self.generate_access_token(user.user_id, session.session_id)
         
@@ -274,6 +298,7 @@ class AuthService:
             timedelta(days=1),
             "true"
         )
+        await session_revocations.revoke([session_id])
         
         logger.info("User logged out", session_id=session_id)
     
@@ -281,14 +306,22 @@ class AuthService:
         """Logout user from all devices"""
         
         result = await db.execute(
+            select(UserSession.session_id).where(
+                and_(UserSession.user_id == user_id, UserSession.is_active == True)
+            )
+        )
+        session_ids = result.scalars().all()
+        
+        await db.execute(
             update(UserSession)
-            .where(and_(UserSession.user_id == user_id, UserSession.is_active == True))
+            .where(UserSession.session_id.in_(session_ids))
             .values(is_active=False)
         )
         
         await db.commit()
+        await session_revocations.revoke(session_ids)
         
-        logger.info("All sessions logged out", user_id=user_id, sessions_count=result.rowcount)
+        logger.info("All sessions logged out", user_id=user_id, sessions_count=len(session_ids))
     
     async def get_user_sessions(self, db: AsyncSession, user_id: str) -> list[UserSession]:
         """Get active sessions for user"""
@@ -405,17 +438,7 @@ class AuthService:
     async def check_company_access(self, user_id: str, company_id: str, db: AsyncSession) -> bool:
         """Check if user has access to a specific company"""
         try:
-            result = await db.execute(
-                select(CompanyMembership).where(
-                    and_(
-                        CompanyMembership.user_id == user_id,
-                        CompanyMembership.company_id == company_id,
-                        CompanyMembership.is_active == True
-                    )
-                )
-            )
-            membership = result.scalar_one_or_none()
-            return membership is not None
+            return await access_control.has_company_access(db, user_id, company_id)
         except Exception as e:
             logger.error("Failed to check company access", error=str(e))
             return False
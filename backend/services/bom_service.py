@@ -0,0 +1,141 @@
+from typing import Dict, List, Tuple, Iterable
+from decimal import Decimal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+from models.inventory import InventoryAssembly
+from models.list_management import Item
+import structlog
+
+logger = structlog.get_logger()
+
+
+class BomRequirement:
+    """Quantity of a leaf component needed for one unit of an assembly"""
+
+    __slots__ = ("item_id", "quantity", "is_optional", "unit_cost")
+
+    def __init__(self, item_id: str, quantity: Decimal, is_optional: bool, unit_cost: Decimal):
+        self.item_id = item_id
+        self.quantity = quantity
+        self.is_optional = is_optional
+        self.unit_cost = unit_cost
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "item_id": self.item_id,
+            "quantity": self.quantity,
+            "is_optional": self.is_optional,
+            "unit_cost": self.unit_cost
+        }
+
+
+class BomService:
+    """Multi-level bill of materials explosion.
+
+    Bills are loaded one level at a time, with one query for all items of a
+    level, and each sub-assembly is exploded once and reused wherever it
+    appears. Sub-assemblies are phantoms: building an assembly consumes the
+    leaf components of every level beneath it. Components reached through
+    an optional line are optional themselves.
+    """
+
+    @staticmethod
+    async def load_boms(
+        db: AsyncSession,
+        company_id: str,
+        item_ids: Iterable[str]
+    ) -> Dict[str, List[InventoryAssembly]]:
+        """Active bill lines of the given items and every sub-assembly beneath them; leaves map to []"""
+        boms: Dict[str, List[InventoryAssembly]] = {}
+        frontier = set(item_ids)
+        while frontier:
+            result = await db.execute(
+                select(InventoryAssembly).join(
+                    Item, InventoryAssembly.assembly_item_id == Item.item_id
+                ).where(
+                    and_(
+                        Item.company_id == company_id,
+                        InventoryAssembly.assembly_item_id.in_(frontier),
+                        InventoryAssembly.is_active == True
+                    )
+                ).order_by(InventoryAssembly.assembly_item_id, InventoryAssembly.build_sequence)
+            )
+            for item_id in frontier:
+                boms[item_id] = []
+            for line in result.scalars().all():
+                boms[line.assembly_item_id].append(line)
+
+            frontier = {
+                line.component_item_id
+                for item_id in frontier for line in boms[item_id]
+            } - boms.keys()
+        return boms
+
+    @staticmethod
+    def flatten(boms: Dict[str, List[InventoryAssembly]], item_id: str) -> List[BomRequirement]:
+        """Leaf requirements for one unit of an assembly; raises ValueError on a cycle"""
+        memo: Dict[str, Dict[Tuple[str, bool], List[Decimal]]] = {}
+        path: List[str] = []
+
+        def visit(current: str) -> Dict[Tuple[str, bool], List[Decimal]]:
+            if current in memo:
+                return memo[current]
+            if current in path:
+                cycle = path[path.index(current):] + [current]
+                raise ValueError(f"Bill of materials cycle: {' -> '.join(cycle)}")
+
+            path.append(current)
+            flattened: Dict[Tuple[str, bool], List[Decimal]] = {}
+            for line in boms.get(current, []):
+                if boms.get(line.component_item_id):
+                    children = visit(line.component_item_id)
+                else:
+                    children = {(line.component_item_id, False): [Decimal('1'), line.unit_cost]}
+                for (leaf, optional), (quantity, unit_cost) in children.items():
+                    key = (leaf, optional or bool(line.is_optional))
+                    entry = flattened.setdefault(key, [Decimal('0'), unit_cost])
+                    entry[0] += quantity * line.quantity_needed
+            path.pop()
+
+            memo[current] = flattened
+            return flattened
+
+        return [
+            BomRequirement(leaf, quantity, optional, unit_cost)
+            for (leaf, optional), (quantity, unit_cost) in visit(item_id).items()
+        ]
+
+    async def explode(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        item_ids: Iterable[str]
+    ) -> Dict[str, List[BomRequirement]]:
+        """Leaf requirements per unit of each assembly; raises ValueError for items without components"""
+        item_ids = list(dict.fromkeys(item_ids))
+        boms = await self.load_boms(db, company_id, item_ids)
+
+        requirements = {}
+        for item_id in item_ids:
+            if not boms.get(item_id):
+                raise ValueError("No active components found for assembly")
+            requirements[item_id] = self.flatten(boms, item_id)
+        return requirements
+
+    async def check_component(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        assembly_item_id: str,
+        component_item_id: str
+    ) -> None:
+        """Raise ValueError if adding the component to the assembly would create a cycle"""
+        if assembly_item_id == component_item_id:
+            raise ValueError("An assembly cannot be a component of itself")
+        boms = await self.load_boms(db, company_id, [component_item_id])
+        if assembly_item_id in boms:
+            raise ValueError(f"Item {component_item_id} already contains assembly {assembly_item_id}")
+
+
+# Global bill of materials service instance
+bom_service = BomService()
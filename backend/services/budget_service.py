@@ -0,0 +1,379 @@
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import date
+from decimal import Decimal
+from collections import OrderedDict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, func, delete
+from sqlalchemy.orm import selectinload
+from models.budget import Budget, BudgetLine
+from models.transactions import Transaction, JournalEntry
+from models.list_management import Account, AccountType
+from schemas.report_schemas import BudgetCreate, BudgetUpdate, BudgetResponse, BudgetAccountAmounts
+from services.export_artifact_service import export_artifacts
+import numpy as np
+import os
+import uuid
+import structlog
+
+logger = structlog.get_logger()
+
+# Accounts whose balances grow with credits; their actuals are reported credit-positive
+CREDIT_NORMAL_TYPES = {AccountType.LIABILITIES, AccountType.EQUITY, AccountType.REVENUE}
+INCOME_TYPES = {AccountType.REVENUE}
+EXPENSE_TYPES = {AccountType.EXPENSES, AccountType.COST_OF_GOODS_SOLD}
+
+
+def _add_months(start: date, months: int) -> date:
+    month = start.month - 1 + months
+    return date(start.year + month // 12, month % 12 + 1, 1)
+
+
+def _period_key(period_start: date) -> int:
+    return period_start.year * 100 + period_start.month
+
+
+def _to_cents(value: Any) -> int:
+    return int((Decimal(str(value or 0)) * 100).to_integral_value())
+
+
+def _to_amounts(cents: np.ndarray) -> List[Decimal]:
+    return [Decimal(int(value)).scaleb(-2) for value in cents]
+
+
+class BudgetService:
+    """Budgets and the budget vs. actual report.
+
+    Actuals for every account and month of a budget's range come from one
+    grouped query over posted journal entries and are kept per company until
+    its transactions or journal entries change, so repeated comparisons only
+    cost the data version check. Budget and actual amounts are laid out as account x period matrices
+    of cents and the variances are computed on whole arrays.
+    """
+
+    def __init__(self):
+        self.actuals_cache_size = int(os.getenv("BUDGET_ACTUALS_CACHE_SIZE", "64"))
+        self._actuals: "OrderedDict[Tuple[str, date, date], Tuple[str, Dict[Tuple[str, int], Decimal]]]" = OrderedDict()
+
+    @staticmethod
+    def periods(budget: Budget) -> List[date]:
+        """First day of each period of a budget"""
+        return [_add_months(budget.start_date, index) for index in range(budget.period_count or 12)]
+
+    @staticmethod
+    def to_response(budget: Budget) -> BudgetResponse:
+        """Budget with its amounts grouped per account and ordered by period"""
+        period_index = {period: index for index, period in enumerate(BudgetService.periods(budget))}
+        amounts: Dict[str, List[Decimal]] = {}
+        for line in budget.lines:
+            index = period_index.get(line.period_start)
+            if index is None:
+                continue
+            amounts.setdefault(line.account_id, [Decimal('0.00')] * len(period_index))[index] = line.amount
+
+        return BudgetResponse(
+            budget_id=budget.budget_id,
+            company_id=budget.company_id,
+            budget_name=budget.budget_name,
+            fiscal_year=budget.fiscal_year,
+            start_date=budget.start_date,
+            period_count=budget.period_count,
+            description=budget.description,
+            is_active=budget.is_active,
+            created_by=budget.created_by,
+            created_at=budget.created_at,
+            updated_at=budget.updated_at,
+            accounts=[
+                BudgetAccountAmounts(account_id=account_id, amounts=account_amounts)
+                for account_id, account_amounts in amounts.items()
+            ]
+        )
+
+    async def get_budget(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        budget_id: str,
+        with_lines: bool = True
+    ) -> Optional[Budget]:
+        """Get a budget, with its lines unless only the header is needed"""
+        query = select(Budget).where(and_(Budget.budget_id == budget_id, Budget.company_id == company_id))
+        if with_lines:
+            query = query.options(selectinload(Budget.lines))
+        result = await db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def list_budgets(self, db: AsyncSession, company_id: str, fiscal_year: Optional[int] = None) -> List[Budget]:
+        """List a company's budgets, newest fiscal year first"""
+        query = select(Budget).options(selectinload(Budget.lines)).where(Budget.company_id == company_id)
+        if fiscal_year is not None:
+            query = query.where(Budget.fiscal_year == fiscal_year)
+        result = await db.execute(query.order_by(Budget.fiscal_year.desc(), Budget.budget_name))
+        return list(result.scalars().all())
+
+    async def create_budget(self, db: AsyncSession, company_id: str, user_id: str, budget_data: BudgetCreate) -> Budget:
+        """Create a budget with its per-account, per-period amounts"""
+        budget = Budget(
+            budget_id=str(uuid.uuid4()),
+            company_id=company_id,
+            budget_name=budget_data.budget_name,
+            fiscal_year=budget_data.fiscal_year,
+            start_date=budget_data.start_date,
+            period_count=budget_data.period_count,
+            description=budget_data.description,
+            created_by=user_id
+        )
+        db.add(budget)
+        await self._add_lines(db, company_id, budget, budget_data.accounts)
+        await db.commit()
+
+        logger.info("Budget created", budget_id=budget.budget_id, company_id=company_id,
+                    accounts=len(budget_data.accounts))
+        return await self.get_budget(db, company_id, budget.budget_id)
+
+    async def update_budget(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        budget_id: str,
+        budget_data: BudgetUpdate
+    ) -> Optional[Budget]:
+        """Update a budget; listed accounts get their amounts replaced"""
+        budget = await self.get_budget(db, company_id, budget_id)
+        if not budget:
+            return None
+
+        for field in ("budget_name", "description", "is_active"):
+            value = getattr(budget_data, field)
+            if value is not None:
+                setattr(budget, field, value)
+
+        if budget_data.accounts is not None:
+            account_ids = [account.account_id for account in budget_data.accounts]
+            if account_ids:
+                await db.execute(
+                    delete(BudgetLine).where(
+                        and_(BudgetLine.budget_id == budget_id, BudgetLine.account_id.in_(account_ids))
+                    )
+                )
+            await self._add_lines(db, company_id, budget, budget_data.accounts)
+
+        await db.commit()
+        db.expire(budget)
+        return await self.get_budget(db, company_id, budget_id)
+
+    async def delete_budget(self, db: AsyncSession, company_id: str, budget_id: str) -> bool:
+        """Delete a budget and its amounts"""
+        budget = await self.get_budget(db, company_id, budget_id)
+        if not budget:
+            return False
+        await db.delete(budget)
+        await db.commit()
+        return True
+
+    async def _add_lines(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        budget: Budget,
+        accounts: List[BudgetAccountAmounts]
+    ) -> None:
+        if not accounts:
+            return
+        periods = self.periods(budget)
+        account_ids = {account.account_id for account in accounts}
+        if len(account_ids) != len(accounts):
+            raise ValueError("Each account can only be listed once per budget")
+
+        result = await db.execute(
+            select(Account.account_id).where(
+                and_(Account.company_id == company_id, Account.account_id.in_(account_ids))
+            )
+        )
+        unknown = account_ids - set(result.scalars().all())
+        if unknown:
+            raise ValueError(f"Accounts not found: {', '.join(sorted(unknown))}")
+
+        for account in accounts:
+            if len(account.amounts) > len(periods):
+                raise ValueError(f"Budget has {len(periods)} periods but {len(account.amounts)} amounts were given")
+            db.add_all([
+                BudgetLine(budget_id=budget.budget_id, account_id=account.account_id,
+                           period_start=period, amount=amount)
+                for period, amount in zip(periods, account.amounts)
+            ])
+
+    async def period_actuals(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        start_date: date,
+        end_date: date
+    ) -> Dict[Tuple[str, int], Decimal]:
+        """Posted debit-minus-credit totals per (account, yyyymm) in [start_date, end_date)"""
+        data_version = await export_artifacts.data_version(db, company_id, ("transactions", "journal_entries"))
+        cache_key = (company_id, start_date, end_date)
+        cached = self._actuals.get(cache_key)
+        if cached is not None and cached[0] == data_version:
+            self._actuals.move_to_end(cache_key)
+            return cached[1]
+
+        period = func.extract('year', JournalEntry.posting_date) * 100 + func.extract('month', JournalEntry.posting_date)
+        result = await db.execute(
+            select(
+                JournalEntry.account_id,
+                period.label('period'),
+                func.sum(
+                    func.coalesce(JournalEntry.debit_amount, 0) - func.coalesce(JournalEntry.credit_amount, 0)
+                ).label('net_amount')
+            ).join(
+                Transaction, JournalEntry.transaction_id == Transaction.transaction_id
+            ).where(
+                and_(
+                    Transaction.company_id == company_id,
+                    Transaction.is_posted == True,
+                    JournalEntry.posting_date >= start_date,
+                    JournalEntry.posting_date < end_date
+                )
+            ).group_by(JournalEntry.account_id, period)
+        )
+        actuals = {(row.account_id, int(row.period)): row.net_amount for row in result}
+
+        self._actuals[cache_key] = (data_version, actuals)
+        self._actuals.move_to_end(cache_key)
+        while len(self._actuals) > self.actuals_cache_size:
+            self._actuals.popitem(last=False)
+        return actuals
+
+    async def generate_budget_vs_actual(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        budget_id: str,
+        include_unbudgeted: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Compare a budget with posted actuals per account and period"""
+        budget = await self.get_budget(db, company_id, budget_id, with_lines=False)
+        if not budget:
+            return None
+
+        periods = self.periods(budget)
+        period_index = {_period_key(period): index for index, period in enumerate(periods)}
+        actuals = await self.period_actuals(db, company_id, periods[0], _add_months(periods[-1], 1))
+
+        # Plain rows rather than ORM objects: a large budget has thousands of lines
+        result = await db.execute(
+            select(BudgetLine.account_id, BudgetLine.period_start, BudgetLine.amount).where(
+                BudgetLine.budget_id == budget_id
+            )
+        )
+        lines = result.all()
+
+        budgeted_ids = {line.account_id for line in lines}
+        account_ids = set(budgeted_ids)
+        if include_unbudgeted:
+            account_ids.update(account_id for account_id, _ in actuals)
+        result = await db.execute(
+            select(Account.account_id, Account.account_number, Account.account_name, Account.account_type).where(
+                and_(Account.company_id == company_id, Account.account_id.in_(account_ids))
+            )
+        )
+        # Unbudgeted accounts are only shown when they affect net income
+        accounts = [
+            account for account in result.all()
+            if account.account_id in budgeted_ids
+            or account.account_type in INCOME_TYPES or account.account_type in EXPENSE_TYPES
+        ]
+        accounts.sort(key=lambda account: (account.account_number or '', account.account_name))
+        row_index = {account.account_id: index for index, account in enumerate(accounts)}
+
+        shape = (len(accounts), len(periods))
+        budget_cents = np.zeros(shape, dtype=np.int64)
+        actual_cents = np.zeros(shape, dtype=np.int64)
+        for line in lines:
+            row = row_index.get(line.account_id)
+            column = period_index.get(_period_key(line.period_start))
+            if row is not None and column is not None:
+                budget_cents[row, column] = _to_cents(line.amount)
+        for (account_id, period), net_amount in actuals.items():
+            row = row_index.get(account_id)
+            column = period_index.get(period)
+            if row is not None and column is not None:
+                actual_cents[row, column] = _to_cents(net_amount)
+
+        # Report actuals in each account's natural sign, like the budget amounts
+        signs = np.array([-1 if account.account_type in CREDIT_NORMAL_TYPES else 1 for account in accounts],
+                         dtype=np.int64).reshape(-1, 1)
+        actual_cents *= signs
+        # Revenue over budget and expenses under budget are favorable; other accounts have no direction
+        directions = np.array([
+            1 if account.account_type in INCOME_TYPES else -1 if account.account_type in EXPENSE_TYPES else 0
+            for account in accounts
+        ], dtype=np.int64).reshape(-1, 1)
+
+        variance_cents = actual_cents - budget_cents
+        variance_percentage = self._percentages(variance_cents, budget_cents)
+        favorable = (variance_cents * directions) >= 0
+
+        total_budget = budget_cents.sum(axis=1)
+        total_actual = actual_cents.sum(axis=1)
+        total_variance = total_actual - total_budget
+        total_percentage = self._percentages(total_variance, total_budget)
+
+        data = []
+        for index, account in enumerate(accounts):
+            has_direction = bool(directions[index, 0])
+            data.append({
+                'account_id': account.account_id,
+                'account_number': account.account_number,
+                'account_name': account.account_name,
+                'account_type': account.account_type,
+                'budget': _to_amounts(budget_cents[index]),
+                'actual': _to_amounts(actual_cents[index]),
+                'variance': _to_amounts(variance_cents[index]),
+                'variance_percentage': variance_percentage[index],
+                'favorable': [bool(value) for value in favorable[index]] if has_direction else None,
+                'total_budget': Decimal(int(total_budget[index])).scaleb(-2),
+                'total_actual': Decimal(int(total_actual[index])).scaleb(-2),
+                'total_variance': Decimal(int(total_variance[index])).scaleb(-2),
+                'total_variance_percentage': total_percentage[index]
+            })
+
+        income_rows = (directions[:, 0] == 1)
+        expense_rows = (directions[:, 0] == -1)
+        summary = {}
+        for name, budget_totals, actual_totals in (
+            ("revenue", budget_cents[income_rows].sum(axis=0), actual_cents[income_rows].sum(axis=0)),
+            ("expenses", budget_cents[expense_rows].sum(axis=0), actual_cents[expense_rows].sum(axis=0)),
+            ("net_income",
+             budget_cents[income_rows].sum(axis=0) - budget_cents[expense_rows].sum(axis=0),
+             actual_cents[income_rows].sum(axis=0) - actual_cents[expense_rows].sum(axis=0))
+        ):
+            summary[name] = {
+                "budget": _to_amounts(budget_totals),
+                "actual": _to_amounts(actual_totals),
+                "variance": _to_amounts(actual_totals - budget_totals),
+                "total_budget": Decimal(int(budget_totals.sum())).scaleb(-2),
+                "total_actual": Decimal(int(actual_totals.sum())).scaleb(-2)
+            }
+
+        return {
+            "budget_id": budget.budget_id,
+            "budget_name": budget.budget_name,
+            "fiscal_year": budget.fiscal_year,
+            "periods": [period.strftime('%Y-%m') for period in periods],
+            "data": data,
+            "summary": summary
+        }
+
+    @staticmethod
+    def _percentages(variance: np.ndarray, budget: np.ndarray) -> List[Any]:
+        """Variance as a percentage of the budget, None where nothing was budgeted"""
+        percentages = np.divide(
+            variance * 100.0, np.abs(budget),
+            out=np.full(variance.shape, np.nan), where=budget != 0
+        ).round(1)
+        return np.where(np.isnan(percentages), None, percentages).tolist()
+
+
+# Global budget service instance
+budget_service = BudgetService()
@@ -0,0 +1,194 @@
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence, Callable, Tuple
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import types as sqltypes
+
+# Parquet and Arrow IPC writers for row-chunked exports. Column types come
+# from the query's SQL types when known and are otherwise inferred once from
+# the first chunk, so Decimal and date columns keep their types instead of
+# being written as text.
+PARQUET_ROW_GROUP_SIZE = int(os.getenv("PARQUET_ROW_GROUP_SIZE", "100000"))
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "zstd")
+DECIMAL_PRECISION = 38
+# Scale for Decimal columns of untyped queries; wider values are rounded to it
+DEFAULT_DECIMAL_SCALE = 6
+
+ColumnSpec = Tuple[pa.DataType, Optional[Callable[[Any], Any]]]
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def _json_text(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+def column_spec_for_sql_type(sql_type: Any) -> ColumnSpec:
+    """Arrow type and value converter for a SQLAlchemy column type"""
+    if isinstance(sql_type, sqltypes.Enum):
+        return pa.string(), _enum_value
+    if isinstance(sql_type, sqltypes.JSON):
+        return pa.string(), _json_text
+    if isinstance(sql_type, sqltypes.Boolean):
+        return pa.bool_(), None
+    if isinstance(sql_type, sqltypes.Integer):
+        return pa.int64(), None
+    if isinstance(sql_type, sqltypes.Float):
+        return pa.float64(), None
+    if isinstance(sql_type, sqltypes.Numeric):
+        scale = sql_type.scale if sql_type.scale is not None else DEFAULT_DECIMAL_SCALE
+        return pa.decimal128(sql_type.precision or DECIMAL_PRECISION, scale), None
+    if isinstance(sql_type, sqltypes.DateTime):
+        return pa.timestamp("us", tz="UTC" if sql_type.timezone else None), None
+    if isinstance(sql_type, sqltypes.Date):
+        return pa.date32(), None
+    return pa.string(), None
+
+
+def infer_column_spec(values: Sequence[Any]) -> ColumnSpec:
+    """Arrow type and value converter from a sample of column values"""
+    sample = next((value for value in values if value is not None), None)
+    if sample is None:
+        return pa.string(), None
+    if isinstance(sample, Enum):
+        return pa.string(), _enum_value
+    if isinstance(sample, (dict, list)):
+        return pa.string(), _json_text
+    if isinstance(sample, Decimal):
+        return pa.decimal128(DECIMAL_PRECISION, DEFAULT_DECIMAL_SCALE), None
+    if isinstance(sample, bool):
+        return pa.bool_(), None
+    if isinstance(sample, int):
+        return pa.int64(), None
+    if isinstance(sample, float):
+        return pa.float64(), None
+    if isinstance(sample, datetime):
+        return pa.timestamp("us", tz="UTC" if sample.tzinfo else None), None
+    if isinstance(sample, date):
+        return pa.date32(), None
+    return pa.string(), None
+
+
+def _column_array(values: List[Any], data_type: pa.DataType) -> pa.Array:
+    try:
+        return pa.array(values, type=data_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Values that do not fit the type resolved from the first chunk
+        if pa.types.is_decimal(data_type):
+            quantum = Decimal(1).scaleb(-data_type.scale)
+            return pa.array(
+                [Decimal(value).quantize(quantum) if value is not None else None for value in values],
+                type=data_type
+            )
+        if pa.types.is_string(data_type):
+            return pa.array([str(value) if value is not None else None for value in values], type=data_type)
+        if pa.types.is_floating(data_type):
+            return pa.array([float(value) if value is not None else None for value in values], type=data_type)
+        raise
+
+
+class ColumnarWriter:
+    """Incremental Parquet or Arrow IPC stream writer fed with row chunks.
+
+    Parquet output buffers chunks until a full row group is collected, so
+    files keep large, well-compressed row groups while at most one row group
+    is held in memory. Arrow IPC output writes each chunk as a record batch.
+    """
+
+    def __init__(
+        self,
+        filepath: Path,
+        export_format: str,
+        columns: List[str],
+        column_specs: Optional[List[Optional[ColumnSpec]]] = None,
+        metadata: Optional[Dict[str, str]] = None,
+        row_group_size: int = PARQUET_ROW_GROUP_SIZE
+    ):
+        if export_format not in ("parquet", "arrow"):
+            raise ValueError(f"Unsupported columnar format: {export_format}")
+        self.filepath = filepath
+        self.export_format = export_format
+        self.columns = columns
+        self.column_specs = list(column_specs) if column_specs else [None] * len(columns)
+        self.metadata = metadata or {}
+        self.row_group_size = row_group_size
+        self.row_count = 0
+        self._schema: Optional[pa.Schema] = None
+        self._writer = None
+        self._sink = None
+        self._pending: List[pa.RecordBatch] = []
+        self._pending_rows = 0
+
+    def _open(self, rows: Sequence[Sequence[Any]]) -> None:
+        for index, spec in enumerate(self.column_specs):
+            if spec is None:
+                self.column_specs[index] = infer_column_spec([row[index] for row in rows])
+        self._schema = pa.schema(
+            [pa.field(name, spec[0]) for name, spec in zip(self.columns, self.column_specs)],
+            metadata=self.metadata
+        )
+        if self.export_format == "parquet":
+            self._writer = pq.ParquetWriter(str(self.filepath), self._schema, compression=PARQUET_COMPRESSION)
+        else:
+            self._sink = pa.OSFile(str(self.filepath), "wb")
+            self._writer = pa.ipc.new_stream(self._sink, self._schema)
+
+    def write_rows(self, rows: Sequence[Sequence[Any]]) -> None:
+        """Convert a chunk of row tuples to a record batch and write or buffer it"""
+        if not rows:
+            return
+        if self._writer is None:
+            self._open(rows)
+
+        arrays = []
+        for index, (data_type, converter) in enumerate(self.column_specs):
+            values = [row[index] for row in rows]
+            if converter is not None:
+                values = [converter(value) if value is not None else None for value in values]
+            arrays.append(_column_array(values, data_type))
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self._schema)
+        self.row_count += batch.num_rows
+
+        if self.export_format == "arrow":
+            self._writer.write_batch(batch)
+            return
+        self._pending.append(batch)
+        self._pending_rows += batch.num_rows
+        if self._pending_rows >= self.row_group_size:
+            self._flush_row_group()
+
+    def _flush_row_group(self) -> None:
+        if self._pending:
+            table = pa.Table.from_batches(self._pending, schema=self._schema)
+            self._writer.write_table(table, row_group_size=self.row_group_size)
+            self._pending = []
+            self._pending_rows = 0
+
+    def close(self) -> int:
+        """Flush buffered rows, finish the file and return the number of rows written"""
+        if self._writer is None:
+            # No rows: still write a valid file with the column names
+            self._open([])
+        if self.export_format == "parquet":
+            self._flush_row_group()
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        return self.row_count
+
+    def abort(self) -> None:
+        """Release the file after a failed export"""
+        try:
+            if self._writer is not None:
+                self._writer.close()
+        finally:
+            if self._sink is not None:
+                self._sink.close()
@@ -8,6 +8,7 @@ from schemas.company_schemas import (
     CompanySettingRequest, CompanySettingResponse,
     CompanyUserInviteRequest, CompanyUserUpdateRequest
 )
+from services.access_control_service import access_control
 from fastapi import HTTPException, status
 from datetime import datetime, timezone, timedelta
 import structlog
@@ -39,6 +40,13 @@ class CompanyService:
                 "email_notifications": True,
                 "sms_notifications": False,
                 "push_notifications": True
+            },
+            "inventory": {
+                "cost_method": "fifo",
+                "reorder_history_days": 90,
+                "reorder_lead_time_days": 14,
+                "reorder_service_level": 0.95,
+                "reorder_review_days": 30
             }
         }
 
@@ -96,6 +104,7 @@ class CompanyService:
             
             await db.commit()
             await db.refresh(company)
+            await access_control.invalidate(user_id)
             
             logger.info("Company created", company_id=company.company_id, user_id=user_id)
             return company
@@ -117,17 +126,7 @@ class CompanyService:
         """Get company by ID"""
         try:
             # Check if user has access to this company
-            membership_result = await db.execute(
-                select(CompanyMembership).where(
-                    and_(
-                        CompanyMembership.user_id == user_id,
-                        CompanyMembership.company_id == company_id,
-                        CompanyMembership.is_active == True
-                    )
-                )
-            )
-            
-            if not membership_result.scalar_one_or_none():
+            if not await access_control.has_company_access(db, user_id, company_id):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Access denied to this company"
@@ -469,24 +468,106 @@ class CompanyService:
                 detail="Failed to get company users"
             )
 
-    async def _check_company_access(
+    async def update_company_user(
         self,
         db: AsyncSession,
         company_id: str,
-        user_id: str
+        member_user_id: str,
+        update_data: CompanyUserUpdateRequest
+    ) -> CompanyMembership:
+        """Update a user's membership in a company"""
+        try:
+            membership = await self._get_membership(db, company_id, member_user_id)
+            
+            if update_data.role is not None:
+                try:
+                    membership.role = UserRole(update_data.role)
+                except ValueError:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Invalid role: {update_data.role}"
+                    )
+            if update_data.permissions is not None:
+                membership.permissions = update_data.permissions
+            if update_data.is_active is not None:
+                membership.is_active = update_data.is_active
+            
+            await db.commit()
+            await db.refresh(membership)
+            await access_control.invalidate(member_user_id)
+            
+            logger.info("Company user updated", company_id=company_id, user_id=member_user_id)
+            return membership
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            await db.rollback()
+            logger.error("Company user update failed", error=str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to update company user"
+            )
+
+    async def remove_company_user(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        member_user_id: str
     ) -> None:
-        """Check if user has access to company"""
+        """Remove user from company (deactivate membership)"""
+        try:
+            membership = await self._get_membership(db, company_id, member_user_id)
+            membership.is_active = False
+            
+            await db.commit()
+            await access_control.invalidate(member_user_id)
+            
+            logger.info("Company user removed", company_id=company_id, user_id=member_user_id)
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            await db.rollback()
+            logger.error("Company user removal failed", error=str(e))
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to remove company user"
+            )
+
+    async def _get_membership(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        member_user_id: str
+    ) -> CompanyMembership:
+        """Get a company membership or raise 404"""
         result = await db.execute(
             select(CompanyMembership).where(
                 and_(
-                    CompanyMembership.user_id == user_id,
-                    CompanyMembership.company_id == company_id,
-                    CompanyMembership.is_active == True
+                    CompanyMembership.user_id == member_user_id,
+                    CompanyMembership.company_id == company_id
                 )
             )
         )
+        membership = result.scalar_one_or_none()
         
-        if not result.scalar_one_or_none():
+        if not membership:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User is not a member of this company"
+            )
+        
+        return membership
+
+    async def _check_company_access(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        user_id: str
+    ) -> None:
+        """Check if user has access to company"""
+        if not await access_control.has_company_access(db, user_id, company_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied to this company"
@@ -499,21 +580,9 @@ class CompanyService:
         user_id: str
     ) -> None:
         """Check if user has admin access to company"""
-        result = await db.execute(
-            select(CompanyMembership).where(
-                and_(
-                    CompanyMembership.user_id == user_id,
-                    CompanyMembership.company_id == company_id,
-                    CompanyMembership.is_active == True,
-                    or_(
-                        CompanyMembership.role == UserRole.ADMIN,
-                        CompanyMembership.role == UserRole.MANAGER
-                    )
-                )
-            )
-        )
+        permissions = await access_control.get_permissions(db, user_id, company_id)
         
-        if not result.scalar_one_or_none():
+        if not permissions.has_membership or permissions.role not in (UserRole.ADMIN.value, UserRole.MANAGER.value):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient permissions for this operation"
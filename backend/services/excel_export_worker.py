@@ -0,0 +1,196 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Any, List, Optional
+import os
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, NamedStyle
+from openpyxl.utils import get_column_letter
+
+# Builders run in export worker processes: they take and return picklable
+# data and write workbooks in write-only mode, with formatting from named
+# styles registered once per workbook.
+CURRENCY_FORMAT = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
+PROGRESS_INTERVAL_ROWS = 5000
+# Rows sampled to size columns, since write-only sheets cannot be revisited
+WIDTH_SAMPLE_ROWS = 200
+MAX_COLUMN_WIDTH = 50
+
+
+def _register_styles(wb: Workbook) -> None:
+    """Register the named styles shared by every cell of a report workbook"""
+    styles = [
+        NamedStyle(name="report_title", font=Font(bold=True, size=16)),
+        NamedStyle(name="report_subtitle", alignment=Alignment(horizontal="left")),
+        NamedStyle(
+            name="report_header",
+            font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+            alignment=Alignment(horizontal="center")
+        ),
+        NamedStyle(name="report_bold", font=Font(bold=True)),
+        NamedStyle(name="report_currency", number_format=CURRENCY_FORMAT),
+        NamedStyle(name="report_total", font=Font(bold=True), number_format=CURRENCY_FORMAT),
+        NamedStyle(name="report_grand_total", font=Font(bold=True, size=12), number_format=CURRENCY_FORMAT),
+        NamedStyle(name="report_grand_total_label", font=Font(bold=True, size=12))
+    ]
+    for style in styles:
+        wb.add_named_style(style)
+
+
+def _cell(ws, value: Any, style: str) -> WriteOnlyCell:
+    cell = WriteOnlyCell(ws, value=value)
+    cell.style = style
+    return cell
+
+
+def _excel_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _set_column_widths(ws, widths: List[int]) -> None:
+    for index, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(index)].width = min(width + 2, MAX_COLUMN_WIDTH)
+
+
+def _report_progress(progress, rows_written: int) -> None:
+    if progress is not None:
+        progress.put(rows_written)
+
+
+def build_report_workbook(filepath: str, payload: Dict[str, Any], progress=None) -> int:
+    """Write a tabular report workbook and return its size in bytes"""
+    rows: List[Dict[str, Any]] = payload.get("data") or []
+    headers = list(rows[0].keys()) if rows else []
+
+    wb = Workbook(write_only=True)
+    _register_styles(wb)
+    ws = wb.create_sheet("Report Data")
+
+    # Widths and panes must be set before the first row is written
+    widths = [len(str(header)) for header in headers]
+    for row in rows[:WIDTH_SAMPLE_ROWS]:
+        for index, header in enumerate(headers):
+            widths[index] = max(widths[index], len(str(row.get(header, ''))))
+    widths = widths or [len(payload["report_name"])]
+    _set_column_widths(ws, widths)
+
+    header_row = 5
+    if rows and payload.get("freeze_header_row"):
+        ws.freeze_panes = f"A{header_row + 1}"
+
+    ws.append([_cell(ws, payload["report_name"], "report_title")])
+    ws.append([_cell(ws, payload["company_name"], "report_subtitle")])
+    generated_at = payload.get("generated_at")
+    if isinstance(generated_at, datetime):
+        ws.append([_cell(ws, f"Generated: {generated_at.strftime('%B %d, %Y at %I:%M %p')}", "report_subtitle")])
+    else:
+        ws.append([])
+    ws.append([])
+
+    if rows:
+        ws.append([_cell(ws, header, "report_header") for header in headers])
+
+        # Currency and Decimal columns get the currency style; the rest are written as plain values
+        defined_currency = {
+            column.get("name") for column in payload.get("columns") or []
+            if isinstance(column, dict) and column.get("data_type") == "currency"
+        }
+        currency_columns = {
+            index for index, header in enumerate(headers)
+            if header in defined_currency or isinstance(
+                next((row.get(header) for row in rows[:WIDTH_SAMPLE_ROWS] if row.get(header) is not None), None),
+                Decimal
+            )
+        }
+        for count, row_data in enumerate(rows, 1):
+            values = [_excel_value(row_data.get(header, '')) for header in headers]
+            for index in currency_columns:
+                if values[index] is not None:
+                    values[index] = _cell(ws, values[index], "report_currency")
+            ws.append(values)
+            if count % PROGRESS_INTERVAL_ROWS == 0:
+                _report_progress(progress, count)
+
+    summary = payload.get("summary")
+    if payload.get("include_summary") and summary is not None:
+        summary_ws = wb.create_sheet("Summary")
+        _set_column_widths(summary_ws, [
+            max((len(str(key)) for key in summary), default=10),
+            max((len(str(value)) for value in summary.values()), default=10)
+        ])
+        for key, value in summary.items():
+            summary_ws.append([_cell(summary_ws, key, "report_bold"), _excel_value(value)])
+
+    wb.save(filepath)
+    _report_progress(progress, len(rows))
+    return os.path.getsize(filepath)
+
+
+def build_financial_workbook(filepath: str, financial_data: Dict[str, Any], progress=None) -> int:
+    """Write a sectioned financial statement workbook and return its size in bytes"""
+    sections: List[Dict[str, Any]] = financial_data["sections"]
+    has_comparison = financial_data.get("comparison_date") is not None
+
+    wb = Workbook(write_only=True)
+    _register_styles(wb)
+    ws = wb.create_sheet(financial_data["report_name"].replace(" ", "_")[:31])
+
+    account_width = max(
+        [len(financial_data["report_name"])] +
+        [len(line["account_name"]) for section in sections for line in section["lines"]] +
+        [len(f"Total {section['section_name']}") for section in sections]
+    )
+    _set_column_widths(ws, [account_width, 18, 18, 18] if has_comparison else [account_width, 18])
+
+    report_date = financial_data["report_date"]
+    if isinstance(report_date, date):
+        report_date = report_date.strftime("%B %d, %Y")
+
+    ws.append([_cell(ws, financial_data["report_name"], "report_title")])
+    ws.append([_cell(ws, financial_data["company_name"], "report_subtitle")])
+    ws.append([_cell(ws, f"As of {report_date}", "report_subtitle")])
+    ws.append([])
+
+    lines_written = 0
+    for section in sections:
+        ws.append([_cell(ws, section["section_name"], "report_bold")])
+        if has_comparison:
+            ws.append([_cell(ws, label, "report_bold") for label in ("Account", "Current", "Comparison", "Variance")])
+        else:
+            ws.append([_cell(ws, label, "report_bold") for label in ("Account", "Amount")])
+
+        for line in section["lines"]:
+            row = [line["account_name"], _cell(ws, _excel_value(line["amount"]), "report_currency")]
+            if has_comparison and line.get("comparison_amount") is not None:
+                row.append(_cell(ws, _excel_value(line["comparison_amount"]), "report_currency"))
+                if line.get("variance_amount") is not None:
+                    row.append(_cell(ws, _excel_value(line["variance_amount"]), "report_currency"))
+            ws.append(row)
+            lines_written += 1
+            if lines_written % PROGRESS_INTERVAL_ROWS == 0:
+                _report_progress(progress, lines_written)
+
+        total_row = [
+            _cell(ws, f"Total {section['section_name']}", "report_bold"),
+            _cell(ws, _excel_value(section["total_amount"]), "report_total")
+        ]
+        if has_comparison and section.get("comparison_total") is not None:
+            total_row.append(_cell(ws, _excel_value(section["comparison_total"]), "report_total"))
+        ws.append(total_row)
+        ws.append([])
+
+    grand_total: Optional[Any] = financial_data.get("grand_total")
+    if grand_total is not None:
+        label = "Net Income" if "Profit" in financial_data["report_name"] else "Total Assets"
+        ws.append([
+            _cell(ws, label, "report_grand_total_label"),
+            _cell(ws, _excel_value(grand_total), "report_grand_total")
+        ])
+
+    wb.save(filepath)
+    _report_progress(progress, lines_written)
+    return os.path.getsize(filepath)
@@ -0,0 +1,393 @@
+from typing import Optional, Dict, Any, Callable, Awaitable, Tuple, AsyncIterator, Iterable
+from datetime import datetime, timezone
+from pathlib import Path
+from fastapi import Request, HTTPException, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from models.transactions import Transaction, TransactionLine, JournalEntry, Payment
+from models.list_management import Account, Customer, Vendor, Item
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+import structlog
+
+logger = structlog.get_logger()
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "zip": "application/zip",
+    "parquet": "application/vnd.apache.parquet",
+    "arrows": "application/vnd.apache.arrow.stream"
+}
+RANGE_CHUNK_SIZE = 64 * 1024
+
+
+def _source(key_column, changed_column, company_column, *join):
+    """Row count and last change of a company's rows, as scalar subqueries"""
+    def fingerprint(company_id: str):
+        count = select(func.count(key_column))
+        changed = select(func.max(changed_column))
+        if join:
+            count, changed = count.join(*join), changed.join(*join)
+        return (
+            count.where(company_column == company_id).scalar_subquery(),
+            changed.where(company_column == company_id).scalar_subquery()
+        )
+    return fingerprint
+
+
+# Tables exports read, by the name reports declare them under. Lines and
+# journal entries are only ever inserted or deleted, so their count and
+# newest row cover every change.
+DATA_SOURCES = {
+    "transactions": _source(Transaction.transaction_id,
+                            func.coalesce(Transaction.updated_at, Transaction.created_at),
+                            Transaction.company_id),
+    "transaction_lines": _source(TransactionLine.line_id, TransactionLine.created_at, Transaction.company_id,
+                                 Transaction, TransactionLine.transaction_id == Transaction.transaction_id),
+    "journal_entries": _source(JournalEntry.entry_id, JournalEntry.created_at, Transaction.company_id,
+                               Transaction, JournalEntry.transaction_id == Transaction.transaction_id),
+    "payments": _source(Payment.payment_id, Payment.created_at, Payment.company_id),
+    "accounts": _source(Account.account_id, func.coalesce(Account.updated_at, Account.created_at),
+                        Account.company_id),
+    "customers": _source(Customer.customer_id, func.coalesce(Customer.updated_at, Customer.created_at),
+                         Customer.company_id),
+    "vendors": _source(Vendor.vendor_id, func.coalesce(Vendor.updated_at, Vendor.created_at),
+                       Vendor.company_id),
+    "items": _source(Item.item_id, func.coalesce(Item.updated_at, Item.created_at), Item.company_id)
+}
+
+
+class ExportArtifact:
+    """A rendered export file and its metadata"""
+
+    __slots__ = ("artifact_id", "company_id", "filename", "extension", "path", "file_size", "created_at", "kind")
+
+    def __init__(self, artifact_id: str, company_id: str, filename: str, extension: str,
+                 path: Path, file_size: int, created_at: float, kind: Optional[str] = None):
+        self.artifact_id = artifact_id
+        self.company_id = company_id
+        self.filename = filename
+        self.extension = extension
+        self.path = path
+        self.file_size = file_size
+        self.created_at = created_at
+        self.kind = kind
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES.get(self.extension, "application/octet-stream")
+
+    @property
+    def storage_name(self) -> str:
+        return f"{self.artifact_id}.{self.extension}"
+
+    def to_meta(self) -> Dict[str, Any]:
+        return {
+            "artifact_id": self.artifact_id,
+            "company_id": self.company_id,
+            "filename": self.filename,
+            "extension": self.extension,
+            "file_size": self.file_size,
+            "created_at": self.created_at,
+            "kind": self.kind
+        }
+
+
+class ExportArtifactStore:
+    """Content-addressed store for rendered exports.
+
+    Artifacts are keyed by company, report, parameters, the data version of
+    the tables the report reads and format, so exporting an unchanged report
+    returns the file rendered last time. Exports without a data version are
+    rendered every time. Concurrent requests for the same key within a worker
+    render once. Files are written under a temporary name and renamed into
+    place, with a JSON sidecar holding the download name, creation time and
+    kind; download routes serve only the kinds their permission check
+    covers, and artifacts stored before kinds were recorded are not served. A background
+    sweep deletes artifacts past their TTL and then the least recently
+    downloaded ones until the store fits its size budget.
+    """
+
+    def __init__(self):
+        self.root = Path(os.getenv("EXPORT_ROOT", "/app/backend/exports"))
+        self.ttl_seconds = int(os.getenv("EXPORT_ARTIFACT_TTL_HOURS", "24")) * 3600
+        self.max_bytes = int(os.getenv("EXPORT_ARTIFACT_MAX_MB", "2048")) * 1024 * 1024
+        self.sweep_interval_seconds = int(os.getenv("EXPORT_ARTIFACT_SWEEP_SECONDS", "600"))
+        # Render lock per artifact and the number of callers holding or awaiting it
+        self._locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+        self._task = None
+
+    def start(self) -> None:
+        """Start the periodic eviction sweep"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Export artifact store started", root=str(self.root))
+
+    async def stop(self) -> None:
+        """Stop the periodic eviction sweep"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                logger.error("Export artifact sweep failed", error=str(e))
+            await asyncio.sleep(self.sweep_interval_seconds)
+
+    @staticmethod
+    async def data_version(db: AsyncSession, company_id: str, sources: Iterable[str]) -> str:
+        """Cheap fingerprint of the company's rows in the given data sources"""
+        sources = sorted(set(sources))
+        columns = []
+        for source in sources:
+            count, changed = DATA_SOURCES[source](company_id)
+            columns.extend((count.label(f"{source}_rows"), changed.label(f"{source}_changed")))
+        result = await db.execute(select(*columns))
+        return ":".join(str(value) for value in result.one())
+
+    @staticmethod
+    def artifact_key(
+        company_id: str,
+        report_key: str,
+        parameters: Dict[str, Any],
+        data_version: str,
+        extension: str
+    ) -> str:
+        """Derive the artifact ID for an export"""
+        key_data = {
+            "company_id": company_id,
+            "report_key": report_key,
+            "parameters": parameters,
+            "data_version": data_version,
+            "format": extension
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _company_dir(self, company_id: str) -> Path:
+        return self.root / re.sub(r'[^A-Za-z0-9_-]', '_', company_id)
+
+    def get(self, company_id: str, artifact_id: str) -> Optional[ExportArtifact]:
+        """Get a live artifact of a company, marking it as recently used"""
+        if not re.fullmatch(r'[0-9a-f]{64}', artifact_id):
+            return None
+        meta_path = self._company_dir(company_id) / f"{artifact_id}.json"
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if meta.get("company_id") != company_id or time.time() - meta["created_at"] > self.ttl_seconds:
+            return None
+
+        path = meta_path.with_name(f"{artifact_id}.{meta['extension']}")
+        try:
+            # Access time for size-based eviction, independent of filesystem atime settings
+            os.utime(path)
+        except OSError:
+            return None
+        return ExportArtifact(artifact_id, company_id, meta["filename"], meta["extension"],
+                              path, meta["file_size"], meta["created_at"], meta.get("kind"))
+
+    async def get_or_create(
+        self,
+        company_id: str,
+        report_key: str,
+        parameters: Dict[str, Any],
+        data_version: Optional[str],
+        extension: str,
+        filename: str,
+        producer: Callable[[Path], Awaitable[Any]],
+        kind: str = "report"
+    ) -> Tuple[ExportArtifact, bool]:
+        """Return the artifact for an export, rendering it with `producer` if missing.
+
+        `producer` writes the file to the path it is given, and `kind` tags
+        the artifact for download routes. A `data_version` of None means the
+        export's inputs are not tracked, so a stored file is never reused.
+        Returns the artifact and whether it was already stored.
+        """
+        if data_version is None:
+            artifact_id = self.artifact_key(company_id, report_key, parameters, uuid.uuid4().hex, extension)
+            return await self._create(company_id, artifact_id, extension, filename, producer, kind), False
+
+        artifact_id = self.artifact_key(company_id, report_key, parameters, data_version, extension)
+        artifact = self.get(company_id, artifact_id)
+        if artifact is not None:
+            return artifact, True
+
+        lock, users = self._locks.get(artifact_id, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[artifact_id] = (lock, users + 1)
+        try:
+            async with lock:
+                artifact = self.get(company_id, artifact_id)
+                if artifact is not None:
+                    return artifact, True
+                return await self._create(company_id, artifact_id, extension, filename, producer, kind), False
+        finally:
+            # Drop the lock only once no other caller can still be waiting on it
+            lock, users = self._locks[artifact_id]
+            if users == 1:
+                del self._locks[artifact_id]
+            else:
+                self._locks[artifact_id] = (lock, users - 1)
+
+    async def _create(
+        self,
+        company_id: str,
+        artifact_id: str,
+        extension: str,
+        filename: str,
+        producer: Callable[[Path], Awaitable[Any]],
+        kind: str
+    ) -> ExportArtifact:
+        company_dir = self._company_dir(company_id)
+        company_dir.mkdir(parents=True, exist_ok=True)
+        path = company_dir / f"{artifact_id}.{extension}"
+        temp_path = company_dir / f".{artifact_id}.{uuid.uuid4().hex}.tmp"
+
+        try:
+            await producer(temp_path)
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        artifact = ExportArtifact(artifact_id, company_id, filename, extension,
+                                  path, path.stat().st_size, time.time(), kind)
+        meta_temp = company_dir / f".{artifact_id}.{uuid.uuid4().hex}.meta.tmp"
+        meta_temp.write_text(json.dumps(artifact.to_meta()))
+        os.replace(meta_temp, company_dir / f"{artifact_id}.json")
+
+        logger.info("Export artifact stored", company_id=company_id, artifact_id=artifact_id,
+                    filename=filename, file_size=artifact.file_size)
+        return artifact
+
+    def expires_at(self, artifact: ExportArtifact) -> datetime:
+        return datetime.fromtimestamp(artifact.created_at + self.ttl_seconds, tz=timezone.utc)
+
+    def sweep(self) -> Dict[str, int]:
+        """Delete expired artifacts, then least recently used ones over the size budget"""
+        now = time.time()
+        live = []
+        expired = 0
+
+        for meta_path in self.root.glob("*/*.json"):
+            try:
+                meta = json.loads(meta_path.read_text())
+                path = meta_path.with_name(f"{meta['artifact_id']}.{meta['extension']}")
+                stat = path.stat()
+            except (OSError, ValueError, KeyError):
+                meta_path.unlink(missing_ok=True)
+                continue
+            if now - meta["created_at"] > self.ttl_seconds:
+                self._delete(meta_path, path)
+                expired += 1
+            else:
+                live.append((stat.st_mtime, stat.st_size, meta_path, path))
+
+        # Leftovers from interrupted renders
+        for temp_path in self.root.glob("*/.*.tmp"):
+            try:
+                if now - temp_path.stat().st_mtime > 3600:
+                    temp_path.unlink()
+            except OSError:
+                pass
+
+        total_bytes = sum(size for _, size, _, _ in live)
+        evicted = 0
+        for _, size, meta_path, path in sorted(live):
+            if total_bytes <= self.max_bytes:
+                break
+            self._delete(meta_path, path)
+            total_bytes -= size
+            evicted += 1
+
+        if expired or evicted:
+            logger.info("Export artifacts swept", expired=expired, evicted=evicted, total_bytes=total_bytes)
+        return {"expired": expired, "evicted": evicted, "total_bytes": total_bytes}
+
+    @staticmethod
+    def _delete(meta_path: Path, path: Path) -> None:
+        # Sidecar first so a half-deleted artifact is never served
+        meta_path.unlink(missing_ok=True)
+        path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _parse_range(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+        """Parse a single `bytes=` range into inclusive offsets, or None if unsatisfiable"""
+        match = re.fullmatch(r'\s*bytes=(\d*)-(\d*)\s*', range_header)
+        if not match or (not match.group(1) and not match.group(2)):
+            return None
+        if match.group(1):
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else file_size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(file_size - int(match.group(2)), 0)
+            end = file_size - 1
+        end = min(end, file_size - 1)
+        if start > end:
+            return None
+        return start, end
+
+    @staticmethod
+    async def _iter_range(path: Path, start: int, end: int) -> AsyncIterator[bytes]:
+        with open(path, "rb") as file:
+            file.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(file.read, min(RANGE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def file_response(self, request: Request, artifact: ExportArtifact):
+        """Serve an artifact, honouring single byte-range requests so downloads can resume"""
+        etag = f'"{artifact.artifact_id}"'
+        headers = {"Accept-Ranges": "bytes", "ETag": etag}
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+
+        # Multi-range requests and stale If-Range validators get the whole file
+        if not range_header or "," in range_header or (if_range and if_range != etag):
+            return FileResponse(path=artifact.path, filename=artifact.filename,
+                                media_type=artifact.media_type, headers=headers)
+
+        byte_range = self._parse_range(range_header, artifact.file_size)
+        if byte_range is None:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{artifact.file_size}"}
+            )
+
+        start, end = byte_range
+        headers.update({
+            "Content-Range": f"bytes {start}-{end}/{artifact.file_size}",
+            "Content-Length": str(end - start + 1),
+            "Content-Disposition": f'attachment; filename="{artifact.filename}"'
+        })
+        return StreamingResponse(self._iter_range(artifact.path, start, end),
+                                 status_code=status.HTTP_206_PARTIAL_CONTENT,
+                                 media_type=artifact.media_type, headers=headers)
+
+
+# Global export artifact store instance
+export_artifacts = ExportArtifactStore()
@@ -0,0 +1,178 @@
+from typing import Optional, Dict, Any, List, Callable
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException, status
+import asyncio
+import functools
+import multiprocessing
+import os
+import queue
+import uuid
+import structlog
+
+logger = structlog.get_logger()
+
+
+class ExportWorkerPool:
+    """Process pool for CPU-bound report rendering.
+
+    Workbook and document builds run in separate processes so they neither
+    block the event loop nor hold the API worker's GIL. Each company may run
+    a bounded number of exports at once; further exports wait for a slot and
+    are rejected if none frees up in time. Workers report rows written
+    through a managed queue, which is exposed as per-company progress. The
+    manager process and its queues are reached over IPC, so they are started
+    and drained in a thread rather than on the event loop.
+    """
+
+    def __init__(self):
+        self.max_workers = int(os.getenv("EXPORT_WORKER_PROCESSES", str(os.cpu_count() or 2)))
+        self.per_company_limit = int(os.getenv("EXPORT_CONCURRENCY_PER_COMPANY", "2"))
+        self.slot_timeout = float(os.getenv("EXPORT_SLOT_TIMEOUT_SECONDS", "30"))
+        self.progress_poll_seconds = 0.5
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._start_lock = asyncio.Lock()
+        # company_id -> [semaphore, number of holders and waiters]
+        self._company_slots: Dict[str, List[Any]] = {}
+        self._progress: Dict[str, Dict[str, Any]] = {}
+
+    async def _get_executor(self) -> ProcessPoolExecutor:
+        async with self._start_lock:
+            if self._executor is None:
+                # Spawned workers only import the render modules, not the app
+                context = multiprocessing.get_context("spawn")
+                if self._manager is None:
+                    self._manager = await asyncio.to_thread(context.Manager)
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+                logger.info("Export worker pool started", workers=self.max_workers)
+            return self._executor
+
+    async def _acquire_slot(self, company_id: str) -> asyncio.Semaphore:
+        slot = self._company_slots.setdefault(company_id, [asyncio.Semaphore(self.per_company_limit), 0])
+        slot[1] += 1
+        try:
+            await asyncio.wait_for(slot[0].acquire(), timeout=self.slot_timeout)
+        except asyncio.TimeoutError:
+            self._release_usage(company_id)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent exports for this company",
+                headers={"Retry-After": str(int(self.slot_timeout))}
+            )
+        return slot[0]
+
+    def _release_usage(self, company_id: str) -> None:
+        slot = self._company_slots.get(company_id)
+        if slot is None:
+            return
+        slot[1] -= 1
+        if slot[1] <= 0:
+            del self._company_slots[company_id]
+
+    async def run(
+        self,
+        company_id: Optional[str],
+        description: str,
+        func: Callable,
+        *args,
+        total_rows: Optional[int] = None
+    ) -> Any:
+        """Run a render function in the pool under the company's concurrency limit.
+
+        The function receives a `progress` keyword argument: a queue that
+        accepts the number of rows written so far.
+        """
+        results = await self.run_many(company_id, description, func, [args], total_rows=total_rows)
+        return results[0]
+
+    async def run_many(
+        self,
+        company_id: Optional[str],
+        description: str,
+        func: Callable,
+        arg_sets: List[tuple],
+        total_rows: Optional[int] = None
+    ) -> List[Any]:
+        """Run a render function over several argument sets in parallel, as one export"""
+        company_key = company_id or "global"
+        export_id = str(uuid.uuid4())
+        self._progress[export_id] = {
+            "export_id": export_id,
+            "company_id": company_key,
+            "description": description,
+            "status": "queued",
+            "rows_written": 0,
+            "total_rows": total_rows,
+            "started_at": None
+        }
+
+        try:
+            semaphore = await self._acquire_slot(company_key)
+            try:
+                return await self._execute(export_id, func, arg_sets)
+            finally:
+                semaphore.release()
+                self._release_usage(company_key)
+        finally:
+            self._progress.pop(export_id, None)
+
+    async def _execute(self, export_id: str, func: Callable, arg_sets: List[tuple]) -> List[Any]:
+        entry = self._progress[export_id]
+        executor = await self._get_executor()
+        manager = self._manager
+        progress_queues = await asyncio.to_thread(lambda: [manager.Queue() for _ in arg_sets])
+
+        entry["status"] = "running"
+        entry["started_at"] = datetime.now(timezone.utc).isoformat()
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(executor, functools.partial(func, *args, progress=progress_queue))
+            for args, progress_queue in zip(arg_sets, progress_queues)
+        ]
+        rows_written = [0] * len(futures)
+
+        try:
+            pending = set(futures)
+            while pending:
+                _, pending = await asyncio.wait(pending, timeout=self.progress_poll_seconds)
+                rows_written = await asyncio.to_thread(self._drain_progress, progress_queues, rows_written)
+                entry["rows_written"] = sum(rows_written)
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            # A crashed worker poisons the pool; start a fresh one next time
+            logger.error("Export worker pool broken, restarting", description=entry["description"])
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    @staticmethod
+    def _drain_progress(progress_queues: List[Any], rows_written: List[int]) -> List[int]:
+        """Latest row count reported on each queue"""
+        rows_written = list(rows_written)
+        for index, progress_queue in enumerate(progress_queues):
+            while True:
+                try:
+                    rows_written[index] = progress_queue.get_nowait()
+                except queue.Empty:
+                    break
+        return rows_written
+
+    def get_progress(self, company_id: str) -> List[Dict[str, Any]]:
+        """Get the queued and running exports of a company"""
+        return [dict(entry) for entry in self._progress.values() if entry["company_id"] == company_id]
+
+    def shutdown(self) -> None:
+        """Stop worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+
+# Global export worker pool instance
+export_workers = ExportWorkerPool()
@@ -1,15 +1,17 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, desc, asc, text, case
+from sqlalchemy import select, and_, or_, func, desc, asc, text, case, tuple_
 from sqlalchemy.orm import selectinload, joinedload
-from typing import List, Optional, Tuple, Dict, Any, Union
+from typing import List, Optional, Tuple, Dict, Any, Union, AsyncIterator
 from models.transactions import Transaction, TransactionLine, JournalEntry, TransactionType, TransactionStatus
 from models.list_management import Account, Customer, Vendor, AccountType
 from models.user import Company
 from schemas.report_schemas import (
     FinancialReportData, FinancialSection, FinancialLine,
     ProfitLossRequest, BalanceSheetRequest, CashFlowRequest,
-    TrialBalanceRequest, AgingReportRequest
+    TrialBalanceRequest, AgingReportRequest, GeneralLedgerRequest
 )
+import base64
+import json
 import structlog
 from datetime import datetime, date, timedelta
 from decimal import Decimal
@@ -17,6 +19,11 @@ from collections import defaultdict
 
 logger = structlog.get_logger()
 
+GENERAL_LEDGER_COLUMNS = [
+    "Account Number", "Account Name", "Posting Date", "Transaction Type", "Transaction Number",
+    "Reference", "Description", "Debit", "Credit", "Balance"
+]
+
 class FinancialReportService:
     """Service for generating financial reports"""
     
@@ -445,6 +452,272 @@ class FinancialReportService:
             }
         }
     
+    @staticmethod
+    async def generate_general_ledger_page(
+        db: AsyncSession,
+        company_id: str,
+        request: GeneralLedgerRequest,
+        cursor: Optional[str] = None,
+        page_size: int = 500
+    ) -> Dict[str, Any]:
+        """Generate one page of the General Ledger detail report"""
+        
+        position = FinancialReportService._decode_general_ledger_cursor(cursor) if cursor else None
+        after = position[:4] if position else None
+        
+        accounts = await FinancialReportService._get_general_ledger_accounts(db, company_id, request.account_ids)
+        rows = await FinancialReportService._fetch_general_ledger_lines(
+            db, company_id, request, accounts, after, page_size + 1
+        )
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        
+        # The cursor carries the running balance of the account it stopped in;
+        # every other account on the page starts from its opening balance
+        current_account_id = position[1] if position else None
+        balance = position[4] if position else Decimal('0.0')
+        new_account_ids = {row.account_id for row in rows} - {current_account_id}
+        opening_balances = {}
+        if new_account_ids:
+            opening_balances = await FinancialReportService._get_general_ledger_opening_balances(
+                db, company_id, request.start_date, list(new_account_ids)
+            )
+        
+        lines = []
+        for row in rows:
+            if row.account_id != current_account_id:
+                current_account_id = row.account_id
+                balance = opening_balances.get(row.account_id, Decimal('0.0'))
+            balance += row.debit_amount - row.credit_amount
+            
+            lines.append({
+                'entry_id': row.entry_id,
+                'account_id': row.account_id,
+                'account_number': row.account_number,
+                'account_name': row.account_name,
+                'posting_date': row.posting_date,
+                'transaction_id': row.transaction_id,
+                'transaction_type': row.transaction_type,
+                'transaction_number': row.transaction_number,
+                'reference_number': row.reference_number,
+                'description': row.description,
+                'debit_amount': row.debit_amount,
+                'credit_amount': row.credit_amount,
+                'balance': balance
+            })
+        
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = FinancialReportService._encode_general_ledger_cursor(
+                (last.account_sort, last.account_id, last.posting_date, last.entry_id, balance)
+            )
+        
+        return {
+            "data": lines,
+            "opening_balances": {
+                account_id: opening_balances.get(account_id, Decimal('0.0'))
+                for account_id in new_account_ids
+            },
+            "start_date": request.start_date,
+            "end_date": request.end_date,
+            "has_more": has_more,
+            "next_cursor": next_cursor
+        }
+    
+    @staticmethod
+    async def stream_general_ledger(
+        db: AsyncSession,
+        company_id: str,
+        request: GeneralLedgerRequest,
+        chunk_size: int = 5000
+    ) -> AsyncIterator[List[Tuple[Any, ...]]]:
+        """Yield General Ledger rows in chunks, with an opening balance row per account"""
+        
+        opening_balances = await FinancialReportService._get_general_ledger_opening_balances(
+            db, company_id, request.start_date, request.account_ids
+        )
+        
+        accounts = await FinancialReportService._get_general_ledger_accounts(db, company_id, request.account_ids)
+        
+        # Keyset pages rather than one long-running cursor, so each chunk is a
+        # short index range scan and no read transaction is held between them
+        after = None
+        current_account_id = None
+        balance = Decimal('0.0')
+        while True:
+            rows = await FinancialReportService._fetch_general_ledger_lines(
+                db, company_id, request, accounts, after, chunk_size
+            )
+            if not rows:
+                break
+            
+            chunk = []
+            for row in rows:
+                if row.account_id != current_account_id:
+                    current_account_id = row.account_id
+                    balance = opening_balances.get(row.account_id, Decimal('0.0'))
+                    chunk.append((
+                        row.account_number, row.account_name, request.start_date, None, None, None,
+                        "Opening Balance", None, None, balance
+                    ))
+                balance += row.debit_amount - row.credit_amount
+                chunk.append((
+                    row.account_number,
+                    row.account_name,
+                    row.posting_date,
+                    row.transaction_type.value if row.transaction_type else None,
+                    row.transaction_number,
+                    row.reference_number,
+                    row.description,
+                    row.debit_amount,
+                    row.credit_amount,
+                    balance
+                ))
+            yield chunk
+            
+            if len(rows) < chunk_size:
+                break
+            last = rows[-1]
+            after = (last.account_sort, last.account_id, last.posting_date, last.entry_id)
+    
+    @staticmethod
+    async def _get_general_ledger_accounts(
+        db: AsyncSession,
+        company_id: str,
+        account_ids: Optional[List[str]] = None
+    ) -> List[Tuple[str, str]]:
+        """(account sort key, account_id) of the report's accounts, in report order"""
+        
+        query = select(Account.account_id, Account.account_number).where(Account.company_id == company_id)
+        if account_ids:
+            query = query.where(Account.account_id.in_(account_ids))
+        result = await db.execute(query)
+        # Sorted here rather than by the database, so cursors compare the same way under any collation
+        return sorted((row.account_number or '', row.account_id) for row in result)
+    
+    @staticmethod
+    def _general_ledger_lines_query(
+        company_id: str,
+        request: GeneralLedgerRequest,
+        account_id: str,
+        after: Optional[Tuple[date, str]],
+        limit: int
+    ):
+        """Posted journal lines of one account in (posting date, entry) order, after a keyset position"""
+        
+        query = select(
+            JournalEntry.entry_id,
+            JournalEntry.account_id,
+            func.coalesce(Account.account_number, '').label('account_sort'),
+            Account.account_number,
+            Account.account_name,
+            JournalEntry.posting_date,
+            Transaction.transaction_id,
+            Transaction.transaction_type,
+            Transaction.transaction_number,
+            Transaction.reference_number,
+            func.coalesce(JournalEntry.description, Transaction.memo).label('description'),
+            func.coalesce(JournalEntry.debit_amount, 0).label('debit_amount'),
+            func.coalesce(JournalEntry.credit_amount, 0).label('credit_amount')
+        ).join(
+            Transaction, JournalEntry.transaction_id == Transaction.transaction_id
+        ).join(
+            Account, JournalEntry.account_id == Account.account_id
+        ).where(
+            and_(
+                JournalEntry.account_id == account_id,
+                Transaction.company_id == company_id,
+                Transaction.is_posted == True,
+                JournalEntry.posting_date >= request.start_date,
+                JournalEntry.posting_date <= request.end_date
+            )
+        )
+        
+        if after is not None:
+            query = query.where(tuple_(JournalEntry.posting_date, JournalEntry.entry_id) > tuple_(*after))
+        
+        return query.order_by(JournalEntry.posting_date, JournalEntry.entry_id).limit(limit)
+    
+    @staticmethod
+    async def _fetch_general_ledger_lines(
+        db: AsyncSession,
+        company_id: str,
+        request: GeneralLedgerRequest,
+        accounts: List[Tuple[str, str]],
+        after: Optional[Tuple[Any, ...]],
+        limit: int
+    ) -> List[Any]:
+        """Up to `limit` lines after an (account sort, account_id, posting date, entry) position.
+        
+        Accounts are walked in report order with one index range scan each on
+        (account_id, posting_date, entry_id), so a page never sorts the range.
+        """
+        
+        rows = []
+        for account in accounts:
+            within = None
+            if after is not None:
+                if account < tuple(after[:2]):
+                    continue
+                if account == tuple(after[:2]):
+                    within = tuple(after[2:])
+            result = await db.execute(
+                FinancialReportService._general_ledger_lines_query(
+                    company_id, request, account[1], within, limit - len(rows)
+                )
+            )
+            rows.extend(result.fetchall())
+            if len(rows) >= limit:
+                break
+        return rows
+    
+    @staticmethod
+    async def _get_general_ledger_opening_balances(
+        db: AsyncSession,
+        company_id: str,
+        before_date: date,
+        account_ids: Optional[List[str]] = None
+    ) -> Dict[str, Decimal]:
+        """Posted balance of each account before a date, from one aggregate query"""
+        
+        query = select(
+            JournalEntry.account_id,
+            func.sum(
+                func.coalesce(JournalEntry.debit_amount, 0) - func.coalesce(JournalEntry.credit_amount, 0)
+            ).label('balance')
+        ).join(
+            Transaction, JournalEntry.transaction_id == Transaction.transaction_id
+        ).where(
+            and_(
+                Transaction.company_id == company_id,
+                Transaction.is_posted == True,
+                JournalEntry.posting_date < before_date
+            )
+        ).group_by(JournalEntry.account_id)
+        
+        if account_ids:
+            query = query.where(JournalEntry.account_id.in_(account_ids))
+        
+        result = await db.execute(query)
+        return {row.account_id: Decimal(str(row.balance or 0)) for row in result}
+    
+    @staticmethod
+    def _encode_general_ledger_cursor(position: Tuple[Any, ...]) -> str:
+        account_sort, account_id, posting_date, entry_id, balance = position
+        payload = json.dumps([account_sort, account_id, posting_date.isoformat(), entry_id, str(balance)])
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+    
+    @staticmethod
+    def _decode_general_ledger_cursor(cursor: str) -> Tuple[Any, ...]:
+        try:
+            account_sort, account_id, posting_date, entry_id, balance = json.loads(
+                base64.urlsafe_b64decode(cursor.encode())
+            )
+            return account_sort, account_id, date.fromisoformat(posting_date), entry_id, Decimal(balance)
+        except Exception:
+            raise ValueError("Invalid general ledger cursor")
+    
     @staticmethod
     async def generate_ar_aging_report(
         db: AsyncSession,
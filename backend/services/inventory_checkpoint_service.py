@@ -0,0 +1,284 @@
+from typing import Optional, Dict, Any, List
+from datetime import date, timedelta
+from decimal import Decimal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert, and_, or_, func, literal, union_all, Date
+from sqlalchemy.exc import IntegrityError
+from models.inventory import InventoryCheckpoint, InventoryTransaction, InventoryLocation
+from models.list_management import Item
+from models.user import Company
+from database.connection import AsyncSessionLocal
+import asyncio
+import os
+import structlog
+
+logger = structlog.get_logger()
+
+
+def _month_end(day: date) -> date:
+    next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+class InventoryCheckpointService:
+    """Month-end balances per item-location, for as-of-date inventory valuation.
+
+    The balance of an item-location on any date is the sum of its movements
+    up to that date. A checkpoint stores that sum at a month end, so an as-of
+    balance only reads the latest checkpoint on or before the date plus the
+    movements dated after it. Each checkpoint is built from the previous one
+    and one month of movements; recording a movement dated on or before an
+    existing checkpoint deletes the checkpoints it changes and the periodic
+    job rebuilds them. Both lock the company row first, so a checkpoint is
+    never built while a backdated movement that invalidates it is uncommitted.
+    """
+
+    def __init__(self):
+        self.interval_seconds = int(os.getenv("INVENTORY_CHECKPOINT_INTERVAL_SECONDS", "21600"))
+        self._task = None
+
+    def start(self) -> None:
+        """Start the periodic checkpoint loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Inventory checkpoints started", interval_seconds=self.interval_seconds)
+
+    async def stop(self) -> None:
+        """Stop the periodic checkpoint loop"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.run_once(db)
+            except Exception as e:
+                logger.error("Inventory checkpoint build failed", error=str(e))
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self, db: AsyncSession) -> Dict[str, int]:
+        """Bring every active company's checkpoints up to the last completed month"""
+        result = await db.execute(select(Company.company_id).where(Company.is_active == True))
+        built = {}
+        for company_id in result.scalars().all():
+            count = await self.build_monthly_checkpoints(db, company_id)
+            if count:
+                built[company_id] = count
+        return built
+
+    @staticmethod
+    async def latest_checkpoint_date(
+        db: AsyncSession,
+        company_id: str,
+        on_or_before: Optional[date] = None
+    ) -> Optional[date]:
+        """Date of the company's latest checkpoint, optionally not after a given date"""
+        query = select(func.max(InventoryCheckpoint.checkpoint_date)).where(
+            InventoryCheckpoint.company_id == company_id
+        )
+        if on_or_before is not None:
+            query = query.where(InventoryCheckpoint.checkpoint_date <= on_or_before)
+        result = await db.execute(query)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def _balance_parts(
+        company_id: str,
+        checkpoint_date: Optional[date],
+        as_of_date: date,
+        location_id: Optional[str] = None,
+        item_id: Optional[str] = None
+    ):
+        """Checkpoint rows plus grouped movements after them, as one UNION ALL"""
+        movements = select(
+            InventoryTransaction.item_id,
+            InventoryTransaction.location_id,
+            func.sum(InventoryTransaction.quantity_change).label("quantity"),
+            func.sum(InventoryTransaction.total_cost).label("value")
+        ).where(
+            and_(
+                InventoryTransaction.company_id == company_id,
+                InventoryTransaction.transaction_date <= as_of_date
+            )
+        ).group_by(InventoryTransaction.item_id, InventoryTransaction.location_id)
+        if location_id:
+            movements = movements.where(InventoryTransaction.location_id == location_id)
+        if item_id:
+            movements = movements.where(InventoryTransaction.item_id == item_id)
+        if checkpoint_date is None:
+            return movements.subquery()
+
+        movements = movements.where(InventoryTransaction.transaction_date > checkpoint_date)
+        checkpoint = select(
+            InventoryCheckpoint.item_id,
+            InventoryCheckpoint.location_id,
+            InventoryCheckpoint.quantity.label("quantity"),
+            InventoryCheckpoint.value.label("value")
+        ).where(
+            and_(
+                InventoryCheckpoint.company_id == company_id,
+                InventoryCheckpoint.checkpoint_date == checkpoint_date
+            )
+        )
+        if location_id:
+            checkpoint = checkpoint.where(InventoryCheckpoint.location_id == location_id)
+        if item_id:
+            checkpoint = checkpoint.where(InventoryCheckpoint.item_id == item_id)
+        return union_all(checkpoint, movements).subquery()
+
+    @staticmethod
+    async def _lock_company(db: AsyncSession, company_id: str) -> None:
+        """Serialize checkpoint builds with backdated movements of the company"""
+        await db.execute(
+            select(Company.company_id).where(Company.company_id == company_id).with_for_update()
+        )
+
+    async def build_checkpoint(self, db: AsyncSession, company_id: str, checkpoint_date: date) -> None:
+        """Write the company's balances at a date from the previous checkpoint and later movements"""
+        await self._lock_company(db, company_id)
+        previous = await self.latest_checkpoint_date(db, company_id, checkpoint_date - timedelta(days=1))
+        parts = self._balance_parts(company_id, previous, checkpoint_date)
+        quantity = func.sum(parts.c.quantity)
+        value = func.sum(parts.c.value)
+
+        await db.execute(
+            delete(InventoryCheckpoint).where(
+                and_(
+                    InventoryCheckpoint.company_id == company_id,
+                    InventoryCheckpoint.checkpoint_date == checkpoint_date
+                )
+            )
+        )
+        await db.execute(
+            insert(InventoryCheckpoint).from_select(
+                ["company_id", "item_id", "location_id", "checkpoint_date", "quantity", "value"],
+                select(
+                    literal(company_id),
+                    parts.c.item_id,
+                    parts.c.location_id,
+                    literal(checkpoint_date, Date),
+                    quantity,
+                    value
+                ).group_by(parts.c.item_id, parts.c.location_id).having(or_(quantity != 0, value != 0))
+            )
+        )
+
+    async def build_monthly_checkpoints(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        through: Optional[date] = None
+    ) -> int:
+        """Build the missing month-end checkpoints up to the last month ended on or before `through`"""
+        if through is None:
+            through = date.today()
+        if _month_end(through) != through:
+            through = through.replace(day=1) - timedelta(days=1)
+
+        latest = await self.latest_checkpoint_date(db, company_id)
+        if latest is not None:
+            month = _month_end(latest + timedelta(days=1))
+        else:
+            result = await db.execute(
+                select(func.min(InventoryTransaction.transaction_date)).where(
+                    InventoryTransaction.company_id == company_id
+                )
+            )
+            first_movement = result.scalar_one_or_none()
+            if first_movement is None:
+                return 0
+            month = _month_end(first_movement)
+
+        built = 0
+        while month <= through:
+            try:
+                await self.build_checkpoint(db, company_id, month)
+                await db.commit()
+            except IntegrityError:
+                # Another worker built the same checkpoint
+                await db.rollback()
+                logger.info("Inventory checkpoint built concurrently", company_id=company_id, checkpoint_date=month)
+            built += 1
+            month = _month_end(month + timedelta(days=1))
+
+        if built:
+            logger.info("Inventory checkpoints built", company_id=company_id, months=built, through=through)
+        return built
+
+    async def invalidate(self, db: AsyncSession, company_id: str, movement_date: date) -> None:
+        """Drop the checkpoints a movement on `movement_date` changes"""
+        # Only movements dated in a month that has ended, or ends today, can
+        # meet a checkpoint build; later ones skip the lock
+        if movement_date <= (date.today() + timedelta(days=1)).replace(day=1) - timedelta(days=1):
+            await self._lock_company(db, company_id)
+        await db.execute(
+            delete(InventoryCheckpoint).where(
+                and_(
+                    InventoryCheckpoint.company_id == company_id,
+                    InventoryCheckpoint.checkpoint_date >= movement_date
+                )
+            )
+        )
+
+    async def get_balances_as_of(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        as_of_date: date,
+        location_id: Optional[str] = None,
+        item_id: Optional[str] = None,
+        include_inactive_items: bool = False
+    ) -> Dict[str, Any]:
+        """Inventory quantity and value on a date, in total and by location"""
+        checkpoint_date = await self.latest_checkpoint_date(db, company_id, as_of_date)
+        parts = self._balance_parts(company_id, checkpoint_date, as_of_date, location_id, item_id)
+
+        query = select(
+            parts.c.location_id,
+            InventoryLocation.location_name,
+            func.coalesce(func.sum(parts.c.quantity), 0).label("quantity"),
+            func.coalesce(func.sum(parts.c.value), 0).label("value")
+        ).join(
+            Item, parts.c.item_id == Item.item_id
+        ).outerjoin(
+            InventoryLocation, parts.c.location_id == InventoryLocation.location_id
+        ).group_by(parts.c.location_id, InventoryLocation.location_name)
+        if not include_inactive_items:
+            query = query.where(Item.is_active == True)
+
+        result = await db.execute(query)
+        by_location: List[Dict[str, Any]] = []
+        total_quantity = Decimal('0')
+        total_value = Decimal('0')
+        for row in result.all():
+            quantity = Decimal(str(row.quantity))
+            value = Decimal(str(row.value)).quantize(Decimal('0.01'))
+            if not quantity and not value:
+                continue
+            total_quantity += quantity
+            total_value += value
+            by_location.append({
+                "location_id": row.location_id,
+                "location_name": row.location_name,
+                "quantity": quantity,
+                "value": value
+            })
+
+        return {
+            "as_of_date": as_of_date,
+            "checkpoint_date": checkpoint_date,
+            "total_quantity": total_quantity,
+            "total_value": total_value,
+            "by_location": by_location
+        }
+
+
+# Global inventory checkpoint service instance
+inventory_checkpoints = InventoryCheckpointService()
@@ -0,0 +1,262 @@
+from typing import Optional, List, Tuple
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, func, asc, desc, tuple_, update
+from models.inventory import InventoryCostLayer, CostMethod
+from models.list_management import Item
+from models.user import CompanySetting
+import os
+import uuid
+import structlog
+
+logger = structlog.get_logger()
+
+# Methods whose cost of goods comes from the layers that were depleted
+LAYER_COST_METHODS = (CostMethod.FIFO, CostMethod.LIFO, CostMethod.SPECIFIC_IDENTIFICATION)
+
+
+class CostLayerConsumption:
+    """Quantity taken from an item-location's cost layers and what it cost"""
+
+    __slots__ = ("quantity", "total_cost", "layers_touched", "shortfall")
+
+    def __init__(self, quantity: Decimal, total_cost: Decimal, layers_touched: int, shortfall: Decimal):
+        self.quantity = quantity
+        self.total_cost = total_cost
+        self.layers_touched = layers_touched
+        self.shortfall = shortfall
+
+    @property
+    def unit_cost(self) -> Decimal:
+        if not self.quantity:
+            return Decimal('0')
+        return (self.total_cost / self.quantity).quantize(Decimal('0.01'))
+
+
+class InventoryCostingService:
+    """Receipt cost layers per item-location and their depletion.
+
+    Every receipt of stock opens a layer with its quantity and unit cost.
+    Consumption walks the open layers of one item-location oldest first
+    (FIFO) or newest first (LIFO) through the partial index on open layers,
+    fetching them in growing batches, so costing a movement only reads the
+    layers it actually depletes however many receipts the item has had.
+    """
+
+    def __init__(self):
+        self.batch_size = int(os.getenv("COST_LAYER_BATCH_SIZE", "16"))
+        self.max_batch_size = 1024
+
+    @staticmethod
+    async def get_cost_method(db: AsyncSession, company_id: str) -> CostMethod:
+        """The company's inventory cost method, FIFO unless configured otherwise"""
+        result = await db.execute(
+            select(CompanySetting.setting_value).where(
+                and_(
+                    CompanySetting.company_id == company_id,
+                    CompanySetting.category == "inventory",
+                    CompanySetting.setting_key == "cost_method"
+                )
+            )
+        )
+        setting = result.scalar_one_or_none()
+        value = setting.get("value") if isinstance(setting, dict) else setting
+        try:
+            return CostMethod(value) if value else CostMethod.FIFO
+        except ValueError:
+            logger.warning("Unknown inventory cost method setting", company_id=company_id, value=value)
+            return CostMethod.FIFO
+
+    @staticmethod
+    def _location_filter(location_id: Optional[str]):
+        if location_id is None:
+            return InventoryCostLayer.location_id.is_(None)
+        return InventoryCostLayer.location_id == location_id
+
+    async def add_layer(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        item_id: str,
+        location_id: Optional[str],
+        quantity: Decimal,
+        unit_cost: Decimal,
+        received_date: date,
+        source_transaction_id: Optional[str] = None,
+        lot_number: Optional[str] = None
+    ) -> InventoryCostLayer:
+        """Open a cost layer for received stock"""
+        if quantity <= 0:
+            raise ValueError("Cost layers need a positive quantity")
+
+        layer = InventoryCostLayer(
+            layer_id=str(uuid.uuid4()),
+            company_id=company_id,
+            item_id=item_id,
+            location_id=location_id,
+            source_transaction_id=source_transaction_id,
+            received_date=received_date,
+            received_at=datetime.utcnow(),
+            original_quantity=quantity,
+            remaining_quantity=quantity,
+            unit_cost=unit_cost,
+            lot_number=lot_number
+        )
+        db.add(layer)
+        return layer
+
+    async def consume(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        item_id: str,
+        location_id: Optional[str],
+        quantity: Decimal,
+        cost_method: Optional[CostMethod] = None,
+        average_cost: Decimal = Decimal('0'),
+        lot_number: Optional[str] = None
+    ) -> CostLayerConsumption:
+        """Deplete open layers of an item-location and return the cost of the quantity taken.
+
+        FIFO and specific identification take the oldest layers first and LIFO
+        the newest. Average and standard cost still deplete layers oldest first
+        so the layers keep matching the quantity on hand, but cost the
+        quantity at `average_cost`. Quantity not covered by layers is costed
+        at `average_cost` and reported as the shortfall.
+        """
+        if quantity <= 0:
+            raise ValueError("Consumed quantity must be positive")
+        if cost_method is None:
+            cost_method = await self.get_cost_method(db, company_id)
+
+        key = (InventoryCostLayer.received_date, InventoryCostLayer.received_at, InventoryCostLayer.layer_id)
+        newest_first = cost_method == CostMethod.LIFO
+        order = [desc(column) if newest_first else asc(column) for column in key]
+        conditions = [
+            InventoryCostLayer.item_id == item_id,
+            self._location_filter(location_id),
+            InventoryCostLayer.remaining_quantity > 0
+        ]
+        if lot_number and cost_method == CostMethod.SPECIFIC_IDENTIFICATION:
+            conditions.append(InventoryCostLayer.lot_number == lot_number)
+
+        remaining = quantity
+        layer_cost = Decimal('0')
+        layers_touched = 0
+        batch_size = self.batch_size
+        after = None
+        while remaining > 0:
+            query = select(InventoryCostLayer).where(and_(*conditions))
+            if after is not None:
+                position = tuple_(*key)
+                query = query.where(position < tuple_(*after) if newest_first else position > tuple_(*after))
+            result = await db.execute(query.order_by(*order).limit(batch_size).with_for_update())
+            layers = result.scalars().all()
+
+            for layer in layers:
+                taken = min(remaining, layer.remaining_quantity)
+                layer.remaining_quantity -= taken
+                layer_cost += taken * layer.unit_cost
+                remaining -= taken
+                layers_touched += 1
+                if remaining == 0:
+                    break
+
+            if len(layers) < batch_size:
+                break
+            last = layers[-1]
+            after = (last.received_date, last.received_at, last.layer_id)
+            batch_size = min(batch_size * 2, self.max_batch_size)
+
+        shortfall = remaining if remaining > 0 else Decimal('0')
+        if shortfall:
+            logger.warning("Cost layers do not cover consumed quantity",
+                           company_id=company_id, item_id=item_id, location_id=location_id,
+                           quantity=str(quantity), shortfall=str(shortfall))
+
+        if cost_method in LAYER_COST_METHODS:
+            total_cost = layer_cost + shortfall * average_cost
+        else:
+            total_cost = quantity * average_cost
+
+        return CostLayerConsumption(
+            quantity=quantity,
+            total_cost=total_cost.quantize(Decimal('0.01')),
+            layers_touched=layers_touched,
+            shortfall=shortfall
+        )
+
+    async def revalue(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        item_id: str,
+        location_id: Optional[str],
+        unit_cost: Decimal
+    ) -> None:
+        """Set the unit cost of every open layer of an item-location"""
+        await db.execute(
+            update(InventoryCostLayer).where(
+                and_(
+                    InventoryCostLayer.company_id == company_id,
+                    InventoryCostLayer.item_id == item_id,
+                    self._location_filter(location_id),
+                    InventoryCostLayer.remaining_quantity > 0
+                )
+            ).values(unit_cost=unit_cost).execution_options(synchronize_session=False)
+        )
+
+    async def get_open_layers(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        item_id: str,
+        location_id: Optional[str] = None
+    ) -> List[InventoryCostLayer]:
+        """Open layers of an item, oldest first"""
+        query = select(InventoryCostLayer).where(
+            and_(
+                InventoryCostLayer.company_id == company_id,
+                InventoryCostLayer.item_id == item_id,
+                InventoryCostLayer.remaining_quantity > 0
+            )
+        )
+        if location_id:
+            query = query.where(InventoryCostLayer.location_id == location_id)
+        result = await db.execute(query.order_by(
+            InventoryCostLayer.received_date, InventoryCostLayer.received_at, InventoryCostLayer.layer_id
+        ))
+        return list(result.scalars().all())
+
+    async def layer_totals(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        location_id: Optional[str] = None,
+        include_inactive_items: bool = False
+    ) -> Tuple[Decimal, Decimal]:
+        """Quantity and cost remaining in a company's open layers, from one aggregate query"""
+        query = select(
+            func.coalesce(func.sum(InventoryCostLayer.remaining_quantity), 0),
+            func.coalesce(func.sum(InventoryCostLayer.remaining_quantity * InventoryCostLayer.unit_cost), 0)
+        ).join(
+            Item, InventoryCostLayer.item_id == Item.item_id
+        ).where(
+            and_(
+                InventoryCostLayer.company_id == company_id,
+                InventoryCostLayer.remaining_quantity > 0
+            )
+        )
+        if location_id:
+            query = query.where(InventoryCostLayer.location_id == location_id)
+        if not include_inactive_items:
+            query = query.where(Item.is_active == True)
+
+        result = await db.execute(query)
+        quantity, cost = result.one()
+        return Decimal(str(quantity)), Decimal(str(cost)).quantize(Decimal('0.01'))
+
+
+# Global inventory costing service instance
+inventory_costing = InventoryCostingService()
@@ -0,0 +1,316 @@
+from typing import Optional, Dict, Any, List, Tuple, Iterable
+from datetime import date, datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, and_, or_, func, tuple_, desc, asc
+from models.inventory import InventoryTransaction, ItemLocation
+from models.user import Company
+from schemas.inventory_schemas import TransactionSearchFilters
+from database.connection import AsyncSessionLocal
+import asyncio
+import base64
+import json
+import os
+import random
+import time
+import uuid
+import structlog
+
+logger = structlog.get_logger()
+
+_last_id_ms = 0
+_id_sequence = 0
+
+
+def new_ledger_id() -> str:
+    """Time-ordered UUID (version 7 layout) for a new inventory movement.
+
+    Ids from this process sort in the order they were generated, so movements
+    recorded on the same date keep their recording order in the ledger.
+    """
+    global _last_id_ms, _id_sequence
+    now_ms = time.time_ns() // 1_000_000
+    if now_ms > _last_id_ms:
+        _last_id_ms = now_ms
+        _id_sequence = random.getrandbits(10)
+    else:
+        _id_sequence += 1
+        if _id_sequence > 0xFFF:
+            _last_id_ms += 1
+            _id_sequence = 0
+    value = (_last_id_ms << 80) | (0x7 << 76) | (_id_sequence << 64) | (0b10 << 62) | random.getrandbits(62)
+    return str(uuid.UUID(int=value))
+
+
+class InventoryLedgerService:
+    """Per item-location movement ledger with running balances.
+
+    Ledger order is (transaction_date, created_at, inventory_transaction_id)
+    within an item-location, which the ledger index covers. Movements recorded
+    before the time-ordered ids keep random ids, so same-day movements are
+    ordered by when they were recorded before the id breaks ties. The balance on a movement
+    is the running sum of quantity_change and total_cost in that order.
+    Movements are recorded with the item-location balance after them, which
+    is that running sum as long as they sort last; a backdated movement
+    makes the ledger recompute the balances of its item-location with one
+    windowed UPDATE, and a periodic job repairs any other drift the same way.
+    Stock on hand from before movements were recorded is an opening balance
+    movement written by the ledger migration; item-locations without one are
+    left alone by the repair.
+    """
+
+    def __init__(self):
+        self.interval_seconds = int(os.getenv("INVENTORY_LEDGER_REPAIR_INTERVAL_SECONDS", "86400"))
+        self._task = None
+
+    def start(self) -> None:
+        """Start the periodic ledger repair loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Inventory ledger repair started", interval_seconds=self.interval_seconds)
+
+    async def stop(self) -> None:
+        """Stop the periodic ledger repair loop"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.run_once(db)
+            except Exception as e:
+                logger.error("Inventory ledger repair failed", error=str(e))
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self, db: AsyncSession) -> Dict[str, int]:
+        """Recompute the balances of every drifted item in active companies"""
+        result = await db.execute(select(Company.company_id).where(Company.is_active == True))
+        repaired = {}
+        for company_id in result.scalars().all():
+            count = 0
+            for item_id in await self.find_drifted_items(db, company_id):
+                count += await self.rebalance(db, company_id, item_id)
+            await db.commit()
+            if count:
+                repaired[company_id] = count
+                logger.warning("Inventory ledger balances repaired", company_id=company_id, transactions=count)
+        return repaired
+
+    @staticmethod
+    def _running_balances(company_id: str, item_id: Optional[str] = None, location_id: Optional[str] = None):
+        """Stored and running balances of each movement, in ledger order per item-location"""
+        window = {
+            "partition_by": (InventoryTransaction.item_id, InventoryTransaction.location_id),
+            "order_by": (
+                InventoryTransaction.transaction_date,
+                InventoryTransaction.created_at,
+                InventoryTransaction.inventory_transaction_id
+            )
+        }
+        query = select(
+            InventoryTransaction.inventory_transaction_id,
+            InventoryTransaction.item_id,
+            InventoryTransaction.balance_quantity,
+            InventoryTransaction.balance_value,
+            func.round(func.sum(InventoryTransaction.quantity_change).over(**window), 4).label("running_quantity"),
+            func.round(func.sum(InventoryTransaction.total_cost).over(**window), 2).label("running_value")
+        ).where(InventoryTransaction.company_id == company_id)
+        if item_id:
+            query = query.where(InventoryTransaction.item_id == item_id)
+        if location_id:
+            query = query.where(InventoryTransaction.location_id == location_id)
+        return query.subquery()
+
+    @staticmethod
+    def _drifted(balances):
+        return or_(
+            func.round(balances.c.balance_quantity, 4) != balances.c.running_quantity,
+            func.round(balances.c.balance_value, 2) != balances.c.running_value
+        )
+
+    async def find_drifted_items(self, db: AsyncSession, company_id: str) -> List[str]:
+        """Items with at least one movement whose balance is not its running sum.
+
+        Items with an item-location whose movements do not add up to its
+        on-hand quantity are skipped: their ledger is missing an opening
+        balance, and rewriting it from the movements alone would be wrong.
+        """
+        totals = select(
+            InventoryTransaction.item_id,
+            InventoryTransaction.location_id,
+            func.sum(InventoryTransaction.quantity_change).label("quantity")
+        ).where(
+            InventoryTransaction.company_id == company_id
+        ).group_by(InventoryTransaction.item_id, InventoryTransaction.location_id).subquery()
+        unanchored = select(totals.c.item_id).join(
+            ItemLocation,
+            and_(ItemLocation.item_id == totals.c.item_id, ItemLocation.location_id == totals.c.location_id)
+        ).where(func.round(totals.c.quantity, 4) != func.round(ItemLocation.quantity_on_hand, 4))
+
+        balances = self._running_balances(company_id)
+        result = await db.execute(
+            select(balances.c.item_id, balances.c.item_id.in_(unanchored).label("unanchored")).where(
+                self._drifted(balances)
+            ).distinct()
+        )
+        drifted = []
+        for item_id, is_unanchored in result.all():
+            if is_unanchored:
+                logger.warning("Inventory ledger has no opening balance, not repaired",
+                               company_id=company_id, item_id=item_id)
+            else:
+                drifted.append(item_id)
+        return drifted
+
+    async def rebalance(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        item_id: str,
+        location_id: Optional[str] = None
+    ) -> int:
+        """Rewrite the drifted balances of an item's movements; returns the number of rows changed"""
+        balances = self._running_balances(company_id, item_id, location_id)
+        result = await db.execute(
+            update(InventoryTransaction).where(
+                and_(
+                    InventoryTransaction.inventory_transaction_id == balances.c.inventory_transaction_id,
+                    self._drifted(balances)
+                )
+            ).values(
+                balance_quantity=balances.c.running_quantity,
+                balance_value=balances.c.running_value
+            ).execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
+    async def record(self, db: AsyncSession, company_id: str, transactions: Iterable[InventoryTransaction]) -> None:
+        """Keep running balances consistent after a document's movements are added to the session"""
+        transactions = list(transactions)
+        if not transactions:
+            return
+        await db.flush()
+
+        # Earliest new movement per item-location, and whether the document's
+        # own movements were applied out of ledger order
+        earliest: Dict[Tuple[str, str], date] = {}
+        latest: Dict[Tuple[str, str], date] = {}
+        stale = set()
+        for transaction in transactions:
+            key = (transaction.item_id, transaction.location_id)
+            if key in latest and transaction.transaction_date < latest[key]:
+                stale.add(key)
+            earliest[key] = min(earliest.get(key, transaction.transaction_date), transaction.transaction_date)
+            latest[key] = max(latest.get(key, transaction.transaction_date), transaction.transaction_date)
+
+        new_ids = [transaction.inventory_transaction_id for transaction in transactions]
+        result = await db.execute(
+            select(
+                InventoryTransaction.item_id,
+                InventoryTransaction.location_id,
+                func.max(InventoryTransaction.transaction_date)
+            ).where(
+                and_(
+                    InventoryTransaction.company_id == company_id,
+                    tuple_(InventoryTransaction.item_id, InventoryTransaction.location_id).in_(list(earliest)),
+                    InventoryTransaction.inventory_transaction_id.notin_(new_ids)
+                )
+            ).group_by(InventoryTransaction.item_id, InventoryTransaction.location_id)
+        )
+        for item_id, location_id, latest_date in result.all():
+            if latest_date > earliest[(item_id, location_id)]:
+                stale.add((item_id, location_id))
+
+        for item_id, location_id in stale:
+            count = await self.rebalance(db, company_id, item_id, location_id)
+            logger.info("Backdated movement rebalanced", item_id=item_id, location_id=location_id, transactions=count)
+        if stale:
+            # The session still holds the balances written before the UPDATE
+            await db.execute(
+                select(InventoryTransaction).where(
+                    InventoryTransaction.inventory_transaction_id.in_([
+                        transaction.inventory_transaction_id for transaction in transactions
+                        if (transaction.item_id, transaction.location_id) in stale
+                    ])
+                ).execution_options(populate_existing=True)
+            )
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        item_id: str,
+        filters: TransactionSearchFilters,
+        cursor: Optional[str] = None,
+        page_size: int = 20
+    ) -> Dict[str, Any]:
+        """One page of an item's movements in ledger order, after a keyset cursor"""
+        descending = filters.sort_order == "desc"
+        query = select(InventoryTransaction).where(
+            and_(
+                InventoryTransaction.company_id == company_id,
+                InventoryTransaction.item_id == item_id
+            )
+        )
+        if filters.location_id:
+            query = query.where(InventoryTransaction.location_id == filters.location_id)
+        if filters.transaction_type:
+            query = query.where(InventoryTransaction.transaction_type == filters.transaction_type)
+        if filters.date_from:
+            query = query.where(InventoryTransaction.transaction_date >= filters.date_from)
+        if filters.date_to:
+            query = query.where(InventoryTransaction.transaction_date <= filters.date_to)
+
+        position = tuple_(
+            InventoryTransaction.transaction_date,
+            InventoryTransaction.created_at,
+            InventoryTransaction.inventory_transaction_id
+        )
+        if cursor:
+            after = tuple_(*self._decode_cursor(cursor))
+            query = query.where(position < after if descending else position > after)
+        direction = desc if descending else asc
+        query = query.order_by(
+            direction(InventoryTransaction.transaction_date),
+            direction(InventoryTransaction.created_at),
+            direction(InventoryTransaction.inventory_transaction_id)
+        ).limit(page_size + 1).execution_options(populate_existing=True)
+
+        result = await db.execute(query)
+        transactions = list(result.scalars().all())
+        has_more = len(transactions) > page_size
+        transactions = transactions[:page_size]
+
+        next_cursor = None
+        if has_more:
+            last = transactions[-1]
+            next_cursor = self._encode_cursor(last.transaction_date, last.created_at, last.inventory_transaction_id)
+
+        return {
+            "items": transactions,
+            "has_more": has_more,
+            "next_cursor": next_cursor
+        }
+
+    @staticmethod
+    def _encode_cursor(transaction_date: date, created_at: datetime, inventory_transaction_id: str) -> str:
+        payload = json.dumps([transaction_date.isoformat(), created_at.isoformat(), inventory_transaction_id])
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[date, datetime, str]:
+        try:
+            transaction_date, created_at, inventory_transaction_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return date.fromisoformat(transaction_date), datetime.fromisoformat(created_at), inventory_transaction_id
+        except Exception:
+            raise ValueError("Invalid inventory ledger cursor")
+
+
+# Global inventory ledger service instance
+inventory_ledger = InventoryLedgerService()
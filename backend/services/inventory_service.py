@@ -1,17 +1,22 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, desc, asc, text
+from sqlalchemy import select, and_, or_, func, desc, asc, text, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload, joinedload
 from typing import List, Optional, Tuple, Dict, Any
 from decimal import Decimal
 from datetime import datetime, date
+from itertools import groupby
+from fastapi.encoders import jsonable_encoder
+import os
 import uuid
 import structlog
 
 from models.inventory import (
     InventoryAdjustment, PurchaseOrder, PurchaseOrderLine, InventoryReceipt,
     ReceiptLine, InventoryTransaction, InventoryLocation, ItemLocation,
-    InventoryAssembly, InventoryValuation, AdjustmentType, PurchaseOrderStatus,
-    ReceiptStatus, InventoryTransactionType, CostMethod
+    InventoryAssembly, InventoryValuation, InventorySnapshot, AdjustmentType, PurchaseOrderStatus,
+    ReceiptStatus, InventoryTransactionType, CostMethod, InventoryTransfer, InventoryTransferLine,
+    TransferStatus, InventoryLowStock
 )
 from models.list_management import Item, Vendor
 from models.user import Company, User
@@ -23,56 +28,34 @@ from schemas.inventory_schemas import (
     ItemLocationCreate, ItemLocationUpdate, InventoryAssemblyCreate, InventoryAssemblyUpdate,
     AssemblyBuildRequest, InventoryValuationCreate,
     InventorySearchFilters, PurchaseOrderSearchFilters, ReceiptSearchFilters,
-    AdjustmentSearchFilters, TransactionSearchFilters, ReorderItem, ReorderReport
+    AdjustmentSearchFilters, TransactionSearchFilters, ReorderItem, ReorderReport,
+    InventoryTransferCreate, InventoryTransferLineCreate, InventoryTransferReceive,
+    TransferSearchFilters, StockRebalanceRequest
 )
 
-from typing import Dict, Tuple
-import time
+from services.access_control_service import access_control
+from services.inventory_costing_service import inventory_costing, LAYER_COST_METHODS
+from services.inventory_checkpoint_service import inventory_checkpoints
+from services.stock_movement_service import stock_movements, StockDelta
+from services.bom_service import bom_service
+from services.reorder_planning_service import reorder_planner
+from services.inventory_ledger_service import inventory_ledger, new_ledger_id
 
 logger = structlog.get_logger()
 
+INVENTORY_SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("INVENTORY_SNAPSHOT_MAX_AGE_SECONDS", "3600"))
+
+# Location type of the company location holding shipped but unreceived transfers
+IN_TRANSIT_LOCATION_TYPE = "in_transit"
+
 class BaseInventoryService:
     """Base service class for inventory operations"""
     
-    # Class-level cache for company access verification
-    _company_access_cache: Dict[Tuple[str, str], Tuple[bool, float]] = {}
-    _cache_ttl = 300  # 5 minutes TTL for cache
-    
     @classmethod
     async def verify_company_access(cls, db: AsyncSession, user_id: str, company_id: str) -> bool:
-        """Verify user has access to company with caching"""
+        """Verify user has access to company via the shared access control cache"""
         try:
-            # Check cache first
-            cache_key = (user_id, company_id)
-            current_time = time.time()
-            
-            if cache_key in cls._company_access_cache:
-                cached_result, cached_time = cls._company_access_cache[cache_key]
-                if current_time - cached_time < cls._cache_ttl:
-                    logger.debug("Company access verification served from cache", user_id=user_id, company_id=company_id)
-                    return cached_result
-            
-            # Cache miss or expired, query database
-            from models.user import CompanyMembership
-            
-            result = await db.execute(
-                select(CompanyMembership).where(
-                    and_(
-                        CompanyMembership.user_id == user_id,
-                        CompanyMembership.company_id == company_id,
-                        CompanyMembership.is_active == True
-                    )
-                )
-            )
-            membership = result.scalar_one_or_none()
-            has_access = membership is not None
-            
-            # Cache the result
-            cls._company_access_cache[cache_key] = (has_access, current_time)
-            
-            logger.debug("Company access verification queried and cached", user_id=user_id, company_id=company_id, has_access=has_access)
-            return has_access
-            
+            return await access_control.has_company_access(db, user_id, company_id)
         except Exception as e:
             logger.error("Error verifying company access", error=str(e), user_id=user_id, company_id=company_id)
             return False
@@ -96,25 +79,33 @@ class InventoryService(BaseInventoryService):
     ) -> Dict[str, Any]:
         """Get inventory summary for company"""
         
-        # Base query for item locations
-        query = select(ItemLocation).join(Item).where(
-            and_(
-                Item.company_id == company_id,
-                Item.is_active == True
-            )
-        )
-        
+        conditions = [Item.company_id == company_id, Item.is_active == True]
         if location_id:
-            query = query.where(ItemLocation.location_id == location_id)
-        
-        result = await db.execute(query)
-        item_locations = result.scalars().all()
-        
-        total_items = len(item_locations)
-        total_value = sum(il.total_value or 0 for il in item_locations)
-        low_stock_items = sum(1 for il in item_locations 
-                            if il.quantity_on_hand <= il.reorder_point and il.reorder_point > 0)
-        negative_stock_items = sum(1 for il in item_locations if il.quantity_on_hand < 0)
+            conditions.append(ItemLocation.location_id == location_id)
+        
+        # Totals per location and per item type; company totals add up the location groups
+        by_location_result = await db.execute(
+            select(
+                ItemLocation.location_id,
+                InventoryLocation.location_name,
+                *InventoryService._stock_aggregates()
+            ).join(
+                Item, ItemLocation.item_id == Item.item_id
+            ).outerjoin(
+                InventoryLocation, ItemLocation.location_id == InventoryLocation.location_id
+            ).where(and_(*conditions)).group_by(ItemLocation.location_id, InventoryLocation.location_name)
+        )
+        by_location = [InventoryService._stock_totals(row) for row in by_location_result]
+        
+        by_item_type_result = await db.execute(
+            select(
+                Item.item_type,
+                *InventoryService._stock_aggregates()
+            ).select_from(ItemLocation).join(
+                Item, ItemLocation.item_id == Item.item_id
+            ).where(and_(*conditions)).group_by(Item.item_type)
+        )
+        by_item_type = [InventoryService._stock_totals(row) for row in by_item_type_result]
         
         # Get total locations
         locations_query = select(func.count(InventoryLocation.location_id)).where(
@@ -127,13 +118,91 @@ class InventoryService(BaseInventoryService):
         total_locations = total_locations_result.scalar() or 0
         
         return {
-            "total_items": total_items,
-            "total_value": total_value,
-            "low_stock_items": low_stock_items,
-            "negative_stock_items": negative_stock_items,
-            "total_locations": total_locations
+            "total_items": sum(group["total_items"] for group in by_location),
+            "total_quantity": sum((group["total_quantity"] for group in by_location), Decimal('0')),
+            "total_value": sum((group["total_value"] for group in by_location), Decimal('0')),
+            "low_stock_items": sum(group["low_stock_items"] for group in by_location),
+            "negative_stock_items": sum(group["negative_stock_items"] for group in by_location),
+            "total_locations": total_locations,
+            "by_location": by_location,
+            "by_item_type": by_item_type
         }
     
+    @staticmethod
+    def _stock_aggregates() -> Tuple[Any, ...]:
+        """Aggregate columns over item locations shared by the inventory summaries"""
+        
+        low_stock = and_(ItemLocation.reorder_point > 0, ItemLocation.quantity_on_hand <= ItemLocation.reorder_point)
+        return (
+            func.count(ItemLocation.item_location_id).label('total_items'),
+            func.coalesce(func.sum(ItemLocation.quantity_on_hand), 0).label('total_quantity'),
+            func.coalesce(func.sum(ItemLocation.total_value), 0).label('total_value'),
+            func.count(ItemLocation.item_location_id).filter(low_stock).label('low_stock_items'),
+            func.count(ItemLocation.item_location_id).filter(ItemLocation.quantity_on_hand < 0).label('negative_stock_items')
+        )
+    
+    @staticmethod
+    def _stock_totals(row) -> Dict[str, Any]:
+        """Group key and totals of a row selected with _stock_aggregates"""
+        
+        totals = dict(row._mapping)
+        totals["total_quantity"] = Decimal(str(totals["total_quantity"]))
+        totals["total_value"] = Decimal(str(totals["total_value"]))
+        return totals
+    
+    @staticmethod
+    async def mark_snapshot_stale(db: AsyncSession, company_id: str) -> None:
+        """Flag the company's inventory snapshot for recomputation after a stock movement"""
+        
+        # Only the first movement after a refresh updates the row
+        await db.execute(
+            update(InventorySnapshot).where(
+                and_(
+                    InventorySnapshot.company_id == company_id,
+                    InventorySnapshot.is_stale == False
+                )
+            ).values(is_stale=True)
+        )
+    
+    @staticmethod
+    async def get_inventory_snapshot(db: AsyncSession, company_id: str) -> Dict[str, Any]:
+        """Get the company inventory summary from its snapshot, recomputing it when stale"""
+        
+        result = await db.execute(
+            select(InventorySnapshot).where(InventorySnapshot.company_id == company_id)
+        )
+        snapshot = result.scalar_one_or_none()
+        
+        now = datetime.utcnow()
+        if (snapshot is not None and not snapshot.is_stale and snapshot.refreshed_at
+                and (now - snapshot.refreshed_at).total_seconds() < INVENTORY_SNAPSHOT_MAX_AGE_SECONDS):
+            return {**snapshot.summary, "refreshed_at": snapshot.refreshed_at, "from_snapshot": True}
+        
+        # Clear the flag before computing, so movements committed while the
+        # summary is computed mark it stale again instead of being lost
+        if snapshot is None:
+            snapshot = InventorySnapshot(company_id=company_id, summary={}, is_stale=False)
+            db.add(snapshot)
+        else:
+            snapshot.is_stale = False
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Created concurrently by another request; this one just computes
+            await db.rollback()
+            snapshot = None
+        
+        summary = await InventoryService.get_inventory_summary(db, company_id)
+        refreshed_at = datetime.utcnow()
+        if snapshot is not None:
+            snapshot.summary = jsonable_encoder(summary)
+            snapshot.refreshed_at = refreshed_at
+            await db.commit()
+        
+        logger.info("Inventory snapshot refreshed", company_id=company_id,
+                    total_items=summary["total_items"])
+        return {**summary, "refreshed_at": refreshed_at, "from_snapshot": False}
+    
     @staticmethod
     async def get_inventory_by_item(
         db: AsyncSession,
@@ -142,26 +211,50 @@ class InventoryService(BaseInventoryService):
     ) -> Dict[str, Any]:
         """Get inventory information for a specific item across all locations"""
         
-        query = select(ItemLocation).options(
-            joinedload(ItemLocation.location)
+        # Item totals come with every location row as window aggregates
+        query = select(
+            ItemLocation.item_location_id,
+            ItemLocation.location_id,
+            InventoryLocation.location_name,
+            ItemLocation.quantity_on_hand,
+            ItemLocation.quantity_available,
+            ItemLocation.quantity_on_order,
+            ItemLocation.quantity_allocated,
+            ItemLocation.reorder_point,
+            ItemLocation.reorder_quantity,
+            ItemLocation.bin_location,
+            ItemLocation.average_cost,
+            ItemLocation.last_cost,
+            ItemLocation.total_value,
+            func.sum(ItemLocation.quantity_on_hand).over().label('item_total_quantity'),
+            func.sum(func.coalesce(ItemLocation.total_value, 0)).over().label('item_total_value')
+        ).join(
+            Item, ItemLocation.item_id == Item.item_id
+        ).outerjoin(
+            InventoryLocation, ItemLocation.location_id == InventoryLocation.location_id
         ).where(
             and_(
                 ItemLocation.item_id == item_id,
-                ItemLocation.location.has(InventoryLocation.company_id == company_id)
+                Item.company_id == company_id
             )
-        )
+        ).order_by(InventoryLocation.location_name)
         
         result = await db.execute(query)
-        item_locations = result.scalars().all()
+        rows = result.all()
         
-        total_quantity = sum(il.quantity_on_hand for il in item_locations)
-        total_value = sum(il.total_value or 0 for il in item_locations)
+        total_quantity = Decimal(str(rows[0].item_total_quantity)) if rows else Decimal('0')
+        total_value = Decimal(str(rows[0].item_total_value)) if rows else Decimal('0')
+        locations = []
+        for row in rows:
+            location = dict(row._mapping)
+            del location['item_total_quantity'], location['item_total_value']
+            locations.append(location)
         
         return {
             "item_id": item_id,
             "total_quantity": total_quantity,
             "total_value": total_value,
-            "locations": item_locations
+            "locations": locations
         }
     
     @staticmethod
@@ -169,53 +262,13 @@ class InventoryService(BaseInventoryService):
         db: AsyncSession,
         company_id: str,
         item_id: str,
-        filters: TransactionSearchFilters
-    ) -> Tuple[List[InventoryTransaction], int]:
-        """Get transaction history for an item"""
-        
-        query = select(InventoryTransaction).where(
-            and_(
-                InventoryTransaction.company_id == company_id,
-                InventoryTransaction.item_id == item_id
-            )
-        )
-        
-        # Apply filters
-        if filters.location_id:
-            query = query.where(InventoryTransaction.location_id == filters.location_id)
-        
-        if filters.transaction_type:
-            query = query.where(InventoryTransaction.transaction_type == filters.transaction_type)
-        
-        if filters.date_from:
-            query = query.where(InventoryTransaction.transaction_date >= filters.date_from)
-        
-        if filters.date_to:
-            query = query.where(InventoryTransaction.transaction_date <= filters.date_to)
-        
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
-        
-        # Apply sorting
-        if filters.sort_by:
-            sort_column = getattr(InventoryTransaction, filters.sort_by, InventoryTransaction.transaction_date)
-            if filters.sort_order == "desc":
-                query = query.order_by(desc(sort_column))
-            else:
-                query = query.order_by(asc(sort_column))
-        else:
-            query = query.order_by(desc(InventoryTransaction.transaction_date))
-        
-        # Apply pagination
-        offset = (filters.page - 1) * filters.page_size
-        query = query.offset(offset).limit(filters.page_size)
-        
-        result = await db.execute(query)
-        transactions = result.scalars().all()
+        filters: TransactionSearchFilters,
+        cursor: Optional[str] = None,
+        page_size: int = 20
+    ) -> Dict[str, Any]:
+        """Get a page of transaction history for an item, in ledger order"""
         
-        return transactions, total
+        return await inventory_ledger.get_page(db, company_id, item_id, filters, cursor, page_size)
     
     @staticmethod
     async def calculate_inventory_valuation(
@@ -226,46 +279,44 @@ class InventoryService(BaseInventoryService):
     ) -> InventoryValuation:
         """Calculate inventory valuation using specified cost method"""
         
-        # Get all items with inventory
-        query = select(ItemLocation).join(Item).where(
-            and_(
-                Item.company_id == company_id,
-                ItemLocation.quantity_on_hand > 0
+        if valuation_data.valuation_date < date.today():
+            # Past dates are valued from the movement ledger at the cost booked on each movement
+            balances = await inventory_checkpoints.get_balances_as_of(
+                db, company_id, valuation_data.valuation_date,
+                location_id=valuation_data.location_id,
+                include_inactive_items=valuation_data.include_inactive_items
+            )
+            total_quantity = balances["total_quantity"]
+            total_cost = balances["total_value"]
+        elif valuation_data.cost_method in LAYER_COST_METHODS:
+            # Remaining quantity and cost of the open receipt layers
+            total_quantity, total_cost = await inventory_costing.layer_totals(
+                db, company_id, valuation_data.location_id, valuation_data.include_inactive_items
+            )
+        else:
+            # Standard cost would need a standard cost on the item master
+            query = select(
+                func.coalesce(func.sum(ItemLocation.quantity_on_hand), 0),
+                func.coalesce(func.sum(ItemLocation.average_cost * ItemLocation.quantity_on_hand), 0)
+            ).join(
+                Item, ItemLocation.item_id == Item.item_id
+            ).where(
+                and_(
+                    Item.company_id == company_id,
+                    ItemLocation.quantity_on_hand > 0
+                )
             )
-        )
-        
-        if not valuation_data.include_inactive_items:
-            query = query.where(Item.is_active == True)
-        
-        if valuation_data.location_id:
-            query = query.where(ItemLocation.location_id == valuation_data.location_id)
-        
-        result = await db.execute(query)
-        item_locations = result.scalars().all()
-        
-        total_quantity = sum(il.quantity_on_hand for il in item_locations)
-        
-        # Calculate total cost based on cost method
-        total_cost = Decimal('0')
-        
-        for item_location in item_locations:
-            if valuation_data.cost_method == CostMethod.AVERAGE_COST:
-                cost = item_location.average_cost * item_location.quantity_on_hand
-            elif valuation_data.cost_method == CostMethod.FIFO:
-                # For FIFO, we would need to implement cost layers
-                # For now, use average cost as approximation
-                cost = item_location.average_cost * item_location.quantity_on_hand
-            elif valuation_data.cost_method == CostMethod.LIFO:
-                # For LIFO, we would need to implement cost layers
-                # For now, use last cost as approximation
-                cost = item_location.last_cost * item_location.quantity_on_hand
-            elif valuation_data.cost_method == CostMethod.STANDARD_COST:
-                # Would need standard cost from item master
-                cost = item_location.average_cost * item_location.quantity_on_hand
-            else:  # Specific identification
-                cost = item_location.total_value
             
-            total_cost += cost
+            if not valuation_data.include_inactive_items:
+                query = query.where(Item.is_active == True)
+            
+            if valuation_data.location_id:
+                query = query.where(ItemLocation.location_id == valuation_data.location_id)
+            
+            result = await db.execute(query)
+            total_quantity, total_cost = result.one()
+            total_quantity = Decimal(str(total_quantity))
+            total_cost = Decimal(str(total_cost)).quantize(Decimal('0.01'))
         
         # Create valuation record
         valuation = InventoryValuation(
@@ -285,28 +336,30 @@ class InventoryService(BaseInventoryService):
                    valuation_id=valuation.valuation_id, 
                    total_cost=total_cost)
         
+        return valuation
+    
     @staticmethod
     async def get_low_stock_items(
         db: AsyncSession,
         company_id: str,
         location_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Get items with low stock levels"""
+        """Get items with low stock levels from the maintained low-stock set"""
         
-        query = select(ItemLocation).join(Item).options(
+        query = select(ItemLocation).join(
+            InventoryLowStock, InventoryLowStock.item_location_id == ItemLocation.item_location_id
+        ).join(Item).options(
             joinedload(ItemLocation.item),
             joinedload(ItemLocation.location)
         ).where(
             and_(
-                Item.company_id == company_id,
-                Item.is_active == True,
-                ItemLocation.reorder_point > 0,
-                ItemLocation.quantity_on_hand <= ItemLocation.reorder_point
+                InventoryLowStock.company_id == company_id,
+                Item.is_active == True
             )
         )
         
         if location_id:
-            query = query.where(ItemLocation.location_id == location_id)
+            query = query.where(InventoryLowStock.location_id == location_id)
         
         result = await db.execute(query)
         item_locations = result.scalars().all()
@@ -364,61 +417,91 @@ class InventoryAdjustmentService(BaseInventoryService):
     ) -> InventoryAdjustment:
         """Create an inventory adjustment"""
         
-        # Get current item location info
-        current_item_location = await InventoryAdjustmentService._get_or_create_item_location(
-            db, adjustment_data.item_id, adjustment_data.location_id, company_id
-        )
-        
-        quantity_before = current_item_location.quantity_on_hand
-        quantity_after = quantity_before + adjustment_data.quantity_adjustment
-        value_before = current_item_location.total_value
-        value_after = quantity_after * adjustment_data.unit_cost
-        value_adjustment = value_after - value_before
-        
-        # Create adjustment record
-        adjustment = InventoryAdjustment(
-            adjustment_id=str(uuid.uuid4()),
-            company_id=company_id,
-            quantity_before=quantity_before,
-            quantity_after=quantity_after,
-            value_before=value_before,
-            value_after=value_after,
-            value_adjustment=value_adjustment,
-            created_by=user_id,
-            **adjustment_data.dict()
-        )
-        
-        db.add(adjustment)
-        
-        # Update item location
-        current_item_location.quantity_on_hand = quantity_after
-        current_item_location.total_value = value_after
-        if quantity_after > 0:
-            current_item_location.average_cost = value_after / quantity_after
-        
-        # Create inventory transaction
-        transaction = InventoryTransaction(
-            inventory_transaction_id=str(uuid.uuid4()),
-            company_id=company_id,
-            item_id=adjustment_data.item_id,
-            location_id=adjustment_data.location_id,
-            transaction_type=InventoryTransactionType.ADJUSTMENT,
-            transaction_date=adjustment_data.adjustment_date,
-            quantity_change=adjustment_data.quantity_adjustment,
-            unit_cost=adjustment_data.unit_cost,
-            total_cost=adjustment_data.quantity_adjustment * adjustment_data.unit_cost,
-            balance_quantity=quantity_after,
-            balance_value=value_after,
-            reference_type="adjustment",
-            reference_id=adjustment.adjustment_id,
-            lot_number=adjustment_data.lot_number,
-            serial_number=adjustment_data.serial_number,
-            memo=adjustment_data.memo,
-            created_by=user_id
-        )
+        async with stock_movements.writer(db):
+            # Lock the item location so costing sees the quantity being adjusted
+            key = (adjustment_data.item_id, adjustment_data.location_id)
+            item_locations = await stock_movements.lock_item_locations(db, company_id, [key])
+            current_item_location = item_locations[key]
+            
+            quantity_before = current_item_location.quantity_on_hand
+            quantity_after = quantity_before + adjustment_data.quantity_adjustment
+            value_before = current_item_location.total_value or Decimal('0')
+            location_id = current_item_location.location_id
+            
+            # Removed stock is costed from the layers it depletes, added stock
+            # opens a layer at the given cost and a revaluation reprices them all
+            consumption = None
+            if adjustment_data.adjustment_type == AdjustmentType.REVALUE or adjustment_data.quantity_adjustment == 0:
+                value_after = quantity_after * adjustment_data.unit_cost
+                await inventory_costing.revalue(db, company_id, adjustment_data.item_id, location_id, adjustment_data.unit_cost)
+            elif adjustment_data.quantity_adjustment < 0:
+                consumption = await inventory_costing.consume(
+                    db, company_id, adjustment_data.item_id, location_id, -adjustment_data.quantity_adjustment,
+                    average_cost=current_item_location.average_cost or Decimal('0'),
+                    lot_number=adjustment_data.lot_number
+                )
+                value_after = value_before - consumption.total_cost
+            else:
+                value_after = value_before + adjustment_data.quantity_adjustment * adjustment_data.unit_cost
+            value_adjustment = value_after - value_before
+            
+            # Create adjustment record
+            adjustment = InventoryAdjustment(
+                adjustment_id=str(uuid.uuid4()),
+                company_id=company_id,
+                quantity_before=quantity_before,
+                quantity_after=quantity_after,
+                value_before=value_before,
+                value_after=value_after,
+                value_adjustment=value_adjustment,
+                created_by=user_id,
+                **adjustment_data.dict()
+            )
+            
+            db.add(adjustment)
+            
+            # Update item location
+            [(balance_quantity, balance_value)] = await stock_movements.apply(db, company_id, item_locations, [
+                StockDelta(adjustment_data.item_id, adjustment_data.location_id,
+                           adjustment_data.quantity_adjustment, value_adjustment)
+            ])
+            
+            # Create inventory transaction
+            transaction = InventoryTransaction(
+                inventory_transaction_id=new_ledger_id(),
+                company_id=company_id,
+                item_id=adjustment_data.item_id,
+                location_id=location_id,
+                transaction_type=InventoryTransactionType.ADJUSTMENT,
+                transaction_date=adjustment_data.adjustment_date,
+                quantity_change=adjustment_data.quantity_adjustment,
+                unit_cost=consumption.unit_cost if consumption else adjustment_data.unit_cost,
+                total_cost=value_adjustment,
+                balance_quantity=balance_quantity,
+                balance_value=balance_value,
+                reference_type="adjustment",
+                reference_id=adjustment.adjustment_id,
+                lot_number=adjustment_data.lot_number,
+                serial_number=adjustment_data.serial_number,
+                memo=adjustment_data.memo,
+                created_by=user_id
+            )
+            
+            db.add(transaction)
+            
+            if adjustment_data.quantity_adjustment > 0 and adjustment_data.adjustment_type != AdjustmentType.REVALUE:
+                await inventory_costing.add_layer(
+                    db, company_id, adjustment_data.item_id, location_id,
+                    adjustment_data.quantity_adjustment, adjustment_data.unit_cost, adjustment_data.adjustment_date,
+                    source_transaction_id=transaction.inventory_transaction_id,
+                    lot_number=adjustment_data.lot_number
+                )
+            
+            await inventory_ledger.record(db, company_id, [transaction])
+            await InventoryService.mark_snapshot_stale(db, company_id)
+            await inventory_checkpoints.invalidate(db, company_id, adjustment_data.adjustment_date)
+            await db.commit()
         
-        db.add(transaction)
-        await db.commit()
         await db.refresh(adjustment)
         
         logger.info("Inventory adjustment created", 
@@ -427,61 +510,6 @@ class InventoryAdjustmentService(BaseInventoryService):
         
         return adjustment
     
-    @staticmethod
-    async def _get_or_create_item_location(
-        db: AsyncSession,
-        item_id: str,
-        location_id: Optional[str],
-        company_id: str
-    ) -> ItemLocation:
-        """Get or create item location record"""
-        
-        # If no location specified, get default location
-        if not location_id:
-            default_location = await db.execute(
-                select(InventoryLocation).where(
-                    and_(
-                        InventoryLocation.company_id == company_id,
-                        InventoryLocation.is_default == True,
-                        InventoryLocation.is_active == True
-                    )
-                )
-            )
-            location = default_location.scalar_one_or_none()
-            if location:
-                location_id = location.location_id
-        
-        # Try to get existing item location
-        result = await db.execute(
-            select(ItemLocation).where(
-                and_(
-                    ItemLocation.item_id == item_id,
-                    ItemLocation.location_id == location_id
-                )
-            )
-        )
-        
-        item_location = result.scalar_one_or_none()
-        
-        if not item_location:
-            # Create new item location
-            item_location = ItemLocation(
-                item_location_id=str(uuid.uuid4()),
-                item_id=item_id,
-                location_id=location_id,
-                quantity_on_hand=Decimal('0'),
-                quantity_available=Decimal('0'),
-                quantity_on_order=Decimal('0'),
-                quantity_allocated=Decimal('0'),
-                average_cost=Decimal('0'),
-                last_cost=Decimal('0'),
-                total_value=Decimal('0')
-            )
-            db.add(item_location)
-            await db.flush()
-        
-        return item_location
-    
     @staticmethod
     async def get_adjustments(
         db: AsyncSession,
@@ -614,6 +642,28 @@ class PurchaseOrderService(BaseInventoryService):
         # Generate PO number
         po_number = await PurchaseOrderService._generate_po_number(db, company_id)
         
+        purchase_order = PurchaseOrderService._add_purchase_order(db, company_id, po_number, po_data, user_id)
+        
+        await db.commit()
+        await db.refresh(purchase_order)
+        
+        logger.info("Purchase order created", 
+                   po_id=purchase_order.purchase_order_id,
+                   po_number=po_number,
+                   total=purchase_order.subtotal)
+        
+        return purchase_order
+    
+    @staticmethod
+    def _add_purchase_order(
+        db: AsyncSession,
+        company_id: str,
+        po_number: str,
+        po_data: PurchaseOrderCreate,
+        user_id: str
+    ) -> PurchaseOrder:
+        """Add a purchase order and its lines to the session"""
+        
         # Calculate totals
         subtotal = sum(
             line.quantity_ordered * line.unit_cost 
@@ -630,43 +680,38 @@ class PurchaseOrderService(BaseInventoryService):
             created_by=user_id,
             **po_data.dict(exclude={'lines'})
         )
-        
         db.add(purchase_order)
-        await db.flush()
         
         # Create purchase order lines
-        for i, line_data in enumerate(po_data.lines, 1):
-            line_total = line_data.quantity_ordered * line_data.unit_cost
-            
-            po_line = PurchaseOrderLine(
+        db.add_all([
+            PurchaseOrderLine(
                 po_line_id=str(uuid.uuid4()),
                 purchase_order_id=purchase_order.purchase_order_id,
                 line_number=i,
-                line_total=line_total,
+                line_total=line_data.quantity_ordered * line_data.unit_cost,
                 **line_data.dict()
             )
-            db.add(po_line)
-        
-        await db.commit()
-        await db.refresh(purchase_order)
-        
-        logger.info("Purchase order created", 
-                   po_id=purchase_order.purchase_order_id,
-                   po_number=po_number,
-                   total=subtotal)
+            for i, line_data in enumerate(po_data.lines, 1)
+        ])
         
         return purchase_order
     
     @staticmethod
     async def _generate_po_number(db: AsyncSession, company_id: str) -> str:
         """Generate next PO number"""
+        po_numbers = await PurchaseOrderService._generate_po_numbers(db, company_id, 1)
+        return po_numbers[0]
+    
+    @staticmethod
+    async def _generate_po_numbers(db: AsyncSession, company_id: str, count: int) -> List[str]:
+        """Generate the next `count` PO numbers"""
         result = await db.execute(
             select(func.count(PurchaseOrder.purchase_order_id)).where(
                 PurchaseOrder.company_id == company_id
             )
         )
-        count = result.scalar() or 0
-        return f"PO{count + 1:06d}"
+        existing = result.scalar() or 0
+        return [f"PO{existing + i:06d}" for i in range(1, count + 1)]
     
     @staticmethod
     async def get_purchase_orders(
@@ -856,33 +901,31 @@ class InventoryReceiptService(BaseInventoryService):
             **receipt_data.dict(exclude={'lines'})
         )
         
-        db.add(receipt)
-        await db.flush()
-        
-        # Create receipt lines and update inventory
-        for line_data in receipt_data.lines:
-            line_total = line_data.quantity_received * line_data.unit_cost
+        async with stock_movements.writer(db):
+            db.add(receipt)
+            await db.flush()
             
-            receipt_line = ReceiptLine(
-                receipt_line_id=str(uuid.uuid4()),
-                receipt_id=receipt.receipt_id,
-                line_total=line_total,
-                **line_data.dict()
-            )
-            db.add(receipt_line)
+            # Receive against every purchase order line on the receipt at once
+            await InventoryReceiptService._receive_po_lines(db, company_id, receipt_data.lines)
             
-            # Update inventory
+            # Create receipt lines
+            db.add_all([
+                ReceiptLine(
+                    receipt_line_id=str(uuid.uuid4()),
+                    receipt_id=receipt.receipt_id,
+                    line_total=line_data.quantity_received * line_data.unit_cost,
+                    **line_data.dict()
+                )
+                for line_data in receipt_data.lines
+            ])
+            
+            # Update inventory for all lines at once
             await InventoryReceiptService._update_inventory_for_receipt(
-                db, company_id, line_data, user_id
+                db, company_id, receipt, receipt_data.lines, user_id
             )
             
-            # Update PO line if linked
-            if line_data.po_line_id:
-                await InventoryReceiptService._update_po_line_received_quantity(
-                    db, line_data.po_line_id, line_data.quantity_received
-                )
+            await db.commit()
         
-        await db.commit()
         await db.refresh(receipt)
         
         logger.info("Inventory receipt created", 
@@ -1031,95 +1074,640 @@ class InventoryReceiptService(BaseInventoryService):
     async def _update_inventory_for_receipt(
         db: AsyncSession,
         company_id: str,
-        line_data: ReceiptLineCreate,
+        receipt: InventoryReceipt,
+        lines: List[ReceiptLineCreate],
         user_id: str
     ) -> None:
         """Update inventory quantities for received items"""
         
-        # Get or create item location
-        item_location = await InventoryAdjustmentService._get_or_create_item_location(
-            db, line_data.item_id, line_data.location_id, company_id
+        # Lock every item location on the receipt and apply the lines in one update
+        item_locations = await stock_movements.lock_item_locations(
+            db, company_id, [(line_data.item_id, line_data.location_id) for line_data in lines]
         )
+        balances = await stock_movements.apply(db, company_id, item_locations, [
+            StockDelta(
+                line_data.item_id, line_data.location_id,
+                line_data.quantity_received, line_data.quantity_received * line_data.unit_cost,
+                last_cost=line_data.unit_cost
+            )
+            for line_data in lines
+        ])
         
-        # Update quantities
-        old_quantity = item_location.quantity_on_hand
-        new_quantity = old_quantity + line_data.quantity_received
-        old_value = item_location.total_value
-        
-        # Calculate new average cost
-        total_cost_addition = line_data.quantity_received * line_data.unit_cost
-        new_total_value = old_value + total_cost_addition
+        transactions = []
+        for line_data, (balance_quantity, balance_value) in zip(lines, balances):
+            location_id = item_locations[(line_data.item_id, line_data.location_id)].location_id
+            
+            # Create inventory transaction
+            transaction = InventoryTransaction(
+                inventory_transaction_id=new_ledger_id(),
+                company_id=company_id,
+                item_id=line_data.item_id,
+                location_id=location_id,
+                transaction_type=InventoryTransactionType.PURCHASE,
+                transaction_date=receipt.receipt_date,
+                quantity_change=line_data.quantity_received,
+                unit_cost=line_data.unit_cost,
+                total_cost=line_data.quantity_received * line_data.unit_cost,
+                balance_quantity=balance_quantity,
+                balance_value=balance_value,
+                reference_type="receipt",
+                reference_id=receipt.receipt_id,
+                lot_number=line_data.lot_number,
+                created_by=user_id
+            )
+            
+            db.add(transaction)
+            transactions.append(transaction)
+            
+            await inventory_costing.add_layer(
+                db, company_id, line_data.item_id, location_id,
+                line_data.quantity_received, line_data.unit_cost, transaction.transaction_date,
+                source_transaction_id=transaction.inventory_transaction_id,
+                lot_number=line_data.lot_number
+            )
         
-        item_location.quantity_on_hand = new_quantity
-        item_location.quantity_available = new_quantity - item_location.quantity_allocated
-        item_location.total_value = new_total_value
-        item_location.last_cost = line_data.unit_cost
+        await inventory_ledger.record(db, company_id, transactions)
+        await InventoryService.mark_snapshot_stale(db, company_id)
+        await inventory_checkpoints.invalidate(db, company_id, receipt.receipt_date)
+    
+    @staticmethod
+    async def _receive_po_lines(
+        db: AsyncSession,
+        company_id: str,
+        lines: List[ReceiptLineCreate]
+    ) -> None:
+        """Add received quantities to purchase order lines and recompute their orders' status"""
         
-        if new_quantity > 0:
-            item_location.average_cost = new_total_value / new_quantity
+        received: Dict[str, Decimal] = {}
+        for line_data in lines:
+            if line_data.po_line_id:
+                received[line_data.po_line_id] = received.get(line_data.po_line_id, Decimal('0')) + line_data.quantity_received
+        if not received:
+            return
         
-        # Create inventory transaction
-        transaction = InventoryTransaction(
-            inventory_transaction_id=str(uuid.uuid4()),
-            company_id=company_id,
-            item_id=line_data.item_id,
-            location_id=line_data.location_id,
-            transaction_type=InventoryTransactionType.PURCHASE,
-            transaction_date=date.today(),
-            quantity_change=line_data.quantity_received,
-            unit_cost=line_data.unit_cost,
-            total_cost=total_cost_addition,
-            balance_quantity=new_quantity,
-            balance_value=new_total_value,
-            reference_type="receipt",
-            lot_number=line_data.lot_number,
-            created_by=user_id
+        # Every line of every purchase order the receipt touches, locked against concurrent receipts
+        touched_orders = select(PurchaseOrderLine.purchase_order_id).where(
+            PurchaseOrderLine.po_line_id.in_(list(received))
         )
+        result = await db.execute(
+            select(PurchaseOrderLine, PurchaseOrder).join(
+                PurchaseOrder, PurchaseOrderLine.purchase_order_id == PurchaseOrder.purchase_order_id
+            ).where(
+                and_(
+                    PurchaseOrder.company_id == company_id,
+                    PurchaseOrderLine.purchase_order_id.in_(touched_orders)
+                )
+            ).order_by(PurchaseOrderLine.purchase_order_id, PurchaseOrderLine.line_number).with_for_update()
+        )
+        rows = result.all()
+        po_lines = {po_line.po_line_id: po_line for po_line, _ in rows}
         
-        db.add(transaction)
+        for line_data in lines:
+            if not line_data.po_line_id:
+                continue
+            po_line = po_lines.get(line_data.po_line_id)
+            if po_line is None:
+                raise ValueError(f"Purchase order line {line_data.po_line_id} not found")
+            if po_line.item_id != line_data.item_id:
+                raise ValueError(f"Item {line_data.item_id} does not match purchase order line {line_data.po_line_id}")
+        
+        totals: Dict[str, List[Decimal]] = {}
+        orders: Dict[str, PurchaseOrder] = {}
+        for po_line, po in rows:
+            if po_line.po_line_id in received:
+                if po.status in (PurchaseOrderStatus.CLOSED, PurchaseOrderStatus.CANCELLED):
+                    raise ValueError(f"Purchase order {po.po_number} is {po.status.value}")
+                po_line.quantity_received += received[po_line.po_line_id]
+            
+            total = totals.setdefault(po.purchase_order_id, [Decimal('0'), Decimal('0')])
+            total[0] += po_line.quantity_ordered
+            total[1] += po_line.quantity_received
+            orders[po.purchase_order_id] = po
+        
+        # Lines and orders are written back in batches at flush
+        for purchase_order_id, (total_ordered, total_received) in totals.items():
+            po = orders[purchase_order_id]
+            if total_received == 0:
+                po.status = PurchaseOrderStatus.OPEN
+            elif total_received >= total_ordered:
+                po.status = PurchaseOrderStatus.RECEIVED
+            else:
+                po.status = PurchaseOrderStatus.PARTIALLY_RECEIVED
+
+class InventoryTransferService(BaseInventoryService):
+    """Service for stock transfers between locations"""
     
     @staticmethod
-    async def _update_po_line_received_quantity(
+    async def post_transfers(
         db: AsyncSession,
-        po_line_id: str,
-        quantity_received: Decimal
-    ) -> None:
-        """Update received quantity on PO line"""
+        company_id: str,
+        transfers_data: List[InventoryTransferCreate],
+        user_id: str
+    ) -> List[InventoryTransfer]:
+        """Post transfer documents as one stock movement"""
+        
+        location_ids = set()
+        for transfer_data in transfers_data:
+            if transfer_data.from_location_id == transfer_data.to_location_id:
+                raise ValueError("A transfer needs different source and destination locations")
+            location_ids.update((transfer_data.from_location_id, transfer_data.to_location_id))
         
         result = await db.execute(
-            select(PurchaseOrderLine).where(
-                PurchaseOrderLine.po_line_id == po_line_id
+            select(InventoryLocation).where(
+                and_(
+                    InventoryLocation.company_id == company_id,
+                    InventoryLocation.location_id.in_(location_ids),
+                    InventoryLocation.is_active == True
+                )
             )
         )
-        po_line = result.scalar_one_or_none()
+        locations = {location.location_id: location for location in result.scalars().all()}
+        for location_id in location_ids:
+            if location_id not in locations:
+                raise ValueError(f"Inventory location {location_id} not found")
+            if locations[location_id].location_type == IN_TRANSIT_LOCATION_TYPE:
+                raise ValueError("Stock in transit moves only by receiving or cancelling its transfer")
+        
+        async with stock_movements.writer(db):
+            transit_location_id = None
+            if any(transfer_data.in_transit for transfer_data in transfers_data):
+                transit_location_id = await InventoryTransferService._get_transit_location_id(db, company_id)
+            destinations = [
+                transit_location_id if transfer_data.in_transit else transfer_data.to_location_id
+                for transfer_data in transfers_data
+            ]
+            
+            # Lock both ends of every line of every document at once
+            item_locations = await stock_movements.lock_item_locations(db, company_id, [
+                key
+                for transfer_data, destination in zip(transfers_data, destinations)
+                for line_data in transfer_data.lines
+                for key in ((line_data.item_id, transfer_data.from_location_id), (line_data.item_id, destination))
+            ])
+            
+            required: Dict[Tuple[str, str], Decimal] = {}
+            for transfer_data in transfers_data:
+                for line_data in transfer_data.lines:
+                    key = (line_data.item_id, transfer_data.from_location_id)
+                    required[key] = required.get(key, Decimal('0')) + line_data.quantity
+            shortages = [
+                item_id for (item_id, location_id), quantity in required.items()
+                if not locations[location_id].allow_negative_stock
+                and item_locations[(item_id, location_id)].quantity_available < quantity
+            ]
+            if shortages:
+                raise ValueError(f"Insufficient quantity for items {', '.join(dict.fromkeys(shortages))}")
+            
+            # Stock leaves the source at its cost there and arrives at that same cost
+            cost_method = await inventory_costing.get_cost_method(db, company_id)
+            deltas = []
+            documents = []
+            for transfer_data, destination in zip(transfers_data, destinations):
+                lines = []
+                for line_data in transfer_data.lines:
+                    source = item_locations[(line_data.item_id, transfer_data.from_location_id)]
+                    consumption = await inventory_costing.consume(
+                        db, company_id, line_data.item_id, transfer_data.from_location_id, line_data.quantity,
+                        cost_method=cost_method,
+                        average_cost=source.average_cost or Decimal('0'),
+                        lot_number=line_data.lot_number
+                    )
+                    deltas.append(StockDelta(line_data.item_id, transfer_data.from_location_id,
+                                             -line_data.quantity, -consumption.total_cost))
+                    deltas.append(StockDelta(line_data.item_id, destination, line_data.quantity, consumption.total_cost))
+                    lines.append(InventoryTransferLine(
+                        transfer_line_id=str(uuid.uuid4()),
+                        item_id=line_data.item_id,
+                        quantity=line_data.quantity,
+                        unit_cost=consumption.unit_cost,
+                        total_cost=consumption.total_cost,
+                        lot_number=line_data.lot_number
+                    ))
+                documents.append(lines)
+            
+            balances = iter(await stock_movements.apply(db, company_id, item_locations, deltas))
+            transfer_numbers = await InventoryTransferService._generate_transfer_numbers(db, company_id, len(transfers_data))
+            
+            transfers = []
+            transactions = []
+            for transfer_data, destination, transfer_number, lines in zip(
+                transfers_data, destinations, transfer_numbers, documents
+            ):
+                transfer = InventoryTransfer(
+                    transfer_id=str(uuid.uuid4()),
+                    company_id=company_id,
+                    transfer_number=transfer_number,
+                    from_location_id=transfer_data.from_location_id,
+                    to_location_id=transfer_data.to_location_id,
+                    transit_location_id=destination if transfer_data.in_transit else None,
+                    transfer_date=transfer_data.transfer_date,
+                    received_date=None if transfer_data.in_transit else transfer_data.transfer_date,
+                    status=TransferStatus.IN_TRANSIT if transfer_data.in_transit else TransferStatus.COMPLETED,
+                    total_value=sum((line.total_cost for line in lines), Decimal('0')),
+                    memo=transfer_data.memo,
+                    created_by=user_id,
+                    received_by=None if transfer_data.in_transit else user_id,
+                    transfer_lines=lines
+                )
+                for line in lines:
+                    transfer_out, transfer_in = InventoryTransferService._transfer_transactions(
+                        transfer, line, transfer_data.from_location_id, destination,
+                        transfer_data.transfer_date, next(balances), next(balances), user_id
+                    )
+                    transactions.extend((transfer_out, transfer_in))
+                    
+                    # Layers open where the stock can be issued from again
+                    if not transfer_data.in_transit:
+                        await inventory_costing.add_layer(
+                            db, company_id, line.item_id, destination, line.quantity, line.unit_cost,
+                            transfer_data.transfer_date,
+                            source_transaction_id=transfer_in.inventory_transaction_id,
+                            lot_number=line.lot_number
+                        )
+                transfers.append(transfer)
+            
+            db.add_all(transfers)
+            db.add_all(transactions)
+            await inventory_ledger.record(db, company_id, transactions)
+            await InventoryService.mark_snapshot_stale(db, company_id)
+            await inventory_checkpoints.invalidate(
+                db, company_id, min(transfer_data.transfer_date for transfer_data in transfers_data)
+            )
+            await db.commit()
+        
+        logger.info("Inventory transfers posted", 
+                   transfers=len(transfers),
+                   lines=sum(len(lines) for lines in documents))
+        
+        return transfers
+    
+    @staticmethod
+    async def create_transfer(
+        db: AsyncSession,
+        company_id: str,
+        transfer_data: InventoryTransferCreate,
+        user_id: str
+    ) -> InventoryTransfer:
+        """Create a stock transfer"""
+        
+        [transfer] = await InventoryTransferService.post_transfers(db, company_id, [transfer_data], user_id)
+        return transfer
+    
+    @staticmethod
+    async def receive_transfer(
+        db: AsyncSession,
+        company_id: str,
+        transfer_id: str,
+        receive_data: InventoryTransferReceive,
+        user_id: str
+    ) -> Optional[InventoryTransfer]:
+        """Move an in-transit transfer's stock into its destination"""
+        
+        return await InventoryTransferService._move_out_of_transit(
+            db, company_id, transfer_id, receive_data.received_date, TransferStatus.COMPLETED, user_id
+        )
+    
+    @staticmethod
+    async def cancel_transfer(
+        db: AsyncSession,
+        company_id: str,
+        transfer_id: str,
+        user_id: str
+    ) -> Optional[InventoryTransfer]:
+        """Return an in-transit transfer's stock to its source"""
+        
+        return await InventoryTransferService._move_out_of_transit(
+            db, company_id, transfer_id, date.today(), TransferStatus.CANCELLED, user_id
+        )
+    
+    @staticmethod
+    async def _move_out_of_transit(
+        db: AsyncSession,
+        company_id: str,
+        transfer_id: str,
+        movement_date: date,
+        status: TransferStatus,
+        user_id: str
+    ) -> Optional[InventoryTransfer]:
+        """Move the stock of an in-transit transfer to its destination, or back to its source"""
         
-        if po_line:
-            po_line.quantity_received += quantity_received
+        async with stock_movements.writer(db):
+            result = await db.execute(
+                select(InventoryTransfer).options(
+                    selectinload(InventoryTransfer.transfer_lines)
+                ).where(
+                    and_(
+                        InventoryTransfer.transfer_id == transfer_id,
+                        InventoryTransfer.company_id == company_id
+                    )
+                ).with_for_update()
+            )
+            transfer = result.scalar_one_or_none()
+            if not transfer:
+                return None
+            if transfer.status != TransferStatus.IN_TRANSIT:
+                raise ValueError(f"Transfer {transfer.transfer_number} is not in transit")
+            movement_date = max(movement_date, transfer.transfer_date)
+            
+            transit_location_id = transfer.transit_location_id
+            destination = transfer.to_location_id if status == TransferStatus.COMPLETED else transfer.from_location_id
+            item_locations = await stock_movements.lock_item_locations(db, company_id, [
+                key
+                for line in transfer.transfer_lines
+                for key in ((line.item_id, transit_location_id), (line.item_id, destination))
+            ])
             
-            # Update PO status if fully received
-            await InventoryReceiptService._update_po_status(db, po_line.purchase_order_id)
+            # Stock leaves transit at the cost it was shipped at
+            balances = iter(await stock_movements.apply(db, company_id, item_locations, [
+                delta
+                for line in transfer.transfer_lines
+                for delta in (
+                    StockDelta(line.item_id, transit_location_id, -line.quantity, -line.total_cost),
+                    StockDelta(line.item_id, destination, line.quantity, line.total_cost)
+                )
+            ]))
+            
+            transactions = []
+            for line in transfer.transfer_lines:
+                transfer_out, transfer_in = InventoryTransferService._transfer_transactions(
+                    transfer, line, transit_location_id, destination,
+                    movement_date, next(balances), next(balances), user_id
+                )
+                transactions.extend((transfer_out, transfer_in))
+                await inventory_costing.add_layer(
+                    db, company_id, line.item_id, destination, line.quantity, line.unit_cost, movement_date,
+                    source_transaction_id=transfer_in.inventory_transaction_id,
+                    lot_number=line.lot_number
+                )
+            
+            transfer.status = status
+            transfer.received_date = movement_date
+            transfer.received_by = user_id
+            
+            db.add_all(transactions)
+            await inventory_ledger.record(db, company_id, transactions)
+            await InventoryService.mark_snapshot_stale(db, company_id)
+            await inventory_checkpoints.invalidate(db, company_id, movement_date)
+            await db.commit()
+        
+        logger.info("Inventory transfer left transit", 
+                   transfer_id=transfer_id,
+                   status=status.value)
+        
+        return transfer
+    
+    @staticmethod
+    def _transfer_transactions(
+        transfer: InventoryTransfer,
+        line: InventoryTransferLine,
+        from_location_id: str,
+        to_location_id: str,
+        movement_date: date,
+        out_balance: Tuple[Decimal, Decimal],
+        in_balance: Tuple[Decimal, Decimal],
+        user_id: str
+    ) -> Tuple[InventoryTransaction, InventoryTransaction]:
+        """Ledger rows for one transfer line leaving one location and entering another"""
+        
+        def movement(location_id: str, sign: int, balance: Tuple[Decimal, Decimal]) -> InventoryTransaction:
+            return InventoryTransaction(
+                inventory_transaction_id=new_ledger_id(),
+                company_id=transfer.company_id,
+                item_id=line.item_id,
+                location_id=location_id,
+                transaction_type=InventoryTransactionType.TRANSFER,
+                transaction_date=movement_date,
+                quantity_change=sign * line.quantity,
+                unit_cost=line.unit_cost,
+                total_cost=sign * line.total_cost,
+                balance_quantity=balance[0],
+                balance_value=balance[1],
+                reference_type="transfer",
+                reference_id=transfer.transfer_id,
+                lot_number=line.lot_number,
+                memo=transfer.memo,
+                created_by=user_id
+            )
+        
+        return movement(from_location_id, -1, out_balance), movement(to_location_id, 1, in_balance)
     
     @staticmethod
-    async def _update_po_status(db: AsyncSession, purchase_order_id: str) -> None:
-        """Update purchase order status based on received quantities"""
+    async def _get_transit_location_id(db: AsyncSession, company_id: str) -> str:
+        """The company's in-transit location, created on first use"""
         
         result = await db.execute(
-            select(PurchaseOrder).options(
-                selectinload(PurchaseOrder.po_lines)
-            ).where(PurchaseOrder.purchase_order_id == purchase_order_id)
+            select(InventoryLocation.location_id).where(
+                and_(
+                    InventoryLocation.company_id == company_id,
+                    InventoryLocation.location_type == IN_TRANSIT_LOCATION_TYPE
+                )
+            ).order_by(InventoryLocation.created_at, InventoryLocation.location_id).limit(1)
         )
-        po = result.scalar_one_or_none()
+        location_id = result.scalar_one_or_none()
+        if location_id is None:
+            location = InventoryLocation(
+                location_id=str(uuid.uuid4()),
+                company_id=company_id,
+                location_name="In Transit",
+                location_code="TRANSIT",
+                location_type=IN_TRANSIT_LOCATION_TYPE,
+                is_active=True
+            )
+            db.add(location)
+            await db.flush()
+            location_id = location.location_id
+        return location_id
+    
+    @staticmethod
+    async def _generate_transfer_numbers(db: AsyncSession, company_id: str, count: int) -> List[str]:
+        """Generate the next `count` transfer numbers"""
+        result = await db.execute(
+            select(func.count(InventoryTransfer.transfer_id)).where(
+                InventoryTransfer.company_id == company_id
+            )
+        )
+        existing = result.scalar() or 0
+        return [f"TRF{existing + i:06d}" for i in range(1, count + 1)]
+    
+    @staticmethod
+    async def get_transfers(
+        db: AsyncSession,
+        company_id: str,
+        filters: TransferSearchFilters
+    ) -> Tuple[List[InventoryTransfer], int]:
+        """Get stock transfers with filtering and pagination"""
+        
+        query = select(InventoryTransfer).options(
+            selectinload(InventoryTransfer.transfer_lines)
+        ).where(InventoryTransfer.company_id == company_id)
+        
+        # Apply filters
+        if filters.location_id:
+            query = query.where(
+                or_(
+                    InventoryTransfer.from_location_id == filters.location_id,
+                    InventoryTransfer.to_location_id == filters.location_id
+                )
+            )
+        
+        if filters.status:
+            query = query.where(InventoryTransfer.status == filters.status)
+        
+        if filters.date_from:
+            query = query.where(InventoryTransfer.transfer_date >= filters.date_from)
+        
+        if filters.date_to:
+            query = query.where(InventoryTransfer.transfer_date <= filters.date_to)
+        
+        # Get total count
+        count_query = select(func.count()).select_from(query.subquery())
+        total_result = await db.execute(count_query)
+        total = total_result.scalar()
+        
+        # Apply pagination
+        offset = (filters.page - 1) * filters.page_size
+        query = query.order_by(
+            desc(InventoryTransfer.transfer_date), desc(InventoryTransfer.transfer_number)
+        ).offset(offset).limit(filters.page_size)
+        
+        result = await db.execute(query)
+        transfers = result.scalars().all()
+        
+        return transfers, total
+    
+    @staticmethod
+    async def get_transfer_by_id(
+        db: AsyncSession,
+        company_id: str,
+        transfer_id: str
+    ) -> Optional[InventoryTransfer]:
+        """Get transfer by ID"""
+        
+        result = await db.execute(
+            select(InventoryTransfer).options(
+                selectinload(InventoryTransfer.transfer_lines)
+            ).where(
+                and_(
+                    InventoryTransfer.transfer_id == transfer_id,
+                    InventoryTransfer.company_id == company_id
+                )
+            )
+        )
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def plan_rebalance(
+        db: AsyncSession,
+        company_id: str,
+        request: StockRebalanceRequest
+    ) -> List[Dict[str, Any]]:
+        """Moves that fill item-locations below their reorder point from locations with surplus.
+        
+        A location keeps stock up to its max stock level, or its reorder point
+        when no maximum is set, and anything above that is surplus. Locations
+        below their reorder point are filled up to that same level, largest
+        shortfall first from the largest surplus.
+        """
+        
+        query = select(
+            ItemLocation.item_id,
+            ItemLocation.location_id,
+            ItemLocation.quantity_available,
+            ItemLocation.reorder_point,
+            ItemLocation.max_stock_level
+        ).join(
+            Item, ItemLocation.item_id == Item.item_id
+        ).join(
+            InventoryLocation, ItemLocation.location_id == InventoryLocation.location_id
+        ).where(
+            and_(
+                Item.company_id == company_id,
+                Item.is_active == True,
+                InventoryLocation.is_active == True,
+                or_(
+                    InventoryLocation.location_type.is_(None),
+                    InventoryLocation.location_type != IN_TRANSIT_LOCATION_TYPE
+                )
+            )
+        ).order_by(ItemLocation.item_id, ItemLocation.location_id)
+        if request.item_ids:
+            query = query.where(ItemLocation.item_id.in_(request.item_ids))
+        if request.location_ids:
+            query = query.where(ItemLocation.location_id.in_(request.location_ids))
+        
+        result = await db.execute(query)
         
-        if po:
-            total_ordered = sum(line.quantity_ordered for line in po.po_lines)
-            total_received = sum(line.quantity_received for line in po.po_lines)
+        moves = []
+        for item_id, rows in groupby(result.all(), key=lambda row: row.item_id):
+            surplus = []
+            shortfall = []
+            for row in rows:
+                available = row.quantity_available or Decimal('0')
+                reorder_point = row.reorder_point or Decimal('0')
+                level = row.max_stock_level if row.max_stock_level and row.max_stock_level > 0 else reorder_point
+                if reorder_point > 0 and available < reorder_point:
+                    shortfall.append([level - available, row.location_id])
+                elif available > level:
+                    surplus.append([available - level, row.location_id])
+            if not shortfall or not surplus:
+                continue
             
-            if total_received == 0:
-                po.status = PurchaseOrderStatus.OPEN
-            elif total_received >= total_ordered:
-                po.status = PurchaseOrderStatus.RECEIVED
-            else:
-                po.status = PurchaseOrderStatus.PARTIALLY_RECEIVED
+            shortfall.sort(key=lambda entry: entry[0], reverse=True)
+            surplus.sort(key=lambda entry: entry[0], reverse=True)
+            sources = iter(surplus)
+            source = next(sources)
+            for need, to_location_id in shortfall:
+                while need > 0 and source is not None:
+                    quantity = min(need, source[0])
+                    moves.append({
+                        "item_id": item_id,
+                        "from_location_id": source[1],
+                        "to_location_id": to_location_id,
+                        "quantity": quantity
+                    })
+                    need -= quantity
+                    source[0] -= quantity
+                    if source[0] == 0:
+                        source = next(sources, None)
+        
+        return moves
+    
+    @staticmethod
+    async def rebalance_stock(
+        db: AsyncSession,
+        company_id: str,
+        request: StockRebalanceRequest,
+        user_id: str
+    ) -> Dict[str, Any]:
+        """Plan stock moves across locations and post them as one transfer per location pair"""
+        
+        moves = await InventoryTransferService.plan_rebalance(db, company_id, request)
+        if request.dry_run or not moves:
+            return {"moves": moves, "transfers": []}
+        
+        pairs: Dict[Tuple[str, str], List[InventoryTransferLineCreate]] = {}
+        for move in moves:
+            pairs.setdefault((move["from_location_id"], move["to_location_id"]), []).append(
+                InventoryTransferLineCreate(item_id=move["item_id"], quantity=move["quantity"])
+            )
+        transfers = await InventoryTransferService.post_transfers(db, company_id, [
+            InventoryTransferCreate(
+                from_location_id=from_location_id,
+                to_location_id=to_location_id,
+                transfer_date=request.transfer_date,
+                in_transit=request.in_transit,
+                memo="Stock rebalance",
+                lines=lines
+            )
+            for (from_location_id, to_location_id), lines in pairs.items()
+        ], user_id)
+        
+        logger.info("Stock rebalanced", 
+                   company_id=company_id,
+                   moves=len(moves),
+                   transfers=len(transfers))
+        
+        return {"moves": moves, "transfers": transfers}
 
 class InventoryLocationService(BaseInventoryService):
     """Service for inventory location operations"""
@@ -1325,60 +1913,9 @@ class InventoryReorderService(BaseInventoryService):
         company_id: str,
         location_id: Optional[str] = None
     ) -> ReorderReport:
-        """Generate reorder report for items below reorder point"""
-        
-        query = select(ItemLocation).join(Item).where(
-            and_(
-                Item.company_id == company_id,
-                Item.is_active == True,
-                ItemLocation.reorder_point > 0,
-                ItemLocation.quantity_on_hand <= ItemLocation.reorder_point
-            )
-        )
-        
-        if location_id:
-            query = query.where(ItemLocation.location_id == location_id)
+        """Generate reorder report for items at or below their demand-based reorder point"""
         
-        result = await db.execute(query.options(
-            joinedload(ItemLocation.item),
-            joinedload(ItemLocation.location)
-        ))
-        item_locations = result.scalars().all()
-        
-        reorder_items = []
-        estimated_cost = Decimal('0')
-        
-        for item_location in item_locations:
-            # Calculate suggested order quantity
-            if item_location.reorder_quantity > 0:
-                suggested_qty = item_location.reorder_quantity
-            else:
-                # Default to difference between max level and current
-                max_level = item_location.max_stock_level or (item_location.reorder_point * 3)
-                suggested_qty = max_level - item_location.quantity_on_hand
-            
-            item_cost = suggested_qty * item_location.last_cost
-            estimated_cost += item_cost
-            
-            reorder_item = ReorderItem(
-                item_id=item_location.item_id,
-                item_name=item_location.item.item_name,
-                location_id=item_location.location_id,
-                location_name=item_location.location.location_name,
-                current_quantity=item_location.quantity_on_hand,
-                reorder_point=item_location.reorder_point,
-                reorder_quantity=item_location.reorder_quantity,
-                preferred_vendor_id=item_location.item.preferred_vendor_id,
-                suggested_order_quantity=suggested_qty
-            )
-            reorder_items.append(reorder_item)
-        
-        return ReorderReport(
-            report_date=date.today(),
-            items=reorder_items,
-            total_items=len(reorder_items),
-            estimated_cost=estimated_cost
-        )
+        return await reorder_planner.plan(db, company_id, location_id)
     
     @staticmethod
     async def auto_generate_purchase_orders(
@@ -1397,48 +1934,56 @@ class InventoryReorderService(BaseInventoryService):
         if not reorder_report.items:
             return []
         
-        # Group by vendor
-        vendor_items = {}
+        # Total the suggestions per vendor and item across locations
+        vendor_items: Dict[str, Dict[str, List[Decimal]]] = {}
         for item in reorder_report.items:
-            if vendor_id and item.preferred_vendor_id != vendor_id:
+            if not item.preferred_vendor_id or (vendor_id and item.preferred_vendor_id != vendor_id):
                 continue
             
-            if item.preferred_vendor_id:
-                if item.preferred_vendor_id not in vendor_items:
-                    vendor_items[item.preferred_vendor_id] = []
-                vendor_items[item.preferred_vendor_id].append(item)
-        
-        purchase_orders = []
-        
-        for vendor_id, items in vendor_items.items():
-            # Create PO lines
-            po_lines = []
-            for item in items:
-                # Get item details for unit cost
-                item_result = await db.execute(
-                    select(Item).where(Item.item_id == item.item_id)
-                )
-                item_record = item_result.scalar_one()
-                
-                po_line = PurchaseOrderLineCreate(
-                    item_id=item.item_id,
-                    quantity_ordered=item.suggested_order_quantity,
-                    unit_cost=item_record.purchase_cost or item_record.sales_price or Decimal('0')
-                )
-                po_lines.append(po_line)
-            
-            # Create purchase order
-            po_data = PurchaseOrderCreate(
-                vendor_id=vendor_id,
-                po_date=date.today(),
-                memo="Auto-generated for reorder",
-                lines=po_lines
+            totals = vendor_items.setdefault(item.preferred_vendor_id, {}).setdefault(
+                item.item_id, [Decimal('0'), item.unit_cost or Decimal('0')]
             )
-            
-            po = await PurchaseOrderService.create_purchase_order(
-                db, company_id, po_data, user_id
-            )
-            purchase_orders.append(po)
+            totals[0] += item.suggested_order_quantity
+        
+        # Quantity already on open purchase orders is not ordered again
+        on_order = await reorder_planner.open_po_quantities(db, company_id)
+        
+        po_requests = []
+        for po_vendor_id, items in vendor_items.items():
+            po_lines = [
+                PurchaseOrderLineCreate(
+                    item_id=item_id,
+                    quantity_ordered=quantity - on_order.get(item_id, Decimal('0')),
+                    unit_cost=unit_cost
+                )
+                for item_id, (quantity, unit_cost) in items.items()
+                if quantity > on_order.get(item_id, Decimal('0'))
+            ]
+            if po_lines:
+                po_requests.append(PurchaseOrderCreate(
+                    vendor_id=po_vendor_id,
+                    po_date=date.today(),
+                    memo="Auto-generated for reorder",
+                    lines=po_lines
+                ))
+        
+        if not po_requests:
+            return []
+        
+        # All purchase orders are created in one transaction
+        po_numbers = await PurchaseOrderService._generate_po_numbers(db, company_id, len(po_requests))
+        purchase_order_ids = []
+        for po_number, po_data in zip(po_numbers, po_requests):
+            purchase_order = PurchaseOrderService._add_purchase_order(db, company_id, po_number, po_data, user_id)
+            purchase_order_ids.append(purchase_order.purchase_order_id)
+        await db.commit()
+        
+        result = await db.execute(
+            select(PurchaseOrder).where(
+                PurchaseOrder.purchase_order_id.in_(purchase_order_ids)
+            ).order_by(PurchaseOrder.po_number).execution_options(populate_existing=True)
+        )
+        purchase_orders = list(result.scalars().all())
         
         logger.info("Auto-generated purchase orders", 
                    count=len(purchase_orders),
@@ -1452,10 +1997,15 @@ class InventoryAssemblyService(BaseInventoryService):
     @staticmethod
     async def create_assembly(
         db: AsyncSession,
+        company_id: str,
         assembly_data: InventoryAssemblyCreate
     ) -> InventoryAssembly:
         """Create a new inventory assembly"""
         
+        await bom_service.check_component(
+            db, company_id, assembly_data.assembly_item_id, assembly_data.component_item_id
+        )
+        
         assembly = InventoryAssembly(
             assembly_id=str(uuid.uuid4()),
             **assembly_data.dict()
@@ -1468,6 +2018,8 @@ class InventoryAssemblyService(BaseInventoryService):
         logger.info("Inventory assembly created", 
                    assembly_id=assembly.assembly_id)
         
+        return assembly
+    
     @staticmethod
     async def get_assemblies(
         db: AsyncSession,
@@ -1534,6 +2086,11 @@ class InventoryAssemblyService(BaseInventoryService):
         if not assembly:
             return None
         
+        if assembly_data.is_active and not assembly.is_active:
+            await bom_service.check_component(
+                db, company_id, assembly.assembly_item_id, assembly.component_item_id
+            )
+        
         # Update fields
         for field, value in assembly_data.dict(exclude_unset=True).items():
             setattr(assembly, field, value)
@@ -1546,6 +2103,21 @@ class InventoryAssemblyService(BaseInventoryService):
         
         return assembly
     
+    @staticmethod
+    async def get_assembly_requirements(
+        db: AsyncSession,
+        company_id: str,
+        assembly_item_id: str,
+        quantity: Decimal = Decimal('1')
+    ) -> List[Dict[str, Any]]:
+        """Flattened leaf component requirements for building a quantity of an assembly"""
+        
+        requirements = await bom_service.explode(db, company_id, [assembly_item_id])
+        return [
+            {**requirement.to_dict(), "quantity": requirement.quantity * quantity}
+            for requirement in requirements[assembly_item_id]
+        ]
+    
     @staticmethod
     async def build_assembly(
         db: AsyncSession,
@@ -1555,108 +2127,152 @@ class InventoryAssemblyService(BaseInventoryService):
     ) -> Dict[str, Any]:
         """Build an assembly item from components"""
         
-        # Get assembly components
-        result = await db.execute(
-            select(InventoryAssembly).where(
-                and_(
-                    InventoryAssembly.assembly_item_id == build_request.assembly_item_id,
-                    InventoryAssembly.is_active == True
-                )
-            ).order_by(InventoryAssembly.build_sequence)
-        )
-        assembly_components = result.scalars().all()
-        
-        if not assembly_components:
-            raise ValueError("No active components found for assembly")
-        
-        transactions = []
-        total_cost = Decimal('0')
-        
-        # Check component availability and calculate costs
-        for component in assembly_components:
-            required_qty = component.quantity_needed * build_request.quantity_to_build
+        builds = await InventoryAssemblyService.build_assemblies(db, company_id, [build_request], user_id)
+        return builds[0]
+    
+    @staticmethod
+    async def build_assemblies(
+        db: AsyncSession,
+        company_id: str,
+        build_requests: List[AssemblyBuildRequest],
+        user_id: str
+    ) -> List[Dict[str, Any]]:
+        """Build several assemblies at once from their multi-level component requirements.
+        
+        Every build is checked against the locked component stock before any
+        stock moves, so a shortage in one build fails the whole request.
+        """
+        
+        requirements = await bom_service.explode(db, company_id, [request.assembly_item_id for request in build_requests])
+        cost_method = await inventory_costing.get_cost_method(db, company_id)
+        
+        async with stock_movements.writer(db):
+            # Lock every component and assembled item in one query
+            keys = []
+            for request in build_requests:
+                keys.extend((requirement.item_id, request.location_id) for requirement in requirements[request.assembly_item_id])
+                keys.append((request.assembly_item_id, request.location_id))
+            item_locations = await stock_movements.lock_item_locations(db, company_id, keys)
+            available = {
+                item_location.item_location_id: item_location.quantity_on_hand
+                for item_location in item_locations.values()
+            }
             
-            # Get component inventory
-            component_location = await InventoryAdjustmentService._get_or_create_item_location(
-                db, component.component_item_id, build_request.location_id, company_id
-            )
+            # Check component availability for all builds
+            plans = []
+            shortages = []
+            for request in build_requests:
+                picks = []
+                for requirement in requirements[request.assembly_item_id]:
+                    required_qty = requirement.quantity * request.quantity_to_build
+                    item_location = item_locations[(requirement.item_id, request.location_id)]
+                    if available[item_location.item_location_id] >= required_qty:
+                        available[item_location.item_location_id] -= required_qty
+                        picks.append((requirement, required_qty))
+                    elif not requirement.is_optional:
+                        shortages.append(requirement.item_id)
+                plans.append(picks)
+            
+            if shortages:
+                raise ValueError(f"Insufficient quantity for components {', '.join(dict.fromkeys(shortages))}")
             
-            if component_location.quantity_on_hand < required_qty and not component.is_optional:
-                raise ValueError(f"Insufficient quantity for component {component.component_item_id}")
+            # Cost the consumed components from their layers
+            deltas = []
+            builds = []
+            for request, picks in zip(build_requests, plans):
+                consumed = []
+                total_cost = Decimal('0')
+                for requirement, required_qty in picks:
+                    item_location = item_locations[(requirement.item_id, request.location_id)]
+                    consumption = await inventory_costing.consume(
+                        db, company_id, requirement.item_id, item_location.location_id, required_qty,
+                        cost_method=cost_method,
+                        average_cost=item_location.average_cost or requirement.unit_cost
+                    )
+                    deltas.append(StockDelta(requirement.item_id, request.location_id, -required_qty, -consumption.total_cost))
+                    consumed.append((requirement, required_qty, consumption))
+                    total_cost += consumption.total_cost
+                
+                deltas.append(StockDelta(request.assembly_item_id, request.location_id, request.quantity_to_build, total_cost))
+                builds.append((request, consumed, total_cost))
             
-            # Create transaction for component consumption
-            if component_location.quantity_on_hand >= required_qty:
-                transaction = InventoryTransaction(
-                    inventory_transaction_id=str(uuid.uuid4()),
+            # Update component and assembly inventory in one statement
+            balances = iter(await stock_movements.apply(db, company_id, item_locations, deltas))
+            
+            transactions = []
+            results = []
+            for request, consumed, total_cost in builds:
+                build_transactions = []
+                for requirement, required_qty, consumption in consumed:
+                    balance_quantity, balance_value = next(balances)
+                    build_transactions.append(InventoryTransaction(
+                        inventory_transaction_id=new_ledger_id(),
+                        company_id=company_id,
+                        item_id=requirement.item_id,
+                        location_id=item_locations[(requirement.item_id, request.location_id)].location_id,
+                        transaction_type=InventoryTransactionType.ASSEMBLY,
+                        transaction_date=request.build_date,
+                        quantity_change=-required_qty,
+                        unit_cost=consumption.unit_cost,
+                        total_cost=-consumption.total_cost,
+                        balance_quantity=balance_quantity,
+                        balance_value=balance_value,
+                        cost_method=cost_method,
+                        reference_type="assembly_build",
+                        memo=request.memo,
+                        created_by=user_id
+                    ))
+                
+                assembly_location = item_locations[(request.assembly_item_id, request.location_id)]
+                balance_quantity, balance_value = next(balances)
+                assembly_transaction = InventoryTransaction(
+                    inventory_transaction_id=new_ledger_id(),
                     company_id=company_id,
-                    item_id=component.component_item_id,
-                    location_id=build_request.location_id,
+                    item_id=request.assembly_item_id,
+                    location_id=assembly_location.location_id,
                     transaction_type=InventoryTransactionType.ASSEMBLY,
-                    transaction_date=build_request.build_date,
-                    quantity_change=-required_qty,
-                    unit_cost=component.unit_cost,
-                    total_cost=-required_qty * component.unit_cost,
-                    balance_quantity=component_location.quantity_on_hand - required_qty,
-                    balance_value=component_location.total_value - (required_qty * component.unit_cost),
+                    transaction_date=request.build_date,
+                    quantity_change=request.quantity_to_build,
+                    unit_cost=(total_cost / request.quantity_to_build).quantize(Decimal('0.01')),
+                    total_cost=total_cost,
+                    balance_quantity=balance_quantity,
+                    balance_value=balance_value,
+                    cost_method=cost_method,
                     reference_type="assembly_build",
-                    memo=build_request.memo,
+                    memo=request.memo,
                     created_by=user_id
                 )
+                build_transactions.append(assembly_transaction)
                 
-                db.add(transaction)
-                transactions.append(transaction)
-                
-                # Update component inventory
-                component_location.quantity_on_hand -= required_qty
-                component_location.total_value -= required_qty * component.unit_cost
+                await inventory_costing.add_layer(
+                    db, company_id, request.assembly_item_id, assembly_location.location_id,
+                    request.quantity_to_build, assembly_transaction.unit_cost, request.build_date,
+                    source_transaction_id=assembly_transaction.inventory_transaction_id
+                )
                 
-                total_cost += required_qty * component.unit_cost
-        
-        # Create transaction for assembled item creation
-        assembly_location = await InventoryAdjustmentService._get_or_create_item_location(
-            db, build_request.assembly_item_id, build_request.location_id, company_id
-        )
-        
-        assembly_transaction = InventoryTransaction(
-            inventory_transaction_id=str(uuid.uuid4()),
-            company_id=company_id,
-            item_id=build_request.assembly_item_id,
-            location_id=build_request.location_id,
-            transaction_type=InventoryTransactionType.ASSEMBLY,
-            transaction_date=build_request.build_date,
-            quantity_change=build_request.quantity_to_build,
-            unit_cost=total_cost / build_request.quantity_to_build if build_request.quantity_to_build > 0 else Decimal('0'),
-            total_cost=total_cost,
-            balance_quantity=assembly_location.quantity_on_hand + build_request.quantity_to_build,
-            balance_value=assembly_location.total_value + total_cost,
-            reference_type="assembly_build",
-            memo=build_request.memo,
-            created_by=user_id
-        )
-        
-        db.add(assembly_transaction)
-        transactions.append(assembly_transaction)
-        
-        # Update assembly inventory
-        assembly_location.quantity_on_hand += build_request.quantity_to_build
-        assembly_location.total_value += total_cost
-        if assembly_location.quantity_on_hand > 0:
-            assembly_location.average_cost = assembly_location.total_value / assembly_location.quantity_on_hand
-        
-        await db.commit()
+                transactions.extend(build_transactions)
+                results.append({
+                    "build_id": str(uuid.uuid4()),
+                    "assembly_item_id": request.assembly_item_id,
+                    "quantity_built": request.quantity_to_build,
+                    "total_cost": total_cost,
+                    "build_date": request.build_date,
+                    "status": "completed",
+                    "memo": request.memo,
+                    "transactions": build_transactions
+                })
+            
+            # Movement rows are written together at flush
+            db.add_all(transactions)
+            await inventory_ledger.record(db, company_id, transactions)
+            await InventoryService.mark_snapshot_stale(db, company_id)
+            await inventory_checkpoints.invalidate(db, company_id, min(request.build_date for request in build_requests))
+            
+            await db.commit()
         
-        logger.info("Assembly built", 
-                   assembly_item_id=build_request.assembly_item_id,
-                   quantity=build_request.quantity_to_build,
-                   total_cost=total_cost)
+        logger.info("Assemblies built", 
+                   builds=len(build_requests),
+                   transactions=len(transactions),
+                   total_cost=sum(result["total_cost"] for result in results))
         
-        return {
-            "build_id": str(uuid.uuid4()),
-            "assembly_item_id": build_request.assembly_item_id,
-            "quantity_built": build_request.quantity_to_build,
-            "total_cost": total_cost,
-            "build_date": build_request.build_date,
-            "status": "completed",
-            "memo": build_request.memo,
-            "transactions": transactions
-        }
\ No newline at end of file
+        return results
@@ -4,6 +4,7 @@ from sqlalchemy.orm import selectinload
 from typing import List, Optional, Tuple, Dict, Any
 from models.list_management import Account, Customer, Vendor, Item, Employee
 from models.user import Company
+from models.inventory import InventoryLowStock
 from schemas.list_management_schemas import (
     AccountCreate, AccountUpdate, AccountSearchFilters,
     CustomerCreate, CustomerUpdate, CustomerSearchFilters,
@@ -14,53 +15,18 @@ from schemas.list_management_schemas import (
 import uuid
 import structlog
 from datetime import datetime
-from typing import Dict, Tuple
-import time
+from services.access_control_service import access_control
 
 logger = structlog.get_logger()
 
 class BaseListService:
     """Base service class for list management operations"""
     
-    # Class-level cache for company access verification
-    _company_access_cache: Dict[Tuple[str, str], Tuple[bool, float]] = {}
-    _cache_ttl = 300  # 5 minutes TTL for cache
-    
     @classmethod
     async def verify_company_access(cls, db: AsyncSession, user_id: str, company_id: str) -> bool:
-        """Verify user has access to company with caching"""
+        """Verify user has access to company via the shared access control cache"""
         try:
-            # Check cache first
-            cache_key = (user_id, company_id)
-            current_time = time.time()
-            
-            if cache_key in cls._company_access_cache:
-                cached_result, cached_time = cls._company_access_cache[cache_key]
-                if current_time - cached_time < cls._cache_ttl:
-                    logger.debug("Company access verification served from cache", user_id=user_id, company_id=company_id)
-                    return cached_result
-            
-            # Cache miss or expired, query database
-            from models.user import CompanyMembership
-            
-            result = await db.execute(
-                select(CompanyMembership).where(
-                    and_(
-                        CompanyMembership.user_id == user_id,
-                        CompanyMembership.company_id == company_id,
-                        CompanyMembership.is_active == True
-                    )
-                )
-            )
-            membership = result.scalar_one_or_none()
-            has_access = membership is not None
-            
-            # Cache the result
-            cls._company_access_cache[cache_key] = (has_access, current_time)
-            
-            logger.debug("Company access verification queried and cached", user_id=user_id, company_id=company_id, has_access=has_access)
-            return has_access
-            
+            return await access_control.has_company_access(db, user_id, company_id)
         except Exception as e:
             logger.error("Error verifying company access", error=str(e), user_id=user_id, company_id=company_id)
             return False
@@ -761,15 +727,15 @@ class ItemService(BaseListService):
         db: AsyncSession,
         company_id: str
     ) -> List[Item]:
-        """Get items with low stock"""
+        """Get items at or below their reorder point at any location"""
         result = await db.execute(
             select(Item).where(
                 and_(
                     Item.company_id == company_id,
                     Item.is_active == True,
-                    Item.quantity_on_hand.isnot(None),
-                    Item.reorder_point.isnot(None),
-                    Item.quantity_on_hand <= Item.reorder_point
+                    Item.item_id.in_(
+                        select(InventoryLowStock.item_id).where(InventoryLowStock.company_id == company_id)
+                    )
                 )
             ).order_by(Item.item_name)
         )
@@ -0,0 +1,371 @@
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+from decimal import Decimal
+from itertools import groupby
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, and_, or_, event, literal, inspect
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from models.inventory import ItemLocation, InventoryLocation, InventoryLowStock
+from models.list_management import Item
+from models.notification import Notification, NotificationPreference, NotificationType, Priority
+from models.user import Company, CompanyMembership, UserRole
+from services.notification_service import WebhookService
+from database.connection import AsyncSessionLocal
+import asyncio
+import os
+import time
+import uuid
+import structlog
+
+logger = structlog.get_logger()
+
+LOW_STOCK_EVENT = "inventory.low_stock"
+
+# Company members told when stock crosses its reorder point
+ALERT_ROLES = (UserRole.ADMIN, UserRole.MANAGER)
+
+# Session info key set while a transaction has added item-locations to the set
+_PENDING_KEY = "low_stock_alerts_pending"
+
+
+def is_low_stock(quantity: Optional[Decimal], reorder_point: Optional[Decimal]) -> bool:
+    """Whether an item-location is at or below a reorder point it has set"""
+    reorder_point = reorder_point or Decimal('0')
+    return reorder_point > 0 and (quantity or Decimal('0')) <= reorder_point
+
+
+class LowStockAlertService:
+    """Maintained set of item-locations at or below their reorder point.
+
+    Stock movements keep the set current in the transaction that moves the
+    stock, and item-locations whose reorder point or quantity are changed
+    through the ORM are tracked when they are flushed, so low-stock reports
+    read the set by index instead of scanning every item-location. A row that
+    has not been alerted yet is a pending alert: once the transaction that
+    added it commits, the alert loop is woken to notify the company's admins
+    and managers and send the inventory.low_stock webhook. Transactions that
+    roll back leave nothing to alert. The loop also runs on an interval to
+    pick up rows committed by other processes, and periodically rebuilds
+    every company's set to catch rows changed by bulk SQL.
+    """
+
+    def __init__(self):
+        self.interval_seconds = int(os.getenv("LOW_STOCK_ALERT_INTERVAL_SECONDS", "60"))
+        self.batch_size = int(os.getenv("LOW_STOCK_ALERT_BATCH_SIZE", "500"))
+        self.reconcile_interval_seconds = int(os.getenv("LOW_STOCK_RECONCILE_INTERVAL_SECONDS", "3600"))
+        self._reconciled_at: Optional[float] = None
+        self._wakeup = asyncio.Event()
+        self._task = None
+        event.listen(Session, "after_flush", self._after_flush)
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+    def _after_flush(self, session: Session, flush_context) -> None:
+        # Stock movements refresh their rows without history, so only other ORM writes show up here
+        changed = [
+            instance for instance in list(session.new) + list(session.dirty)
+            if isinstance(instance, ItemLocation) and (
+                instance in session.new
+                or inspect(instance).attrs.reorder_point.history.has_changes()
+                or inspect(instance).attrs.quantity_on_hand.history.has_changes()
+            )
+        ]
+        if not changed:
+            return
+
+        connection = session.connection()
+        company_ids = dict(connection.execute(
+            select(Item.item_id, Item.company_id).where(
+                Item.item_id.in_({item_location.item_id for item_location in changed})
+            )
+        ).all())
+        rows = [
+            self._set_row(company_ids[item_location.item_id], item_location)
+            for item_location in changed
+            if item_location.item_id in company_ids
+            and is_low_stock(item_location.quantity_on_hand, item_location.reorder_point)
+        ]
+        restocked = [
+            item_location.item_location_id for item_location in changed
+            if item_location not in session.new
+            and not is_low_stock(item_location.quantity_on_hand, item_location.reorder_point)
+        ]
+        if restocked:
+            connection.execute(self._remove(restocked))
+        if rows and connection.execute(self._add(connection.dialect.name, rows)).rowcount:
+            session.info[_PENDING_KEY] = True
+
+    def _after_commit(self, session: Session) -> None:
+        if session.info.pop(_PENDING_KEY, False):
+            self._wakeup.set()
+
+    @staticmethod
+    def _after_rollback(session: Session) -> None:
+        session.info.pop(_PENDING_KEY, None)
+
+    def start(self) -> None:
+        """Start the low-stock alert loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Low-stock alerts started", interval_seconds=self.interval_seconds)
+
+    async def stop(self) -> None:
+        """Stop the low-stock alert loop"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._reconciled_at is None or time.monotonic() - self._reconciled_at >= self.reconcile_interval_seconds:
+                self._reconciled_at = time.monotonic()
+                await self.reconcile()
+            try:
+                async with AsyncSessionLocal() as db:
+                    while await self.run_once(db) >= self.batch_size:
+                        pass
+            except Exception as e:
+                logger.error("Low-stock alerts failed", error=str(e))
+
+    @staticmethod
+    def _set_row(company_id: str, item_location: ItemLocation) -> Dict[str, Any]:
+        return {
+            "item_location_id": item_location.item_location_id,
+            "company_id": company_id,
+            "item_id": item_location.item_id,
+            "location_id": item_location.location_id,
+            "below_since": datetime.utcnow()
+        }
+
+    @staticmethod
+    def _add(dialect_name: str, rows: List[Dict[str, Any]]):
+        # Rows already in the set keep the time they went low and their alert
+        insert = postgresql_insert if dialect_name == "postgresql" else sqlite_insert
+        return insert(InventoryLowStock).values(rows).on_conflict_do_nothing(index_elements=["item_location_id"])
+
+    @staticmethod
+    def _remove(item_location_ids: List[str]):
+        return delete(InventoryLowStock).where(
+            InventoryLowStock.item_location_id.in_(item_location_ids)
+        ).execution_options(synchronize_session=False)
+
+    async def track(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        low: List[ItemLocation],
+        restocked: List[str]
+    ) -> None:
+        """Record the item-locations a movement left at or below, or above, their reorder point"""
+        if restocked:
+            await db.execute(self._remove(restocked))
+        if not low:
+            return
+
+        result = await db.execute(
+            self._add(db.get_bind().dialect.name, [self._set_row(company_id, item_location) for item_location in low])
+        )
+        if result.rowcount:
+            db.sync_session.info[_PENDING_KEY] = True
+            logger.info("Item-locations crossed their reorder point", company_id=company_id, count=result.rowcount)
+
+    async def refresh(self, db: AsyncSession, company_id: str, alert: bool = False) -> Dict[str, int]:
+        """Rebuild a company's set from the item-locations; new rows are alerted only if asked"""
+        low_stock = and_(
+            Item.company_id == company_id,
+            ItemLocation.reorder_point > 0,
+            ItemLocation.quantity_on_hand <= ItemLocation.reorder_point
+        )
+        removed = await db.execute(
+            delete(InventoryLowStock).where(
+                and_(
+                    InventoryLowStock.company_id == company_id,
+                    InventoryLowStock.item_location_id.notin_(
+                        select(ItemLocation.item_location_id).join(
+                            Item, ItemLocation.item_id == Item.item_id
+                        ).where(low_stock)
+                    )
+                )
+            ).execution_options(synchronize_session=False)
+        )
+
+        now = datetime.utcnow()
+        missing = select(
+            ItemLocation.item_location_id,
+            literal(company_id),
+            ItemLocation.item_id,
+            ItemLocation.location_id,
+            literal(now),
+            literal(None if alert else now)
+        ).join(
+            Item, ItemLocation.item_id == Item.item_id
+        ).where(
+            and_(
+                low_stock,
+                ItemLocation.item_location_id.notin_(select(InventoryLowStock.item_location_id))
+            )
+        )
+        added = await db.execute(
+            InventoryLowStock.__table__.insert().from_select(
+                ["item_location_id", "company_id", "item_id", "location_id", "below_since", "alerted_at"],
+                missing
+            )
+        )
+        if alert and added.rowcount:
+            db.sync_session.info[_PENDING_KEY] = True
+
+        return {"added": added.rowcount or 0, "removed": removed.rowcount or 0}
+
+    async def reconcile(self) -> int:
+        """Rebuild every company's set, alerting item-locations it had missed; returns how many companies changed"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Company.company_id))
+            company_ids = list(result.scalars().all())
+
+        changed = 0
+        for company_id in company_ids:
+            try:
+                async with AsyncSessionLocal() as db:
+                    counts = await self.refresh(db, company_id, alert=True)
+                    await db.commit()
+            except Exception as e:
+                logger.error("Low-stock reconcile failed", company_id=company_id, error=str(e))
+                continue
+            if counts["added"] or counts["removed"]:
+                logger.info("Low-stock set reconciled", company_id=company_id, **counts)
+                changed += 1
+        return changed
+
+    async def run_once(self, db: AsyncSession) -> int:
+        """Alert a batch of item-locations that crossed their reorder point; returns how many"""
+        result = await db.execute(
+            select(InventoryLowStock, ItemLocation, Item, InventoryLocation).join(
+                ItemLocation, InventoryLowStock.item_location_id == ItemLocation.item_location_id
+            ).join(
+                Item, InventoryLowStock.item_id == Item.item_id
+            ).join(
+                InventoryLocation, InventoryLowStock.location_id == InventoryLocation.location_id
+            ).where(
+                InventoryLowStock.alerted_at.is_(None)
+            ).order_by(
+                InventoryLowStock.company_id, InventoryLowStock.below_since
+            ).limit(self.batch_size).with_for_update(of=InventoryLowStock, skip_locked=True)
+        )
+        rows = result.all()
+        if not rows:
+            return 0
+
+        now = datetime.utcnow()
+        events = {}
+        for company_id, company_rows in groupby(rows, key=lambda row: row.InventoryLowStock.company_id):
+            company_rows = list(company_rows)
+            alerts = []
+            for row in company_rows:
+                row.InventoryLowStock.alerted_at = now
+                if row.Item.is_active:
+                    alerts.append(self._alert(row))
+            if not alerts:
+                continue
+            for user_id in await self._recipients(db, company_id):
+                db.add(self._notification(company_id, user_id, alerts))
+            events[company_id] = alerts
+        await db.commit()
+
+        for company_id, alerts in events.items():
+            try:
+                await WebhookService.send_webhook_event(db, company_id, LOW_STOCK_EVENT, {"items": alerts})
+            except Exception as e:
+                logger.error("Low-stock webhook failed", company_id=company_id, error=str(e))
+        # Webhook delivery updates the subscriptions' health
+        await db.commit()
+
+        logger.info("Low-stock alerts sent", item_locations=len(rows), companies=len(events))
+        return len(rows)
+
+    @staticmethod
+    def _alert(row) -> Dict[str, Any]:
+        item_location = row.ItemLocation
+        return {
+            "item_id": row.Item.item_id,
+            "item_name": row.Item.item_name,
+            "item_number": row.Item.item_number,
+            "location_id": row.InventoryLocation.location_id,
+            "location_name": row.InventoryLocation.location_name,
+            "current_quantity": float(item_location.quantity_on_hand or 0),
+            "reorder_point": float(item_location.reorder_point or 0),
+            "below_since": row.InventoryLowStock.below_since.isoformat(),
+            "status": "critical" if (item_location.quantity_on_hand or 0) <= 0 else "low"
+        }
+
+    @staticmethod
+    async def _recipients(db: AsyncSession, company_id: str) -> List[str]:
+        """Active admins and managers who have not turned off in-app inventory notifications"""
+        result = await db.execute(
+            select(CompanyMembership.user_id).outerjoin(
+                NotificationPreference,
+                and_(
+                    NotificationPreference.user_id == CompanyMembership.user_id,
+                    NotificationPreference.company_id == company_id,
+                    NotificationPreference.notification_type == NotificationType.INVENTORY
+                )
+            ).where(
+                and_(
+                    CompanyMembership.company_id == company_id,
+                    CompanyMembership.is_active == True,
+                    CompanyMembership.role.in_(ALERT_ROLES),
+                    or_(
+                        NotificationPreference.preference_id.is_(None),
+                        and_(
+                            NotificationPreference.in_app_enabled == True,
+                            NotificationPreference.frequency != "never"
+                        )
+                    )
+                )
+            ).distinct()
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    def _notification(company_id: str, user_id: str, alerts: List[Dict[str, Any]]) -> Notification:
+        if len(alerts) == 1:
+            alert = alerts[0]
+            title = f"Low stock: {alert['item_name']}"
+            message = (
+                f"{alert['item_name']} at {alert['location_name']} is down to "
+                f"{alert['current_quantity']:g} (reorder point {alert['reorder_point']:g})"
+            )
+        else:
+            title = f"{len(alerts)} items are at or below their reorder point"
+            message = ", ".join(
+                f"{alert['item_name']} at {alert['location_name']}" for alert in alerts[:5]
+            )
+            if len(alerts) > 5:
+                message += f" and {len(alerts) - 5} more"
+
+        return Notification(
+            notification_id=str(uuid.uuid4()),
+            company_id=company_id,
+            user_id=user_id,
+            notification_type=NotificationType.INVENTORY,
+            title=title,
+            message=message,
+            data={"items": alerts},
+            priority=Priority.URGENT if any(alert["status"] == "critical" for alert in alerts) else Priority.HIGH,
+            action_url=f"/companies/{company_id}/inventory/low-stock"
+        )
+
+
+# Global low-stock alert service instance
+low_stock_alerts = LowStockAlertService()
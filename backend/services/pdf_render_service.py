@@ -0,0 +1,206 @@
+from typing import Dict, Any, Optional
+from datetime import date
+from pathlib import Path
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, func
+from sqlalchemy.orm import selectinload
+from models.transactions import Transaction, TransactionType
+from models.user import Company
+from services.export_worker_pool import export_workers
+from services.export_artifact_service import export_artifacts, ExportArtifact
+from services.pdf_render_worker import render_invoice_pdf, render_invoice_batch, build_zip_archive
+import calendar
+import math
+import os
+import re
+import shutil
+import tempfile
+import structlog
+
+logger = structlog.get_logger()
+
+# Data an invoice PDF is rendered from, besides the company's branding
+INVOICE_SOURCES = ("transactions", "transaction_lines", "customers")
+
+
+class PdfRenderService:
+    """Invoice PDF rendering through the export worker pool"""
+
+    def __init__(self):
+        self.page_size = os.getenv("INVOICE_PDF_PAGE_SIZE", "letter")
+
+    @staticmethod
+    def company_branding(company: Company) -> Dict[str, Any]:
+        """Branding fields that determine a company's compiled PDF resources"""
+        return {
+            "company_name": company.company_name,
+            "address_line1": company.address_line1,
+            "address_line2": company.address_line2,
+            "city": company.city,
+            "state": company.state,
+            "zip_code": company.zip_code,
+            "country": company.country,
+            "phone": company.phone,
+            "email": company.email,
+            "website": company.website
+        }
+
+    @staticmethod
+    def invoice_payload(invoice: Transaction) -> Dict[str, Any]:
+        """Plain invoice data for a worker process"""
+        customer = invoice.customer
+        billing_address = invoice.billing_address
+        if not billing_address and customer:
+            billing_address = {
+                "address_line1": customer.address_line1,
+                "address_line2": customer.address_line2,
+                "city": customer.city,
+                "state": customer.state,
+                "zip_code": customer.zip_code,
+                "country": customer.country
+            }
+
+        return {
+            "transaction_id": invoice.transaction_id,
+            "transaction_number": invoice.transaction_number,
+            "transaction_date": invoice.transaction_date,
+            "due_date": invoice.due_date,
+            "payment_terms": invoice.payment_terms,
+            "customer_name": customer.customer_name if customer else None,
+            "billing_address": billing_address,
+            "memo": invoice.memo,
+            "subtotal": invoice.subtotal,
+            "tax_amount": invoice.tax_amount,
+            "total_amount": invoice.total_amount,
+            "balance_due": invoice.balance_due,
+            "lines": [
+                {
+                    "description": line.description,
+                    "quantity": line.quantity,
+                    "unit_price": line.unit_price,
+                    "line_total": line.line_total
+                }
+                for line in sorted(invoice.lines, key=lambda line: line.line_number or 0)
+            ]
+        }
+
+    @staticmethod
+    def _sanitize(value: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_.-]', '_', value)
+
+    async def render_invoice(self, db: AsyncSession, company: Company, invoice: Transaction) -> ExportArtifact:
+        """Render one invoice to PDF, reusing the stored file while nothing changed"""
+        filename = f"invoice_{self._sanitize(invoice.transaction_number or invoice.transaction_id)}.pdf"
+        branding = self.company_branding(company)
+        data_version = await export_artifacts.data_version(db, company.company_id, INVOICE_SOURCES)
+
+        async def render(filepath: Path) -> None:
+            payload = {
+                "company_id": company.company_id,
+                "branding": branding,
+                "page_size": self.page_size,
+                "invoice": self.invoice_payload(invoice)
+            }
+            await export_workers.run(
+                company.company_id, filename, render_invoice_pdf, str(filepath), payload, total_rows=1
+            )
+
+        artifact, reused = await export_artifacts.get_or_create(
+            company.company_id,
+            f"invoice:{invoice.transaction_id}",
+            {"branding": branding, "page_size": self.page_size, "updated_at": invoice.updated_at},
+            data_version,
+            "pdf",
+            filename,
+            render,
+            kind="invoice"
+        )
+
+        logger.info("Invoice PDF generated", invoice_id=invoice.transaction_id,
+                    file_size=artifact.file_size, reused=reused)
+        return artifact
+
+    async def render_month_archive(
+        self,
+        db: AsyncSession,
+        company: Company,
+        year: int,
+        month: int
+    ) -> Optional[ExportArtifact]:
+        """Render a month's invoices in parallel into one zip archive, or None if there are none"""
+        start = date(year, month, 1)
+        end = date(year, month, calendar.monthrange(year, month)[1])
+        branding = self.company_branding(company)
+        filename = f"invoices_{year:04d}_{month:02d}.zip"
+        data_version = await export_artifacts.data_version(db, company.company_id, INVOICE_SOURCES)
+
+        month_filter = and_(
+            Transaction.company_id == company.company_id,
+            Transaction.transaction_type == TransactionType.INVOICE,
+            Transaction.transaction_date >= start,
+            Transaction.transaction_date <= end,
+            Transaction.is_void == False
+        )
+        count_result = await db.execute(select(func.count(Transaction.transaction_id)).where(month_filter))
+        invoice_count = count_result.scalar()
+        if not invoice_count:
+            return None
+
+        async def render(archive_path: Path) -> None:
+            result = await db.execute(
+                select(Transaction).where(month_filter).options(
+                    selectinload(Transaction.lines),
+                    selectinload(Transaction.customer)
+                ).order_by(Transaction.transaction_date, Transaction.transaction_number)
+            )
+            invoices = [self.invoice_payload(invoice) for invoice in result.scalars().all()]
+
+            # One chunk per worker so each process compiles the company's resources once
+            chunk_size = math.ceil(len(invoices) / export_workers.max_workers)
+            staging_dir = tempfile.mkdtemp(prefix=".invoice_batch_", dir=str(archive_path.parent))
+            try:
+                chunks = [
+                    (staging_dir, {
+                        "company_id": company.company_id,
+                        "branding": branding,
+                        "page_size": self.page_size,
+                        "invoices": invoices[start_index:start_index + chunk_size]
+                    })
+                    for start_index in range(0, len(invoices), chunk_size)
+                ]
+                rendered = await export_workers.run_many(
+                    company.company_id, filename, render_invoice_batch, chunks, total_rows=len(invoices)
+                )
+                filepaths = [filepath for paths in rendered for filepath in paths]
+
+                await export_workers.run(
+                    company.company_id, filename, build_zip_archive, str(archive_path), filepaths,
+                    total_rows=len(filepaths)
+                )
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
+        artifact, reused = await export_artifacts.get_or_create(
+            company.company_id,
+            "invoice_archive",
+            {"year": year, "month": month, "branding": branding, "page_size": self.page_size},
+            data_version,
+            "zip",
+            filename,
+            render,
+            kind="invoice"
+        )
+
+        logger.info(
+            "Invoice archive generated",
+            company_id=company.company_id,
+            period=f"{year:04d}-{month:02d}",
+            invoice_count=invoice_count,
+            file_size=artifact.file_size,
+            reused=reused
+        )
+        return artifact
+
+
+# Global PDF render service instance
+pdf_render_service = PdfRenderService()
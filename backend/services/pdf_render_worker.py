@@ -0,0 +1,390 @@
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Callable, Tuple
+import hashlib
+import json
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from reportlab.lib.pagesizes import letter, A4, legal, landscape
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import BaseDocTemplate, PageTemplate, Frame, Paragraph, Spacer, Table, TableStyle
+
+# Renderers run in export worker processes. Fonts are registered once per
+# process and styles, table styles and page layouts are compiled once per
+# company branding, then reused for every document the process renders.
+MAX_CACHED_COMPANIES = 64
+PAGE_SIZES = {
+    "letter": letter,
+    "a4": A4,
+    "legal": legal
+}
+MARGIN = 0.75 * inch
+
+_fonts: Optional[Tuple[str, str]] = None
+_resources: "OrderedDict[str, PdfResources]" = OrderedDict()
+
+
+def _register_fonts() -> Tuple[str, str]:
+    """Register configured TrueType fonts once per process"""
+    global _fonts
+    if _fonts is None:
+        regular_path = os.getenv("PDF_FONT_PATH")
+        bold_path = os.getenv("PDF_BOLD_FONT_PATH") or regular_path
+        if regular_path:
+            pdfmetrics.registerFont(TTFont("ReportFont", regular_path))
+            pdfmetrics.registerFont(TTFont("ReportFont-Bold", bold_path))
+            _fonts = ("ReportFont", "ReportFont-Bold")
+        else:
+            _fonts = ("Helvetica", "Helvetica-Bold")
+    return _fonts
+
+
+class PdfResources:
+    """Styles and page layouts compiled for one company's branding"""
+
+    def __init__(self, branding: Dict[str, Any]):
+        self.font, self.bold_font = _register_fonts()
+        self.branding = branding
+        base = getSampleStyleSheet()
+
+        self.title = ParagraphStyle('ReportTitle', parent=base['Title'], fontName=self.bold_font,
+                                    fontSize=16, alignment=TA_CENTER, spaceAfter=12)
+        self.normal = ParagraphStyle('ReportNormal', parent=base['Normal'], fontName=self.font)
+        self.heading = ParagraphStyle('ReportHeading', parent=base['Heading2'], fontName=self.bold_font)
+        self.bold = ParagraphStyle('ReportBold', parent=self.normal, fontName=self.bold_font)
+        self.invoice_title = ParagraphStyle('InvoiceTitle', parent=self.heading, fontSize=20, alignment=TA_RIGHT)
+
+        self.data_table = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, -1), self.font),
+            ('FONTNAME', (0, 0), (-1, 0), self.bold_font),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+        self.summary_table = TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, -1), self.font),
+            ('FONTNAME', (0, 0), (0, -1), self.bold_font),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+        self.financial_table = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, -1), self.font),
+            ('FONTNAME', (0, 0), (-1, 0), self.bold_font),
+            ('FONTNAME', (0, -1), (-1, -1), self.bold_font),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+        self.grand_total_table = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, -1), self.bold_font),
+            ('FONTSIZE', (0, 0), (-1, -1), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+        self.invoice_lines_table = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#366092")),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('FONTNAME', (0, 0), (-1, -1), self.font),
+            ('FONTNAME', (0, 0), (-1, 0), self.bold_font),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+            ('LINEBELOW', (0, 0), (-1, -1), 0.25, colors.lightgrey),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP')
+        ])
+        self.invoice_totals_table = TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, -1), self.font),
+            ('FONTNAME', (0, -1), (-1, -1), self.bold_font),
+            ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black)
+        ])
+        self.plain_table = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), self.font),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP')
+        ])
+
+        self.footer_text = " | ".join(
+            str(part) for part in (branding.get("company_name"), branding.get("phone"),
+                                   branding.get("email"), branding.get("website"))
+            if part
+        )
+        self._layouts: Dict[Tuple[float, float], Tuple[Tuple[float, float, float, float], Callable]] = {}
+
+    def _draw_footer(self, canvas, doc) -> None:
+        canvas.saveState()
+        canvas.setFont(self.font, 8)
+        canvas.setFillColor(colors.grey)
+        canvas.drawString(MARGIN, 0.5 * inch, self.footer_text)
+        canvas.drawRightString(doc.pagesize[0] - MARGIN, 0.5 * inch, f"Page {doc.page}")
+        canvas.restoreState()
+
+    def document(self, filepath: str, pagesize: Tuple[float, float]) -> BaseDocTemplate:
+        """Create a document using the cached page layout for a page size"""
+        layout = self._layouts.get(pagesize)
+        if layout is None:
+            frame = (MARGIN, MARGIN, pagesize[0] - 2 * MARGIN, pagesize[1] - 2 * MARGIN)
+            layout = self._layouts[pagesize] = (frame, self._draw_footer)
+        (x, y, width, height), on_page = layout
+
+        doc = BaseDocTemplate(filepath, pagesize=pagesize, leftMargin=MARGIN, rightMargin=MARGIN,
+                              topMargin=MARGIN, bottomMargin=MARGIN)
+        # Frames carry per-build state, so only their geometry is cached
+        doc.addPageTemplates([PageTemplate(id="content", frames=[Frame(x, y, width, height, id="body")],
+                                           onPage=on_page)])
+        return doc
+
+
+def get_resources(company_id: str, branding: Dict[str, Any]) -> PdfResources:
+    """Get the compiled resources for a company, rebuilding when branding changes"""
+    digest = hashlib.sha1(json.dumps(branding, sort_keys=True, default=str).encode()).hexdigest()
+    key = f"{company_id}:{digest}"
+    resources = _resources.get(key)
+    if resources is None:
+        resources = _resources[key] = PdfResources(branding)
+        while len(_resources) > MAX_CACHED_COMPANIES:
+            _resources.popitem(last=False)
+    _resources.move_to_end(key)
+    return resources
+
+
+def _page_size(name: Optional[str], orientation: Optional[str]) -> Tuple[float, float]:
+    size = PAGE_SIZES.get((name or "letter").lower(), letter)
+    if orientation == "landscape":
+        size = landscape(size)
+    return tuple(size)
+
+
+def _money(value: Any) -> str:
+    if value is None or value == "":
+        return ""
+    return f"${value:,.2f}"
+
+
+def _format_date(value: Any) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%B %d, %Y")
+    return str(value or "")
+
+
+def _text(value: Any) -> str:
+    """Escape free text for Paragraph markup"""
+    return escape(str(value or ""))
+
+
+def _report_progress(progress, rows_written: int) -> None:
+    if progress is not None:
+        progress.put(rows_written)
+
+
+def render_report_pdf(filepath: str, payload: Dict[str, Any], progress=None) -> int:
+    """Render a tabular report PDF and return its size in bytes"""
+    res = get_resources(payload["company_id"], payload["branding"])
+    doc = res.document(filepath, _page_size(payload.get("page_size"), payload.get("page_orientation")))
+
+    story = [
+        Paragraph(_text(payload["report_name"]), res.title),
+        Paragraph(_text(payload["company_name"]), res.normal),
+        Spacer(1, 12)
+    ]
+    generated_at = payload.get("generated_at")
+    if isinstance(generated_at, datetime):
+        story.append(Paragraph(f"Generated: {generated_at.strftime('%B %d, %Y at %I:%M %p')}", res.normal))
+        story.append(Spacer(1, 12))
+
+    rows = payload.get("data") or []
+    if rows:
+        headers = list(rows[0].keys())
+        table_data = [headers]
+        for row in rows:
+            table_data.append([
+                _money(value) if isinstance(value, Decimal) else str(value)
+                for value in (row.get(header, '') for header in headers)
+            ])
+        # repeatRows keeps the header on every page of long tables
+        table = Table(table_data, repeatRows=1)
+        table.setStyle(res.data_table)
+        story.append(table)
+
+    summary = payload.get("summary")
+    if payload.get("include_summary") and summary is not None:
+        story.append(Spacer(1, 12))
+        story.append(Paragraph("Summary", res.heading))
+        table_data = [
+            [key, _money(value) if isinstance(value, Decimal) else str(value)]
+            for key, value in summary.items()
+        ] or [["No summary data available", ""]]
+        table = Table(table_data)
+        table.setStyle(res.summary_table)
+        story.append(table)
+
+    doc.build(story)
+    _report_progress(progress, len(rows))
+    return os.path.getsize(filepath)
+
+
+def render_financial_pdf(filepath: str, payload: Dict[str, Any], progress=None) -> int:
+    """Render a sectioned financial statement PDF and return its size in bytes"""
+    res = get_resources(payload["company_id"], payload["branding"])
+    doc = res.document(filepath, _page_size(payload.get("page_size"), payload.get("page_orientation")))
+    financial = payload["financial_data"]
+    has_comparison = financial.get("comparison_date") is not None
+
+    story = [
+        Paragraph(_text(financial["report_name"]), res.title),
+        Paragraph(_text(financial["company_name"]), res.normal),
+        Paragraph(f"As of {_format_date(financial['report_date'])}", res.normal)
+    ]
+    if has_comparison:
+        story.append(Paragraph(f"Compared to {_format_date(financial['comparison_date'])}", res.normal))
+    story.append(Spacer(1, 20))
+
+    lines_written = 0
+    for section in financial["sections"]:
+        story.append(Paragraph(_text(section["section_name"]), res.heading))
+        if has_comparison:
+            table_data = [["Account", "Current", "Comparison", "Variance"]]
+            for line in section["lines"]:
+                table_data.append([
+                    line["account_name"],
+                    _money(line["amount"]),
+                    _money(line.get("comparison_amount")) if line.get("comparison_amount") else "",
+                    _money(line.get("variance_amount")) if line.get("variance_amount") else ""
+                ])
+            table_data.append([
+                f"Total {section['section_name']}",
+                _money(section["total_amount"]),
+                _money(section.get("comparison_total")) if section.get("comparison_total") else "",
+                ""
+            ])
+        else:
+            table_data = [["Account", "Amount"]]
+            for line in section["lines"]:
+                table_data.append([line["account_name"], _money(line["amount"])])
+            table_data.append([f"Total {section['section_name']}", _money(section["total_amount"])])
+        lines_written += len(section["lines"])
+
+        table = Table(table_data, repeatRows=1)
+        table.setStyle(res.financial_table)
+        story.append(table)
+        story.append(Spacer(1, 12))
+
+    if financial.get("grand_total") is not None:
+        story.append(Paragraph("Net Income" if "Profit" in financial["report_name"] else "Total Assets", res.heading))
+        table = Table([[financial["grand_total"]]])
+        table.setStyle(res.grand_total_table)
+        story.append(table)
+
+    doc.build(story)
+    _report_progress(progress, lines_written)
+    return os.path.getsize(filepath)
+
+
+def _address_lines(address: Optional[Dict[str, Any]]) -> List[str]:
+    if not address:
+        return []
+    city_line = " ".join(part for part in (
+        ", ".join(part for part in (address.get("city"), address.get("state")) if part),
+        address.get("zip_code")
+    ) if part)
+    return [line for line in (address.get("address_line1"), address.get("address_line2"),
+                              city_line, address.get("country")) if line]
+
+
+def _invoice_story(res: PdfResources, invoice: Dict[str, Any]) -> List[Any]:
+    branding = res.branding
+    company_block = [Paragraph(_text(branding.get("company_name")), res.bold)]
+    company_block += [Paragraph(_text(line), res.normal) for line in _address_lines(branding)]
+
+    header = Table([[company_block, Paragraph("INVOICE", res.invoice_title)]], colWidths=["60%", "40%"])
+    header.setStyle(res.plain_table)
+
+    bill_to = [Paragraph("Bill To", res.bold)]
+    bill_to += [Paragraph(_text(line), res.normal) for line in
+                [invoice.get("customer_name") or ""] + _address_lines(invoice.get("billing_address"))]
+    details = Table([
+        ["Invoice #", invoice.get("transaction_number") or ""],
+        ["Date", _format_date(invoice.get("transaction_date"))],
+        ["Due Date", _format_date(invoice.get("due_date"))],
+        ["Terms", invoice.get("payment_terms") or ""]
+    ])
+    details.setStyle(res.summary_table)
+    parties = Table([[bill_to, details]], colWidths=["55%", "45%"])
+    parties.setStyle(res.plain_table)
+
+    line_data = [["Description", "Qty", "Rate", "Amount"]]
+    for line in invoice.get("lines") or []:
+        quantity = line.get("quantity")
+        line_data.append([
+            Paragraph(_text(line.get("description")), res.normal),
+            f"{quantity.normalize():f}" if isinstance(quantity, Decimal) else str(quantity or ""),
+            _money(line.get("unit_price")),
+            _money(line.get("line_total"))
+        ])
+    lines_table = Table(line_data, colWidths=["52%", "12%", "18%", "18%"], repeatRows=1)
+    lines_table.setStyle(res.invoice_lines_table)
+
+    totals = Table([
+        ["Subtotal", _money(invoice.get("subtotal") or 0)],
+        ["Tax", _money(invoice.get("tax_amount") or 0)],
+        ["Total", _money(invoice.get("total_amount") or 0)],
+        ["Balance Due", _money(invoice.get("balance_due") if invoice.get("balance_due") is not None
+                               else invoice.get("total_amount") or 0)]
+    ], colWidths=[1.5 * inch, 1.5 * inch], hAlign="RIGHT")
+    totals.setStyle(res.invoice_totals_table)
+
+    story = [header, Spacer(1, 18), parties, Spacer(1, 18), lines_table, Spacer(1, 12), totals]
+    if invoice.get("memo"):
+        story += [Spacer(1, 18), Paragraph(_text(invoice["memo"]), res.normal)]
+    return story
+
+
+def render_invoice_pdf(filepath: str, payload: Dict[str, Any], progress=None) -> int:
+    """Render one invoice PDF and return its size in bytes"""
+    res = get_resources(payload["company_id"], payload["branding"])
+    doc = res.document(filepath, _page_size(payload.get("page_size"), None))
+    doc.build(_invoice_story(res, payload["invoice"]))
+    _report_progress(progress, 1)
+    return os.path.getsize(filepath)
+
+
+def render_invoice_batch(directory: str, payload: Dict[str, Any], progress=None) -> List[str]:
+    """Render a chunk of invoices into a directory and return the file paths"""
+    res = get_resources(payload["company_id"], payload["branding"])
+    pagesize = _page_size(payload.get("page_size"), None)
+
+    paths = []
+    for count, invoice in enumerate(payload["invoices"], 1):
+        # Invoice numbers need not be unique, so the transaction ID keeps entries apart
+        name = "_".join(str(part) for part in (invoice.get("transaction_number"), invoice["transaction_id"]) if part)
+        filepath = os.path.join(directory, f"invoice_{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}.pdf")
+        res.document(filepath, pagesize).build(_invoice_story(res, invoice))
+        paths.append(filepath)
+        _report_progress(progress, count)
+    return paths
+
+
+def build_zip_archive(archive_path: str, filepaths: List[str], progress=None) -> int:
+    """Bundle rendered files into a zip archive and return its size in bytes"""
+    # PDFs are already compressed, so entries are stored rather than deflated
+    with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for count, filepath in enumerate(filepaths, 1):
+            archive.write(filepath, arcname=os.path.basename(filepath))
+            _report_progress(progress, count)
+    return os.path.getsize(archive_path)
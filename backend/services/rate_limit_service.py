@@ -0,0 +1,346 @@
+from typing import Optional, Dict, Any, List, Tuple, Callable
+from fastapi import HTTPException, Request, status
+from database.connection import get_redis
+from collections import OrderedDict
+import functools
+import ipaddress
+import math
+import os
+import time
+import structlog
+
+logger = structlog.get_logger()
+
+_PERIODS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400
+}
+
+# Sliding-window counter evaluated atomically for every quota of a request.
+# KEYS come in (current, previous) window pairs and ARGV in matching
+# (elapsed_ms, limit, window_ms) triples.
+# Counters are only incremented when every quota allows the request.
+_SLIDING_WINDOW_LUA = """
+local quotas = #KEYS / 2
+local counts = {}
+local allowed = 1
+for i = 1, quotas do
+    local current = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+    local elapsed = tonumber(ARGV[3 * i - 2])
+    local limit = tonumber(ARGV[3 * i - 1])
+    local window = tonumber(ARGV[3 * i])
+    local estimate = previous * (window - elapsed) / window + current
+    if estimate + 1 > limit then
+        allowed = 0
+    end
+    counts[2 * i - 1] = current
+    counts[2 * i] = previous
+end
+if allowed == 1 then
+    for i = 1, quotas do
+        local window = tonumber(ARGV[3 * i])
+        redis.call('INCR', KEYS[2 * i - 1])
+        redis.call('PEXPIRE', KEYS[2 * i - 1], window * 2)
+        counts[2 * i - 1] = counts[2 * i - 1] + 1
+    end
+end
+table.insert(counts, 1, allowed)
+return counts
+"""
+
+
+class RateLimit:
+    """A quota of `limit` requests per `window` seconds"""
+
+    __slots__ = ("limit", "window")
+
+    def __init__(self, limit: int, window: int):
+        self.limit = limit
+        self.window = window
+
+    @classmethod
+    def parse(cls, spec: str) -> "RateLimit":
+        """Parse a spec such as "30/minute" or "10/second" """
+        count, _, period = spec.partition("/")
+        period = period.strip().lower().rstrip("s")
+        if period not in _PERIODS:
+            raise ValueError(f"Unknown rate limit period: {spec}")
+        return cls(int(count), _PERIODS[period])
+
+
+class RateLimitResult:
+    """Outcome of a rate limit check across one or more quotas"""
+
+    __slots__ = ("allowed", "limit", "remaining", "retry_after")
+
+    def __init__(self, allowed: bool, limit: int, remaining: int, retry_after: int):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining)
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+def _window_position(now: float, window: int) -> Tuple[int, float]:
+    """Return the index of the current fixed window and the seconds elapsed in it"""
+    index = int(now // window)
+    return index, now - index * window
+
+
+def _summarize(quotas: List[Tuple[str, RateLimit]], counts: List[Tuple[int, int]],
+               allowed: bool, now: float) -> RateLimitResult:
+    """Derive remaining quota and Retry-After from the window counters"""
+    tightest_limit = quotas[0][1].limit
+    tightest_remaining = None
+    retry_after = 0
+
+    for (_, quota), (current, previous) in zip(quotas, counts):
+        _, elapsed = _window_position(now, quota.window)
+        weight = (quota.window - elapsed) / quota.window
+        estimate = previous * weight + current
+        remaining = max(int(quota.limit - estimate), 0)
+        if tightest_remaining is None or remaining < tightest_remaining:
+            tightest_remaining = remaining
+            tightest_limit = quota.limit
+
+        if not allowed and estimate + 1 > quota.limit:
+            if current + 1 > quota.limit or previous == 0:
+                # The current window alone is full; wait for it to roll over
+                wait = quota.window - elapsed
+            else:
+                # Wait until the previous window's weight decays enough
+                wait = quota.window * (1 - (quota.limit - current - 1) / previous) - elapsed
+            retry_after = max(retry_after, math.ceil(max(wait, 1)))
+
+    return RateLimitResult(allowed, tightest_limit, tightest_remaining or 0, retry_after)
+
+
+class LocalRateLimitStore:
+    """In-process sliding-window counters.
+
+    Checks run without awaiting between read and increment, so they are
+    atomic with respect to the event loop and need no locks. Limits are
+    per worker process.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        # key -> (window index, current count, previous count, window seconds), least recently hit first
+        self._windows: "OrderedDict[str, Tuple[int, int, int, int]]" = OrderedDict()
+
+    def _counts(self, key: str, window: int, now: float) -> Tuple[int, int]:
+        index, _ = _window_position(now, window)
+        entry = self._windows.get(key)
+        if entry is None:
+            return 0, 0
+        stored_index, current, previous, _ = entry
+        if stored_index == index:
+            return current, previous
+        if stored_index == index - 1:
+            return 0, current
+        return 0, 0
+
+    def _prune(self, now: float) -> None:
+        # Drop counters that no longer contribute to their sliding window
+        stale = [
+            key for key, (index, _, _, window) in self._windows.items()
+            if (index + 2) * window <= now
+        ]
+        for key in stale:
+            del self._windows[key]
+        # Then evict the least recently hit counters, leaving headroom so the
+        # scan above does not run on every request at capacity
+        while len(self._windows) > self.max_keys * 0.9:
+            self._windows.popitem(last=False)
+
+    def hit(self, quotas: List[Tuple[str, RateLimit]], now: float) -> RateLimitResult:
+        counts = [self._counts(key, quota.window, now) for key, quota in quotas]
+        allowed = all(
+            previous * (quota.window - _window_position(now, quota.window)[1]) / quota.window + current + 1 <= quota.limit
+            for (_, quota), (current, previous) in zip(quotas, counts)
+        )
+        if allowed:
+            if len(self._windows) >= self.max_keys:
+                self._prune(now)
+            for i, (key, quota) in enumerate(quotas):
+                current, previous = counts[i]
+                index, _ = _window_position(now, quota.window)
+                self._windows[key] = (index, current + 1, previous, quota.window)
+                self._windows.move_to_end(key)
+                counts[i] = (current + 1, previous)
+        return _summarize(quotas, counts, allowed, now)
+
+
+class RedisRateLimitStore:
+    """Sliding-window counters shared across workers through Redis.
+
+    Every quota for a request is checked and incremented in a single
+    atomic script invocation, i.e. one round trip per request.
+    """
+
+    def __init__(self, redis):
+        self._script = redis.register_script(_SLIDING_WINDOW_LUA)
+
+    async def hit(self, quotas: List[Tuple[str, RateLimit]], now: float) -> RateLimitResult:
+        keys: List[str] = []
+        args: List[int] = []
+        for key, quota in quotas:
+            index, elapsed = _window_position(now, quota.window)
+            keys.extend([f"{key}:{index}", f"{key}:{index - 1}"])
+            args.extend([int(elapsed * 1000), quota.limit, quota.window * 1000])
+
+        reply = await self._script(keys=keys, args=args)
+        allowed = bool(int(reply[0]))
+        counts = [(int(reply[2 * i + 1]), int(reply[2 * i + 2])) for i in range(len(quotas))]
+        return _summarize(quotas, counts, allowed, now)
+
+
+class RateLimiter:
+    """Unified per-IP, per-user and per-company rate limiting"""
+
+    def __init__(self):
+        per_minute = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+        self.ip_limit = RateLimit(per_minute, 60)
+        # Higher limit for authenticated users
+        self.user_limit = RateLimit(int(os.getenv("RATE_LIMIT_USER_PER_MINUTE", str(per_minute * 2))), 60)
+        self.company_limit = RateLimit(int(os.getenv("RATE_LIMIT_COMPANY_PER_MINUTE", str(per_minute * 10))), 60)
+        # Proxies whose X-Forwarded-For is believed, e.g. "10.0.0.0/8,127.0.0.1"
+        self.trusted_proxies = [
+            ipaddress.ip_network(proxy.strip(), strict=False)
+            for proxy in os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "").split(",") if proxy.strip()
+        ]
+        # Fail startup instead of falling back to per-worker counters
+        self.require_shared_store = os.getenv("RATE_LIMIT_REQUIRE_REDIS") == "true"
+        self._store = None
+        self._local_store = LocalRateLimitStore()
+
+    async def _get_store(self):
+        if self._store is None:
+            redis = await get_redis()
+            if hasattr(redis, "register_script"):
+                self._store = RedisRateLimitStore(redis)
+            else:
+                self._store = self._local_store
+            logger.info("Rate limiter initialized", store=type(self._store).__name__)
+        return self._store
+
+    async def start(self) -> None:
+        """Choose the counter store at startup, refusing per-worker counters when a shared store is required"""
+        store = await self._get_store()
+        if store is not self._local_store:
+            return
+        if self.require_shared_store:
+            raise RuntimeError("Rate limiting needs Redis but only the in-process store is available")
+        # Each worker process counts separately, so effective limits scale with the worker count
+        logger.warning("Rate limits are counted per worker process; configure Redis to share them",
+                       workers=os.getenv("WEB_CONCURRENCY", "1"))
+
+    def _is_trusted_proxy(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    def client_ip(self, request: Request) -> str:
+        """Get the client IP address, following X-Forwarded-For only through trusted proxies"""
+        address = request.client.host if request.client else "unknown"
+        forwarded = request.headers.get("X-Forwarded-For")
+        if not forwarded or not self._is_trusted_proxy(address):
+            return address
+        # Each trusted proxy appends the address it received from; the first
+        # untrusted hop from the right is the client
+        for hop in reversed([hop.strip() for hop in forwarded.split(",") if hop.strip()]):
+            address = hop
+            if not self._is_trusted_proxy(hop):
+                break
+        return address
+
+    async def hit(self, quotas: List[Tuple[str, RateLimit]]) -> RateLimitResult:
+        """Count one request against every quota, atomically"""
+        store = await self._get_store()
+        now = time.time()
+        try:
+            if isinstance(store, LocalRateLimitStore):
+                return store.hit(quotas, now)
+            return await store.hit(quotas, now)
+        except Exception as e:
+            # Fall back to per-worker limiting rather than failing requests
+            logger.error("Rate limit store unavailable, using local counters", error=str(e))
+            return self._local_store.hit(quotas, now)
+
+    async def check(
+        self,
+        request: Request,
+        user_id: Optional[str] = None,
+        company_id: Optional[str] = None
+    ) -> RateLimitResult:
+        """Enforce the IP, user and company quotas for a request"""
+        quotas = [(f"rate_limit:ip:{self.client_ip(request)}", self.ip_limit)]
+        if user_id:
+            quotas.append((f"rate_limit:user:{user_id}", self.user_limit))
+        company_id = company_id or request.path_params.get("company_id")
+        if company_id:
+            quotas.append((f"rate_limit:company:{company_id}", self.company_limit))
+
+        result = await self.hit(quotas)
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers=result.headers
+            )
+        return result
+
+    async def check_company(self, request: Request, company_id: str) -> RateLimitResult:
+        """Enforce the company quota shared by all users of a company"""
+        result = await self.hit([(f"rate_limit:company:{company_id}", self.company_limit)])
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Company rate limit exceeded",
+                headers=result.headers
+            )
+        return result
+
+    def limit(self, spec: str) -> Callable:
+        """Decorator applying a per-IP quota to a single endpoint"""
+        quota = RateLimit.parse(spec)
+
+        def decorator(func: Callable) -> Callable:
+            scope = f"{func.__module__}.{func.__name__}"
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                request = kwargs.get("request")
+                if request is None:
+                    request = next((arg for arg in args if isinstance(arg, Request)), None)
+                if request is not None:
+                    result = await self.hit([(f"rate_limit:route:{scope}:{self.client_ip(request)}", quota)])
+                    if not result.allowed:
+                        raise HTTPException(
+                            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                            detail=f"Rate limit exceeded: {spec}",
+                            headers=result.headers
+                        )
+                return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter()
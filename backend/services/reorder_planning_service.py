@@ -0,0 +1,228 @@
+from typing import Optional, Dict, Any, List
+from datetime import date, timedelta
+from decimal import Decimal
+from statistics import NormalDist
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, or_, func, type_coerce, Float
+from models.inventory import (
+    ItemLocation, InventoryLocation, InventoryTransaction, InventoryTransactionType,
+    PurchaseOrder, PurchaseOrderLine, PurchaseOrderStatus
+)
+from models.list_management import Item
+from models.user import CompanySetting
+from schemas.inventory_schemas import ReorderItem, ReorderReport
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+# Outbound movements that count as demand for an item-location
+DEMAND_TRANSACTION_TYPES = (InventoryTransactionType.SALE, InventoryTransactionType.ASSEMBLY)
+
+# Purchase orders whose unreceived quantity is still expected
+OPEN_PO_STATUSES = (PurchaseOrderStatus.DRAFT, PurchaseOrderStatus.OPEN, PurchaseOrderStatus.PARTIALLY_RECEIVED)
+
+PLANNING_COLUMNS = (
+    "on_hand", "on_order", "reorder_point", "reorder_quantity", "max_stock_level",
+    "last_cost", "purchase_cost", "demand", "demand_squared"
+)
+
+DEFAULT_PLANNING_SETTINGS = {
+    "reorder_history_days": 90,
+    "reorder_lead_time_days": 14,
+    "reorder_service_level": 0.95,
+    "reorder_review_days": 30
+}
+
+
+def _number(column, label: str):
+    # Planning columns go straight into numpy, so skip Decimal conversion
+    return type_coerce(func.coalesce(column, 0), Float).label(label)
+
+
+class ReorderPlanningService:
+    """Demand-based reorder points for every stocked item-location of a company.
+
+    Daily demand per item-location over the history window is summed in the
+    database, so a single query returns one row per item-location with its
+    stock levels, item cost and the sum and sum of squares of its daily
+    demand. Reorder points are then computed for all rows at once:
+
+        reorder point = mean daily demand * lead time
+                        + z(service level) * daily demand std dev * sqrt(lead time)
+
+    A configured reorder point is never lowered by this: item-locations use
+    the higher of the two, and those without demand in the window keep their
+    configured one.
+    """
+
+    @staticmethod
+    async def get_settings(db: AsyncSession, company_id: str) -> Dict[str, Any]:
+        """The company's planning settings over the defaults"""
+        result = await db.execute(
+            select(CompanySetting.setting_key, CompanySetting.setting_value).where(
+                and_(
+                    CompanySetting.company_id == company_id,
+                    CompanySetting.category == "inventory",
+                    CompanySetting.setting_key.in_(list(DEFAULT_PLANNING_SETTINGS))
+                )
+            )
+        )
+        settings = dict(DEFAULT_PLANNING_SETTINGS)
+        for key, value in result.all():
+            value = value.get("value") if isinstance(value, dict) else value
+            if value is not None:
+                settings[key] = value
+        return settings
+
+    async def plan(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        location_id: Optional[str] = None,
+        as_of: Optional[date] = None
+    ) -> ReorderReport:
+        """Item-locations at or below their reorder point with suggested order quantities"""
+        as_of = as_of or date.today()
+        settings = await self.get_settings(db, company_id)
+        history_days = int(settings["reorder_history_days"])
+        lead_time_days = float(settings["reorder_lead_time_days"])
+        review_days = float(settings["reorder_review_days"])
+        z = NormalDist().inv_cdf(float(settings["reorder_service_level"]))
+
+        daily = select(
+            InventoryTransaction.item_id,
+            InventoryTransaction.location_id,
+            (-func.sum(InventoryTransaction.quantity_change)).label("quantity")
+        ).where(
+            and_(
+                InventoryTransaction.company_id == company_id,
+                InventoryTransaction.transaction_type.in_(DEMAND_TRANSACTION_TYPES),
+                InventoryTransaction.quantity_change < 0,
+                InventoryTransaction.transaction_date > as_of - timedelta(days=history_days),
+                InventoryTransaction.transaction_date <= as_of
+            )
+        ).group_by(
+            InventoryTransaction.item_id, InventoryTransaction.location_id, InventoryTransaction.transaction_date
+        ).subquery()
+        usage = select(
+            daily.c.item_id,
+            daily.c.location_id,
+            func.sum(daily.c.quantity).label("demand"),
+            func.sum(daily.c.quantity * daily.c.quantity).label("demand_squared")
+        ).group_by(daily.c.item_id, daily.c.location_id).subquery()
+
+        query = select(
+            ItemLocation.item_id,
+            ItemLocation.location_id,
+            Item.item_name,
+            InventoryLocation.location_name,
+            Item.preferred_vendor_id,
+            _number(ItemLocation.quantity_on_hand, "on_hand"),
+            _number(ItemLocation.quantity_on_order, "on_order"),
+            _number(ItemLocation.reorder_point, "reorder_point"),
+            _number(ItemLocation.reorder_quantity, "reorder_quantity"),
+            _number(ItemLocation.max_stock_level, "max_stock_level"),
+            _number(ItemLocation.last_cost, "last_cost"),
+            _number(Item.purchase_cost, "purchase_cost"),
+            _number(usage.c.demand, "demand"),
+            _number(usage.c.demand_squared, "demand_squared")
+        ).join(
+            Item, ItemLocation.item_id == Item.item_id
+        ).join(
+            InventoryLocation, ItemLocation.location_id == InventoryLocation.location_id
+        ).outerjoin(
+            usage, and_(usage.c.item_id == ItemLocation.item_id, usage.c.location_id == ItemLocation.location_id)
+        ).where(
+            and_(
+                Item.company_id == company_id,
+                Item.is_active == True,
+                or_(ItemLocation.reorder_point > 0, usage.c.demand > 0)
+            )
+        ).order_by(ItemLocation.item_id, ItemLocation.location_id)
+        if location_id:
+            query = query.where(ItemLocation.location_id == location_id)
+
+        rows = (await db.execute(query)).all()
+        if not rows:
+            return ReorderReport(report_date=as_of, items=[], total_items=0, estimated_cost=Decimal('0'))
+
+        # Everything after the five identifying columns is numeric
+        values = np.array([row[5:] for row in rows], dtype=float)
+        columns = dict(zip(PLANNING_COLUMNS, values.T))
+        demand = columns["demand"]
+        mean_usage = demand / history_days
+        usage_std = np.sqrt(np.maximum(columns["demand_squared"] / history_days - mean_usage ** 2, 0))
+        lead_time_demand = mean_usage * lead_time_days
+        safety_stock = z * usage_std * np.sqrt(lead_time_days)
+        has_demand = demand > 0
+        # A configured reorder point is a floor, so the plan covers everything in the low-stock set
+        reorder_point = np.maximum(np.where(has_demand, lead_time_demand + safety_stock, 0), columns["reorder_point"])
+
+        position = columns["on_hand"] + columns["on_order"]
+        order_up_to = np.where(
+            columns["max_stock_level"] > 0,
+            columns["max_stock_level"],
+            np.where(has_demand, reorder_point + mean_usage * review_days, columns["reorder_point"] * 3)
+        )
+        suggested = np.where(
+            columns["reorder_quantity"] > 0,
+            columns["reorder_quantity"],
+            np.ceil(np.maximum(order_up_to - position, 0))
+        )
+        unit_cost = np.where(columns["last_cost"] > 0, columns["last_cost"], columns["purchase_cost"])
+        flagged = np.flatnonzero((reorder_point > 0) & (position <= reorder_point) & (suggested > 0))
+
+        def quantity(value: float) -> Decimal:
+            return Decimal(str(round(float(value), 4)))
+
+        items = []
+        for index in flagged:
+            row = rows[index]
+            items.append(ReorderItem(
+                item_id=row.item_id,
+                item_name=row.item_name,
+                location_id=row.location_id,
+                location_name=row.location_name,
+                current_quantity=quantity(columns["on_hand"][index]),
+                reorder_point=quantity(reorder_point[index]),
+                reorder_quantity=quantity(columns["reorder_quantity"][index]),
+                preferred_vendor_id=row.preferred_vendor_id,
+                suggested_order_quantity=quantity(suggested[index]),
+                average_daily_usage=quantity(mean_usage[index]),
+                safety_stock=quantity(safety_stock[index]),
+                unit_cost=Decimal(str(round(float(unit_cost[index]), 2)))
+            ))
+
+        estimated_cost = Decimal(str(round(float(np.dot(suggested[flagged], unit_cost[flagged])), 2)))
+        logger.info("Reorder plan computed", company_id=company_id, item_locations=len(rows), reorder_items=len(items))
+
+        return ReorderReport(
+            report_date=as_of,
+            items=items,
+            total_items=len(items),
+            estimated_cost=estimated_cost
+        )
+
+    @staticmethod
+    async def open_po_quantities(db: AsyncSession, company_id: str) -> Dict[str, Decimal]:
+        """Ordered but not yet received quantity per item on open purchase orders"""
+        result = await db.execute(
+            select(
+                PurchaseOrderLine.item_id,
+                func.sum(PurchaseOrderLine.quantity_ordered - PurchaseOrderLine.quantity_received)
+            ).join(
+                PurchaseOrder, PurchaseOrderLine.purchase_order_id == PurchaseOrder.purchase_order_id
+            ).where(
+                and_(
+                    PurchaseOrder.company_id == company_id,
+                    PurchaseOrder.status.in_(OPEN_PO_STATUSES),
+                    PurchaseOrderLine.quantity_ordered > PurchaseOrderLine.quantity_received
+                )
+            ).group_by(PurchaseOrderLine.item_id)
+        )
+        return {item_id: Decimal(str(quantity)) for item_id, quantity in result.all()}
+
+
+# Global reorder planning service instance
+reorder_planner = ReorderPlanningService()
@@ -1,37 +1,47 @@
 import os
+import asyncio
 import csv
 import io
-from datetime import datetime
+import zlib
+from datetime import datetime, date
 from decimal import Decimal
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator, Callable, Sequence
 from pathlib import Path
 
-# PDF generation
-from reportlab.lib.pagesizes import letter, A4, legal, landscape, portrait
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-
-# Excel generation
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.chart import LineChart, Reference
-
 import structlog
 from schemas.report_schemas import ReportExportRequest, ReportFormat, FinancialReportData
+from services.excel_export_worker import build_report_workbook, build_financial_workbook
+from services.pdf_render_worker import render_report_pdf, render_financial_pdf
+from services.export_worker_pool import export_workers
+from services.export_artifact_service import export_artifacts
+from services.columnar_export_writer import ColumnarWriter, ColumnSpec
 
 logger = structlog.get_logger()
 
 class ReportExportService:
     """Service for exporting reports to various formats"""
     
+    FILE_EXTENSIONS = {
+        ReportFormat.PDF: "pdf",
+        ReportFormat.EXCEL: "xlsx",
+        ReportFormat.CSV: "csv",
+        ReportFormat.PARQUET: "parquet",
+        # Arrow IPC stream format
+        ReportFormat.ARROW: "arrows"
+    }
+    COLUMNAR_FORMATS = (ReportFormat.PARQUET, ReportFormat.ARROW)
+    
     def __init__(self):
-        # Create exports directory if it doesn't exist
-        self.export_dir = Path("/app/backend/exports")
-        self.export_dir.mkdir(exist_ok=True)
+        self.export_dir = export_artifacts.root
+    
+    def _default_filepath(self, name: str, export_format: ReportFormat) -> Path:
+        """Timestamped path in the export root for exports outside the artifact store"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        extension = self.FILE_EXTENSIONS.get(export_format)
+        if extension is None:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        return self.export_dir / f"{self._sanitize_filename(name)}_{timestamp}.{extension}"
     
     def _sanitize_filename(self, filename: str) -> str:
         """Sanitize filename by removing or replacing invalid characters"""
@@ -49,25 +59,35 @@ class ReportExportService:
         report_data: Dict[str, Any],
         export_request: ReportExportRequest,
         company_name: str,
-        report_name: str
+        report_name: str,
+        company_id: Optional[str] = None,
+        filepath: Optional[Path] = None
     ) -> Dict[str, Any]:
-        """Export report to specified format"""
+        """Export report to specified format, to `filepath` if given"""
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        sanitized_name = self._sanitize_filename(report_name)
-        base_filename = f"{sanitized_name}_{timestamp}"
+        filepath = filepath or self._default_filepath(report_name, export_request.format)
         
         if export_request.format == ReportFormat.PDF:
             return await self._export_to_pdf(
-                report_data, export_request, company_name, report_name, base_filename
+                report_data, export_request, company_name, report_name, filepath, company_id
             )
         elif export_request.format == ReportFormat.EXCEL:
             return await self._export_to_excel(
-                report_data, export_request, company_name, report_name, base_filename
+                report_data, export_request, company_name, report_name, filepath, company_id
             )
         elif export_request.format == ReportFormat.CSV:
             return await self._export_to_csv(
-                report_data, export_request, company_name, report_name, base_filename
+                report_data, export_request, company_name, report_name, filepath
+            )
+        elif export_request.format in self.COLUMNAR_FORMATS:
+            rows = report_data.get('data') or []
+            columns = list(rows[0].keys()) if rows else []
+            
+            async def row_chunks():
+                yield [tuple(row.get(column) for column in columns) for row in rows]
+            
+            return await self.export_columnar(
+                columns, row_chunks(), filepath, export_request.format, company_name, report_name
             )
         else:
             raise ValueError(f"Unsupported export format: {export_request.format}")
@@ -75,25 +95,25 @@ class ReportExportService:
     async def export_financial_report(
         self,
         financial_data: FinancialReportData,
-        export_request: ReportExportRequest
+        export_request: ReportExportRequest,
+        company_id: Optional[str] = None,
+        filepath: Optional[Path] = None
     ) -> Dict[str, Any]:
-        """Export financial report data"""
+        """Export financial report data, to `filepath` if given"""
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        sanitized_name = self._sanitize_filename(financial_data.report_name)
-        base_filename = f"{sanitized_name}_{timestamp}"
+        filepath = filepath or self._default_filepath(financial_data.report_name, export_request.format)
         
         if export_request.format == ReportFormat.PDF:
             return await self._export_financial_to_pdf(
-                financial_data, export_request, base_filename
+                financial_data, export_request, filepath, company_id
             )
         elif export_request.format == ReportFormat.EXCEL:
             return await self._export_financial_to_excel(
-                financial_data, export_request, base_filename
+                financial_data, export_request, filepath, company_id
             )
         elif export_request.format == ReportFormat.CSV:
             return await self._export_financial_to_csv(
-                financial_data, export_request, base_filename
+                financial_data, export_request, filepath
             )
         else:
             raise ValueError(f"Unsupported export format: {export_request.format}")
@@ -104,69 +124,33 @@ class ReportExportService:
         export_request: ReportExportRequest,
         company_name: str,
         report_name: str,
-        base_filename: str
+        filepath: Path,
+        company_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Export report to PDF format"""
         
-        filename = f"{base_filename}.pdf"
-        filepath = self.export_dir / filename
-        
-        # Determine page size and orientation
-        page_size = self._get_page_size(export_request.page_size)
-        if export_request.page_orientation == "landscape":
-            page_size = landscape(page_size)
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            str(filepath),
-            pagesize=page_size,
-            topMargin=0.75 * inch,
-            bottomMargin=0.75 * inch,
-            leftMargin=0.75 * inch,
-            rightMargin=0.75 * inch
-        )
+        filename = filepath.name
+        rows = report_data.get('data') or []
+        
+        payload = {
+            "company_id": company_id or company_name,
+            "branding": {"company_name": company_name},
+            "report_name": report_name,
+            "company_name": company_name,
+            "generated_at": report_data.get('generated_at'),
+            "data": rows,
+            "summary": report_data.get('summary'),
+            "include_summary": export_request.include_summary,
+            "page_size": export_request.page_size,
+            "page_orientation": export_request.page_orientation
+        }
         
-        # Build content
-        story = []
-        styles = getSampleStyleSheet()
-        
-        # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Title'],
-            fontSize=16,
-            alignment=TA_CENTER,
-            spaceAfter=12
+        # Document build runs in a worker process
+        file_size = await export_workers.run(
+            company_id, filename, render_report_pdf, str(filepath), payload,
+            total_rows=len(rows)
         )
         
-        story.append(Paragraph(report_name, title_style))
-        story.append(Paragraph(company_name, styles['Normal']))
-        story.append(Spacer(1, 12))
-        
-        # Add report date
-        if 'generated_at' in report_data:
-            date_str = report_data['generated_at'].strftime("%B %d, %Y at %I:%M %p")
-            story.append(Paragraph(f"Generated: {date_str}", styles['Normal']))
-            story.append(Spacer(1, 12))
-        
-        # Add data table
-        if 'data' in report_data and report_data['data']:
-            data_table = self._create_pdf_data_table(report_data['data'])
-            story.append(data_table)
-        
-        # Add summary if requested
-        if export_request.include_summary and 'summary' in report_data:
-            story.append(Spacer(1, 12))
-            story.append(Paragraph("Summary", styles['Heading2']))
-            summary_table = self._create_pdf_summary_table(report_data['summary'])
-            story.append(summary_table)
-        
-        # Build PDF
-        doc.build(story)
-        
-        # Get file size
-        file_size = filepath.stat().st_size
-        
         logger.info("PDF report generated", filename=filename, file_size=file_size)
         
         return {
@@ -180,84 +164,26 @@ class ReportExportService:
         self,
         financial_data: FinancialReportData,
         export_request: ReportExportRequest,
-        base_filename: str
+        filepath: Path,
+        company_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Export financial report to PDF format"""
         
-        filename = f"{base_filename}.pdf"
-        filepath = self.export_dir / filename
-        
-        # Determine page size and orientation
-        page_size = self._get_page_size(export_request.page_size)
-        if export_request.page_orientation == "landscape":
-            page_size = landscape(page_size)
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            str(filepath),
-            pagesize=page_size,
-            topMargin=0.75 * inch,
-            bottomMargin=0.75 * inch,
-            leftMargin=0.75 * inch,
-            rightMargin=0.75 * inch
-        )
+        filename = filepath.name
         
-        # Build content
-        story = []
-        styles = getSampleStyleSheet()
-        
-        # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Title'],
-            fontSize=16,
-            alignment=TA_CENTER,
-            spaceAfter=12
-        )
-        
-        story.append(Paragraph(financial_data.report_name, title_style))
-        story.append(Paragraph(financial_data.company_name, styles['Normal']))
-        
-        # Report date
-        date_str = financial_data.report_date.strftime("%B %d, %Y")
-        story.append(Paragraph(f"As of {date_str}", styles['Normal']))
-        
-        if financial_data.comparison_date:
-            comp_date_str = financial_data.comparison_date.strftime("%B %d, %Y")
-            story.append(Paragraph(f"Compared to {comp_date_str}", styles['Normal']))
-        
-        story.append(Spacer(1, 20))
-        
-        # Add financial sections
-        for section in financial_data.sections:
-            story.append(Paragraph(section.section_name, styles['Heading2']))
-            
-            # Create section table
-            section_table = self._create_financial_pdf_table(section, financial_data.comparison_date is not None)
-            story.append(section_table)
-            story.append(Spacer(1, 12))
-        
-        # Grand total if available
-        if financial_data.grand_total is not None:
-            story.append(Paragraph("Net Income" if "Profit" in financial_data.report_name else "Total Assets", styles['Heading2']))
-            total_data = [[financial_data.grand_total]]
-            total_table = Table(total_data)
-            total_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(total_table)
-        
-        # Build PDF
-        doc.build(story)
+        payload = {
+            "company_id": company_id or financial_data.company_name,
+            "branding": {"company_name": financial_data.company_name},
+            "financial_data": financial_data.dict(),
+            "page_size": export_request.page_size,
+            "page_orientation": export_request.page_orientation
+        }
         
-        # Get file size
-        file_size = filepath.stat().st_size
+        # Document build runs in a worker process
+        file_size = await export_workers.run(
+            company_id, filename, render_financial_pdf, str(filepath), payload,
+            total_rows=sum(len(section.lines) for section in financial_data.sections)
+        )
         
         logger.info("Financial PDF report generated", filename=filename, file_size=file_size)
         
@@ -274,98 +200,30 @@ class ReportExportService:
         export_request: ReportExportRequest,
         company_name: str,
         report_name: str,
-        base_filename: str
+        filepath: Path,
+        company_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Export report to Excel format"""
         
-        filename = f"{base_filename}.xlsx"
-        filepath = self.export_dir / filename
-        
-        # Create workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Report Data"
-        
-        # Header styles
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_alignment = Alignment(horizontal="center")
-        
-        # Title
-        ws.merge_cells('A1:F1')
-        ws['A1'] = report_name
-        ws['A1'].font = Font(bold=True, size=16)
-        ws['A1'].alignment = Alignment(horizontal="center")
-        
-        # Company name
-        ws.merge_cells('A2:F2')
-        ws['A2'] = company_name
-        ws['A2'].alignment = Alignment(horizontal="center")
-        
-        # Generated date
-        if 'generated_at' in report_data:
-            ws.merge_cells('A3:F3')
-            ws['A3'] = f"Generated: {report_data['generated_at'].strftime('%B %d, %Y at %I:%M %p')}"
-            ws['A3'].alignment = Alignment(horizontal="center")
-        
-        # Data section
-        if 'data' in report_data and report_data['data']:
-            data = report_data['data']
-            if data:
-                # Headers
-                headers = list(data[0].keys())
-                start_row = 5
-                
-                for col, header in enumerate(headers, 1):
-                    cell = ws.cell(row=start_row, column=col, value=header)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                
-                # Data rows
-                for row_idx, row_data in enumerate(data, start_row + 1):
-                    for col, header in enumerate(headers, 1):
-                        value = row_data.get(header, '')
-                        if isinstance(value, Decimal):
-                            value = float(value)
-                        ws.cell(row=row_idx, column=col, value=value)
-                
-                # Freeze header row if requested
-                if export_request.freeze_header_row:
-                    ws.freeze_panes = f"A{start_row + 1}"
-        
-        # Summary sheet
-        if export_request.include_summary and 'summary' in report_data:
-            summary_ws = wb.create_sheet("Summary")
-            summary_data = report_data['summary']
-            
-            row = 1
-            for key, value in summary_data.items():
-                summary_ws.cell(row=row, column=1, value=key).font = Font(bold=True)
-                if isinstance(value, Decimal):
-                    value = float(value)
-                summary_ws.cell(row=row, column=2, value=value)
-                row += 1
-        
-        # Auto-adjust column widths
-        for ws in wb.worksheets:
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Save workbook
-        wb.save(str(filepath))
+        filename = filepath.name
+        rows = report_data.get('data') or []
+        
+        payload = {
+            "report_name": report_name,
+            "company_name": company_name,
+            "generated_at": report_data.get('generated_at'),
+            "columns": report_data.get('columns') or [],
+            "data": rows,
+            "summary": report_data.get('summary'),
+            "include_summary": export_request.include_summary,
+            "freeze_header_row": export_request.freeze_header_row
+        }
         
-        # Get file size
-        file_size = filepath.stat().st_size
+        # Workbook build runs in a worker process
+        file_size = await export_workers.run(
+            company_id, filename, build_report_workbook, str(filepath), payload,
+            total_rows=len(rows)
+        )
         
         logger.info("Excel report generated", filename=filename, file_size=file_size)
         
@@ -380,106 +238,18 @@ class ReportExportService:
         self,
         financial_data: FinancialReportData,
         export_request: ReportExportRequest,
-        base_filename: str
+        filepath: Path,
+        company_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Export financial report to Excel format"""
         
-        filename = f"{base_filename}.xlsx"
-        filepath = self.export_dir / filename
-        
-        # Create workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = financial_data.report_name.replace(" ", "_")
-        
-        # Header styles
-        title_font = Font(bold=True, size=16)
-        header_font = Font(bold=True)
-        currency_format = '_($* #,##0.00_);_($* (#,##0.00);_($* "-"??_);_(@_)'
-        
-        # Title
-        ws.merge_cells('A1:D1')
-        ws['A1'] = financial_data.report_name
-        ws['A1'].font = title_font
-        ws['A1'].alignment = Alignment(horizontal="center")
-        
-        # Company name
-        ws.merge_cells('A2:D2')
-        ws['A2'] = financial_data.company_name
-        ws['A2'].alignment = Alignment(horizontal="center")
-        
-        # Report date
-        ws.merge_cells('A3:D3')
-        date_str = financial_data.report_date.strftime("%B %d, %Y")
-        ws['A3'] = f"As of {date_str}"
-        ws['A3'].alignment = Alignment(horizontal="center")
-        
-        current_row = 5
-        
-        # Financial sections
-        for section in financial_data.sections:
-            # Section header
-            ws.cell(row=current_row, column=1, value=section.section_name).font = header_font
-            current_row += 1
-            
-            # Column headers
-            if financial_data.comparison_date:
-                ws.cell(row=current_row, column=1, value="Account").font = header_font
-                ws.cell(row=current_row, column=2, value="Current").font = header_font
-                ws.cell(row=current_row, column=3, value="Comparison").font = header_font
-                ws.cell(row=current_row, column=4, value="Variance").font = header_font
-            else:
-                ws.cell(row=current_row, column=1, value="Account").font = header_font
-                ws.cell(row=current_row, column=2, value="Amount").font = header_font
-            current_row += 1
-            
-            # Section lines
-            for line in section.lines:
-                ws.cell(row=current_row, column=1, value=line.account_name)
-                ws.cell(row=current_row, column=2, value=float(line.amount)).number_format = currency_format
-                
-                if financial_data.comparison_date and line.comparison_amount is not None:
-                    ws.cell(row=current_row, column=3, value=float(line.comparison_amount)).number_format = currency_format
-                    if line.variance_amount is not None:
-                        ws.cell(row=current_row, column=4, value=float(line.variance_amount)).number_format = currency_format
-                
-                current_row += 1
-            
-            # Section total
-            ws.cell(row=current_row, column=1, value=f"Total {section.section_name}").font = header_font
-            ws.cell(row=current_row, column=2, value=float(section.total_amount)).font = header_font
-            ws.cell(row=current_row, column=2).number_format = currency_format
-            
-            if financial_data.comparison_date and section.comparison_total is not None:
-                ws.cell(row=current_row, column=3, value=float(section.comparison_total)).font = header_font
-                ws.cell(row=current_row, column=3).number_format = currency_format
-            
-            current_row += 2
-        
-        # Grand total
-        if financial_data.grand_total is not None:
-            ws.cell(row=current_row, column=1, value="Net Income" if "Profit" in financial_data.report_name else "Total Assets").font = Font(bold=True, size=12)
-            ws.cell(row=current_row, column=2, value=float(financial_data.grand_total)).font = Font(bold=True, size=12)
-            ws.cell(row=current_row, column=2).number_format = currency_format
-        
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Save workbook
-        wb.save(str(filepath))
+        filename = filepath.name
         
-        # Get file size
-        file_size = filepath.stat().st_size
+        # Workbook build runs in a worker process
+        file_size = await export_workers.run(
+            company_id, filename, build_financial_workbook, str(filepath), financial_data.dict(),
+            total_rows=sum(len(section.lines) for section in financial_data.sections)
+        )
         
         logger.info("Financial Excel report generated", filename=filename, file_size=file_size)
         
@@ -496,12 +266,11 @@ class ReportExportService:
         export_request: ReportExportRequest,
         company_name: str,
         report_name: str,
-        base_filename: str
+        filepath: Path
     ) -> Dict[str, Any]:
         """Export report to CSV format"""
         
-        filename = f"{base_filename}.csv"
-        filepath = self.export_dir / filename
+        filename = filepath.name
         
         with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
             if 'data' in report_data and report_data['data']:
@@ -551,16 +320,147 @@ class ReportExportService:
             "format": ReportFormat.CSV
         }
     
+    async def stream_csv(
+        self,
+        columns: List[str],
+        row_chunks: AsyncIterator[List[Sequence[Any]]],
+        company_name: str,
+        report_name: str,
+        column_definitions: Optional[List[Dict[str, Any]]] = None,
+        compress: bool = False
+    ) -> AsyncIterator[bytes]:
+        """Encode row chunks to CSV incrementally, optionally gzip-compressed"""
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # wbits=31 produces a gzip container rather than a raw zlib stream
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+        
+        def drain() -> bytes:
+            data = buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate(0)
+            return compressor.compress(data) if compressor else data
+        
+        buffer.write(f"# {report_name}\n")
+        buffer.write(f"# {company_name}\n")
+        buffer.write(f"# Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}\n")
+        buffer.write("\n")
+        writer.writerow(columns)
+        
+        formatters = None
+        row_count = 0
+        async for chunk in row_chunks:
+            if formatters is None:
+                formatters = self._csv_column_formatters(columns, column_definitions or [], chunk)
+            if formatters:
+                formatted = []
+                for row in chunk:
+                    row = list(row)
+                    for index, formatter in formatters:
+                        if row[index] is not None:
+                            row[index] = formatter(row[index])
+                    formatted.append(row)
+                chunk = formatted
+            writer.writerows(chunk)
+            row_count += len(chunk)
+            
+            data = drain()
+            if data:
+                yield data
+        
+        data = drain()
+        if compressor:
+            data += compressor.flush()
+        if data:
+            yield data
+        
+        logger.info("CSV report streamed", report_name=report_name, row_count=row_count, compressed=compress)
+    
+    def _csv_column_formatters(
+        self,
+        columns: List[str],
+        column_definitions: List[Dict[str, Any]],
+        sample_rows: List[Sequence[Any]]
+    ) -> List[tuple]:
+        """Resolve a value formatter once per column from its definition or first value"""
+        
+        data_types = {
+            column.get('name'): column.get('data_type')
+            for column in column_definitions if isinstance(column, dict)
+        }
+        
+        formatters: List[tuple] = []
+        for index, column in enumerate(columns):
+            sample = next((row[index] for row in sample_rows if row[index] is not None), None)
+            formatter: Optional[Callable[[Any], str]] = None
+            
+            if data_types.get(column) == 'currency' and isinstance(sample, (Decimal, float, int)):
+                formatter = '{:.2f}'.format
+            elif isinstance(sample, Decimal):
+                # Fixed-point notation, never exponent form such as 1E+3
+                formatter = lambda value: format(value, 'f')
+            elif isinstance(sample, (datetime, date)):
+                formatter = lambda value: value.isoformat()
+            
+            if formatter is not None:
+                formatters.append((index, formatter))
+        
+        return formatters
+    
+    async def export_columnar(
+        self,
+        columns: List[str],
+        row_chunks: AsyncIterator[List[Sequence[Any]]],
+        filepath: Path,
+        export_format: ReportFormat,
+        company_name: str,
+        report_name: str,
+        column_specs: Optional[List[Optional[ColumnSpec]]] = None
+    ) -> Dict[str, Any]:
+        """Write row chunks to a Parquet or Arrow IPC file with typed columns"""
+        
+        writer = ColumnarWriter(
+            filepath,
+            ReportFormat(export_format).value,
+            columns,
+            column_specs,
+            metadata={
+                "report_name": report_name,
+                "company_name": company_name,
+                "generated_at": datetime.now().isoformat()
+            }
+        )
+        try:
+            # Arrow conversion and compression run off the event loop, one chunk at a time
+            async for chunk in row_chunks:
+                await asyncio.to_thread(writer.write_rows, chunk)
+            row_count = await asyncio.to_thread(writer.close)
+        except Exception:
+            writer.abort()
+            raise
+        
+        file_size = filepath.stat().st_size
+        logger.info("Columnar report generated", filename=filepath.name, format=export_format,
+                    row_count=row_count, file_size=file_size)
+        
+        return {
+            "file_path": str(filepath),
+            "filename": filepath.name,
+            "file_size": file_size,
+            "row_count": row_count,
+            "format": ReportFormat(export_format)
+        }
+    
     async def _export_financial_to_csv(
         self,
         financial_data: FinancialReportData,
         export_request: ReportExportRequest,
-        base_filename: str
+        filepath: Path
     ) -> Dict[str, Any]:
         """Export financial report to CSV format"""
         
-        filename = f"{base_filename}.csv"
-        filepath = self.export_dir / filename
+        filename = filepath.name
         
         with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.writer(csvfile)
@@ -630,104 +530,3 @@ class ReportExportService:
             "file_size": file_size,
             "format": ReportFormat.CSV
         }
-    
-    def _get_page_size(self, page_size_name: str):
-        """Get page size object from name"""
-        sizes = {
-            "letter": letter,
-            "a4": A4,
-            "legal": legal
-        }
-        return sizes.get(page_size_name.lower(), letter)
-    
-    def _create_pdf_data_table(self, data: List[Dict[str, Any]]) -> Table:
-        """Create PDF table from data"""
-        if not data:
-            return Table([["No data available"]])
-        
-        # Headers
-        headers = list(data[0].keys())
-        table_data = [headers]
-        
-        # Data rows
-        for row in data:
-            table_row = []
-            for header in headers:
-                value = row.get(header, '')
-                if isinstance(value, Decimal):
-                    value = f"${value:,.2f}"
-                table_row.append(str(value))
-            table_data.append(table_row)
-        
-        # Create table
-        table = Table(table_data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        return table
-    
-    def _create_pdf_summary_table(self, summary: Dict[str, Any]) -> Table:
-        """Create PDF summary table"""
-        table_data = []
-        for key, value in summary.items():
-            if isinstance(value, Decimal):
-                value = f"${value:,.2f}"
-            table_data.append([key, str(value)])
-        
-        # Handle empty summary data
-        if not table_data:
-            table_data = [["No summary data available", ""]]
-        
-        table = Table(table_data)
-        table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        return table
-    
-    def _create_financial_pdf_table(self, section, has_comparison: bool) -> Table:
-        """Create PDF table for financial section"""
-        if has_comparison:
-            table_data = [["Account", "Current", "Comparison", "Variance"]]
-            for line in section.lines:
-                table_data.append([
-                    line.account_name,
-                    f"${line.amount:,.2f}",
-                    f"${line.comparison_amount:,.2f}" if line.comparison_amount else "",
-                    f"${line.variance_amount:,.2f}" if line.variance_amount else ""
-                ])
-            table_data.append([
-                f"Total {section.section_name}",
-                f"${section.total_amount:,.2f}",
-                f"${section.comparison_total:,.2f}" if section.comparison_total else "",
-                ""
-            ])
-        else:
-            table_data = [["Account", "Amount"]]
-            for line in section.lines:
-                table_data.append([line.account_name, f"${line.amount:,.2f}"])
-            table_data.append([f"Total {section.section_name}", f"${section.total_amount:,.2f}"])
-        
-        table = Table(table_data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        return table
\ No newline at end of file
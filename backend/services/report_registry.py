@@ -0,0 +1,145 @@
+from typing import Optional, Dict, Any, List, Callable, Awaitable, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from models.reports import ReportDefinition
+import os
+import re
+import time
+import structlog
+
+logger = structlog.get_logger()
+
+ReportGenerator = Callable[[AsyncSession, str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class SystemReport:
+    """A built-in report: its generator, parameter schema, caching policy and the data sources it reads"""
+
+    __slots__ = ("report_key", "generator", "parameters", "cacheable", "names", "sources")
+
+    def __init__(
+        self,
+        report_key: str,
+        generator: ReportGenerator,
+        parameters: Dict[str, Dict[str, Any]],
+        cacheable: bool,
+        names: Tuple[str, ...],
+        sources: Tuple[str, ...]
+    ):
+        self.report_key = report_key
+        self.generator = generator
+        self.parameters = parameters
+        self.cacheable = cacheable
+        self.names = names
+        self.sources = sources
+
+    def apply_defaults(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in default values for parameters the caller left out"""
+        applied = dict(parameters)
+        for name, schema in self.parameters.items():
+            if applied.get(name) is None and schema.get("default_value") is not None:
+                applied[name] = schema["default_value"]
+        return applied
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "report_key": self.report_key,
+            "parameters": self.parameters,
+            "cacheable": self.cacheable,
+            "sources": list(self.sources)
+        }
+
+
+class ReportDefinitionSnapshot:
+    """Read-only copy of a report definition, safe to share between sessions"""
+
+    def __init__(self, report_def: ReportDefinition):
+        for column in ReportDefinition.__table__.columns:
+            setattr(self, column.key, getattr(report_def, column.key))
+
+    def __repr__(self):
+        return f"<ReportDefinition {self.report_name}>"
+
+
+def _normalize_name(name: str) -> str:
+    return re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip()
+
+
+class ReportRegistry:
+    """Dispatch table of system reports plus an in-memory report definition cache.
+
+    System reports are looked up by their stable `report_key`; definitions
+    created before keys existed fall back to their registered names. Cached
+    definitions are dropped when a definition is updated in this process and
+    expire after a short TTL so updates made by other workers are picked up.
+    """
+
+    def __init__(self):
+        self.definition_ttl_seconds = int(os.getenv("REPORT_DEFINITION_CACHE_SECONDS", "300"))
+        self._reports: Dict[str, SystemReport] = {}
+        self._keys_by_name: Dict[str, str] = {}
+        self._definitions: Dict[str, Tuple[ReportDefinitionSnapshot, float]] = {}
+
+    def register(
+        self,
+        report_key: str,
+        generator: ReportGenerator,
+        parameters: Optional[Dict[str, Dict[str, Any]]] = None,
+        cacheable: bool = True,
+        names: Tuple[str, ...] = (),
+        sources: Tuple[str, ...] = ()
+    ) -> SystemReport:
+        """Register the generator of a system report.
+
+        `sources` names the export data sources the report reads; reports
+        that declare none are never served from a stored export.
+        """
+        report = SystemReport(report_key, generator, parameters or {}, cacheable, names, sources)
+        self._reports[report_key] = report
+        for name in names:
+            self._keys_by_name[_normalize_name(name)] = report_key
+        return report
+
+    def get(self, report_key: str) -> Optional[SystemReport]:
+        return self._reports.get(report_key)
+
+    def key_for_name(self, report_name: str) -> Optional[str]:
+        """The report key registered for a system report name"""
+        return self._keys_by_name.get(_normalize_name(report_name))
+
+    def resolve(self, report_def) -> Optional[SystemReport]:
+        """The system report a definition runs, or None for custom reports"""
+        if not report_def.is_system_report:
+            return None
+        report_key = report_def.report_key or self.key_for_name(report_def.report_name)
+        return self._reports.get(report_key) if report_key else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [report.to_dict() for report in self._reports.values()]
+
+    async def get_definition(self, db: AsyncSession, report_id: str) -> Optional[ReportDefinitionSnapshot]:
+        """Get a report definition, from memory when it was loaded recently"""
+        cached = self._definitions.get(report_id)
+        if cached is not None and time.monotonic() - cached[1] < self.definition_ttl_seconds:
+            return cached[0]
+
+        result = await db.execute(select(ReportDefinition).where(ReportDefinition.report_id == report_id))
+        report_def = result.scalar_one_or_none()
+        if report_def is None:
+            self._definitions.pop(report_id, None)
+            return None
+
+        snapshot = ReportDefinitionSnapshot(report_def)
+        self._definitions[report_id] = (snapshot, time.monotonic())
+        return snapshot
+
+    def invalidate(self, report_id: Optional[str] = None) -> None:
+        """Drop one cached definition, or all of them"""
+        if report_id is None:
+            self._definitions.clear()
+        else:
+            self._definitions.pop(report_id, None)
+
+
+# Global report registry instance
+report_registry = ReportRegistry()
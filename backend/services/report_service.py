@@ -1,7 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func, desc, asc, text
 from sqlalchemy.orm import selectinload, joinedload
-from typing import List, Optional, Tuple, Dict, Any, Union
+from typing import List, Optional, Tuple, Dict, Any, Union, AsyncIterator, Sequence
 from models.reports import (
     ReportDefinition, MemorizedReport, MemorizedReportGroup,
     ReportCache, ReportExecution, ReportTemplate,
@@ -16,18 +16,36 @@ from schemas.report_schemas import (
     ReportGroupCreate, ReportGroupUpdate, ReportExecutionRequest,
     ReportDataResponse, FinancialReportData, FinancialSection, FinancialLine,
     ProfitLossRequest, BalanceSheetRequest, CashFlowRequest,
-    TrialBalanceRequest, AgingReportRequest
+    TrialBalanceRequest, AgingReportRequest, validate_sql_template, sql_template_tables, CUSTOM_REPORT_TABLES
 )
+import asyncio
+import re
+import time
 import uuid
 import structlog
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 import json
 import hashlib
+import os
 from services.list_management_service import BaseListService
+from services.report_telemetry_service import report_telemetry
+from services.report_registry import report_registry
+from services.export_artifact_service import export_artifacts
 
 logger = structlog.get_logger()
 
+# Rows fetched per round trip when streaming report output
+REPORT_STREAM_CHUNK_SIZE = int(os.getenv("REPORT_STREAM_CHUNK_SIZE", "5000"))
+# Budgets for custom SQL reports: rows returned inline, rows streamed to exports, database time
+CUSTOM_REPORT_MAX_INLINE_ROWS = int(os.getenv("CUSTOM_REPORT_MAX_INLINE_ROWS", "50000"))
+CUSTOM_REPORT_MAX_ROWS = int(os.getenv("CUSTOM_REPORT_MAX_ROWS", "2000000"))
+CUSTOM_REPORT_TIMEOUT_SECONDS = float(os.getenv("CUSTOM_REPORT_TIMEOUT_SECONDS", "60"))
+# Comparison operators of report filters on custom SQL output
+CUSTOM_SQL_FILTER_OPERATORS = {"eq": "=", "ne": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "like": "LIKE"}
+# Named bind parameters such as :start_date, skipping PostgreSQL :: casts
+SQL_PARAMETER_PATTERN = re.compile(r'(?<![:\w]):([A-Za-z_]\w*)')
+
 class ReportService(BaseListService):
     """Service for report management operations"""
     
@@ -119,6 +137,57 @@ class ReportService(BaseListService):
         )
         return result.scalar_one_or_none()
     
+    @staticmethod
+    async def resolve_report_definition(
+        db: AsyncSession,
+        report_id: str
+    ):
+        """Get a read-only report definition through the in-memory definition cache"""
+        return await report_registry.get_definition(db, report_id)
+    
+    @staticmethod
+    async def update_report_definition(
+        db: AsyncSession,
+        report_id: str,
+        report_data: ReportDefinitionUpdate
+    ) -> Optional[ReportDefinition]:
+        """Update a report definition and drop its cached copy"""
+        
+        report = await ReportService.get_report_definition_by_id(db, report_id)
+        if not report:
+            return None
+        
+        for field, value in report_data.dict(exclude_unset=True).items():
+            setattr(report, field, value)
+        
+        await db.commit()
+        await db.refresh(report)
+        report_registry.invalidate(report_id)
+        
+        logger.info("Report definition updated", report_id=report_id)
+        return report
+    
+    @staticmethod
+    def _prepare_parameters(report_def, parameters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply a system report's parameter defaults so equivalent requests share cache entries"""
+        system_report = report_registry.resolve(report_def)
+        if system_report is None:
+            return parameters or {}
+        return system_report.apply_defaults(parameters or {})
+    
+    @staticmethod
+    def _is_cacheable(report_def) -> bool:
+        system_report = report_registry.resolve(report_def)
+        return system_report is None or system_report.cacheable
+    
+    @staticmethod
+    async def data_version(db: AsyncSession, company_id: str, report_def) -> Optional[str]:
+        """Version of the data a report reads, or None when its exports must not be reused"""
+        system_report = report_registry.resolve(report_def)
+        if system_report is None or not system_report.cacheable or not system_report.sources:
+            return None
+        return await export_artifacts.data_version(db, company_id, system_report.sources)
+    
     @staticmethod
     async def execute_report(
         db: AsyncSession,
@@ -130,9 +199,11 @@ class ReportService(BaseListService):
         """Execute a report and return execution record"""
         
         # Get report definition
-        report_def = await ReportService.get_report_definition_by_id(db, report_id)
+        report_def = await ReportService.resolve_report_definition(db, report_id)
         if not report_def:
             raise ValueError("Report definition not found")
+        parameters = ReportService._prepare_parameters(report_def, execution_request.parameters)
+        use_cache = execution_request.use_cache and ReportService._is_cacheable(report_def)
         
         # Create execution record
         execution = ReportExecution(
@@ -149,69 +220,73 @@ class ReportService(BaseListService):
         db.add(execution)
         await db.flush()
         
-        try:
-            start_time = datetime.now()
-            
-            # Check cache first if requested
-            if execution_request.use_cache:
-                cached_data = await ReportService._get_cached_report_data(
-                    db, report_id, execution_request.parameters, execution_request.filters
+        async with report_telemetry.track(db, company_id, report_def, "execution") as run:
+            try:
+                start_time = datetime.now()
+                
+                # Check cache first if requested
+                if use_cache:
+                    cached_data = await ReportService._get_cached_report_data(
+                        db, report_id, parameters, execution_request.filters
+                    )
+                    run.cache_hit = bool(cached_data)
+                    if cached_data:
+                        run.rows = len(cached_data.get('data', []))
+                        execution.status = ReportStatus.COMPLETED
+                        execution.row_count = len(cached_data.get('data', []))
+                        execution.execution_time_ms = 0  # Cache hit
+                        execution.completed_at = datetime.now()
+                        await db.commit()
+                        
+                        logger.info("Report executed from cache", execution_id=execution.execution_id)
+                        return execution
+                
+                # Execute the report
+                report_data = await ReportService._execute_report_query(
+                    db, company_id, report_def, parameters, execution_request.filters
                 )
-                if cached_data:
-                    execution.status = ReportStatus.COMPLETED
-                    execution.row_count = len(cached_data.get('data', []))
-                    execution.execution_time_ms = 0  # Cache hit
-                    execution.completed_at = datetime.now()
-                    await db.commit()
-                    
-                    logger.info("Report executed from cache", execution_id=execution.execution_id)
-                    return execution
-            
-            # Execute the report
-            report_data = await ReportService._execute_report_query(
-                db, company_id, report_def, execution_request.parameters, execution_request.filters
-            )
-            
-            # Calculate execution time
-            end_time = datetime.now()
-            execution_time_ms = int((end_time - start_time).total_seconds() * 1000)
-            
-            # Update execution record
-            execution.status = ReportStatus.COMPLETED
-            execution.row_count = len(report_data.get('data', []))
-            execution.execution_time_ms = execution_time_ms
-            execution.completed_at = end_time
-            
-            # Cache the results if requested
-            if execution_request.use_cache:
-                await ReportService._cache_report_data(
-                    db, report_id, execution_request.parameters, 
-                    execution_request.filters, report_data, execution_request.cache_duration_minutes
+                
+                # Calculate execution time
+                end_time = datetime.now()
+                execution_time_ms = int((end_time - start_time).total_seconds() * 1000)
+                
+                # Update execution record
+                execution.status = ReportStatus.COMPLETED
+                execution.row_count = len(report_data.get('data', []))
+                execution.execution_time_ms = execution_time_ms
+                run.rows = execution.row_count
+                execution.completed_at = end_time
+                
+                # Cache the results if requested
+                if use_cache:
+                    await ReportService._cache_report_data(
+                        db, report_id, parameters, 
+                        execution_request.filters, report_data, execution_request.cache_duration_minutes
+                    )
+                
+                await db.commit()
+                
+                logger.info(
+                    "Report executed successfully",
+                    execution_id=execution.execution_id,
+                    row_count=execution.row_count,
+                    execution_time_ms=execution_time_ms
                 )
+                
+            except Exception as e:
+                execution.status = ReportStatus.FAILED
+                execution.error_message = str(e)
+                execution.completed_at = datetime.now()
+                await db.commit()
+                
+                logger.error(
+                    "Report execution failed",
+                    execution_id=execution.execution_id,
+                    error=str(e),
+                    exc_info=True
+                )
+                raise
             
-            await db.commit()
-            
-            logger.info(
-                "Report executed successfully",
-                execution_id=execution.execution_id,
-                row_count=execution.row_count,
-                execution_time_ms=execution_time_ms
-            )
-            
-        except Exception as e:
-            execution.status = ReportStatus.FAILED
-            execution.error_message = str(e)
-            execution.completed_at = datetime.now()
-            await db.commit()
-            
-            logger.error(
-                "Report execution failed",
-                execution_id=execution.execution_id,
-                error=str(e),
-                exc_info=True
-            )
-            raise
-        
         return execution
     
     @staticmethod
@@ -220,28 +295,40 @@ class ReportService(BaseListService):
         company_id: str,
         report_id: str,
         parameters: Dict[str, Any] = None,
-        filters: List[Dict[str, Any]] = None
+        filters: List[Dict[str, Any]] = None,
+        report_def=None
     ) -> ReportDataResponse:
-        """Get report data directly without creating execution record"""
+        """Get report data directly without creating execution record.
         
-        report_def = await ReportService.get_report_definition_by_id(db, report_id)
+        Callers that already resolved the definition pass it as `report_def`.
+        """
+        
+        report_def = report_def or await ReportService.resolve_report_definition(db, report_id)
         if not report_def:
             raise ValueError("Report definition not found")
+        parameters = ReportService._prepare_parameters(report_def, parameters)
         
-        # Check cache first
-        cached_data = await ReportService._get_cached_report_data(
-            db, report_id, parameters or {}, filters or []
-        )
-        
-        if cached_data:
-            return ReportDataResponse(**cached_data)
-        
-        # Execute the report
-        start_time = datetime.now()
-        report_data = await ReportService._execute_report_query(
-            db, company_id, report_def, parameters or {}, filters or []
-        )
-        execution_time = int((datetime.now() - start_time).total_seconds() * 1000)
+        async with report_telemetry.track(db, company_id, report_def, "inline") as run:
+            # Check cache first
+            cached_data = None
+            if ReportService._is_cacheable(report_def):
+                cached_data = await ReportService._get_cached_report_data(
+                    db, report_id, parameters, filters or []
+                )
+                run.cache_hit = bool(cached_data)
+            
+            if cached_data:
+                response = ReportDataResponse(**cached_data)
+                run.rows = len(response.data)
+                return response
+            
+            # Execute the report
+            start_time = datetime.now()
+            report_data = await ReportService._execute_report_query(
+                db, company_id, report_def, parameters, filters or []
+            )
+            execution_time = int((datetime.now() - start_time).total_seconds() * 1000)
+            run.rows = len(report_data.get('data', []))
         
         response = ReportDataResponse(
             report_id=report_id,
@@ -249,7 +336,7 @@ class ReportService(BaseListService):
             columns=report_def.column_definitions,
             data=report_data.get('data', []),
             summary=report_data.get('summary', {}),
-            parameters=parameters or {},
+            parameters=parameters,
             filters=filters or [],
             generated_at=datetime.now(),
             row_count=len(report_data.get('data', [])),
@@ -291,26 +378,16 @@ class ReportService(BaseListService):
         parameters: Dict[str, Any],
         filters: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
-        """Execute system report based on report name/type"""
-        
-        report_name = report_def.report_name.lower()
-        
-        if "profit" in report_name and "loss" in report_name:
-            return await ReportService._generate_profit_loss_data(db, company_id, parameters)
-        elif "balance" in report_name and "sheet" in report_name:
-            return await ReportService._generate_balance_sheet_data(db, company_id, parameters)
-        elif "cash" in report_name and "flow" in report_name:
-            return await ReportService._generate_cash_flow_data(db, company_id, parameters)
-        elif "trial" in report_name and "balance" in report_name:
-            return await ReportService._generate_trial_balance_data(db, company_id, parameters)
-        elif "aging" in report_name:
-            if "receivable" in report_name or "customer" in report_name:
-                return await ReportService._generate_ar_aging_data(db, company_id, parameters)
-            elif "payable" in report_name or "vendor" in report_name:
-                return await ReportService._generate_ap_aging_data(db, company_id, parameters)
-        
-        # Default for unknown system reports
-        return {"data": [], "summary": {}}
+        """Execute system report through the report registry"""
+        
+        system_report = report_registry.resolve(report_def)
+        if system_report is None:
+            # Default for unknown system reports
+            logger.warning("No generator registered for system report", report_id=report_def.report_id,
+                           report_name=report_def.report_name)
+            return {"data": [], "summary": {}}
+        
+        return await system_report.generator(db, company_id, system_report.apply_defaults(parameters))
 
     @staticmethod
     async def _generate_profit_loss_data(db: AsyncSession, company_id: str, parameters: Dict[str, Any]):
@@ -505,6 +582,175 @@ class ReportService(BaseListService):
         
         return await FinancialReportService.generate_ap_aging_report(db, company_id, request)
     
+    @staticmethod
+    def _custom_sql_filter(index: int, report_filter: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """A report filter as a condition on the template's output columns, with its bound values"""
+        
+        field = str(report_filter.get('field', ''))
+        operator = report_filter.get('operator')
+        value = report_filter.get('value')
+        if not re.fullmatch(r'[A-Za-z_]\w*', field):
+            raise ValueError(f"Invalid filter field: {field}")
+        column = f"custom_report.{field}"
+        name = f"report_filter_{index}"
+        
+        if operator in CUSTOM_SQL_FILTER_OPERATORS:
+            return f"{column} {CUSTOM_SQL_FILTER_OPERATORS[operator]} :{name}", {name: value}
+        if operator == 'in' and isinstance(value, list):
+            names = [f"{name}_{position}" for position in range(len(value))]
+            if not names:
+                return "1 = 0", {}
+            return f"{column} IN ({', '.join(':' + item for item in names)})", dict(zip(names, value))
+        if operator == 'between' and isinstance(value, list) and len(value) == 2:
+            return f"{column} BETWEEN :{name}_0 AND :{name}_1", {f"{name}_0": value[0], f"{name}_1": value[1]}
+        raise ValueError(f"Invalid filter operator for {field}: {operator}")
+    
+    @staticmethod
+    def _build_custom_sql_query(
+        company_id: str,
+        sql_template: str,
+        parameters: Dict[str, Any],
+        filters: List[Dict[str, Any]],
+        row_limit: int,
+        dialect: str
+    ):
+        """Build a custom SQL report query with bound parameters, company scope, filters and row limit.
+
+        Each table the template reads is shadowed by a common table expression
+        holding only the company's rows, so the template cannot see other
+        companies whatever it selects. The company is always bound from the
+        request, never from report parameters. Filters apply to the
+        template's output columns.
+        """
+        
+        try:
+            validate_sql_template(sql_template)
+        except ValueError as e:
+            raise ValueError(f"Report execution failed: {str(e)}")
+        
+        template = sql_template.strip().rstrip(';')
+        names = set(SQL_PARAMETER_PATTERN.findall(template))
+        missing = sorted(names - {'company_id', 'row_limit'} - set(parameters))
+        if missing:
+            raise ValueError(f"Missing report parameters: {', '.join(missing)}")
+        
+        # SQLite resolves a name inside its own CTE to the CTE, so the base table is schema-qualified
+        schema = "main." if dialect == "sqlite" else ""
+        scopes = []
+        for table in sql_template_tables(template):
+            parent = CUSTOM_REPORT_TABLES[table]
+            if parent is None:
+                scope = f"SELECT * FROM {schema}{table} WHERE company_id = :company_id"
+            else:
+                foreign_key, parent_table, parent_key = parent
+                scope = (
+                    f"SELECT {table}.* FROM {schema}{table} WHERE {table}.{foreign_key} IN "
+                    f"(SELECT {parent_key} FROM {schema}{parent_table} WHERE company_id = :company_id)"
+                )
+            scopes.append(f"{table} AS ({scope})")
+        
+        values = {name: parameters[name] for name in names if name in parameters}
+        conditions = []
+        for index, report_filter in enumerate(filters):
+            condition, filter_values = ReportService._custom_sql_filter(index, report_filter)
+            conditions.append(condition)
+            values.update(filter_values)
+        
+        query = f"SELECT * FROM ({template}) AS custom_report"
+        if scopes:
+            query = f"WITH {', '.join(scopes)} {query}"
+        if conditions:
+            query += f" WHERE {' AND '.join(conditions)}"
+        query += " LIMIT :row_limit"
+        
+        values.update(company_id=company_id, row_limit=row_limit)
+        return text(query).bindparams(**values)
+    
+    @staticmethod
+    async def _stream_custom_sql_report(
+        db: AsyncSession,
+        company_id: str,
+        sql_template: str,
+        parameters: Dict[str, Any],
+        filters: List[Dict[str, Any]],
+        chunk_size: int = REPORT_STREAM_CHUNK_SIZE,
+        max_rows: int = CUSTOM_REPORT_MAX_ROWS
+    ) -> Tuple[List[str], AsyncIterator[List[Sequence[Any]]]]:
+        """Run a custom SQL report on a server-side cursor within its row and time budget.
+
+        The report runs on its own connection in a read-only transaction, so
+        the template cannot write whatever it contains and the caller's session
+        stays writable. The time budget counts database time only, so a slow
+        consumer does not use it up. Exceeding either budget raises ValueError.
+        """
+        
+        # One extra row tells a result at the limit from one over it
+        dialect = db.bind.dialect.name
+        query = ReportService._build_custom_sql_query(
+            company_id, sql_template, parameters, filters, max_rows + 1, dialect
+        )
+        budget = CUSTOM_REPORT_TIMEOUT_SECONDS
+        conn = await db.bind.connect()
+        
+        async def release() -> None:
+            try:
+                if conn.in_transaction():
+                    await conn.rollback()
+                if dialect == "sqlite":
+                    await conn.execute(text("PRAGMA query_only = OFF"))
+            finally:
+                await conn.close()
+        
+        try:
+            await conn.begin()
+            if dialect == "sqlite":
+                await conn.execute(text("PRAGMA query_only = ON"))
+            elif dialect == "postgresql":
+                await conn.execute(text("SET TRANSACTION READ ONLY"))
+                await conn.execute(text(f"SET LOCAL statement_timeout = {int(budget * 1000)}"))
+            started = time.monotonic()
+            result = await asyncio.wait_for(conn.stream(query.execution_options(yield_per=chunk_size)), budget)
+            elapsed = time.monotonic() - started
+        except asyncio.TimeoutError:
+            await release()
+            logger.warning("Custom SQL report exceeded time budget", company_id=company_id, budget_seconds=budget)
+            raise ValueError(f"Report execution failed: exceeded the time limit of {budget:g} seconds")
+        except Exception as e:
+            await release()
+            logger.error("Custom SQL report execution failed", error=str(e), sql_template=sql_template)
+            raise ValueError(f"Report execution failed: {str(e)}")
+        
+        async def sql_chunks() -> AsyncIterator[List[Sequence[Any]]]:
+            nonlocal elapsed
+            partitions = result.partitions(chunk_size)
+            row_count = 0
+            try:
+                while True:
+                    started = time.monotonic()
+                    try:
+                        chunk = await asyncio.wait_for(anext(partitions), max(budget - elapsed, 0))
+                    except StopAsyncIteration:
+                        return
+                    except asyncio.TimeoutError:
+                        logger.warning("Custom SQL report exceeded time budget", company_id=company_id,
+                                       budget_seconds=budget, row_count=row_count)
+                        raise ValueError(f"Report execution failed: exceeded the time limit of {budget:g} seconds")
+                    elapsed += time.monotonic() - started
+        
+                    row_count += len(chunk)
+                    if row_count > max_rows:
+                        logger.warning("Custom SQL report exceeded row budget", company_id=company_id,
+                                       max_rows=max_rows)
+                        raise ValueError(f"Report execution failed: returns more than {max_rows} rows")
+                    yield chunk
+            finally:
+                try:
+                    await result.close()
+                finally:
+                    await release()
+        
+        return list(result.keys()), sql_chunks()
+    
     @staticmethod
     async def _execute_custom_sql_report(
         db: AsyncSession,
@@ -513,42 +759,56 @@ class ReportService(BaseListService):
         parameters: Dict[str, Any],
         filters: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
-        """Execute custom SQL report with parameter substitution"""
+        """Execute custom SQL report with bound parameters, returning rows inline"""
         
-        # Simple parameter substitution (in production, use more secure method)
-        query = sql_template
+        columns, row_chunks = await ReportService._stream_custom_sql_report(
+            db, company_id, sql_template, parameters, filters, max_rows=CUSTOM_REPORT_MAX_INLINE_ROWS
+        )
         
-        # Add company filter
-        if "WHERE" in query.upper():
-            query += f" AND company_id = '{company_id}'"
-        else:
-            query += f" WHERE company_id = '{company_id}'"
+        data = []
+        async for chunk in row_chunks:
+            data.extend(dict(zip(columns, row)) for row in chunk)
+        
+        return {
+            "data": data,
+            "summary": {"total_rows": len(data)}
+        }
+    
+    @staticmethod
+    async def open_report_stream(
+        db: AsyncSession,
+        company_id: str,
+        report_def: ReportDefinition,
+        parameters: Dict[str, Any],
+        filters: List[Dict[str, Any]],
+        chunk_size: int = REPORT_STREAM_CHUNK_SIZE
+    ) -> Tuple[List[str], AsyncIterator[List[Sequence[Any]]]]:
+        """Open a report as column names plus an iterator of row chunks.
+
+        Custom SQL reports are read from a server-side cursor so only one chunk
+        is held in memory at a time. System reports are aggregates and are
+        computed up front, then chunked.
+        """
+        
+        if not report_def.is_system_report and report_def.sql_template:
+            return await ReportService._stream_custom_sql_report(
+                db, company_id, report_def.sql_template, parameters, filters, chunk_size
+            )
         
-        # Substitute parameters
-        for key, value in parameters.items():
-            placeholder = f":{key}"
-            if placeholder in query:
-                if isinstance(value, str):
-                    query = query.replace(placeholder, f"'{value}'")
-                else:
-                    query = query.replace(placeholder, str(value))
+        report_data = await ReportService._execute_report_query(
+            db, company_id, report_def, parameters, filters
+        )
+        rows = report_data.get('data', [])
+        columns = list(rows[0].keys()) if rows else [
+            column['name'] for column in (report_def.column_definitions or [])
+            if isinstance(column, dict) and 'name' in column
+        ]
         
-        try:
-            result = await db.execute(text(query))
-            rows = result.fetchall()
-            
-            # Convert rows to dictionaries
-            columns = result.keys()
-            data = [dict(zip(columns, row)) for row in rows]
-            
-            return {
-                "data": data,
-                "summary": {"total_rows": len(data)}
-            }
-            
-        except Exception as e:
-            logger.error("Custom SQL report execution failed", error=str(e), query=query)
-            raise ValueError(f"Report execution failed: {str(e)}")
+        async def data_chunks() -> AsyncIterator[List[Sequence[Any]]]:
+            for start in range(0, len(rows), chunk_size):
+                yield [tuple(row.get(column) for column in columns) for row in rows[start:start + chunk_size]]
+        
+        return columns, data_chunks()
     
     @staticmethod
     async def _get_cached_report_data(
@@ -643,6 +903,79 @@ class ReportService(BaseListService):
         cache_string = json.dumps(cache_data, sort_keys=True, default=str)
         return hashlib.md5(cache_string.encode()).hexdigest()
 
+_DATE_RANGE_PARAMETERS = {
+    "start_date": {"type": "date"},
+    "end_date": {"type": "date"}
+}
+_STATEMENT_PARAMETERS = {
+    "include_subtotals": {"type": "boolean", "default_value": True},
+    "show_cents": {"type": "boolean", "default_value": True}
+}
+# Posted activity the financial statements are built from
+_STATEMENT_SOURCES = ("transactions", "transaction_lines", "journal_entries", "accounts")
+
+_AGING_PARAMETERS = {
+    "as_of_date": {"type": "date"},
+    "aging_periods": {"type": "string", "default_value": [30, 60, 90, 120]},
+    "include_zero_balances": {"type": "boolean", "default_value": False}
+}
+
+report_registry.register(
+    "profit_loss",
+    ReportService._generate_profit_loss_data,
+    {
+        **_DATE_RANGE_PARAMETERS,
+        "comparison_type": {"type": "select", "default_value": "none"},
+        "comparison_start_date": {"type": "date"},
+        "comparison_end_date": {"type": "date"},
+        **_STATEMENT_PARAMETERS
+    },
+    names=("Profit & Loss", "Profit and Loss"),
+    sources=_STATEMENT_SOURCES
+)
+report_registry.register(
+    "balance_sheet",
+    ReportService._generate_balance_sheet_data,
+    {"as_of_date": {"type": "date"}, "comparison_date": {"type": "date"}, **_STATEMENT_PARAMETERS},
+    names=("Balance Sheet",),
+    sources=_STATEMENT_SOURCES
+)
+report_registry.register(
+    "cash_flow",
+    ReportService._generate_cash_flow_data,
+    {**_DATE_RANGE_PARAMETERS, "method": {"type": "select", "default_value": "indirect"}, **_STATEMENT_PARAMETERS},
+    names=("Cash Flow Statement", "Cash Flow"),
+    sources=_STATEMENT_SOURCES
+)
+report_registry.register(
+    "trial_balance",
+    ReportService._generate_trial_balance_data,
+    {
+        "as_of_date": {"type": "date"},
+        "include_zero_balances": {"type": "boolean", "default_value": False},
+        "show_cents": {"type": "boolean", "default_value": True}
+    },
+    names=("Trial Balance",),
+    sources=_STATEMENT_SOURCES
+)
+# Aging defaults to today's balances, which change with every payment
+report_registry.register(
+    "ar_aging",
+    ReportService._generate_ar_aging_data,
+    {**_AGING_PARAMETERS, "customer_id": {"type": "string"}},
+    cacheable=False,
+    names=("A/R Aging Summary", "Accounts Receivable Aging", "Customer Aging"),
+    sources=("transactions", "payments", "customers")
+)
+report_registry.register(
+    "ap_aging",
+    ReportService._generate_ap_aging_data,
+    {**_AGING_PARAMETERS, "vendor_id": {"type": "string"}},
+    cacheable=False,
+    names=("A/P Aging Summary", "Accounts Payable Aging", "Vendor Aging"),
+    sources=("transactions", "payments", "vendors")
+)
+
 class MemorizedReportService(BaseListService):
     """Service for memorized report management"""
     
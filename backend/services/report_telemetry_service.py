@@ -0,0 +1,232 @@
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime, timezone
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from prometheus_client import Counter, Histogram
+import math
+import os
+import time
+import structlog
+
+logger = structlog.get_logger()
+
+REPORT_DURATION = Histogram(
+    "report_execution_seconds", "Report execution time", ["report", "mode"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+REPORT_ROWS = Counter("report_rows_total", "Rows produced by report executions", ["report"])
+REPORT_BYTES = Counter("report_output_bytes_total", "Bytes of exported report output", ["report"])
+REPORT_QUERIES = Counter("report_db_queries_total", "Database queries issued by report executions", ["report"])
+REPORT_CACHE_LOOKUPS = Counter("report_cache_lookups_total", "Report cache lookups", ["report", "result"])
+REPORT_SLOW = Counter("report_slow_executions_total", "Report executions over the slow threshold", ["report"])
+
+
+class ReportRun:
+    """Cost of a single report execution"""
+
+    __slots__ = ("company_id", "report_id", "report_name", "label", "mode", "started", "duration_ms",
+                 "rows", "bytes", "cache_hit", "queries", "slowest_query_ms", "slowest_statement",
+                 "slowest_parameters")
+
+    def __init__(self, company_id: str, report_id: str, report_name: str, label: str, mode: str):
+        self.company_id = company_id
+        self.report_id = report_id
+        self.report_name = report_name
+        self.label = label
+        self.mode = mode
+        self.started = time.perf_counter()
+        self.duration_ms = 0.0
+        self.rows = 0
+        self.bytes: Optional[int] = None
+        self.cache_hit: Optional[bool] = None
+        self.queries = 0
+        self.slowest_query_ms = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.slowest_parameters: Any = None
+
+
+# The run of the report being executed by the current task. SQLAlchemy's async
+# greenlets share the caller's context, so cursor events see it too.
+_current_run: ContextVar[Optional[ReportRun]] = ContextVar("report_run", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_run.get() is not None:
+        conn.info.setdefault("report_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    run = _current_run.get()
+    started = conn.info.get("report_query_started")
+    if run is None or not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+    run.queries += 1
+    if elapsed_ms > run.slowest_query_ms and not executemany:
+        run.slowest_query_ms = elapsed_ms
+        run.slowest_statement = statement
+        run.slowest_parameters = parameters
+
+
+class ReportTelemetry:
+    """Per-report-definition execution telemetry.
+
+    Each tracked execution records its duration, rows, output bytes, cache
+    outcome and the number of database queries it issued. Recent executions
+    are kept per company and report for percentile summaries, and totals are
+    exported as Prometheus metrics labelled by system report key (custom
+    reports share one label). Executions slower than the threshold get the
+    plan of their slowest statement captured.
+    """
+
+    def __init__(self):
+        self.window = int(os.getenv("REPORT_TELEMETRY_WINDOW", "500"))
+        self.slow_ms = int(os.getenv("REPORT_SLOW_MS", "2000"))
+        self._samples: Dict[Tuple[str, str], deque] = {}
+        self._slow_runs: Dict[Tuple[str, str], deque] = {}
+        self._names: Dict[str, str] = {}
+        self._installed = False
+
+    def install(self, engine) -> None:
+        """Count and time the queries issued on an engine by tracked executions"""
+        if self._installed:
+            return
+        sync_engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        self._installed = True
+
+    @asynccontextmanager
+    async def track(self, db: AsyncSession, company_id: str, report_def, mode: str):
+        """Track a report execution; nested executions count towards the outer one"""
+        active = _current_run.get()
+        if active is not None:
+            yield active
+            return
+
+        label = (report_def.report_key or report_def.report_name) if report_def.is_system_report else "custom"
+        run = ReportRun(company_id, report_def.report_id, report_def.report_name, label, mode)
+        token = _current_run.set(run)
+        try:
+            yield run
+        finally:
+            _current_run.reset(token)
+            run.duration_ms = (time.perf_counter() - run.started) * 1000
+
+        # Only reached when the execution succeeded
+        self._record(run)
+        if run.duration_ms >= self.slow_ms:
+            await self._record_slow_run(db, run)
+
+    def _record(self, run: ReportRun) -> None:
+        key = (run.company_id, run.report_id)
+        self._names[run.report_id] = run.report_name
+        self._samples.setdefault(key, deque(maxlen=self.window)).append(
+            (run.duration_ms, run.rows, run.bytes, run.cache_hit, run.queries, run.mode)
+        )
+
+        REPORT_DURATION.labels(run.label, run.mode).observe(run.duration_ms / 1000)
+        REPORT_ROWS.labels(run.label).inc(run.rows)
+        REPORT_QUERIES.labels(run.label).inc(run.queries)
+        if run.bytes is not None:
+            REPORT_BYTES.labels(run.label).inc(run.bytes)
+        if run.cache_hit is not None:
+            REPORT_CACHE_LOOKUPS.labels(run.label, "hit" if run.cache_hit else "miss").inc()
+
+    async def _record_slow_run(self, db: AsyncSession, run: ReportRun) -> None:
+        REPORT_SLOW.labels(run.label).inc()
+        plan = None
+        if run.slowest_statement:
+            plan = await self.explain(db, run.slowest_statement, run.slowest_parameters)
+
+        self._slow_runs.setdefault((run.company_id, run.report_id), deque(maxlen=5)).append({
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "mode": run.mode,
+            "duration_ms": round(run.duration_ms, 1),
+            "rows": run.rows,
+            "queries": run.queries,
+            "slowest_query_ms": round(run.slowest_query_ms, 1),
+            "slowest_statement": run.slowest_statement,
+            "plan": plan
+        })
+        logger.warning(
+            "Slow report execution",
+            company_id=run.company_id,
+            report_id=run.report_id,
+            report_name=run.report_name,
+            mode=run.mode,
+            duration_ms=round(run.duration_ms),
+            rows=run.rows,
+            queries=run.queries,
+            slowest_query_ms=round(run.slowest_query_ms),
+            plan=plan
+        )
+
+    @staticmethod
+    async def explain(db: AsyncSession, statement: str, parameters: Any) -> Optional[Any]:
+        """Get the database's plan for a statement as it was executed"""
+        try:
+            dialect = db.get_bind().dialect.name
+            if dialect == "postgresql":
+                prefix = "EXPLAIN (FORMAT JSON) "
+            elif dialect == "sqlite":
+                prefix = "EXPLAIN QUERY PLAN "
+            else:
+                prefix = "EXPLAIN "
+            connection = await db.connection()
+            result = await connection.exec_driver_sql(prefix + statement, parameters)
+            rows = result.fetchall()
+            if dialect == "postgresql":
+                return rows[0][0]
+            return [[str(value) for value in row] for row in rows]
+        except Exception as e:
+            logger.warning("Failed to capture report query plan", error=str(e))
+            return None
+
+    @staticmethod
+    def _percentile(values: List[float], percentile: float) -> Optional[float]:
+        if not values:
+            return None
+        ordered = sorted(values)
+        return ordered[max(math.ceil(percentile / 100 * len(ordered)) - 1, 0)]
+
+    def summary(self, company_id: str, report_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Summarize the recent executions of a company's reports, slowest p95 first"""
+        reports = []
+        for (sample_company_id, sample_report_id), samples in self._samples.items():
+            if sample_company_id != company_id or (report_id and sample_report_id != report_id):
+                continue
+            durations = [sample[0] for sample in samples]
+            rows = [sample[1] for sample in samples]
+            sizes = [sample[2] for sample in samples if sample[2] is not None]
+            cache_lookups = [sample[3] for sample in samples if sample[3] is not None]
+            queries = [sample[4] for sample in samples]
+
+            reports.append({
+                "report_id": sample_report_id,
+                "report_name": self._names.get(sample_report_id),
+                "executions": len(samples),
+                "p50_ms": round(self._percentile(durations, 50), 1),
+                "p95_ms": round(self._percentile(durations, 95), 1),
+                "max_ms": round(max(durations), 1),
+                "avg_rows": round(sum(rows) / len(rows), 1),
+                "max_rows": max(rows),
+                "avg_bytes": round(sum(sizes) / len(sizes)) if sizes else None,
+                "cache_hit_ratio": round(sum(cache_lookups) / len(cache_lookups), 3) if cache_lookups else None,
+                "avg_queries": round(sum(queries) / len(queries), 1),
+                "executions_by_mode": {
+                    mode: sum(1 for sample in samples if sample[5] == mode)
+                    for mode in {sample[5] for sample in samples}
+                },
+                "slow_executions": list(self._slow_runs.get((sample_company_id, sample_report_id), []))
+            })
+
+        reports.sort(key=lambda report: report["p95_ms"], reverse=True)
+        return reports
+
+
+# Global report telemetry instance
+report_telemetry = ReportTelemetry()
@@ -1,15 +1,19 @@
 import os
-from typing import Optional
+from typing import Optional, Dict
 from fastapi import HTTPException, status, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, update
 from database.connection import get_db, get_redis
 from models.user import User, UserSession
 from services.auth_service import auth_service
+from services.rate_limit_service import rate_limiter
+from services.session_revocation_service import session_revocations
 import structlog
 from datetime import datetime, timezone
+import hmac
 import ipaddress
+import time
 
 logger = structlog.get_logger()
 
@@ -18,7 +22,8 @@ security = HTTPBearer()
 
 class SecurityService:
     def __init__(self):
-        self.max_requests_per_minute = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+        self.session_touch_interval = int(os.getenv("SESSION_TOUCH_INTERVAL_SECONDS", "60"))
+        self._session_touched_at: Dict[str, float] = {}
     
     async def get_current_user(
         self,
@@ -29,47 +34,48 @@ class SecurityService:
         """Get current authenticated user"""
         
         try:
-            # Decode token
+            # Decode token (cached for the token's remaining lifetime)
             payload = auth_service.decode_access_token(credentials.credentials)
             user_id = payload.get("user_id")
             session_id = payload.get("session_id")
             
-            logger.info(f"Token decoded successfully: user_id={user_id}, session_id={session_id}")
-            
-            # Check if token is blacklisted
-            redis = await get_redis()
-            is_blacklisted = await redis.get(f"blacklist:{session_id}")
-            if is_blacklisted:
+            # Check revocation against the locally replicated revocation list
+            if await session_revocations.is_revoked(session_id):
                 logger.warning(f"Token is blacklisted: session_id={session_id}")
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Token has been revoked"
                 )
             
-            logger.info(f"Token not blacklisted, checking user and session")
-            
-            # Get user and session
-            result = await db.execute(
-                select(User, UserSession).join(UserSession).where(
-                    and_(
-                        User.user_id == user_id,
-                        UserSession.session_id == session_id,
-                        UserSession.is_active == True,
-                        UserSession.expires_at > datetime.now(timezone.utc)
+            # Without a current revocation list, confirm the session in the database
+            if session_revocations.is_stale():
+                active_session = await db.scalar(
+                    select(UserSession.session_id).where(
+                        and_(
+                            UserSession.session_id == session_id,
+                            UserSession.user_id == user_id,
+                            UserSession.is_active == True,
+                            UserSession.expires_at > datetime.now(timezone.utc)
+                        )
                     )
                 )
-            )
-            user_session = result.first()
+                if not active_session:
+                    logger.warning(f"Session not active: session_id={session_id}")
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="User not found or session invalid"
+                    )
             
-            if not user_session:
-                logger.warning(f"User or session not found: user_id={user_id}, session_id={session_id}")
+            # Get user by primary key (served from the session identity map when possible)
+            user = await db.get(User, user_id)
+            
+            if not user:
+                logger.warning(f"User not found: user_id={user_id}, session_id={session_id}")
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="User not found or session invalid"
                 )
             
-            user, session = user_session
-            
             # Check if user is active
             if not user.is_active:
                 logger.warning(f"User account is deactivated: user_id={user_id}")
@@ -78,11 +84,13 @@ class SecurityService:
                     detail="User account is deactivated"
                 )
             
-            logger.info(f"User authenticated successfully: user_id={user_id}")
+            # Company-scoped routes count against the company's shared quota
+            company_id = request.path_params.get("company_id")
+            if company_id:
+                await rate_limiter.check_company(request, company_id)
             
-            # Update session last used
-            session.last_used = datetime.now(timezone.utc)
-            await db.commit()
+            # Update session last used, at most once per interval
+            await self._touch_session(db, session_id)
             
             # Log access
             logger.info(
@@ -103,50 +111,31 @@ class SecurityService:
                 detail="Not authenticated"
             )
     
+    async def _touch_session(self, db: AsyncSession, session_id: str) -> None:
+        """Record session activity without writing on every request"""
+        now = time.time()
+        last_touched = self._session_touched_at.get(session_id)
+        if last_touched is not None and now - last_touched < self.session_touch_interval:
+            return
+        
+        self._session_touched_at[session_id] = now
+        if len(self._session_touched_at) > 100000:
+            self._session_touched_at.clear()
+        
+        await db.execute(
+            update(UserSession)
+            .where(UserSession.session_id == session_id)
+            .values(last_used=datetime.now(timezone.utc))
+        )
+        await db.commit()
+    
     def get_client_ip(self, request: Request) -> str:
         """Get client IP address"""
-        forwarded = request.headers.get("X-Forwarded-For")
-        if forwarded:
-            return forwarded.split(",")[0].strip()
-        return request.client.host
+        return rate_limiter.client_ip(request)
     
     async def check_rate_limit(self, request: Request, user_id: Optional[str] = None) -> None:
-        """Check rate limit for IP or user"""
-        
-        redis = await get_redis()
-        client_ip = self.get_client_ip(request)
-        
-        # Rate limit by IP
-        ip_key = f"rate_limit:ip:{client_ip}"
-        ip_count = await redis.get(ip_key)
-        
-        if ip_count and int(ip_count) >= self.max_requests_per_minute:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded"
-            )
-        
-        # Increment counter
-        pipe = await redis.pipeline()
-        pipe.incr(ip_key)
-        pipe.expire(ip_key, 60)
-        await pipe.execute()
-        
-        # Rate limit by user if authenticated
-        if user_id:
-            user_key = f"rate_limit:user:{user_id}"
-            user_count = await redis.get(user_key)
-            
-            if user_count and int(user_count) >= self.max_requests_per_minute * 2:  # Higher limit for authenticated users
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="User rate limit exceeded"
-                )
-            
-            pipe = await redis.pipeline()
-            pipe.incr(user_key)
-            pipe.expire(user_key, 60)
-            await pipe.execute()
+        """Check rate limit for IP, user and company"""
+        await rate_limiter.check(request, user_id=user_id)
     
     def validate_ip_address(self, ip_address: str) -> bool:
         """Validate IP address format"""
@@ -226,4 +215,19 @@ async def get_current_user_with_rate_limit(
     user: User = Depends(get_current_user)
 ) -> User:
     await security_service.check_rate_limit(request, str(user.user_id))
-    return user
\ No newline at end of file
+    return user
+
+# Dependency guarding operational endpoints such as /api/metrics
+async def require_metrics_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
+) -> None:
+    token = os.getenv("METRICS_TOKEN")
+    if not token:
+        # Metrics carry company and report names, so they are off unless a scraper token is set
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not hmac.compare_digest(credentials.credentials, token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
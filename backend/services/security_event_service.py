@@ -0,0 +1,237 @@
+from typing import Optional, Dict, Any, List, Set, Deque
+from datetime import datetime, timezone
+from collections import defaultdict, deque, OrderedDict
+from sqlalchemy import select, and_, func
+from models.audit import SecurityLog, SecurityEvent
+from database.connection import AsyncSessionLocal
+import asyncio
+import os
+import time
+import structlog
+
+logger = structlog.get_logger()
+
+
+class SecurityEventDetector:
+    """Detects suspicious security patterns from a stream of security log events.
+
+    Events are queued by SecurityService.create_security_log and consumed by a
+    background task that keeps sliding-window state in memory, so request
+    latency does not depend on the size of the security_logs table. Findings
+    are written as SUSPICIOUS_ACTIVITY logs from the consumer and are never fed
+    back into the detector.
+    """
+
+    def __init__(self):
+        self.failed_login_threshold = int(os.getenv("SUSPICIOUS_FAILED_LOGIN_THRESHOLD", "5"))
+        self.failed_login_window = int(os.getenv("SUSPICIOUS_FAILED_LOGIN_WINDOW_MINUTES", "15")) * 60
+        self.max_tracked_users = int(os.getenv("SUSPICIOUS_MAX_TRACKED_USERS", "50000"))
+        self.queue_size = int(os.getenv("SECURITY_EVENT_QUEUE_SIZE", "10000"))
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        # Failed login timestamps per IP and per user within the sliding window
+        self._failed_by_ip: Dict[str, Deque[float]] = defaultdict(deque)
+        self._failed_by_user: Dict[str, Deque[float]] = defaultdict(deque)
+        # Last time a repeated-failure finding was emitted per IP
+        self._failed_alerted_at: Dict[str, float] = {}
+        # IPs each user has logged in from, bounded LRU by user
+        self._seen_ips: "OrderedDict[str, Set[str]]" = OrderedDict()
+        self._processed = 0
+
+    def start(self) -> None:
+        """Start the background consumer"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._worker = asyncio.create_task(self._run())
+            logger.info("Security event detector started")
+
+    async def stop(self) -> None:
+        """Drain pending events and stop the background consumer"""
+        if self._worker is None:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        logger.info("Security event detector stopped")
+
+    def submit(self, security_log: SecurityLog) -> None:
+        """Queue a persisted security log for pattern detection without blocking"""
+        if self._queue is None or security_log.event_type == SecurityEvent.SUSPICIOUS_ACTIVITY:
+            return
+        event = {
+            "user_id": security_log.user_id,
+            "company_id": security_log.company_id,
+            "event_type": security_log.event_type,
+            "ip_address": security_log.ip_address,
+            "user_agent": security_log.user_agent,
+            "details": security_log.details,
+            "timestamp": time.time()
+        }
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Security event queue full, dropping event", event_type=security_log.event_type.value)
+
+    async def _run(self) -> None:
+        while True:
+            event = await self._queue.get()
+            try:
+                findings = await self._detect(event)
+                if findings:
+                    await self._persist(findings)
+            except Exception as e:
+                logger.error("Failed to process security event", error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _detect(self, event: Dict[str, Any]) -> List[Dict[str, Any]]:
+        self._processed += 1
+        if self._processed % 1000 == 0:
+            self._sweep(event["timestamp"])
+
+        event_type = event["event_type"]
+        if event_type == SecurityEvent.LOGIN_FAILED:
+            return self._check_repeated_failed_logins(event)
+        if event_type == SecurityEvent.LOGIN_SUCCESS:
+            return await self._check_unusual_access_patterns(event)
+        if event_type == SecurityEvent.SENSITIVE_DATA_ACCESS:
+            return self._check_suspicious_data_access(event)
+        return []
+
+    def _sweep(self, now: float) -> None:
+        """Forget IPs and users with no failures left in the window"""
+        horizon = now - self.failed_login_window
+        for windows in (self._failed_by_ip, self._failed_by_user):
+            for key in [key for key, window in windows.items() if not window or window[-1] < horizon]:
+                del windows[key]
+        for ip_address in [ip for ip, alerted_at in self._failed_alerted_at.items() if alerted_at < horizon]:
+            del self._failed_alerted_at[ip_address]
+
+    @staticmethod
+    def _slide(window: Deque[float], now: float, horizon: float) -> None:
+        while window and window[0] < horizon:
+            window.popleft()
+
+    def _check_repeated_failed_logins(self, event: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Check for repeated failed login attempts from one IP"""
+        now = event["timestamp"]
+        horizon = now - self.failed_login_window
+
+        if event["user_id"]:
+            user_window = self._failed_by_user[event["user_id"]]
+            user_window.append(now)
+            self._slide(user_window, now, horizon)
+
+        ip_address = event["ip_address"]
+        if not ip_address:
+            return []
+        ip_window = self._failed_by_ip[ip_address]
+        ip_window.append(now)
+        self._slide(ip_window, now, horizon)
+
+        if len(ip_window) < self.failed_login_threshold:
+            return []
+        # Report at most once per window per IP
+        if now - self._failed_alerted_at.get(ip_address, 0) < self.failed_login_window:
+            return []
+        self._failed_alerted_at[ip_address] = now
+
+        return [self._finding(event, success=False, risk_score=85, threat_level="high", details={
+            "pattern": "repeated_failed_logins",
+            "failed_attempts": len(ip_window),
+            "failed_attempts_for_user": len(self._failed_by_user.get(event["user_id"], ())),
+            "time_window_minutes": self.failed_login_window // 60
+        })]
+
+    async def _check_unusual_access_patterns(self, event: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Check for a first login from an IP"""
+        user_id = event["user_id"]
+        ip_address = event["ip_address"]
+        if not user_id or not ip_address:
+            return []
+
+        seen = self._seen_ips.get(user_id)
+        if seen is None:
+            seen = await self._load_seen_ips(user_id, ip_address)
+            self._seen_ips[user_id] = seen
+            while len(self._seen_ips) > self.max_tracked_users:
+                self._seen_ips.popitem(last=False)
+        self._seen_ips.move_to_end(user_id)
+
+        if ip_address in seen:
+            return []
+        seen.add(ip_address)
+
+        return [self._finding(event, success=True, risk_score=40, threat_level="medium", details={
+            "pattern": "new_ip_login",
+            "previous_logins_from_ip": 0
+        })]
+
+    async def _load_seen_ips(self, user_id: str, current_ip: str) -> Set[str]:
+        """Seed a user's seen-IP set once from history, excluding the current login"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(SecurityLog.ip_address, func.count(SecurityLog.log_id).label("logins")).where(
+                    and_(
+                        SecurityLog.user_id == user_id,
+                        SecurityLog.event_type == SecurityEvent.LOGIN_SUCCESS,
+                        SecurityLog.ip_address.is_not(None)
+                    )
+                ).group_by(SecurityLog.ip_address)
+            )
+            logins_by_ip = {row.ip_address: row.logins for row in result.all()}
+
+        # The login being evaluated is already persisted
+        if logins_by_ip.get(current_ip, 0) <= 1:
+            logins_by_ip.pop(current_ip, None)
+        return set(logins_by_ip)
+
+    def _check_suspicious_data_access(self, event: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Check for bulk data access"""
+        details = event["details"] or {}
+        if not details.get("bulk_access"):
+            return []
+
+        return [self._finding(event, success=True, risk_score=60, threat_level="high", details={
+            "pattern": "bulk_data_access",
+            "records_accessed": details.get("records_count", 0)
+        })]
+
+    @staticmethod
+    def _finding(event: Dict[str, Any], success: bool, risk_score: int,
+                 threat_level: str, details: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "user_id": event["user_id"],
+            "company_id": event["company_id"],
+            "event_type": SecurityEvent.SUSPICIOUS_ACTIVITY,
+            "success": success,
+            "ip_address": event["ip_address"],
+            "user_agent": event["user_agent"],
+            "details": {
+                **details,
+                "detected_at": datetime.now(timezone.utc).isoformat()
+            },
+            "risk_score": risk_score,
+            "threat_level": threat_level
+        }
+
+    async def _persist(self, findings: List[Dict[str, Any]]) -> None:
+        async with AsyncSessionLocal() as db:
+            db.add_all([SecurityLog(**finding) for finding in findings])
+            await db.commit()
+
+        for finding in findings:
+            logger.warning("Suspicious activity detected",
+                           pattern=finding["details"]["pattern"],
+                           user_id=finding["user_id"],
+                           ip_address=finding["ip_address"])
+
+
+# Global security event detector instance
+security_event_detector = SecurityEventDetector()
@@ -11,6 +11,8 @@ from schemas.audit_schemas import (
     UserPermissionCreate, UserPermissionResponse, UserPermissionUpdate, UserPermissionList,
     SecuritySettingsBase, SecuritySettingsResponse
 )
+from services.access_control_service import access_control, DEFAULT_ROLE_PERMISSIONS
+from services.security_event_service import security_event_detector
 from fastapi import HTTPException, status
 import structlog
 import uuid
@@ -57,8 +59,8 @@ class SecurityService:
             await self.db.commit()
             await self.db.refresh(security_log)
             
-            # Check for suspicious patterns
-            await self._check_suspicious_patterns(security_log)
+            # Hand off to the streaming detector for pattern checks
+            security_event_detector.submit(security_log)
             
             logger.info("Security log created", 
                        log_id=security_log.log_id,
@@ -255,47 +257,7 @@ class SecurityService:
                                    resource: str, action: str) -> bool:
         """Check if user has specific permission for a resource"""
         try:
-            # Check direct permissions
-            permission_query = select(UserPermission).where(
-                and_(
-                    UserPermission.user_id == user_id,
-                    UserPermission.company_id == company_id,
-                    UserPermission.resource == resource,
-                    UserPermission.is_active == True,
-                    or_(
-                        UserPermission.expires_at.is_(None),
-                        UserPermission.expires_at > datetime.now(timezone.utc)
-                    )
-                )
-            )
-            
-            result = await self.db.execute(permission_query)
-            permissions = result.scalars().all()
-            
-            # Check if user has the required action
-            for permission in permissions:
-                if action in permission.actions:
-                    return True
-            
-            # Check role-based permissions
-            membership_query = select(CompanyMembership).where(
-                and_(
-                    CompanyMembership.user_id == user_id,
-                    CompanyMembership.company_id == company_id,
-                    CompanyMembership.is_active == True
-                )
-            )
-            
-            membership_result = await self.db.execute(membership_query)
-            membership = membership_result.scalar_one_or_none()
-            
-            if membership:
-                # Check default role permissions
-                role_permissions = self._get_default_role_permissions(membership.role)
-                if resource in role_permissions and action in role_permissions[resource]:
-                    return True
-            
-            return False
+            return await access_control.has_permission(self.db, user_id, company_id, resource, action)
             
         except Exception as e:
             logger.error("Failed to check user permissions", error=str(e))
@@ -438,177 +400,7 @@ class SecurityService:
     
     def _get_default_role_permissions(self, role: UserRole) -> Dict[str, List[str]]:
         """Get default permissions for user roles"""
-        role_permissions = {
-            UserRole.ADMIN: {
-                "users": ["read", "write", "delete"],
-                "companies": ["read", "write", "delete"],
-                "transactions": ["read", "write", "delete"],
-                "reports": ["read", "write", "export"],
-                "settings": ["read", "write"],
-                "audit": ["read", "export"],
-                "security": ["read", "write", "delete"],
-                "permissions": ["read", "write", "delete"],
-                "roles": ["read", "write", "delete"]
-            },
-            UserRole.MANAGER: {
-                "users": ["read", "write"],
-                "companies": ["read", "write"],
-                "transactions": ["read", "write"],
-                "reports": ["read", "write", "export"],
-                "settings": ["read"],
-                "audit": ["read"],
-                "security": ["read"],
-                "permissions": ["read"],
-                "roles": ["read"]
-            },
-            UserRole.ACCOUNTANT: {
-                "transactions": ["read", "write"],
-                "reports": ["read", "write", "export"],
-                "customers": ["read", "write"],
-                "vendors": ["read", "write"],
-                "items": ["read", "write"]
-            },
-            UserRole.EMPLOYEE: {
-                "transactions": ["read"],
-                "reports": ["read"],
-                "customers": ["read"],
-                "vendors": ["read"],
-                "items": ["read"]
-            },
-            UserRole.VIEWER: {
-                "transactions": ["read"],
-                "reports": ["read"],
-                "customers": ["read"],
-                "vendors": ["read"],
-                "items": ["read"]
-            }
-        }
-        
-        return role_permissions.get(role, {})
-    
-    async def _check_suspicious_patterns(self, security_log: SecurityLog):
-        """Check for suspicious patterns in security events"""
-        try:
-            # Check for repeated failed logins
-            if security_log.event_type == SecurityEvent.LOGIN_FAILED:
-                await self._check_repeated_failed_logins(security_log)
-            
-            # Check for unusual access patterns
-            if security_log.event_type == SecurityEvent.LOGIN_SUCCESS:
-                await self._check_unusual_access_patterns(security_log)
-            
-            # Check for suspicious data access
-            if security_log.event_type == SecurityEvent.SENSITIVE_DATA_ACCESS:
-                await self._check_suspicious_data_access(security_log)
-        
-        except Exception as e:
-            logger.error("Failed to check suspicious patterns", error=str(e))
-    
-    async def _check_repeated_failed_logins(self, security_log: SecurityLog):
-        """Check for repeated failed login attempts"""
-        try:
-            # Check last 15 minutes
-            time_window = datetime.now(timezone.utc) - timedelta(minutes=15)
-            
-            query = select(func.count(SecurityLog.log_id)).where(
-                and_(
-                    SecurityLog.ip_address == security_log.ip_address,
-                    SecurityLog.event_type == SecurityEvent.LOGIN_FAILED,
-                    SecurityLog.created_at >= time_window
-                )
-            )
-            
-            result = await self.db.execute(query)
-            failed_count = result.scalar()
-            
-            if failed_count >= 5:
-                # Create suspicious activity log
-                suspicious_log = SecurityLogCreate(
-                    user_id=security_log.user_id,
-                    company_id=security_log.company_id,
-                    event_type=SecurityEvent.SUSPICIOUS_ACTIVITY,
-                    success=False,
-                    ip_address=security_log.ip_address,
-                    user_agent=security_log.user_agent,
-                    details={
-                        "pattern": "repeated_failed_logins",
-                        "failed_attempts": failed_count,
-                        "time_window_minutes": 15
-                    },
-                    risk_score=85,
-                    threat_level="high"
-                )
-                
-                await self.create_security_log(suspicious_log)
-        
-        except Exception as e:
-            logger.error("Failed to check repeated failed logins", error=str(e))
-    
-    async def _check_unusual_access_patterns(self, security_log: SecurityLog):
-        """Check for unusual access patterns"""
-        try:
-            if not security_log.user_id:
-                return
-            
-            # Check for access from new IP
-            query = select(func.count(SecurityLog.log_id)).where(
-                and_(
-                    SecurityLog.user_id == security_log.user_id,
-                    SecurityLog.ip_address == security_log.ip_address,
-                    SecurityLog.event_type == SecurityEvent.LOGIN_SUCCESS,
-                    SecurityLog.created_at < security_log.created_at
-                )
-            )
-            
-            result = await self.db.execute(query)
-            previous_logins = result.scalar()
-            
-            if previous_logins == 0:
-                # First time login from this IP
-                suspicious_log = SecurityLogCreate(
-                    user_id=security_log.user_id,
-                    company_id=security_log.company_id,
-                    event_type=SecurityEvent.SUSPICIOUS_ACTIVITY,
-                    success=True,
-                    ip_address=security_log.ip_address,
-                    user_agent=security_log.user_agent,
-                    details={
-                        "pattern": "new_ip_login",
-                        "previous_logins_from_ip": previous_logins
-                    },
-                    risk_score=40,
-                    threat_level="medium"
-                )
-                
-                await self.create_security_log(suspicious_log)
-        
-        except Exception as e:
-            logger.error("Failed to check unusual access patterns", error=str(e))
-    
-    async def _check_suspicious_data_access(self, security_log: SecurityLog):
-        """Check for suspicious data access patterns"""
-        try:
-            # Check for bulk data access
-            if security_log.details and security_log.details.get("bulk_access"):
-                suspicious_log = SecurityLogCreate(
-                    user_id=security_log.user_id,
-                    company_id=security_log.company_id,
-                    event_type=SecurityEvent.SUSPICIOUS_ACTIVITY,
-                    success=True,
-                    ip_address=security_log.ip_address,
-                    user_agent=security_log.user_agent,
-                    details={
-                        "pattern": "bulk_data_access",
-                        "records_accessed": security_log.details.get("records_count", 0)
-                    },
-                    risk_score=60,
-                    threat_level="high"
-                )
-                
-                await self.create_security_log(suspicious_log)
-        
-        except Exception as e:
-            logger.error("Failed to check suspicious data access", error=str(e))
+        return DEFAULT_ROLE_PERMISSIONS.get(role, {})
     
     async def get_security_settings(self, company_id: str) -> SecuritySettingsResponse:
         """Get security settings for a company"""
@@ -823,6 +615,7 @@ class SecurityService:
                     updated_permissions.append(new_permission)
             
             await self.db.commit()
+            await access_control.invalidate(user_id)
             
             # Refresh all permissions
             for permission in updated_permissions:
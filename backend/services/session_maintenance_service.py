@@ -0,0 +1,173 @@
+from typing import Dict, Any, List
+from datetime import datetime, timezone, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, and_, or_, func
+from prometheus_client import Counter, Gauge
+from models.user import UserSession
+from models.audit import SecurityLog, AuditLog
+from database.connection import AsyncSessionLocal
+from services.session_revocation_service import session_revocations
+import asyncio
+import os
+import structlog
+
+logger = structlog.get_logger()
+
+TABLE_ROWS = Gauge("db_table_rows", "Approximate row count per table", ["table"])
+ACTIVE_SESSIONS = Gauge("user_sessions_active", "Active, unexpired user sessions")
+SESSIONS_PRUNED = Counter("user_sessions_pruned_total", "Expired or inactive sessions deleted")
+SESSIONS_LIMITED = Counter("user_sessions_limit_revoked_total", "Sessions revoked to enforce the per-user limit")
+
+
+class SessionMaintenanceService:
+    """Background pruning and bounding of the user_sessions table"""
+
+    def __init__(self):
+        self.interval_seconds = int(os.getenv("SESSION_MAINTENANCE_INTERVAL_SECONDS", "3600"))
+        self.batch_size = int(os.getenv("SESSION_PRUNE_BATCH_SIZE", "1000"))
+        self.max_active_sessions = int(os.getenv("MAX_ACTIVE_SESSIONS_PER_USER", "10"))
+        # Logged-out sessions are kept briefly so recent session history stays visible
+        self.inactive_retention_days = int(os.getenv("SESSION_INACTIVE_RETENTION_DAYS", "7"))
+        self._task = None
+
+    def start(self) -> None:
+        """Start the periodic maintenance loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Session maintenance started", interval_seconds=self.interval_seconds)
+
+    async def stop(self) -> None:
+        """Stop the periodic maintenance loop"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.run_once(db)
+            except Exception as e:
+                logger.error("Session maintenance failed", error=str(e))
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self, db: AsyncSession) -> Dict[str, Any]:
+        """Prune sessions, enforce the per-user limit and refresh table metrics"""
+        pruned = await self.prune_sessions(db)
+        limited = await self.enforce_session_limits(db)
+        table_sizes = await self.collect_table_metrics(db)
+
+        logger.info("Session maintenance completed", pruned=pruned, limited=limited, **table_sizes)
+        return {"pruned": pruned, "limited": limited, "table_sizes": table_sizes}
+
+    async def prune_sessions(self, db: AsyncSession) -> int:
+        """Delete expired and long-inactive sessions in bounded chunks"""
+        now = datetime.now(timezone.utc)
+        inactive_cutoff = now - timedelta(days=self.inactive_retention_days)
+        total = 0
+
+        while True:
+            result = await db.execute(
+                select(UserSession.session_id).where(
+                    or_(
+                        UserSession.expires_at <= now,
+                        and_(
+                            UserSession.is_active == False,
+                            UserSession.last_used <= inactive_cutoff
+                        )
+                    )
+                ).limit(self.batch_size)
+            )
+            session_ids = result.scalars().all()
+            if not session_ids:
+                break
+
+            await db.execute(delete(UserSession).where(UserSession.session_id.in_(session_ids)))
+            await db.commit()
+            total += len(session_ids)
+
+            if len(session_ids) < self.batch_size:
+                break
+
+        SESSIONS_PRUNED.inc(total)
+        return total
+
+    async def enforce_session_limits(self, db: AsyncSession) -> int:
+        """Revoke the oldest sessions of every user above the active session limit"""
+        now = datetime.now(timezone.utc)
+        result = await db.execute(
+            select(UserSession.user_id).where(
+                and_(
+                    UserSession.is_active == True,
+                    UserSession.expires_at > now
+                )
+            ).group_by(UserSession.user_id).having(func.count(UserSession.session_id) > self.max_active_sessions)
+        )
+
+        total = 0
+        for user_id in result.scalars().all():
+            total += await self.enforce_user_session_limit(db, user_id)
+        return total
+
+    async def enforce_user_session_limit(self, db: AsyncSession, user_id: str) -> int:
+        """Revoke a user's least recently used sessions beyond the active session limit"""
+        result = await db.execute(
+            select(UserSession.session_id).where(
+                and_(
+                    UserSession.user_id == user_id,
+                    UserSession.is_active == True,
+                    UserSession.expires_at > datetime.now(timezone.utc)
+                )
+            ).order_by(UserSession.last_used.desc(), UserSession.created_at.desc())
+            .offset(self.max_active_sessions)
+        )
+        excess: List[str] = result.scalars().all()
+        if not excess:
+            return 0
+
+        await db.execute(
+            update(UserSession)
+            .where(UserSession.session_id.in_(excess))
+            .values(is_active=False)
+        )
+        await db.commit()
+        await session_revocations.revoke(excess)
+
+        SESSIONS_LIMITED.inc(len(excess))
+        logger.info("Session limit enforced", user_id=user_id, revoked=len(excess))
+        return len(excess)
+
+    async def collect_table_metrics(self, db: AsyncSession) -> Dict[str, int]:
+        """Record table sizes for the session and log tables"""
+        now = datetime.now(timezone.utc)
+        result = await db.execute(
+            select(
+                select(func.count(UserSession.session_id)).scalar_subquery().label("user_sessions"),
+                select(func.count(UserSession.session_id)).where(
+                    and_(UserSession.is_active == True, UserSession.expires_at > now)
+                ).scalar_subquery().label("user_sessions_active"),
+                select(func.count(SecurityLog.log_id)).scalar_subquery().label("security_logs"),
+                select(func.count(AuditLog.audit_id)).scalar_subquery().label("audit_logs")
+            )
+        )
+        row = result.one()
+
+        table_sizes = {
+            "user_sessions": row.user_sessions,
+            "security_logs": row.security_logs,
+            "audit_logs": row.audit_logs
+        }
+        for table, rows in table_sizes.items():
+            TABLE_ROWS.labels(table=table).set(rows)
+        ACTIVE_SESSIONS.set(row.user_sessions_active)
+
+        return {**table_sizes, "user_sessions_active": row.user_sessions_active}
+
+
+# Global session maintenance service instance
+session_maintenance = SessionMaintenanceService()
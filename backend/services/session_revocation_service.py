@@ -0,0 +1,84 @@
+from typing import Iterable, Dict, Optional
+from database.connection import get_redis
+import os
+import time
+import structlog
+
+logger = structlog.get_logger()
+
+
+class SessionRevocationList:
+    """Locally replicated set of revoked session IDs.
+
+    Revocations are appended to a stream in the cache backend. Each worker
+    keeps its own copy and reads the entries after the last stream ID it has
+    seen at most once per poll interval, so checking a token costs a set
+    lookup. Stream IDs are assigned by the cache server as entries are
+    added, so a revocation can never land behind a worker's cursor the way
+    a client timestamp could. Entries are only needed while access tokens
+    issued for the session can still be valid, after which they are dropped.
+    Callers should not trust the local copy once `is_stale` reports that it
+    could not be refreshed.
+    """
+
+    REVOKED_KEY = "revoked_sessions"
+
+    def __init__(self):
+        self.poll_interval = float(os.getenv("SESSION_REVOCATION_POLL_SECONDS", "1"))
+        self.max_staleness = float(os.getenv("SESSION_REVOCATION_MAX_STALENESS_SECONDS", "10"))
+        # Access tokens outlive their revocation by at most their own lifetime
+        self.retention_seconds = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "15")) * 60 + 60
+        self._revoked: Dict[str, float] = {}
+        self._last_poll = 0.0
+        self._synced_at = 0.0
+        self._last_id: Optional[str] = None
+
+    async def revoke(self, session_ids: Iterable[str]) -> None:
+        """Publish session revocations to every worker"""
+        session_ids = [str(session_id) for session_id in session_ids]
+        if not session_ids:
+            return
+        now = time.time()
+        self._revoked.update({session_id: now for session_id in session_ids})
+
+        redis = await get_redis()
+        await redis.xadd(self.REVOKED_KEY, {"sessions": " ".join(session_ids)})
+        await redis.xtrim(self.REVOKED_KEY, minid=f"{int((now - self.retention_seconds) * 1000)}-0")
+        logger.info("Sessions revoked", sessions_count=len(session_ids))
+
+    async def _refresh(self, now: float) -> None:
+        redis = await get_redis()
+        entries = await redis.xrange(self.REVOKED_KEY, min=f"({self._last_id}" if self._last_id else "-", max="+")
+        for entry_id, fields in entries:
+            entry_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+            sessions = fields.get(b"sessions", fields.get("sessions", ""))
+            sessions = sessions.decode() if isinstance(sessions, bytes) else sessions
+            # The ID's first part is the server time the entry was added, in ms
+            revoked_at = int(entry_id.split("-")[0]) / 1000
+            for session_id in sessions.split():
+                self._revoked[session_id] = revoked_at
+            self._last_id = entry_id
+
+        horizon = now - self.retention_seconds
+        for session_id in [sid for sid, revoked_at in self._revoked.items() if revoked_at < horizon]:
+            del self._revoked[session_id]
+        self._synced_at = now
+
+    def is_stale(self) -> bool:
+        """Whether the local copy has gone unrefreshed for longer than allowed"""
+        return time.time() - self._synced_at > max(self.max_staleness, self.poll_interval)
+
+    async def is_revoked(self, session_id: str) -> bool:
+        """Check a session against the local revocation set, refreshing if due"""
+        now = time.time()
+        if now - self._last_poll >= self.poll_interval:
+            self._last_poll = now
+            try:
+                await self._refresh(now)
+            except Exception as e:
+                logger.error("Failed to refresh session revocations", error=str(e))
+        return session_id in self._revoked
+
+
+# Global session revocation list instance
+session_revocations = SessionRevocationList()
@@ -0,0 +1,236 @@
+from typing import Optional, Dict, List, Tuple, Iterable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, and_, func, case, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm.attributes import set_committed_value
+from models.inventory import ItemLocation, InventoryLocation
+from services.low_stock_alert_service import low_stock_alerts, is_low_stock
+import asyncio
+import uuid
+import structlog
+
+logger = structlog.get_logger()
+
+# (item_id, location_id) as given by the caller; a None location means the default location
+StockKey = Tuple[str, Optional[str]]
+
+# Set while the current task holds the SQLite writer lock
+_holding_writer: ContextVar[bool] = ContextVar("stock_writer", default=False)
+
+
+class StockDelta:
+    """Change to the quantity and value on hand of one item-location"""
+
+    __slots__ = ("item_id", "location_id", "quantity", "value", "last_cost")
+
+    def __init__(
+        self,
+        item_id: str,
+        location_id: Optional[str],
+        quantity: Decimal,
+        value: Decimal,
+        last_cost: Optional[Decimal] = None
+    ):
+        self.item_id = item_id
+        self.location_id = location_id
+        self.quantity = quantity
+        self.value = value
+        self.last_cost = last_cost
+
+    @property
+    def key(self) -> StockKey:
+        return (self.item_id, self.location_id)
+
+
+class StockMovementService:
+    """Concurrency-safe updates of item-location quantities and values.
+
+    A movement first locks the item-location rows it touches with SELECT ...
+    FOR UPDATE, in primary key order so documents touching the same items
+    cannot deadlock, which lets costing read the quantity it is about to
+    change. All lines of the document are then applied by one UPDATE that
+    adds the deltas to the stored quantity and value and returns the new
+    balances. SQLite has no row locks, so there movements in this process
+    are serialized by a writer lock held until the movement commits.
+    """
+
+    def __init__(self):
+        self._sqlite_writer = asyncio.Lock()
+
+    @asynccontextmanager
+    async def writer(self, db: AsyncSession):
+        """Hold around a whole stock movement, through its commit"""
+        if db.get_bind().dialect.name != "sqlite" or _holding_writer.get():
+            yield
+            return
+        async with self._sqlite_writer:
+            token = _holding_writer.set(True)
+            try:
+                yield
+            finally:
+                _holding_writer.reset(token)
+
+    @staticmethod
+    async def get_default_location_id(db: AsyncSession, company_id: str) -> Optional[str]:
+        result = await db.execute(
+            select(InventoryLocation.location_id).where(
+                and_(
+                    InventoryLocation.company_id == company_id,
+                    InventoryLocation.is_default == True,
+                    InventoryLocation.is_active == True
+                )
+            ).limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def _select_for_update(db: AsyncSession, pairs: List[Tuple[str, str]]) -> List[ItemLocation]:
+        result = await db.execute(
+            select(ItemLocation).where(
+                tuple_(ItemLocation.item_id, ItemLocation.location_id).in_(pairs)
+            ).order_by(ItemLocation.item_location_id).with_for_update().execution_options(populate_existing=True)
+        )
+        return list(result.scalars().all())
+
+    async def lock_item_locations(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        keys: Iterable[StockKey]
+    ) -> Dict[StockKey, ItemLocation]:
+        """Lock the item-locations a movement touches, creating the missing ones"""
+        keys = list(dict.fromkeys(keys))
+        default_location_id = None
+        if any(location_id is None for _, location_id in keys):
+            default_location_id = await self.get_default_location_id(db, company_id)
+            if default_location_id is None:
+                raise ValueError("No location given and the company has no default inventory location")
+        resolved = {key: (key[0], key[1] or default_location_id) for key in keys}
+        pairs = list(dict.fromkeys(resolved.values()))
+
+        rows = {(row.item_id, row.location_id): row for row in await self._select_for_update(db, pairs)}
+        missing = [pair for pair in pairs if pair not in rows]
+        if missing:
+            # Concurrent movements may create the same rows; the loser keeps the winner's row
+            insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+            await db.execute(
+                insert(ItemLocation).values([
+                    {
+                        "item_location_id": str(uuid.uuid4()),
+                        "item_id": item_id,
+                        "location_id": location_id,
+                        "quantity_on_hand": Decimal('0'),
+                        "quantity_available": Decimal('0'),
+                        "quantity_on_order": Decimal('0'),
+                        "quantity_allocated": Decimal('0'),
+                        "average_cost": Decimal('0'),
+                        "last_cost": Decimal('0'),
+                        "total_value": Decimal('0')
+                    }
+                    for item_id, location_id in missing
+                ]).on_conflict_do_nothing(index_elements=["item_id", "location_id"])
+            )
+            for row in await self._select_for_update(db, missing):
+                rows[(row.item_id, row.location_id)] = row
+
+        return {key: rows[pair] for key, pair in resolved.items()}
+
+    async def apply(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        item_locations: Dict[StockKey, ItemLocation],
+        deltas: List[StockDelta]
+    ) -> List[Tuple[Decimal, Decimal]]:
+        """Apply a document's deltas in one UPDATE and return the balance after each delta.
+
+        `item_locations` must come from `lock_item_locations` in the same
+        transaction. The locked rows are refreshed with the stored balances,
+        and item-locations the deltas take across their reorder point enter
+        or leave the low-stock set.
+        """
+        locations: Dict[str, ItemLocation] = {}
+        quantity_deltas: Dict[str, Decimal] = {}
+        value_deltas: Dict[str, Decimal] = {}
+        last_costs: Dict[str, Decimal] = {}
+        balances: List[Tuple[Decimal, Decimal]] = []
+        for delta in deltas:
+            item_location = item_locations[delta.key]
+            item_location_id = item_location.item_location_id
+            if item_location_id not in locations:
+                locations[item_location_id] = item_location
+                quantity_deltas[item_location_id] = Decimal('0')
+                value_deltas[item_location_id] = Decimal('0')
+            quantity_deltas[item_location_id] += delta.quantity
+            value_deltas[item_location_id] += delta.value
+            if delta.last_cost is not None:
+                last_costs[item_location_id] = delta.last_cost
+            balances.append((
+                (item_location.quantity_on_hand or Decimal('0')) + quantity_deltas[item_location_id],
+                (item_location.total_value or Decimal('0')) + value_deltas[item_location_id]
+            ))
+        if not locations:
+            return balances
+
+        expected = {
+            item_location_id: (
+                (item_location.quantity_on_hand or Decimal('0')) + quantity_deltas[item_location_id],
+                (item_location.total_value or Decimal('0')) + value_deltas[item_location_id]
+            )
+            for item_location_id, item_location in locations.items()
+        }
+        # Quantity and value are added in place; average cost follows from the locked balances
+        key_column = ItemLocation.item_location_id
+        quantity_delta = case(quantity_deltas, value=key_column, else_=0)
+        values = {
+            "quantity_on_hand": ItemLocation.quantity_on_hand + quantity_delta,
+            "quantity_available": ItemLocation.quantity_on_hand + quantity_delta - ItemLocation.quantity_allocated,
+            "total_value": func.coalesce(ItemLocation.total_value, 0) + case(value_deltas, value=key_column, else_=0)
+        }
+        average_costs = {
+            item_location_id: (value / quantity).quantize(Decimal('0.01'))
+            for item_location_id, (quantity, value) in expected.items() if quantity > 0
+        }
+        if average_costs:
+            values["average_cost"] = case(average_costs, value=key_column, else_=ItemLocation.average_cost)
+        if last_costs:
+            values["last_cost"] = case(last_costs, value=key_column, else_=ItemLocation.last_cost)
+
+        result = await db.execute(
+            update(ItemLocation).where(key_column.in_(list(locations))).values(**values).returning(
+                key_column,
+                ItemLocation.quantity_on_hand,
+                ItemLocation.quantity_available,
+                ItemLocation.total_value,
+                ItemLocation.average_cost,
+                ItemLocation.last_cost
+            ).execution_options(synchronize_session=False)
+        )
+        low: List[ItemLocation] = []
+        restocked: List[str] = []
+        for row in result.all():
+            item_location = locations[row.item_location_id]
+            if row.quantity_on_hand != expected[row.item_location_id][0]:
+                logger.warning("Item-location changed outside a stock movement",
+                               item_location_id=row.item_location_id,
+                               expected=str(expected[row.item_location_id][0]), stored=str(row.quantity_on_hand))
+            was_low = is_low_stock(item_location.quantity_on_hand, item_location.reorder_point)
+            for column in ("quantity_on_hand", "quantity_available", "total_value", "average_cost", "last_cost"):
+                set_committed_value(item_location, column, getattr(row, column))
+            if is_low_stock(row.quantity_on_hand, item_location.reorder_point):
+                low.append(item_location)
+            elif was_low:
+                restocked.append(row.item_location_id)
+
+        # Keep the low-stock set in step with the movement, in its transaction
+        await low_stock_alerts.track(db, company_id, low, restocked)
+
+        return balances
+
+
+# Global stock movement service instance
+stock_movements = StockMovementService()